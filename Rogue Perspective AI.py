@@ -18,13 +18,21 @@
 import bpy
 from bpy.props import (
     PointerProperty, StringProperty, FloatProperty,
-    IntProperty, BoolProperty, EnumProperty, FloatVectorProperty
+    IntProperty, BoolProperty, EnumProperty, FloatVectorProperty, CollectionProperty
 )
 from bpy.types import Operator, Panel, PropertyGroup
+from bpy.app.handlers import persistent
 import math
+import functools
+import collections
+import logging
+import time
+import json
+import hashlib
+import numpy as np
 from mathutils import Vector
 import random
-from bpy_extras.object_utils import world_to_camera_view # For camera trimming
+from bpy_extras.io_utils import ExportHelper
 
 # --- START OF FILE Rogue Perspective AI Mixed.txt ---
 
@@ -45,9 +53,12 @@ bl_info = {
 # -----------------------------------------------------------
 PERSPECTIVE_HELPER_COLLECTION = "Perspective_Helpers_Collection"
 PERSPECTIVE_GUIDES_COLLECTION = "Perspective_Guides_Curves_Collection"
+GUIDE_COLLECTION_PREFIX = "Guides_" # Child collections of the guides collection: 'Guides_<mode>' > 'Guides_<family key>'
+GUIDE_COLLECTION_PROP = "rogue_guide_collection" # Collection: the perspective mode or guide family key it holds
 HORIZON_CTRL_OBJ_NAME = "CTRL_Perspective_Horizon"
 HORIZON_CURVE_OBJ_NAME = "VISUAL_Horizon_Line"
 VP_PREFIX = "VP_"
+GRID_OBJECT_PREFIX = "GridPlane_"
 DEFAULT_LINE_EXTENSION = 100.0
 
 VP_TYPE_SPECIFIC_PREFIX_MAP = {
@@ -57,132 +68,1147 @@ VP_TYPE_SPECIFIC_PREFIX_MAP = {
     'THREE_POINT_V': VP_PREFIX + "3P_V",
     'FISH_EYE': VP_PREFIX + "FE_Center" # Note: Used as base, often with _1 or specific name
 }
+# VP roles: each main VP has a fixed role and object name.
+# Structure: ROLE: (VP_TYPE_SPECIFIC_PREFIX_MAP key, object name)
+VP_ROLE_DEFS = {
+    '1P':    ('ONE_POINT', VP_TYPE_SPECIFIC_PREFIX_MAP['ONE_POINT'] + "_1"),
+    '2P_1':  ('TWO_POINT', VP_TYPE_SPECIFIC_PREFIX_MAP['TWO_POINT'] + "_1"),
+    '2P_2':  ('TWO_POINT', VP_TYPE_SPECIFIC_PREFIX_MAP['TWO_POINT'] + "_2"),
+    '3P_H1': ('THREE_POINT_H', VP_TYPE_SPECIFIC_PREFIX_MAP['THREE_POINT_H'] + "_1"),
+    '3P_H2': ('THREE_POINT_H', VP_TYPE_SPECIFIC_PREFIX_MAP['THREE_POINT_H'] + "_2"),
+    '3P_V':  ('THREE_POINT_V', VP_TYPE_SPECIFIC_PREFIX_MAP['THREE_POINT_V'] + "_1"),
+    'FE':    ('FISH_EYE', VP_TYPE_SPECIFIC_PREFIX_MAP['FISH_EYE'] + "_1"),
+}
+VP_ROLE_BY_NAME = {vp_name: role for role, (_, vp_name) in VP_ROLE_DEFS.items()}
 previous_perspective_type_on_switch = 'NONE'
 
+# Guide families: each generator emits its lines family by family.
+# Structure: FAMILY_KEY: (object name prefix, perspective type)
+GUIDE_FAMILY_DEFS = {
+    '1P':          ("1P_Guides_", 'ONE_POINT'),
+    '2P_VP1':      ("2P_Guides_VP1_", 'TWO_POINT'),
+    '2P_VP2':      ("2P_Guides_VP2_", 'TWO_POINT'),
+    '2P_VERTICAL': ("2P_Guides_Vertical_", 'TWO_POINT'),
+    '3P_H1':       ("3P_Guides_H1_", 'THREE_POINT'),
+    '3P_H2':       ("3P_Guides_H2_", 'THREE_POINT'),
+    '3P_V':        ("3P_Guides_V_", 'THREE_POINT'),
+    'FE_LON':      ("FE_Guides_Lon_", 'FISH_EYE'),
+    'FE_LAT':      ("FE_Guides_Lat_", 'FISH_EYE'),
+    'FE_BOUNDARY': ("FE_Guides_1P_Boundary_", 'FISH_EYE'),
+    'FE_RADIAL':   ("FE_Guides_1P_Radial_", 'FISH_EYE'),
+}
+GUIDE_FAMILY_OBJECT_SUFFIX = "All" # Consolidated family object: e.g. "2P_Guides_VP1_All"
+# Exact object names older versions gave a family's object outside its prefix: name -> family key.
+# They are found as family objects (and removed on regeneration) like '<prefix>All' / '<prefix><N>'.
+LEGACY_GUIDE_FAMILY_NAMES = {
+    "FE_Guides_1P_Boundary": 'FE_BOUNDARY',
+}
+
 EXTRACTION_AIDS_COLLECTION = "Perspective_Extraction_Aids_Collection"
 
 # -----------------------------------------------------------
-# Utility Functions
+# Logging
 # -----------------------------------------------------------
+# Every subsystem logs through its own child of the "rogue_perspective" logger with lazy %-style
+# arguments, so a disabled level or subsystem costs one cached level check and no string formatting.
+# Enabled records go to an in-memory ring buffer (dumped from the Diagnostics panel) and, optionally,
+# to the console. Levels and switches live in the scene tool settings, see configure_logging.
+LOG_ROOT_NAME = "rogue_perspective"
+LOG_RING_BUFFER_SIZE = 2000
+LOG_TEXT_NAME = "RoguePerspective_Log"
+LOG_FORMAT = "%(asctime)s %(levelname)-7s %(name)s: %(message)s"
+# Structure: SUBSYSTEM: (UI name, description)
+LOG_SUBSYSTEMS = {
+    'vps':       ("VPs", "Vanishing point creation and lookup"),
+    'mode':      ("Mode", "Perspective type switching and clearing"),
+    'aids':      ("Aids", "Extraction helpers and aid lines"),
+    'guides':    ("Guides", "Guide generation, live follow and removal"),
+    'horizon':   ("Horizon", "Horizon line and control"),
+    'merge':     ("Merge", "Guide merging"),
+    'depsgraph': ("Depsgraph", "Depsgraph update handler"),
+    'register':  ("Register", "Add-on registration"),
+}
 
+class RingBufferLogHandler(logging.Handler):
+    """Keeps the last `capacity` records unformatted; formatting happens only when they are dumped."""
+    def __init__(self, capacity=LOG_RING_BUFFER_SIZE):
+        super().__init__()
+        self.records = collections.deque(maxlen=capacity)
+
+    def emit(self, record):
+        self.records.append(record)
+
+    def dump_lines(self):
+        return [self.format(record) for record in self.records]
+
+_log_root = logging.getLogger(LOG_ROOT_NAME)
+_log_root.propagate = False # Blender's root handlers must not re-print our records
+_log_root.setLevel(logging.WARNING)
+_log_ring_handler = RingBufferLogHandler()
+_log_ring_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+_log_console_handler = logging.StreamHandler()
+_log_console_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+_log_root.handlers.clear() # The logger outlives script reloads; drop the previous module's handlers
+_log_root.addHandler(_log_ring_handler)
+_log_root.addHandler(_log_console_handler)
+
+def get_subsystem_logger(subsystem):
+    return logging.getLogger(f"{LOG_ROOT_NAME}.{subsystem}")
+
+vp_log = get_subsystem_logger('vps')
+mode_log = get_subsystem_logger('mode')
+aid_log = get_subsystem_logger('aids')
+guide_log = get_subsystem_logger('guides')
+horizon_log = get_subsystem_logger('horizon')
+merge_log = get_subsystem_logger('merge')
+depsgraph_log = get_subsystem_logger('depsgraph')
+register_log = get_subsystem_logger('register')
+
+def configure_logging(tool_settings):
+    """Applies the level, subsystem switches and console echo of the tool settings."""
+    _log_root.setLevel(getattr(logging, tool_settings.log_level))
+    for subsystem in LOG_SUBSYSTEMS:
+        get_subsystem_logger(subsystem).disabled = subsystem not in tool_settings.log_subsystems
+    _log_console_handler.setLevel(logging.NOTSET if tool_settings.log_to_console else logging.CRITICAL + 1)
 
-# Place in the "Utility Functions" section, near the other clip functions
-
-
-def clip_poly_spline_to_polygon(spline, obj_matrix, inv_obj_matrix, polygon, scene, cam):
-    """
-    Clips every consecutive segment of a POLY spline to a given convex polygon in NDC space.
-    
-    Args:
-        spline: The POLY spline (bpy.types.Spline) to process.
-        obj_matrix: The world matrix of the guide curve object.
-        inv_obj_matrix: The inverse of that world matrix.
-        polygon: A list of 2D Vectors representing the clipping polygon (assumed CCW-ordered).
-        scene: The current scene.
-        cam: The active camera.
-        
-    Returns:
-        A list of clipped segments. Each segment is a list of two Vectors (in the curve’s local space)
-        representing the endpoints of the visible part of that segment.
-    """
-    new_segments = []
-    # Get the original points in local space
-    points = [Vector(pt.co[:3]) for pt in spline.points]
-
-    for i in range(len(points) - 1):
-        # Convert local points to world space.
-        p0_world = obj_matrix @ points[i]
-        p1_world = obj_matrix @ points[i+1]
-        # Convert world positions to camera NDC (only X and Y)
-        p0_cam = world_to_camera_view(scene, cam, p0_world)
-        p1_cam = world_to_camera_view(scene, cam, p1_world)
-        p0_ndc = Vector((p0_cam.x, p0_cam.y))
-        p1_ndc = Vector((p1_cam.x, p1_cam.y))
-        
-        # Use your existing helper to clip this segment against the polygon.
-        clipped = clip_segment_to_convex_polygon(p0_ndc, p1_ndc, polygon)
-        if clipped is None:
-            continue  # This segment is completely outside.
-        # Determine interpolation parameters
-        seg = p1_ndc - p0_ndc
-        seg_len_sq = seg.length_squared
-        def project_t(pt):
-            # Project the clipped point onto the segment
-            v = pt - p0_ndc
-            t_raw = v.dot(seg) / seg_len_sq if seg_len_sq > 1e-9 else 0.0
-            return min(max(t_raw, 0.0), 1.0)
-        t0 = project_t(clipped[0])
-        t1 = project_t(clipped[1])
-        # Interpolate in world space for precise points.
-        new_p0_world = p0_world.lerp(p1_world, t0)
-        new_p1_world = p0_world.lerp(p1_world, t1)
-        # Convert back to local coordinates
-        local_p0 = inv_obj_matrix @ new_p0_world
-        local_p1 = inv_obj_matrix @ new_p1_world
-        new_segments.append([local_p0, local_p1])
-        
-    return new_segments
-
+# -----------------------------------------------------------
+# Profiling
+# -----------------------------------------------------------
+# Opt-in timing of operators (execute), the depsgraph handler, timers and property update callbacks.
+# While disabled a profiled call costs one dict lookup. While enabled each call records its wall time,
+# the IDs it created and removed (session_uid sets of the tracked bpy.data collections, inclusive of
+# nested profiled calls) and the spline points it wrote (see count_points_written). The time nested calls
+# spend in their own bookkeeping (ID snapshots, recording) is subtracted from the enclosing call's duration.
+PROFILE_SAMPLE_LIMIT = 1000 # Most recent durations kept per entry for the percentiles
+PROFILE_PERCENTILES = (50, 90, 99)
+PROFILE_ID_COLLECTIONS = ('objects', 'curves', 'materials', 'meshes', 'collections')
+PROFILE_PANEL_ROWS = 12
+_profiling_state = {'enabled': False}
+_profile_counters = {'points_written': 0, 'overhead_s': 0.0} # overhead_s: total profiler bookkeeping time
+_profile_stats = {} # entry name -> {'calls', 'total_time', 'samples', 'ids_created', 'ids_removed', 'points_written'}
+
+def count_points_written(n_points):
+    _profile_counters['points_written'] += int(n_points)
+
+def _profile_id_snapshot():
+    start = time.perf_counter()
+    try:
+        return {id_block.session_uid for attr in PROFILE_ID_COLLECTIONS for id_block in getattr(bpy.data, attr)}
+    finally:
+        _profile_counters['overhead_s'] += time.perf_counter() - start
+
+def _record_profile_sample(name, duration, ids_created, ids_removed, points_written):
+    entry = _profile_stats.get(name)
+    if entry is None:
+        entry = _profile_stats[name] = {'calls': 0, 'total_time': 0.0, 'samples': collections.deque(maxlen=PROFILE_SAMPLE_LIMIT),
+                                        'ids_created': 0, 'ids_removed': 0, 'points_written': 0}
+    entry['calls'] += 1
+    entry['total_time'] += duration
+    entry['samples'].append(duration)
+    entry['ids_created'] += ids_created
+    entry['ids_removed'] += ids_removed
+    entry['points_written'] += points_written
+
+def profiled(name):
+    """Decorator recording the wrapped callable under `name` while profiling is enabled."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _profiling_state['enabled']:
+                return func(*args, **kwargs)
+            ids_before = _profile_id_snapshot()
+            points_before = _profile_counters['points_written']
+            overhead_before = _profile_counters['overhead_s']
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                duration = time.perf_counter() - start - (_profile_counters['overhead_s'] - overhead_before) # Without nested bookkeeping
+                try:
+                    ids_after = _profile_id_snapshot() # Adds its own time to the overhead
+                except Exception: # bpy.data is not accessible in every context (e.g. restricted)
+                    ids_after = ids_before
+                record_start = time.perf_counter()
+                _record_profile_sample(name, duration, len(ids_after - ids_before), len(ids_before - ids_after),
+                                       _profile_counters['points_written'] - points_before)
+                del ids_before, ids_after # Freeing the snapshots is bookkeeping too
+                _profile_counters['overhead_s'] += time.perf_counter() - record_start
+        wrapper.rogue_profiled = True
+        return wrapper
+    return decorator
+
+def profile_operator_classes(classes):
+    """Wraps execute of every PERSPECTIVE_OT_* class (once) so operators show up as 'OT.<bl_idname>'."""
+    for cls in classes:
+        if cls.__name__.startswith("PERSPECTIVE_OT_") and hasattr(cls, "execute") and \
+                not getattr(cls.execute, "rogue_profiled", False):
+            cls.execute = profiled(f"OT.{cls.bl_idname}")(cls.execute)
+
+def reset_profile_stats():
+    _profile_stats.clear()
+
+def summarize_profile_stats():
+    """Rows sorted by total time: dicts with calls, total/mean/percentile times (ms), IDs and points."""
+    rows = []
+    for name, entry in _profile_stats.items():
+        samples_ms = np.fromiter(entry['samples'], dtype=np.float64) * 1000.0
+        percentiles = np.percentile(samples_ms, PROFILE_PERCENTILES) if len(samples_ms) else np.zeros(len(PROFILE_PERCENTILES))
+        row = {'name': name, 'calls': entry['calls'], 'total_ms': entry['total_time'] * 1000.0,
+               'mean_ms': entry['total_time'] * 1000.0 / max(entry['calls'], 1),
+               'ids_created': entry['ids_created'], 'ids_removed': entry['ids_removed'],
+               'points_written': entry['points_written']}
+        row.update({f"p{pct}_ms": float(value) for pct, value in zip(PROFILE_PERCENTILES, percentiles)})
+        rows.append(row)
+    rows.sort(key=lambda row: row['total_ms'], reverse=True)
+    return rows
+
+def export_profile_stats(filepath):
+    report = {
+        'addon_version': list(bl_info["version"]),
+        'blender_version': bpy.app.version_string,
+        'object_count': len(bpy.data.objects),
+        'sample_limit': PROFILE_SAMPLE_LIMIT,
+        'entries': summarize_profile_stats(),
+    }
+    with open(filepath, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    return len(report['entries'])
 
+# >>> GEOMETRY CORE >>>
+# -----------------------------------------------------------
+# Geometry Core
+# -----------------------------------------------------------
+# Pure geometry on plain tuples / NumPy arrays: no bpy, no mathutils (Vectors are accepted wherever
+# a point is expected, as they index like tuples). Everything between the GEOMETRY CORE markers only
+# needs math, functools and numpy, so benchmarks/geometry_microbench.py can load it in plain CPython
+# to profile the hot math without launching Blender. Keep it that way.
 
+# --- 2D polygon clipping ---
 
 def sort_polygon_ccw(points):
-    """Given a list of 2D Vector points, it returns them sorted counter-clockwise."""
+    """Given 2D points, returns them (the same objects) sorted counter-clockwise around their centroid."""
     if not points:
         return []
-    
-    # --- THE FIX IS HERE ---
-    # We explicitly create a 2D vector and sum the points manually.
-    # This is more robust than using sum(points, Vector()).
-    center = Vector((0.0, 0.0)) 
-    for p in points:
-        center += p
-    center /= len(points)
-    
-    # The rest of the function remains the same.
-    return sorted(points, key=lambda p: math.atan2(p.y - center.y, p.x - center.x))
-
-#
-# ---------- END OF THE SECTION TO FIX ----------
-#
-
-
-def clip_segment_to_convex_polygon(p1, p2, polygon):
-    """
-    Clips a 2D segment (p1, p2) to a convex polygon.
-    Returns (new_p1, new_p2) if the segment crosses or is inside the polygon, or None if fully outside.
-    """
-    tE, tL = 0.0, 1.0
-    d = p2 - p1
+    center_x = sum(p[0] for p in points) / len(points)
+    center_y = sum(p[1] for p in points) / len(points)
+    return sorted(points, key=lambda p: math.atan2(p[1] - center_y, p[0] - center_x))
+
+def clip_segment_params_convex(p1, p2, polygon):
+    """Cyrus-Beck clip of the 2D segment p1 -> p2 against a convex CCW polygon.
+    Returns the parameters (t_enter, t_leave) of the visible part, or None if it is fully outside."""
+    t_enter, t_leave = 0.0, 1.0
+    dx, dy = p2[0] - p1[0], p2[1] - p1[1]
     n_edges = len(polygon)
     for i in range(n_edges):
-        a = polygon[i]
-        b = polygon[(i + 1) % n_edges]
-        edge = b - a
-        # Inward normal (for CCW polygons)
-        normal = Vector((edge.y, -edge.x))
-        w = p1 - a
-        denom = normal.dot(d)
-        num = -normal.dot(w)
+        ax, ay = polygon[i][0], polygon[i][1]
+        bx, by = polygon[(i + 1) % n_edges][0], polygon[(i + 1) % n_edges][1]
+        nx, ny = by - ay, -(bx - ax) # Inward normal (for CCW polygons)
+        denom = nx * dx + ny * dy
+        num = -(nx * (p1[0] - ax) + ny * (p1[1] - ay))
         if abs(denom) < 1e-9:
             if num < 0:
-                return None  # Outside and parallel
-            else:
-                continue  # Parallel and inside
+                return None # Outside and parallel
+            continue # Parallel and inside
         t = num / denom
         if denom < 0:
-            if t > tL:
+            if t > t_leave:
                 return None
-            if t > tE:
-                tE = t
+            t_enter = max(t_enter, t)
         else:
-            if t < tE:
+            if t < t_enter:
                 return None
-            if t < tL:
-                tL = t
-    if tE > tL:
+            t_leave = min(t_leave, t)
+    if t_enter > t_leave:
+        return None
+    return t_enter, t_leave
+
+def clip_segment_to_convex_polygon(p1, p2, polygon):
+    """
+    Clips a 2D segment (p1, p2) to a convex polygon.
+    Returns ((x, y), (x, y)) if the segment crosses or is inside the polygon, or None if fully outside.
+    """
+    params = clip_segment_params_convex(p1, p2, polygon)
+    if params is None:
+        return None
+    dx, dy = p2[0] - p1[0], p2[1] - p1[1]
+    return tuple((p1[0] + dx * t, p1[1] + dy * t) for t in params)
+
+def liang_barsky_clip(A, B, x_min=0.0, x_max=1.0, y_min=0.0, y_max=1.0):
+    """Liang-Barsky clipping in 2D for an axis-aligned rectangle (by default the camera view in NDC).
+    Returns the parameters (t_min, t_max) of the visible part of A -> B, or None."""
+    dx = B[0] - A[0]
+    dy = B[1] - A[1]
+    t_min, t_max = 0.0, 1.0
+    p = (-dx, dx, -dy, dy)
+    q = (A[0] - x_min, x_max - A[0], A[1] - y_min, y_max - A[1])
+    for i in range(4):
+        if abs(p[i]) < 1e-9:
+            if q[i] < 0: return None
+        else:
+            r = q[i] / p[i]
+            if p[i] < 0: t_min = max(t_min, r)
+            else: t_max = min(t_max, r)
+        if t_min > t_max: return None
+    return t_min, t_max
+
+# --- 3D lines ---
+
+def _sub3(a, b):
+    return (a[0] - b[0], a[1] - b[1], a[2] - b[2])
+
+def _dot3(a, b):
+    return a[0] * b[0] + a[1] * b[1] + a[2] * b[2]
+
+def line_line_intersection_3d(p1, p2, p3, p4, tolerance=1e-3):
+    """
+    Finds the point of closest approach between two 3D lines L1 (p1-p2) and L2 (p3-p4).
+    If the distance between the closest points is within tolerance, their midpoint is returned.
+    Otherwise, returns None.
+    p1, p2: Points defining the first line segment.
+    p3, p4: Points defining the second line segment.
+    tolerance: Maximum distance for lines to be considered intersecting.
+    Returns: Intersection point (x, y, z) or None, and the two closest points C1, C2 (tuples, or None if parallel).
+    """
+    d1 = _sub3(p2, p1)
+    d2 = _sub3(p4, p3)
+
+    # Ensure direction vectors are not zero length
+    if _dot3(d1, d1) < 1e-9 or _dot3(d2, d2) < 1e-9:
+        return None, None, None
+
+    # Parameters t (for L1) and u (for L2) where the lines are closest:
+    # t*(d1.d1) - u*(d2.d1) = (p3-p1).d1
+    # t*(d1.d2) - u*(d2.d2) = (p3-p1).d2
+    a = _dot3(d1, d1)
+    b = -_dot3(d2, d1)
+    c = _dot3(d1, d2)
+    d = -_dot3(d2, d2)
+
+    dp = _sub3(p3, p1)
+    r1 = _dot3(dp, d1)
+    r2 = _dot3(dp, d2)
+
+    determinant = a * d - b * c
+    if abs(determinant) < 1e-9: # Lines are parallel: they give no unique VP
+        return None, None, None
+
+    t = (r1 * d - b * r2) / determinant
+    u = (a * r2 - r1 * c) / determinant # u is for the line p3 + u*d2
+
+    c1 = (p1[0] + t * d1[0], p1[1] + t * d1[1], p1[2] + t * d1[2])
+    c2 = (p3[0] + u * d2[0], p3[1] + u * d2[1], p3[2] + u * d2[2])
+    offset = _sub3(c1, c2)
+    if _dot3(offset, offset) < tolerance ** 2:
+        return ((c1[0] + c2[0]) / 2.0, (c1[1] + c2[1]) / 2.0, (c1[2] + c2[2]) / 2.0), c1, c2
+    return None, c1, c2
+
+# --- Guide geometry kernels ---
+# Angle tables are cached per density, so regenerating with unchanged settings only pays
+# for the broadcasting.
+
+@functools.lru_cache(maxsize=64)
+def _angle_table(count, divisor, span):
+    """(cos, sin) of span * k / divisor for k in range(count), read-only and cached."""
+    angles = span * np.arange(count, dtype=np.float64) / divisor
+    cos_t, sin_t = np.cos(angles), np.sin(angles)
+    cos_t.flags.writeable = False
+    sin_t.flags.writeable = False
+    return cos_t, sin_t
+
+def euler_xyz_matrix(rot_x, rot_y, rot_z):
+    """3x3 rotation matrix of an 'XYZ' Euler (radians), same as mathutils Euler(...).to_matrix()."""
+    cx, sx = math.cos(rot_x), math.sin(rot_x)
+    cy, sy = math.cos(rot_y), math.sin(rot_y)
+    cz, sz = math.cos(rot_z), math.sin(rot_z)
+    rx = np.array(((1.0, 0.0, 0.0), (0.0, cx, -sx), (0.0, sx, cx)))
+    ry = np.array(((cy, 0.0, sy), (0.0, 1.0, 0.0), (-sy, 0.0, cy)))
+    rz = np.array(((cz, -sz, 0.0), (sz, cz, 0.0), (0.0, 0.0, 1.0)))
+    return rz @ ry @ rx
+
+def _as_point(co):
+    return np.array(tuple(co)[:3], dtype=np.float64)
+
+def _empty_lines(points_per_line=2):
+    return np.zeros((0, points_per_line, 3), dtype=np.float64)
+
+def radial_lines_array(vp_loc, density, line_extension, plane='XZ'):
+    """(density, 2, 3): lines from vp_loc outwards at evenly spaced angles within 'plane'."""
+    if density <= 0: return _empty_lines()
+    cos_t, sin_t = _angle_table(density, density, 2.0 * math.pi)
+    axes = {'XY': (0, 1), 'XZ': (0, 2), 'YZ': (1, 2)}.get(plane, (0, 1)) # XY is the fallback
+    lines = np.empty((density, 2, 3), dtype=np.float64)
+    lines[:, :, :] = _as_point(vp_loc)
+    lines[:, 1, axes[0]] += cos_t * line_extension
+    lines[:, 1, axes[1]] += sin_t * line_extension
+    return lines
+
+def parallel_lines_array(center, offset_axis, offsets, line_axis, half_length):
+    """(len(offsets), 2, 3): lines along 'line_axis', each shifted from center by offset * offset_axis."""
+    offsets = np.asarray(offsets, dtype=np.float64)
+    mids = _as_point(center) + offsets[:, None] * _as_point(offset_axis)
+    half_vec = _as_point(line_axis) * half_length
+    return np.stack((mids - half_vec, mids + half_vec), axis=1)
+
+def _centered_offsets(density):
+    """Factors in [-1, 1] for density + 1 evenly spaced lines (a single centred line if density is 0)."""
+    if density <= 0: return np.zeros(1)
+    return (np.arange(density + 1, dtype=np.float64) / density - 0.5) * 2.0
+
+def plane_grid_lines_array(center, size_u, size_v, subs_u, subs_v, u_axis_vec, v_axis_vec):
+    """((subs_u + 1) + (subs_v + 1), 2, 3): the lines of one grid plane."""
+    t_u = np.arange(subs_u + 1, dtype=np.float64) / subs_u - 0.5 # from -0.5 to 0.5
+    t_v = np.arange(subs_v + 1, dtype=np.float64) / subs_v - 0.5
+    return np.concatenate((
+        parallel_lines_array(center, u_axis_vec, t_u * size_u, v_axis_vec, size_v / 2.0), # Lines along V (varying U)
+        parallel_lines_array(center, v_axis_vec, t_v * size_v, u_axis_vec, size_u / 2.0), # Lines along U (varying V)
+    ))
+
+def fish_eye_meridians_array(center, radius, n_lon, segs, h_scale, rot_matrix):
+    """(n_lon, segs + 1, 3) longitude lines and their (n_lon, segs + 1) 'front' mask (rotated y <= 0)."""
+    cos_phi, sin_phi = _angle_table(n_lon, n_lon, 2.0 * math.pi)
+    cos_theta, sin_theta = _angle_table(segs + 1, segs, math.pi)
+    local = np.empty((n_lon, segs + 1, 3), dtype=np.float64)
+    local[:, :, 0] = radius * cos_theta[None, :]
+    local[:, :, 1] = radius * sin_theta[None, :] * cos_phi[:, None] * h_scale
+    local[:, :, 2] = radius * sin_theta[None, :] * sin_phi[:, None]
+    rotated = local @ rot_matrix.T
+    return rotated + _as_point(center), rotated[:, :, 1] <= 0.0
+
+def fish_eye_rings_array(center, radius, thetas, segs, h_scale, rot_matrix):
+    """(len(thetas), segs + 1, 3) rings at polar angles 'thetas' and their 'front' mask."""
+    thetas = np.asarray(thetas, dtype=np.float64)
+    cos_phi, sin_phi = _angle_table(segs + 1, segs, 2.0 * math.pi)
+    ring_radii = radius * np.sin(thetas)
+    local = np.empty((len(thetas), segs + 1, 3), dtype=np.float64)
+    local[:, :, 0] = (radius * np.cos(thetas))[:, None]
+    local[:, :, 1] = ring_radii[:, None] * cos_phi[None, :] * h_scale
+    local[:, :, 2] = ring_radii[:, None] * sin_phi[None, :]
+    rotated = local @ rot_matrix.T
+    return rotated + _as_point(center), rotated[:, :, 1] <= 0.0
+
+def compact_guide_lines(lines, keep_mask=None):
+    """Splits a family array into per-line point arrays, dropping masked-out points.
+    Lines left with fewer than 2 points are skipped."""
+    if keep_mask is None:
+        return list(lines)
+    return [line[keep] for line, keep in zip(lines, keep_mask) if np.count_nonzero(keep) >= 2]
+
+# --- Packed polylines ---
+
+def pack_lines(lines, min_points=2):
+    """Packs a list of point lists/arrays (or an (N, M, 3) array) into (coords (K, 3) float32, counts).
+    Lines with fewer than min_points points are dropped."""
+    if isinstance(lines, np.ndarray) and lines.ndim == 3:
+        if lines.shape[1] < min_points or lines.shape[0] == 0:
+            return np.zeros((0, 3), dtype=np.float32), np.zeros(0, dtype=np.int64)
+        return (np.ascontiguousarray(lines.reshape(-1, 3), dtype=np.float32),
+                np.full(lines.shape[0], lines.shape[1], dtype=np.int64))
+    kept = [np.asarray(pts, dtype=np.float32).reshape(-1, 3) for pts in lines if len(pts) >= min_points]
+    if not kept:
+        return np.zeros((0, 3), dtype=np.float32), np.zeros(0, dtype=np.int64)
+    return np.concatenate(kept), np.array([len(pts) for pts in kept], dtype=np.int64)
+
+def unpack_lines(coords, counts):
+    """Inverse of pack_lines: a list of (M, 3) views into coords."""
+    return np.split(coords, np.cumsum(counts)[:-1]) if len(counts) else []
+
+def matrix_to_numpy(matrix):
+    return np.array([tuple(row) for row in matrix], dtype=np.float64)
+
+def transform_coords(matrix, coords):
+    """Applies a 4x4 matrix (mathutils or NumPy) to (K, 3) coordinates."""
+    m = matrix if isinstance(matrix, np.ndarray) else matrix_to_numpy(matrix)
+    return np.asarray(coords, dtype=np.float64) @ m[:3, :3].T + m[:3, 3]
+
+def auto_bezier_handles(coords, counts, cyclic):
+    """Handles equivalent to Blender's 'AUTO' handle type, computed for all packed points at once.
+    Returns (handle_left, handle_right), both (K, 3) float32."""
+    coords = np.asarray(coords, dtype=np.float64)
+    prev_pts, next_pts = np.empty_like(coords), np.empty_like(coords)
+    prev_pts[1:], next_pts[:-1] = coords[:-1], coords[1:]
+    for start, count, is_cyclic in zip(np.cumsum(counts) - counts, counts, cyclic):
+        end = start + count
+        if count < 2:
+            prev_pts[start:end] = next_pts[start:end] = coords[start:end]
+        elif is_cyclic:
+            prev_pts[start], next_pts[end - 1] = coords[end - 1], coords[start]
+        else: # Open ends mirror their only neighbour
+            prev_pts[start] = 2.0 * coords[start] - coords[start + 1]
+            next_pts[end - 1] = 2.0 * coords[end - 1] - coords[end - 2]
+    dvec_a, dvec_b = coords - prev_pts, next_pts - coords
+    len_a = np.linalg.norm(dvec_a, axis=1)
+    len_b = np.linalg.norm(dvec_b, axis=1)
+    len_a[len_a == 0.0] = 1.0
+    len_b[len_b == 0.0] = 1.0
+    tangent = dvec_b / len_b[:, None] + dvec_a / len_a[:, None]
+    tangent_len = np.linalg.norm(tangent, axis=1) * 2.5614
+    tangent_len[tangent_len == 0.0] = 1.0
+    handle_left = coords - tangent * (len_a / tangent_len)[:, None]
+    handle_right = coords + tangent * (len_b / tangent_len)[:, None]
+    return handle_left.astype(np.float32), handle_right.astype(np.float32)
+
+def polyline_segment_starts(counts):
+    """Index of the first point of every segment of packed polylines (segment i joins points i and i + 1)."""
+    counts = np.asarray(counts, dtype=np.int64)
+    ends = np.cumsum(counts)
+    is_last = np.zeros(int(ends[-1]) if len(ends) else 0, dtype=bool)
+    is_last[ends[counts > 0] - 1] = True
+    return np.nonzero(~is_last)[0]
+
+def polylines_to_segments(coords, counts, cyclic=False):
+    """Packed polylines -> (2 * segments, 3) float32 endpoint pairs, as drawn with the 'LINES' primitive."""
+    coords = np.asarray(coords, dtype=np.float32).reshape(-1, 3)
+    counts = np.asarray(counts, dtype=np.int64)
+    if len(counts) == 0:
+        return np.zeros((0, 3), dtype=np.float32)
+    ends = np.cumsum(counts)
+    starts = ends - counts
+    seg_start = polyline_segment_starts(counts)
+    pairs = [np.stack((seg_start, seg_start + 1), axis=1)]
+    if cyclic:
+        closing = counts > 2
+        pairs.append(np.stack((ends[closing] - 1, starts[closing]), axis=1))
+    return coords[np.concatenate(pairs).ravel()]
+
+def sample_bezier_spline(co, handle_left, handle_right, cyclic, resolution):
+    """Points of a Bezier spline ((N, 3) control points and handles), each segment sampled uniformly with
+    resolution steps, like Blender's resolution_u. A cyclic spline's closing point is not repeated."""
+    co, handle_left, handle_right = (np.asarray(v, dtype=np.float64).reshape(-1, 3) for v in (co, handle_left, handle_right))
+    nxt = np.roll(np.arange(len(co)), -1) if cyclic else np.arange(1, len(co))
+    cur = np.arange(len(nxt))
+    t = np.arange(resolution)[:, None] / float(resolution)
+    basis = np.stack(((1 - t) ** 3, 3 * (1 - t) ** 2 * t, 3 * (1 - t) * t ** 2, t ** 3)) # (4, resolution, 1)
+    pts = (basis[0][None] * co[cur][:, None] + basis[1][None] * handle_right[cur][:, None] +
+           basis[2][None] * handle_left[nxt][:, None] + basis[3][None] * co[nxt][:, None]).reshape(-1, 3)
+    return pts if cyclic or not len(co) else np.concatenate((pts, co[-1:]))
+
+# --- Camera view projection and batch clipping ---
+# A camera view is (world -> camera 4x4 array, frame, is_ortho) with frame = (min_x, max_x, min_y,
+# max_y, frame depth) of the camera's view frame, see camera_view_params. Projected coordinates match
+# bpy_extras world_to_camera_view: x, y are 0..1 across the camera frame, z is the depth in front
+# of the camera.
+CAMERA_NEAR_CLIP = 1e-4 # Segments are trimmed to this depth: projections behind the camera are meaningless
+
+def camera_view_project(coords_world, view):
+    """(K, 3) world coordinates -> (K, 3) camera view coordinates, in one pass."""
+    world_to_cam, (min_x, max_x, min_y, max_y, frame_depth), is_ortho = view
+    cam_co = transform_coords(world_to_cam, coords_world)
+    depth = -cam_co[:, 2]
+    xy = cam_co[:, :2]
+    if not is_ortho:
+        in_plane = depth == 0.0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            xy = xy * (frame_depth / depth)[:, None]
+        xy[in_plane] = ((min_x + max_x) / 2.0, (min_y + max_y) / 2.0) # Like world_to_camera_view: (0.5, 0.5)
+    projected = np.empty((len(cam_co), 3), dtype=np.float64)
+    projected[:, 0] = (xy[:, 0] - min_x) / (max_x - min_x)
+    projected[:, 1] = (xy[:, 1] - min_y) / (max_y - min_y)
+    projected[:, 2] = depth
+    return projected
+
+def rect_halfplanes(x_min=0.0, x_max=1.0, y_min=0.0, y_max=1.0):
+    """Half-planes (normals (4, 2), offsets (4,)) of an axis-aligned rectangle; by default the camera frame."""
+    normals = np.array(((1.0, 0.0), (-1.0, 0.0), (0.0, 1.0), (0.0, -1.0)))
+    return normals, np.array((-x_min, x_max, -y_min, y_max))
+
+def convex_polygon_halfplanes(polygon):
+    """Half-planes (inward normals (E, 2), offsets (E,)) of a convex CCW polygon: inside where normals @ p + offsets >= 0."""
+    pts = np.array([(p[0], p[1]) for p in polygon], dtype=np.float64)
+    edges = np.roll(pts, -1, axis=0) - pts
+    normals = np.stack((-edges[:, 1], edges[:, 0]), axis=1)
+    return normals, -np.einsum('ij,ij->i', normals, pts)
+
+def clip_segments_halfplanes(a, b, normals, offsets):
+    """Cyrus-Beck (Liang-Barsky for rectangles) of S 2D segments a -> b ((S, 2) each) against a convex region,
+    all at once. Returns (t_enter, t_leave, visible), each of shape (S,)."""
+    a, b = np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64)
+    num = a @ normals.T + offsets # Signed distance of a to each edge, inside >= 0
+    denom = (b - a) @ normals.T
+    parallel = np.abs(denom) < 1e-12
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t_cross = -num / denom
+    t_enter = np.max(np.where(denom > 0.0, t_cross, 0.0), axis=1, initial=0.0)
+    t_leave = np.min(np.where(denom < 0.0, t_cross, 1.0), axis=1, initial=1.0)
+    t_enter, t_leave = np.where(parallel.all(axis=1), 0.0, t_enter), np.where(parallel.all(axis=1), 1.0, t_leave)
+    visible = (t_enter <= t_leave) & ~np.any(parallel & (num < 0.0), axis=1)
+    return t_enter, t_leave, visible
+
+def liang_barsky_clip_batch(a, b, x_min=0.0, x_max=1.0, y_min=0.0, y_max=1.0):
+    """Vectorised liang_barsky_clip: (t_min, t_max, visible) for S segments a -> b."""
+    return clip_segments_halfplanes(a, b, *rect_halfplanes(x_min, x_max, y_min, y_max))
+
+# --- Clip regions ---
+# A clip region answers segment_intervals(a, b) for S 2D segments a -> b ((S, 2) each) with the parts
+# of the segments inside it, as intervals (segment index, t_enter, t_leave) ordered by segment and t,
+# and contains(points) for (K, 2) points.
+
+EDGE_GRID_EDGES_PER_CELL = 0.5 # Mean boundary edges per cell the edge grid is sized for (denser measured faster)
+EDGE_GRID_MAX_CELLS_PER_AXIS = 1024
+
+def _cross2(u, v):
+    return u[:, 0] * v[:, 1] - u[:, 1] * v[:, 0]
+
+def _ragged_ranges(starts, counts):
+    """(owner, index) pairs enumerating range(starts[i], starts[i] + counts[i]) for every i, without a Python loop."""
+    counts = np.asarray(counts, dtype=np.int64)
+    owner = np.repeat(np.arange(len(counts)), counts)
+    local = np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts)
+    return owner, np.repeat(np.asarray(starts, dtype=np.int64), counts) + local
+
+def _csr(keys, values, n_keys):
+    """Groups values by integer key: (start (n_keys + 1,), grouped values); key k owns values[start[k]:start[k + 1]]."""
+    order = np.argsort(keys, kind='stable')
+    start = np.concatenate(([0], np.cumsum(np.bincount(keys, minlength=n_keys))))
+    return start, np.asarray(values)[order]
+
+def _grid_cells_crossed(ga, gb, nx, ny):
+    """(segment index, cell index) of every cell of an nx * ny grid the segments ga -> gb pass through.
+    Coordinates are in cell units (cell (i, j) spans [i, i + 1] x [j, j + 1], index j * nx + i).
+    The segments are cut at every grid line they cross; each piece lies in one cell."""
+    t0, t1, visible = liang_barsky_clip_batch(ga, gb, 0.0, nx, 0.0, ny)
+    idx = np.nonzero(visible)[0]
+    d = gb[idx] - ga[idx]
+    c0, c1 = ga[idx] + d * t0[idx, None], ga[idx] + d * t1[idx, None]
+    owners, params = [np.arange(len(idx)), np.arange(len(idx))], [np.zeros(len(idx)), np.ones(len(idx))]
+    for axis in (0, 1):
+        lo, hi = np.minimum(c0[:, axis], c1[:, axis]), np.maximum(c0[:, axis], c1[:, axis])
+        first_line = np.floor(lo).astype(np.int64) + 1
+        owner, line = _ragged_ranges(first_line, np.maximum(np.ceil(hi).astype(np.int64) - first_line, 0))
+        owners.append(owner)
+        params.append((line - c0[owner, axis]) / (c1[owner, axis] - c0[owner, axis]))
+    owner, param = np.concatenate(owners), np.concatenate(params)
+    order = np.lexsort((param, owner))
+    owner, param = owner[order], param[order]
+    same = owner[1:] == owner[:-1]
+    piece_owner = owner[:-1][same]
+    mid = (param[:-1][same] + param[1:][same])[:, None] / 2.0
+    mid_pt = c0[piece_owner] + (c1[piece_owner] - c0[piece_owner]) * mid
+    col = np.clip(np.floor(mid_pt[:, 0]), 0, nx - 1).astype(np.int64)
+    row = np.clip(np.floor(mid_pt[:, 1]), 0, ny - 1).astype(np.int64)
+    return idx[piece_owner], row * nx + col
+
+def _merge_inside_pieces(piece_seg, t0, t1):
+    """Joins adjacent inside pieces of a segment (cut where the boundary is only touched) into one interval.
+    The pieces are ordered by segment and t."""
+    if len(piece_seg) == 0:
+        return piece_seg, t0, t1
+    starts = np.ones(len(piece_seg), dtype=bool)
+    starts[1:] = (piece_seg[1:] != piece_seg[:-1]) | (t0[1:] > t1[:-1])
+    first = np.nonzero(starts)[0]
+    last = np.concatenate((first[1:] - 1, [len(piece_seg) - 1]))
+    return piece_seg[first], t0[first], t1[last]
+
+class EdgeGrid:
+    """Uniform grid over 2D edges c -> d ((E, 2) each), sized to about EDGE_GRID_EDGES_PER_CELL edges per cell.
+    Cells and rows list the edges whose (slightly widened) bounding box touches them, so a segment only
+    tests the edges of the cells it passes through, and a ray cast only the edges of its row."""
+
+    def __init__(self, c, d, edges_per_cell=EDGE_GRID_EDGES_PER_CELL):
+        self.c, self.d = np.asarray(c, dtype=np.float64), np.asarray(d, dtype=np.float64)
+        n_edges = len(self.c)
+        lo, hi = np.minimum(self.c, self.d).min(axis=0), np.maximum(self.c, self.d).max(axis=0)
+        pad = float((hi - lo).max()) * 1e-6 + 1e-12
+        self.origin = lo - pad
+        extent = hi + pad - self.origin
+        n_cells, aspect = max(n_edges / edges_per_cell, 1.0), extent[0] / extent[1]
+        nx = int(np.clip(round(math.sqrt(n_cells * aspect)), 1, EDGE_GRID_MAX_CELLS_PER_AXIS))
+        ny = int(np.clip(round(math.sqrt(n_cells / aspect)), 1, EDGE_GRID_MAX_CELLS_PER_AXIS))
+        self.shape = (nx, ny)
+        self.cell_size = extent / (nx, ny)
+
+        # Widened by a hair so that an edge touching a cell border is listed in both cells
+        gc, gd = self.to_grid(self.c), self.to_grid(self.d)
+        cell_max = np.array((nx - 1, ny - 1))
+        lo_cell = np.clip(np.floor(np.minimum(gc, gd) - 1e-6), 0, cell_max).astype(np.int64)
+        hi_cell = np.clip(np.floor(np.maximum(gc, gd) + 1e-6), 0, cell_max).astype(np.int64)
+        span = hi_cell - lo_cell + 1
+        edge, local = _ragged_ranges(np.zeros(n_edges), span[:, 0] * span[:, 1])
+        col = lo_cell[edge, 0] + local % span[edge, 0]
+        row = lo_cell[edge, 1] + local // span[edge, 0]
+        self.cell_start, self.cell_edges = _csr(row * nx + col, edge, nx * ny)
+        edge, row = _ragged_ranges(lo_cell[:, 1], span[:, 1])
+        self.row_start, self.row_edges = _csr(row, edge, ny)
+
+    def to_grid(self, points):
+        return (np.asarray(points, dtype=np.float64) - self.origin) / self.cell_size
+
+    def candidate_pairs(self, a, b):
+        """Unique (segment index, edge index) pairs sharing a cell: the only pairs that can intersect."""
+        seg, cell = _grid_cells_crossed(self.to_grid(a), self.to_grid(b), *self.shape)
+        owner, pos = _ragged_ranges(self.cell_start[cell], self.cell_start[cell + 1] - self.cell_start[cell])
+        n_edges = len(self.c)
+        pairs = np.unique(seg[owner] * n_edges + self.cell_edges[pos])
+        return pairs // n_edges, pairs % n_edges
+
+    def crossing_parity(self, points):
+        """True where a ray from the point towards +x crosses the edges an odd number of times."""
+        points = np.asarray(points, dtype=np.float64)
+        g = self.to_grid(points)
+        nx, ny = self.shape
+        idx = np.nonzero((g[:, 0] >= 0.0) & (g[:, 0] < nx) & (g[:, 1] >= 0.0) & (g[:, 1] < ny))[0]
+        row = np.minimum(np.floor(g[idx, 1]).astype(np.int64), ny - 1)
+        owner, pos = _ragged_ranges(self.row_start[row], self.row_start[row + 1] - self.row_start[row])
+        edge, p = self.row_edges[pos], points[idx[owner]]
+        c, d = self.c[edge], self.d[edge]
+        straddles = (c[:, 1] > p[:, 1]) != (d[:, 1] > p[:, 1])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x_cross = c[:, 0] + (p[:, 1] - c[:, 1]) * (d[:, 0] - c[:, 0]) / (d[:, 1] - c[:, 1])
+        hits = straddles & (p[:, 0] < x_cross)
+        inside = np.zeros(len(points), dtype=bool)
+        inside[idx] = np.bincount(owner[hits], minlength=len(idx)) % 2 == 1
+        return inside
+
+class ConvexRegion:
+    """Intersection of half-planes: inside where normals @ p + offsets >= 0 (see rect_halfplanes)."""
+
+    def __init__(self, normals, offsets):
+        self.normals = np.asarray(normals, dtype=np.float64)
+        self.offsets = np.asarray(offsets, dtype=np.float64)
+
+    @classmethod
+    def from_polygon(cls, polygon):
+        return cls(*convex_polygon_halfplanes(polygon))
+
+    def contains(self, points):
+        return np.all(np.asarray(points, dtype=np.float64) @ self.normals.T + self.offsets >= 0.0, axis=1)
+
+    def segment_intervals(self, a, b):
+        t_enter, t_leave, visible = clip_segments_halfplanes(a, b, self.normals, self.offsets)
+        idx = np.nonzero(visible)[0]
+        return idx, t_enter[idx], t_leave[idx]
+
+class PolygonRegion:
+    """Region bounded by closed 2D contours, given as the edges c -> d ((E, 2) each) of all contours.
+    Inside follows the even-odd rule, so concave outlines and holes (inner contours) need no particular
+    orientation or edge order. Segments are cut where they cross an edge (found through an EdgeGrid);
+    each piece in between is then entirely inside or outside, decided by a ray cast from its midpoint."""
+
+    def __init__(self, c, d):
+        self.grid = EdgeGrid(c, d)
+
+    @classmethod
+    def from_contours(cls, contours):
+        """contours: closed point loops ((M, 2) each, the last point not repeating the first)."""
+        loops = [np.asarray(contour, dtype=np.float64)[:, :2] for contour in contours if len(contour) >= 3]
+        return cls(np.concatenate(loops), np.concatenate([np.roll(loop, -1, axis=0) for loop in loops]))
+
+    def contains(self, points):
+        return self.grid.crossing_parity(points)
+
+    def segment_intervals(self, a, b):
+        a, b = np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64)
+        n_segs = len(a)
+        seg, edge = self.grid.candidate_pairs(a, b)
+        r = b[seg] - a[seg]
+        c, q = self.grid.c[edge], self.grid.d[edge] - self.grid.c[edge]
+        w = c - a[seg]
+        denom = _cross2(r, q)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t, u = _cross2(w, q) / denom, _cross2(w, r) / denom
+        hit = (np.abs(denom) > 1e-15) & (t > 0.0) & (t < 1.0) & (u >= 0.0) & (u <= 1.0)
+
+        # Segment ends and crossings cut every segment into pieces that are entirely inside or outside
+        owner = np.concatenate((np.arange(n_segs), np.arange(n_segs), seg[hit]))
+        param = np.concatenate((np.zeros(n_segs), np.ones(n_segs), t[hit]))
+        order = np.lexsort((param, owner))
+        owner, param = owner[order], param[order]
+        piece = (owner[1:] == owner[:-1]) & (param[1:] > param[:-1])
+        piece_seg, t0, t1 = owner[:-1][piece], param[:-1][piece], param[1:][piece]
+        mid = a[piece_seg] + (b[piece_seg] - a[piece_seg]) * ((t0 + t1) / 2.0)[:, None]
+        inside = self.contains(mid)
+        return _merge_inside_pieces(piece_seg[inside], t0[inside], t1[inside])
+
+def camera_view_plane_homography(view, origin, axis_u, axis_v):
+    """3x3 matrix taking plane coordinates (u, v, 1) of the world-space plane origin + u * axis_u + v * axis_v
+    to homogeneous camera view coordinates: the exact counterpart of camera_view_project for that plane."""
+    world_to_cam, (min_x, max_x, min_y, max_y, frame_depth), is_ortho = view
+    rot, loc = world_to_cam[:3, :3], world_to_cam[:3, 3]
+    cam_cols = np.stack((rot @ axis_u, rot @ axis_v, rot @ origin + loc), axis=1)
+    width, height = max_x - min_x, max_y - min_y
+    if is_ortho: # (x_c, y_c, 1) -> (x, y, 1)
+        to_view = np.array(((1.0 / width, 0.0, -min_x / width), (0.0, 1.0 / height, -min_y / height), (0.0, 0.0, 1.0)))
+        return to_view @ np.vstack((cam_cols[:2], (0.0, 0.0, 1.0)))
+    # (x_c, y_c, depth) -> (x * depth, y * depth, depth)
+    to_view = np.array(((frame_depth / width, 0.0, -min_x / width), (0.0, frame_depth / height, -min_y / height),
+                        (0.0, 0.0, 1.0)))
+    return to_view @ (cam_cols * np.array(((1.0,), (1.0,), (-1.0,))))
+
+class EllipseRegion:
+    """Region inside a conic: points p with (p, 1) @ conic @ (p, 1) < 0. Segments are cut at their exact
+    intersections with the conic, one quadratic per segment, so the result does not depend on any sampling."""
+
+    def __init__(self, conic):
+        self.conic = np.asarray(conic, dtype=np.float64)
+
+    @classmethod
+    def from_plane_ellipse(cls, view, center, axis_u, axis_v):
+        """The world-space ellipse center + axis_u * cos(a) + axis_v * sin(a) (a circle for equal, orthogonal
+        axes) as seen in the camera view. Exact while the ellipse is in front of the camera."""
+        to_plane = np.linalg.inv(camera_view_plane_homography(view, center, axis_u, axis_v))
+        return cls(to_plane.T @ np.diag((1.0, 1.0, -1.0)) @ to_plane)
+
+    def _values(self, p):
+        p = np.column_stack((p, np.ones(len(p))))
+        return np.einsum('ij,jk,ik->i', p, self.conic, p)
+
+    def contains(self, points):
+        return self._values(np.asarray(points, dtype=np.float64)) <= 0.0
+
+    def segment_intervals(self, a, b):
+        a, b = np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64)
+        n_segs = len(a)
+        p = np.column_stack((a, np.ones(n_segs)))
+        d = np.column_stack((b - a, np.zeros(n_segs)))
+        # value(a + t (b - a)) = qa t^2 + qb t + qc
+        qa = np.einsum('ij,jk,ik->i', d, self.conic, d)
+        qb = 2.0 * np.einsum('ij,jk,ik->i', p, self.conic, d)
+        qc = np.einsum('ij,jk,ik->i', p, self.conic, p)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            sqrt_disc = np.sqrt(qb * qb - 4.0 * qa * qc)
+            quadratic = np.abs(qa) > 1e-15
+            r1 = np.where(quadratic, (-qb - sqrt_disc) / (2.0 * qa), -qc / qb)
+            r2 = np.where(quadratic, (-qb + sqrt_disc) / (2.0 * qa), r1)
+        # Roots cut each segment into up to three pieces that are entirely inside or outside
+        cuts = np.sort(np.column_stack((np.zeros(n_segs), np.clip(np.nan_to_num(r1), 0.0, 1.0),
+                                        np.clip(np.nan_to_num(r2), 0.0, 1.0), np.ones(n_segs))), axis=1)
+        t0, t1 = cuts[:, :-1], cuts[:, 1:]
+        mid = (t0 + t1) / 2.0
+        inside = (t1 > t0) & (qa[:, None] * mid * mid + qb[:, None] * mid + qc[:, None] < 0.0)
+        piece_seg = np.repeat(np.arange(n_segs), 3).reshape(n_segs, 3)
+        return _merge_inside_pieces(piece_seg[inside], t0[inside], t1[inside])
+
+CLIP_REGION_OPERATIONS = ('UNION', 'DIFFERENCE', 'INTERSECT')
+
+class CompositeRegion:
+    """Boolean combination of clip regions. Starting from an empty region, each (region, operation) in turn
+    is added to (UNION), cut out of (DIFFERENCE) or intersected with (INTERSECT) the region so far; invert
+    finally swaps inside and outside. Segments are cut at every child's interval ends; each piece in between
+    is inside or outside every child, so the combination is decided per piece and no outline is built."""
+
+    def __init__(self, regions, operations, invert=False):
+        self.regions, self.operations, self.invert = list(regions), list(operations), invert
+
+    def _combine(self, masks, n):
+        inside = np.zeros(n, dtype=bool)
+        for mask, operation in zip(masks, self.operations):
+            if operation == 'UNION':
+                inside |= mask
+            elif operation == 'DIFFERENCE':
+                inside &= ~mask
+            else:
+                inside &= mask
+        return ~inside if self.invert else inside
+
+    def contains(self, points):
+        return self._combine([region.contains(points) for region in self.regions], len(points))
+
+    def segment_intervals(self, a, b):
+        n_segs = len(a)
+        children = [region.segment_intervals(a, b) for region in self.regions]
+        owner = np.concatenate([np.arange(n_segs), np.arange(n_segs)] + [child[0] for child in children] * 2)
+        param = np.concatenate([np.zeros(n_segs), np.ones(n_segs)] + [child[1] for child in children] +
+                               [child[2] for child in children])
+        order = np.lexsort((param, owner))
+        owner, param = owner[order], param[order]
+        piece = (owner[1:] == owner[:-1]) & (param[1:] > param[:-1])
+        piece_seg, t0, t1 = owner[:-1][piece], param[:-1][piece], param[1:][piece]
+        # Child intervals are ordered by segment and t: seg * 2 + t sorts them on one axis
+        mid_key = piece_seg * 2.0 + (t0 + t1) / 2.0
+        masks = []
+        for seg_idx, t_enter, t_leave in children:
+            before = np.searchsorted(seg_idx * 2.0 + t_enter, mid_key, side='right') - 1
+            masks.append((before >= 0) & (mid_key < (seg_idx * 2.0 + t_leave)[np.maximum(before, 0)]) if len(seg_idx)
+                         else np.zeros(len(mid_key), dtype=bool))
+        inside = self._combine(masks, len(mid_key))
+        return _merge_inside_pieces(piece_seg[inside], t0[inside], t1[inside])
+
+def clip_polylines_in_camera_view(coords_world, counts, view, region, near=CAMERA_NEAR_CLIP):
+    """Clips every segment of packed world-space polylines against a clip region of the camera view.
+    Perspective views first trim segments to depth >= near; the parameters found in the view are then
+    mapped back onto the 3D segment perspective-correctly (1 / depth is linear across the view).
+    Returns the visible intervals (segment index, t_enter, t_leave), segments numbered as by
+    polyline_segment_starts and t along the 3D segment."""
+    coords_world = np.asarray(coords_world, dtype=np.float64).reshape(-1, 3)
+    seg = polyline_segment_starts(counts)
+    p0, d = coords_world[seg], coords_world[seg + 1] - coords_world[seg]
+    world_to_cam, _, is_ortho = view
+    t_lo, t_hi = np.zeros(len(seg)), np.ones(len(seg))
+    front = np.arange(len(seg))
+    if not is_ortho:
+        depth0 = -(p0 @ world_to_cam[2, :3] + world_to_cam[2, 3])
+        depth1 = depth0 - d @ world_to_cam[2, :3]
+        behind0, behind1 = depth0 < near, depth1 < near
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t_near = (near - depth0) / (depth1 - depth0)
+        t_lo = np.where(behind0, t_near, t_lo)
+        t_hi = np.where(behind1, t_near, t_hi)
+        front = np.nonzero(~(behind0 & behind1))[0]
+    pa = camera_view_project(p0[front] + d[front] * t_lo[front, None], view)
+    pb = camera_view_project(p0[front] + d[front] * t_hi[front, None], view)
+    local, s_enter, s_leave = region.segment_intervals(pa[:, :2], pb[:, :2])
+    if not is_ortho: # View parameter s -> parameter along the trimmed 3D segment
+        za, zb = pa[local, 2], pb[local, 2]
+        s_enter = s_enter * za / ((1.0 - s_enter) * zb + s_enter * za)
+        s_leave = s_leave * za / ((1.0 - s_leave) * zb + s_leave * za)
+    seg_idx = front[local]
+    span = t_hi[seg_idx] - t_lo[seg_idx]
+    t_enter, t_leave = t_lo[seg_idx] + span * s_enter, t_lo[seg_idx] + span * s_leave
+    keep = t_leave > t_enter
+    return seg_idx[keep], t_enter[keep], t_leave[keep]
+
+def close_polylines(coords, counts, cyclic, *point_data):
+    """Repeats the first point at the end of every cyclic polyline, making its closing segment explicit
+    for clipping (see stitch_clipped_segments). Per-point arrays in point_data are extended alike.
+    Returns (coords, counts, *point_data)."""
+    coords = np.asarray(coords).reshape(-1, 3)
+    counts = np.asarray(counts, dtype=np.int64)
+    cyclic = np.asarray(cyclic, dtype=bool) & (counts > 2)
+    if not cyclic.any():
+        return (coords, counts) + point_data
+    ends = np.cumsum(counts)
+    at, first = ends[cyclic], (ends - counts)[cyclic]
+    return (np.insert(coords, at, coords[first], axis=0), counts + cyclic) + \
+           tuple(np.insert(data, at, np.asarray(data)[first], axis=0) for data in point_data)
+
+def stitch_clipped_segments(coords, counts, seg_idx, t_enter, t_leave, join=True, cyclic=None, eps=1e-6,
+                            return_sources=False):
+    """Packs clipped segment intervals (as from clip_polylines_in_camera_view) as new polylines.
+    With join, consecutive intervals of the same polyline that meet (one leaves its segment at the end,
+    the next enters the next segment at the start) continue one polyline, so a polyline is only split
+    where it actually leaves the region; otherwise every interval is its own two-point line.
+    cyclic flags the polylines closed by close_polylines: a piece that runs into the closing point
+    continues with the piece leaving the first point, and a loop that is entirely visible stays cyclic.
+    Returns (coords (K, 3) float32, counts, cyclic flags); with return_sources also the index of the
+    input point every output point coincides with, -1 for the cut points."""
+    coords = np.asarray(coords, dtype=np.float64).reshape(-1, 3)
+    counts = np.asarray(counts, dtype=np.int64)
+    if len(seg_idx) == 0:
+        empty = np.zeros((0, 3), dtype=np.float32), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=bool)
+        return empty + (np.zeros(0, dtype=np.int64),) if return_sources else empty
+    seg_counts = np.maximum(counts - 1, 0)
+    polyline_of_seg = np.repeat(np.arange(len(counts)), seg_counts)[seg_idx]
+    seg = polyline_segment_starts(counts)[seg_idx]
+    continues = np.zeros(len(seg_idx), dtype=bool)
+    if join:
+        continues[1:] = ((seg_idx[1:] == seg_idx[:-1] + 1) & (polyline_of_seg[1:] == polyline_of_seg[:-1]) &
+                         (t_leave[:-1] >= 1.0 - eps) & (t_enter[1:] <= eps))
+    p0, d = coords[seg], coords[seg + 1] - coords[seg]
+    n_points = np.where(continues, 1, 2)
+    offsets = np.cumsum(n_points) - n_points
+    stitched = np.empty((int(n_points.sum()), 3), dtype=np.float64)
+    starts = ~continues
+    stitched[offsets[starts]] = p0[starts] + d[starts] * t_enter[starts, None]
+    stitched[offsets + n_points - 1] = p0 + d * t_leave[:, None]
+    sources = np.empty(len(stitched), dtype=np.int64)
+    sources[offsets[starts]] = np.where(t_enter[starts] <= eps, seg[starts], -1)
+    sources[offsets + n_points - 1] = np.where(t_leave >= 1.0 - eps, seg + 1, -1)
+    new_counts = np.bincount(np.cumsum(starts) - 1, weights=n_points).astype(np.int64)
+    new_cyclic = np.zeros(len(new_counts), dtype=bool)
+    if not join or cyclic is None or not np.any(cyclic):
+        result = stitched.astype(np.float32), new_counts, new_cyclic
+        return result + (sources,) if return_sources else result
+
+    # Runs (output polylines) that start at a loop's first point / end at its closing point
+    first = np.nonzero(starts)[0]
+    last = np.concatenate((first[1:] - 1, [len(seg_idx) - 1]))
+    run_polyline = polyline_of_seg[first]
+    first_seg = np.cumsum(seg_counts) - seg_counts
+    on_loop = np.asarray(cyclic, dtype=bool)[run_polyline]
+    opens = on_loop & (seg_idx[first] == first_seg[run_polyline]) & (t_enter[first] <= eps)
+    closes = on_loop & (seg_idx[last] == first_seg[run_polyline] + seg_counts[run_polyline] - 1) & (t_leave[last] >= 1.0 - eps)
+    whole = opens & closes
+    n_total, run_offsets = len(stitched), np.cumsum(new_counts) - new_counts
+    keep = np.ones(n_total, dtype=bool)
+    keep[(run_offsets + new_counts - 1)[whole]] = False # The closing point repeats the first one
+    new_cyclic[whole] = True
+    # A loop cut open elsewhere: its closing run continues into its opening run
+    opening_runs, closing_runs = np.nonzero(opens & ~whole)[0], np.nonzero(closes & ~whole)[0]
+    _, i_open, i_close = np.intersect1d(run_polyline[opening_runs], run_polyline[closing_runs], return_indices=True)
+    moved_runs, target_runs = opening_runs[i_open], closing_runs[i_close]
+    run_of_point = np.repeat(np.arange(len(new_counts)), new_counts)
+    moved = np.isin(run_of_point, moved_runs)
+    keep[run_offsets[moved_runs]] = False # The first point repeats the closing one
+    remap = np.arange(len(new_counts))
+    remap[moved_runs] = target_runs
+    run_of_point = remap[run_of_point]
+    order = np.lexsort((np.arange(n_total) + moved * n_total, run_of_point))
+    order = order[keep[order]]
+    new_counts = np.bincount(run_of_point[order], minlength=len(new_counts))
+    alive = new_counts > 0
+    result = stitched[order].astype(np.float32), new_counts[alive].astype(np.int64), new_cyclic[alive]
+    return result + (sources[order],) if return_sources else result
+
+# --- Bezier flattening ---
+# Bezier splines are clipped as polylines: every segment is sampled uniformly with a step count from
+# Wang's bound, computed on the control points as seen in the camera view, so the flattening stays
+# within a screen-space tolerance of the curve. Step counts are rounded up to powers of two, so the
+# flattening (and a cache of it) survives small view changes.
+BEZIER_FLATTEN_MAX_STEPS = 64 # Per segment; also used for segments behind the camera
+
+def bezier_segment_indices(counts, cyclic):
+    """(first point, second point, segments per spline) of every segment of packed Bezier splines.
+    Cyclic splines have a closing segment from their last point back to their first."""
+    counts = np.asarray(counts, dtype=np.int64)
+    cyclic = np.asarray(cyclic, dtype=bool) & (counts > 1)
+    n_segs = np.maximum(counts - 1, 0) + cyclic
+    starts = np.cumsum(counts) - counts
+    owner, cur = _ragged_ranges(starts, n_segs)
+    nxt = cur + 1
+    wraps = nxt == (starts + counts)[owner]
+    nxt[wraps] = starts[owner[wraps]]
+    return cur, nxt, n_segs
+
+def bezier_flatten_steps(co, handle_left, handle_right, counts, cyclic, tolerance):
+    """Uniform steps per segment (see bezier_segment_indices) that keep the flattening of packed Bezier
+    splines within tolerance, measured in the space of the given (2D or 3D) control points."""
+    co, handle_left, handle_right = (np.asarray(v, dtype=np.float64) for v in (co, handle_left, handle_right))
+    cur, nxt, _ = bezier_segment_indices(counts, cyclic)
+    p0, p1, p2, p3 = co[cur], handle_right[cur], handle_left[nxt], co[nxt]
+    with np.errstate(invalid='ignore', over='ignore'):
+        second_diff = np.maximum(np.linalg.norm(p0 - 2.0 * p1 + p2, axis=1), np.linalg.norm(p1 - 2.0 * p2 + p3, axis=1))
+        steps = np.sqrt(0.75 * second_diff / tolerance)
+    steps = np.nan_to_num(steps, nan=BEZIER_FLATTEN_MAX_STEPS, posinf=BEZIER_FLATTEN_MAX_STEPS)
+    steps = 2 ** np.ceil(np.log2(np.clip(steps, 1.0, BEZIER_FLATTEN_MAX_STEPS)))
+    return steps.astype(np.int64)
+
+def flatten_bezier_splines(co, handle_left, handle_right, counts, cyclic, steps):
+    """Packed Bezier splines -> packed polylines, segment i sampled with steps[i] uniform steps.
+    Cyclic splines stay cyclic (their closing point is not repeated).
+    Returns (coords (K, 3), counts, knot flags (K,): True at the splines' own control points)."""
+    co, handle_left, handle_right = (np.asarray(v, dtype=np.float64).reshape(-1, 3) for v in (co, handle_left, handle_right))
+    counts = np.asarray(counts, dtype=np.int64)
+    steps = np.asarray(steps, dtype=np.int64)
+    is_open = ~(np.asarray(cyclic, dtype=bool) & (counts > 1)) & (counts > 0)
+    cur, nxt, n_segs = bezier_segment_indices(counts, ~is_open)
+    seg, k = _ragged_ranges(np.zeros(len(steps), dtype=np.int64), steps)
+    t = (k / steps[seg])[:, None]
+    s = 1.0 - t
+    pts = (s ** 3 * co[cur[seg]] + 3.0 * s * s * t * handle_right[cur[seg]] +
+           3.0 * s * t * t * handle_left[nxt[seg]] + t ** 3 * co[nxt[seg]])
+    # Segment samples are ordered spline by spline; open splines end on their last control point
+    samples = np.bincount(np.repeat(np.arange(len(counts)), n_segs), weights=steps, minlength=len(counts)).astype(np.int64)
+    insert_at = np.cumsum(samples)[is_open]
+    coords = np.insert(pts, insert_at, co[(np.cumsum(counts) - 1)[is_open]], axis=0)
+    knots = np.insert(k == 0, insert_at, True)
+    return coords, samples + is_open, knots
+
+def select_polyline_points(coords, counts, keep, cyclic):
+    """Drops the points of packed polylines not flagged in keep; open polylines always keep their ends.
+    Returns (coords, counts)."""
+    counts = np.asarray(counts, dtype=np.int64)
+    keep = np.array(keep, dtype=bool)
+    ends = np.cumsum(counts)
+    has_points = counts > 0
+    keep[(ends - counts)[has_points]] = True
+    keep[(ends - 1)[has_points & ~np.asarray(cyclic, dtype=bool)]] = True
+    owner = np.repeat(np.arange(len(counts)), counts)
+    return np.asarray(coords)[keep], np.bincount(owner[keep], minlength=len(counts)).astype(np.int64)
+
+def select_lines(coords, counts, line_mask, *point_data):
+    """The packed lines flagged in line_mask (one flag per line), with the matching rows of every per-point
+    array in point_data. Returns (coords, counts, *point_data)."""
+    counts = np.asarray(counts, dtype=np.int64)
+    line_mask = np.asarray(line_mask, dtype=bool)
+    point_mask = np.repeat(line_mask, counts)
+    return (np.asarray(coords)[point_mask], counts[line_mask], *(np.asarray(data)[point_mask] for data in point_data))
+
+# <<< GEOMETRY CORE <<<
+
+# -----------------------------------------------------------
+# Utility Functions
+# -----------------------------------------------------------
+
+
+def camera_view_params(scene, cam):
+    """The camera view of cam for camera_view_project / clip_polylines_in_camera_view.
+    The camera frame is computed once here instead of once per projected point."""
+    frame = cam.data.view_frame(scene=scene) # Top right, bottom right, bottom left, top left
+    world_to_cam = matrix_to_numpy(cam.matrix_world.normalized().inverted())
+    return world_to_cam, (frame[2].x, frame[1].x, frame[1].y, frame[0].y, -frame[0].z), cam.data.type == 'ORTHO'
+
+def clipping_shape_camera_polygon(shape_obj, view):
+    """A RECTANGLE clipping shape's outline in camera view coordinates, as a CCW polygon."""
+    local_pts = [(-0.5, -0.5, 0.0), (0.5, -0.5, 0.0), (0.5, 0.5, 0.0), (-0.5, 0.5, 0.0)]
+    projected = camera_view_project(transform_coords(shape_obj.matrix_world, local_pts), view)
+    # Force the projected polygon vertices into counter-clockwise order.
+    return sort_polygon_ccw([tuple(pt[:2]) for pt in projected])
+
+def clipping_shape_ellipse_region(shape_obj, view):
+    """A CIRCLE clipping shape as an exact EllipseRegion: the local XY ellipse with semi-axes scale.x and
+    scale.y (as the 32-gon it replaces was sampled) under the shape's world matrix."""
+    matrix = matrix_to_numpy(shape_obj.matrix_world)
+    axis_u = matrix[:3, 0] * shape_obj.scale.x
+    axis_v = matrix[:3, 1] * shape_obj.scale.y
+    return EllipseRegion.from_plane_ellipse(view, matrix[:3, 3], axis_u, axis_v)
+
+def is_clipping_shape(obj):
+    """Custom clipping shapes: the rectangle / circle empties made by create_clipping_shape, or any
+    curve or mesh object whose outline bounds the region, except the add-on's own lines (guides,
+    grids, aid lines, the horizon): those are clipped, never clip."""
+    if obj is None:
+        return False
+    if obj.type == 'EMPTY':
+        return 'clipping_shape_type' in obj
+    return obj.type in ('CURVE', 'MESH') and get_owner_role(obj) not in NON_SHAPE_OWNER_ROLES
+
+def mesh_outline_edges(mesh):
+    """Local (start, end) coordinates ((E, 3) each) of a mesh's outline: the edges used by exactly one
+    face, or every edge of a mesh without faces (a wire outline)."""
+    co = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", co)
+    edge_verts = np.empty(len(mesh.edges) * 2, dtype=np.int32)
+    mesh.edges.foreach_get("vertices", edge_verts)
+    edge_verts = edge_verts.reshape(-1, 2)
+    if len(mesh.polygons):
+        loop_edges = np.empty(len(mesh.loops), dtype=np.int32)
+        mesh.loops.foreach_get("edge_index", loop_edges)
+        edge_verts = edge_verts[np.bincount(loop_edges, minlength=len(edge_verts)) == 1]
+    co = co.reshape(-1, 3)
+    return co[edge_verts[:, 0]], co[edge_verts[:, 1]]
+
+def curve_outline_edges(curve_data):
+    """Local (start, end) coordinates ((E, 3) each) of a curve's outline: every spline as a closed loop,
+    POLY / NURBS through their control points, BEZIER sampled at the curve's resolution_u."""
+    loops = []
+    for spline in curve_data.splines:
+        if spline.type == 'BEZIER':
+            n_points = len(spline.bezier_points)
+            co, handle_left, handle_right = (np.empty(n_points * 3, dtype=np.float32) for _ in range(3))
+            spline.bezier_points.foreach_get("co", co)
+            spline.bezier_points.foreach_get("handle_left", handle_left)
+            spline.bezier_points.foreach_get("handle_right", handle_right)
+            loop = sample_bezier_spline(co, handle_left, handle_right, True, max(curve_data.resolution_u, 1))
+        else:
+            co = np.empty(len(spline.points) * 4, dtype=np.float32)
+            spline.points.foreach_get("co", co)
+            loop = co.reshape(-1, 4)[:, :3]
+        if len(loop) >= 3:
+            loops.append(loop)
+    if not loops:
+        return np.zeros((0, 3)), np.zeros((0, 3))
+    return np.concatenate(loops), np.concatenate([np.roll(loop, -1, axis=0) for loop in loops])
+
+def clipping_shape_region(shape_obj, view):
+    """The shape's clip region in camera view coordinates, or None.
+    Rectangle empties give a ConvexRegion, circle empties an exact EllipseRegion; curve and mesh outlines
+    a PolygonRegion, so they may be concave and have holes (inner loops). Modifiers are not applied,
+    and the shape should be in front of the camera."""
+    if shape_obj.type == 'EMPTY':
+        shape_type = shape_obj['clipping_shape_type']
+        if shape_type == 'CIRCLE':
+            return clipping_shape_ellipse_region(shape_obj, view)
+        if shape_type == 'RECTANGLE':
+            return ConvexRegion.from_polygon(clipping_shape_camera_polygon(shape_obj, view))
         return None
-    return (p1 + d * tE, p1 + d * tL)
+    start, end = clipping_shape_outline_edges(shape_obj)
+    if len(start) < 3:
+        return None
+    projected = camera_view_project(transform_coords(shape_obj.matrix_world, np.concatenate((start, end))), view)
+    return PolygonRegion(projected[:len(start), :2], projected[len(start):, :2])
+
+def clipping_shape_outline_edges(shape_obj):
+    """Local outline edges (start, end) of a curve or mesh clipping shape."""
+    return mesh_outline_edges(shape_obj.data) if shape_obj.type == 'MESH' else curve_outline_edges(shape_obj.data)
 
 
 def draw_finalize_guides_section(layout, context):
@@ -225,9 +1251,11 @@ def draw_finalize_guides_section(layout, context):
         for group_id, (prefixes, _) in groups.items():
             if prefixes:
                 label = group_id.replace("_LINES", "").replace("_", " ").strip().title()
-                op_sh = col_sh.operator(PERSPECTIVE_OT_toggle_guide_visibility.bl_idname,
+                row_sh = col_sh.row(align=True)
+                op_sh = row_sh.operator(PERSPECTIVE_OT_toggle_guide_visibility.bl_idname,
                                          text=f"Toggle {label}")
                 op_sh.group_prefix = prefixes[0]
+                row_sh.operator(PERSPECTIVE_OT_recolor_guide_group.bl_idname, text="", icon='COLOR').group_prefix = prefixes[0]
     else:
         col_sh.label(text="Select a perspective type for visibility toggles.", icon='INFO')
 
@@ -237,11 +1265,13 @@ def add_vp_empty_if_missing(context, target_vp_name, default_location, empty_col
     helpers_coll = get_helpers_collection(context) 
 
     if not vp_obj:
-        print(f"DEBUG add_vp_empty_if_missing: VP '{target_vp_name}' NOT found. Creating new.")
+        vp_log.debug("VP '%s' NOT found. Creating new.", target_vp_name)
         vp_obj = bpy.data.objects.new(target_vp_name, None)
         vp_obj.empty_display_type = 'SPHERE' 
         vp_obj.empty_display_size = 0.35   
         vp_obj.location = default_location
+        vp_role = VP_ROLE_BY_NAME.get(target_vp_name, "")
+        tag_owned_object(vp_obj, 'VP', vp_role, VP_ROLE_DEFS[vp_role][0] if vp_role else "")
         
         if vp_obj.name not in helpers_coll.objects:
             try:
@@ -249,12 +1279,12 @@ def add_vp_empty_if_missing(context, target_vp_name, default_location, empty_col
                     coll.objects.unlink(vp_obj)
                 helpers_coll.objects.link(vp_obj)
             except Exception as e:
-                print(f"DEBUG add_vp_empty_if_missing: Error managing collections for new VP {target_vp_name}: {e}")
-        print(f"DEBUG add_vp_empty_if_missing: Created and linked new VP: {target_vp_name} at {default_location}")
+                vp_log.error("Error managing collections for new VP %s: %s", target_vp_name, e)
+        vp_log.debug("Created and linked new VP: %s at %s", target_vp_name, default_location)
     else:
-        print(f"DEBUG add_vp_empty_if_missing: VP '{target_vp_name}' found. Ensuring collection and color.")
+        vp_log.debug("VP '%s' found. Ensuring collection and color.", target_vp_name)
         if vp_obj.name not in helpers_coll.objects:
-            print(f"DEBUG add_vp_empty_if_missing: Existing VP '{target_vp_name}' not in helpers_coll. Linking.")
+            vp_log.debug("Existing VP '%s' not in helpers_coll. Linking.", target_vp_name)
             for coll in list(vp_obj.users_collection):
                 if coll != helpers_coll:
                     coll.objects.unlink(vp_obj)
@@ -263,128 +1293,75 @@ def add_vp_empty_if_missing(context, target_vp_name, default_location, empty_col
             except RuntimeError: 
                  pass
 
+    invalidate_vp_registry() # The VP may have been created or relinked into the helpers collection
+
     current_color_tuple = tuple(round(c, 4) for c in vp_obj.color)
     setting_color_tuple = tuple(round(c, 4) for c in empty_color[:4]) 
 
     if current_color_tuple != setting_color_tuple:
         vp_obj.color = empty_color[:4] 
-        print(f"DEBUG add_vp_empty_if_missing: Updated color for VP {vp_obj.name}")
+        vp_log.debug("Updated color for VP %s", vp_obj.name)
         
     return vp_obj
 
+# Aid line groups per mode. Structure: PERSPECTIVE_TYPE: ((aid empty name tag, aid line name prefix), ...)
+EXTRACTION_AID_GROUPS = {
+    'ONE_POINT':   (("1P_Aid", "VISUAL_Extraction_Line_1P"),),
+    'TWO_POINT':   (("2P_VP1_Aid", "VISUAL_Extraction_Line_2P_VP1"),
+                    ("2P_VP2_Aid", "VISUAL_Extraction_Line_2P_VP2")),
+    'THREE_POINT': (("3P_H1_Aid", "VISUAL_Extraction_Line_3P_H1"),
+                    ("3P_H2_Aid", "VISUAL_Extraction_Line_3P_H2"),
+                    ("3P_V_Aid", "VISUAL_Extraction_Line_3P_V")),
+}
+
+def collect_extraction_aid_segments(ts, selected_empties):
+    """Aid line segments of the current mode as [(line name, p1_world, p2_world), ...].
+    A group draws two lines once exactly 4 of its empties are selected: the first two helpers
+    (by name) define one line and the next two the second line."""
+    segments = []
+    for aid_tag, line_prefix in EXTRACTION_AID_GROUPS.get(ts.current_perspective_type, ()):
+        helpers = sorted([e for e in selected_empties if aid_tag in e.name], key=lambda o: o.name)
+        if len(helpers) != 4:
+            aid_log.debug("Not exactly 4 '%s' empties selected. Found: %s", aid_tag, len(helpers))
+            continue
+        e1, e2, e3, e4 = helpers
+        segments.append((line_prefix + "_A", e1.matrix_world.translation.copy(), e2.matrix_world.translation.copy()))
+        segments.append((line_prefix + "_B", e3.matrix_world.translation.copy(), e4.matrix_world.translation.copy()))
+    return segments
+
+@profiled("refresh_extraction_aid_lines")
 def refresh_extraction_aid_lines(context, from_selection_change=False):
-    print(f"\n--- refresh_extraction_aid_lines CALLED (from_selection_change: {from_selection_change}) ---")
+    aid_log.debug("--- refresh_extraction_aid_lines CALLED (from_selection_change: %s) ---", from_selection_change)
     if not hasattr(context.scene, "perspective_tool_settings_splines"):
-        print("DEBUG refresh_aids: Perspective settings not found.")
+        aid_log.debug("Perspective settings not found.")
         return
     ts = context.scene.perspective_tool_settings_splines
     aids_coll = get_extraction_aids_collection(context)
 
     # Always clear any existing aid lines.
-    print("DEBUG refresh_aids: Clearing all existing VISUAL aid lines.")
+    aid_log.debug("Clearing all existing VISUAL aid lines.")
     clear_extraction_aids_lines(context)
 
-    if not ts.show_extraction_helper_lines:
-        print("DEBUG refresh_aids: Toggle is OFF, no aid lines will be drawn.")
+    if not ts.show_extraction_helper_lines or ts.guide_display_backend == 'OVERLAY':
+        # The overlay backend draws the aid lines itself, without curve objects.
+        aid_log.debug("Toggle is OFF or overlay backend active, no aid line objects will be drawn.")
+        invalidate_guide_overlay()
         if context.area:
             context.area.tag_redraw()
         return
 
+    if ts.current_perspective_type not in EXTRACTION_AID_GROUPS:
+        aid_log.debug("Mode %s not implemented for extraction aids.", ts.current_perspective_type)
+
     # Get all selected empties.
     selected_empties = [obj for obj in context.selected_objects if obj.type == 'EMPTY']
-
-    if ts.current_perspective_type == 'ONE_POINT':
-        helpers_1p = sorted([e for e in selected_empties if "1P_Aid" in e.name], key=lambda o: o.name)
-        if len(helpers_1p) == 4:
-            # Assume the first two helpers define one line and the next two the second line.
-            e1, e2, e3, e4 = helpers_1p
-            create_or_update_extraction_aid_line(context, "VISUAL_Extraction_Line_1P_A",
-                                                e1.matrix_world.translation, e2.matrix_world.translation, aids_coll)
-            create_or_update_extraction_aid_line(context, "VISUAL_Extraction_Line_1P_B",
-                                                e3.matrix_world.translation, e4.matrix_world.translation, aids_coll)
-            print("DEBUG refresh_aids: Drew/Updated 1P aid lines")
-        else:
-            print("DEBUG refresh_aids: Not exactly 4 '1P_Aid' empties selected for 1P aid lines.")
-
-    # --- START OF THE FIX ---
-    elif ts.current_perspective_type == 'TWO_POINT':
-        print("DEBUG refresh_aids: In TWO_POINT block")
-
-        # --- Aid Lines for VP1 ---
-        helpers_2p_vp1 = sorted([e for e in selected_empties if "2P_VP1_Aid" in e.name], key=lambda o: o.name)
-        if len(helpers_2p_vp1) == 4:
-            print(f"DEBUG refresh_aids: Drawing 2P_VP1 aid lines for: {[e.name for e in helpers_2p_vp1]}")
-            e1, e2, e3, e4 = helpers_2p_vp1
-            create_or_update_extraction_aid_line(context, "VISUAL_Extraction_Line_2P_VP1_A",
-                                                   e1.matrix_world.translation, e2.matrix_world.translation, aids_coll)
-            create_or_update_extraction_aid_line(context, "VISUAL_Extraction_Line_2P_VP1_B",
-                                                   e3.matrix_world.translation, e4.matrix_world.translation, aids_coll)
-            print("DEBUG refresh_aids: Drew/Updated 2P_VP1 aid lines")
-        else:
-            print(f"DEBUG refresh_aids: Not exactly 4 '2P_VP1_Aid' empties selected. Found: {len(helpers_2p_vp1)}")
-
-        # --- Aid Lines for VP2 ---
-        helpers_2p_vp2 = sorted([e for e in selected_empties if "2P_VP2_Aid" in e.name], key=lambda o: o.name)
-        if len(helpers_2p_vp2) == 4:
-            print(f"DEBUG refresh_aids: Drawing 2P_VP2 aid lines for: {[e.name for e in helpers_2p_vp2]}")
-            e1, e2, e3, e4 = helpers_2p_vp2
-            create_or_update_extraction_aid_line(context, "VISUAL_Extraction_Line_2P_VP2_A",
-                                                   e1.matrix_world.translation, e2.matrix_world.translation, aids_coll)
-            create_or_update_extraction_aid_line(context, "VISUAL_Extraction_Line_2P_VP2_B",
-                                                   e3.matrix_world.translation, e4.matrix_world.translation, aids_coll)
-            print("DEBUG refresh_aids: Drew/Updated 2P_VP2 aid lines")
-        else:
-            print(f"DEBUG refresh_aids: Not exactly 4 '2P_VP2_Aid' empties selected. Found: {len(helpers_2p_vp2)}")
-    # --- END OF THE FIX ---
-
-    elif ts.current_perspective_type == 'THREE_POINT':
-        print("DEBUG refresh_aids: In THREE_POINT block")
-
-        # --- Aid Lines for Horizontal VP1 (H_VP1) ---
-        helpers_3p_hvp1 = sorted([e for e in selected_empties if "3P_H1_Aid" in e.name], key=lambda o: o.name)
-        if len(helpers_3p_hvp1) == 4:
-            print(f"DEBUG refresh_aids: Drawing 3P_H1 aid lines for: {[e.name for e in helpers_3p_hvp1]}")
-            e1, e2, e3, e4 = helpers_3p_hvp1[0], helpers_3p_hvp1[1], helpers_3p_hvp1[2], helpers_3p_hvp1[3]
-            create_or_update_extraction_aid_line(context, "VISUAL_Extraction_Line_3P_H1_A",
-                                                   e1.matrix_world.translation, e2.matrix_world.translation, aids_coll)
-            create_or_update_extraction_aid_line(context, "VISUAL_Extraction_Line_3P_H1_B",
-                                                   e3.matrix_world.translation, e4.matrix_world.translation, aids_coll)
-            print("DEBUG refresh_aids: Drew/Updated 3P_H1 aid lines")
-        else:
-            print("DEBUG refresh_aids: Not exactly 4 '3P_H1_Aid' empties selected for 3P_H1 aid lines.")
-
-        # --- Aid Lines for Horizontal VP2 (H_VP2) ---
-        helpers_3p_hvp2 = sorted([e for e in selected_empties if "3P_H2_Aid" in e.name], key=lambda o: o.name)
-        if len(helpers_3p_hvp2) == 4:
-            print(f"DEBUG refresh_aids: Drawing 3P_H2 aid lines for: {[e.name for e in helpers_3p_hvp2]}")
-            e1, e2, e3, e4 = helpers_3p_hvp2[0], helpers_3p_hvp2[1], helpers_3p_hvp2[2], helpers_3p_hvp2[3]
-            create_or_update_extraction_aid_line(context, "VISUAL_Extraction_Line_3P_H2_A",
-                                                   e1.matrix_world.translation, e2.matrix_world.translation, aids_coll)
-            create_or_update_extraction_aid_line(context, "VISUAL_Extraction_Line_3P_H2_B",
-                                                   e3.matrix_world.translation, e4.matrix_world.translation, aids_coll)
-            print("DEBUG refresh_aids: Drew/Updated 3P_H2 aid lines")
-        else:
-            print("DEBUG refresh_aids: Not exactly 4 '3P_H2_Aid' empties selected for 3P_H2 aid lines.")
-
-        # --- Aid Lines for Vertical VP (V_VP) ---
-        helpers_3p_vvp = sorted([e for e in selected_empties if "3P_V_Aid" in e.name], key=lambda o: o.name)
-        if len(helpers_3p_vvp) == 4:
-            print(f"DEBUG refresh_aids: Drawing 3P_V aid lines for: {[e.name for e in helpers_3p_vvp]}")
-            e1, e2, e3, e4 = helpers_3p_vvp[0], helpers_3p_vvp[1], helpers_3p_vvp[2], helpers_3p_vvp[3]
-            create_or_update_extraction_aid_line(context, "VISUAL_Extraction_Line_3P_V_A",
-                                                   e1.matrix_world.translation, e2.matrix_world.translation, aids_coll)
-            create_or_update_extraction_aid_line(context, "VISUAL_Extraction_Line_3P_V_B",
-                                                   e3.matrix_world.translation, e4.matrix_world.translation, aids_coll)
-            print("DEBUG refresh_aids: Drew/Updated 3P_V aid lines")
-        else:
-            print("DEBUG refresh_aids: Not exactly 4 '3P_V_Aid' empties selected for 3P_V aid lines.")
-
-    else:
-        print(f"DEBUG refresh_aids: Mode {ts.current_perspective_type} not implemented for extraction aids.")
+    for line_name, p1_world, p2_world in collect_extraction_aid_segments(ts, selected_empties):
+        create_or_update_extraction_aid_line(context, line_name, p1_world, p2_world, aids_coll)
+        aid_log.debug("Drew/Updated aid line %s", line_name)
 
     if context.area:
         context.area.tag_redraw()
-    print("--- refresh_extraction_aid_lines FINISHED ---")
+    aid_log.debug("--- refresh_extraction_aid_lines FINISHED ---")
 
 
 def get_extraction_aids_collection(context):
@@ -405,37 +1382,12 @@ def get_extraction_aids_collection(context):
 def clear_extraction_aids_lines(context, specific_prefix=None):
     """Clears lines from the extraction aids collection.
     If specific_prefix is given (e.g., "VISUAL_Extraction_Line_1P_"), only those are cleared.
-    Otherwise, all objects matching a general pattern are cleared.
+    Otherwise, all aid lines are cleared.
     """
-    aids_coll = get_extraction_aids_collection(context) # Ensures collection exists
-    removed_count = 0
-    # Iterate over a copy for safe removal
-    for obj in list(aids_coll.objects):
-        do_remove = False
-        if specific_prefix:
-            if obj.name.startswith(specific_prefix):
-                do_remove = True
-        elif obj.name.startswith("VISUAL_Extraction_Line_"): # General catch-all
-            do_remove = True
-
-        if do_remove:
-            try:
-                # Remove material if it's the only user (optional, good cleanup)
-                if obj.active_material and obj.active_material.users <= 1 and obj.active_material.name == "MAT_Extraction_Aid_Line":
-                    bpy.data.materials.remove(obj.active_material)
-
-                # Remove curve data if it's the only user
-                if obj.data and obj.data.name in bpy.data.curves and obj.data.users <= 1:
-                    bpy.data.curves.remove(obj.data)
-                bpy.data.objects.remove(obj, do_unlink=True) # Unlink and remove
-                removed_count += 1
-            except ReferenceError: # Object might have been removed by other means
-                pass
-            except Exception as e:
-                print(f"Error removing extraction aid line {obj.name}: {e}")
-    # if removed_count > 0:
-    #     print(f"Cleared {removed_count} extraction aid lines (prefix: {specific_prefix}).")
-    return removed_count
+    get_extraction_aids_collection(context) # Ensures collection exists
+    # Only the registered aid lines are visited; the shared aid material goes once the last aid line is gone
+    return batch_remove_objects([obj for obj in owned_objects('AID_LINE')
+                                 if not specific_prefix or obj.name.startswith(specific_prefix)])
 
 def create_or_update_extraction_aid_line(context, name, p1_world, p2_world, collection):
     """
@@ -447,17 +1399,9 @@ def create_or_update_extraction_aid_line(context, name, p1_world, p2_world, coll
     if existing_obj and existing_obj.type == 'CURVE':
         # Update existing line
         curve_data = existing_obj.data
-        if not curve_data.splines: # Should not happen if created correctly
-            curve_data.splines.new(type='POLY')
-        spline = curve_data.splines[0]
-        if len(spline.points) != 2: # Re-initialize points if count is wrong
-            while len(spline.points) > 0:
-                spline.points.remove(spline.points[0])
-            spline.points.add(1) # Creates 2 points
-
         # Since the object is at world origin, its points are in world space.
-        spline.points[0].co = list(p1_world) + [1.0]
-        spline.points[1].co = list(p2_world) + [1.0]
+        # (Re-initializes the spline if it is missing or its point count is wrong.)
+        set_single_poly_spline(curve_data, (tuple(p1_world), tuple(p2_world)))
         curve_data.update_tag() # Mark for depsgraph update
         return existing_obj
     else:
@@ -471,29 +1415,13 @@ def create_or_update_extraction_aid_line(context, name, p1_world, p2_world, coll
         curve_data.bevel_depth = 0.007 # Thin line for visual aid
         curve_data.bevel_resolution = 0 # Simple bevel
 
-        spline = curve_data.splines.new(type='POLY')
-        spline.points.add(1) # 2 points total
-        spline.points[0].co = list(p1_world) + [1.0]
-        spline.points[1].co = list(p2_world) + [1.0]
+        write_splines_bulk(curve_data, (tuple(p1_world), tuple(p2_world)), (2,), 'POLY')
 
         curve_obj = bpy.data.objects.new(name, curve_data)
         curve_obj.location = (0,0,0) # Lines are defined in world space points
 
-        # Assign a simple material for aid lines
-        mat_name = "MAT_Extraction_Aid_Line"
-        mat = bpy.data.materials.get(mat_name)
-        if not mat:
-            mat = bpy.data.materials.new(name=mat_name)
-            mat.use_nodes = True
-            if mat.node_tree: # Should always have a node tree after use_nodes=True
-                mat.node_tree.nodes.clear()
-                output_node = mat.node_tree.nodes.new(type='ShaderNodeOutputMaterial')
-                emission_node = mat.node_tree.nodes.new(type='ShaderNodeEmission')
-                emission_node.inputs['Color'].default_value = (0.3, 0.7, 1.0, 0.9) # Light blue, fairly opaque
-                emission_node.inputs['Strength'].default_value = 1.5 # Make it visible
-                mat.node_tree.links.new(emission_node.outputs['Emission'], output_node.inputs['Surface'])
-            mat.blend_method = 'BLEND'
-            mat.diffuse_color = (0.3, 0.7, 1.0, 0.9) # Viewport color for solid mode
+        # Aid lines share one pooled material (light blue, fairly opaque, emission only)
+        mat = get_pooled_guide_material(EXTRACTION_AID_LINE_COLOR, EXTRACTION_AID_LINE_OPACITY, 'AID')
 
         if curve_obj.data.materials:
             curve_obj.data.materials[0] = mat
@@ -501,73 +1429,13 @@ def create_or_update_extraction_aid_line(context, name, p1_world, p2_world, coll
             curve_obj.data.materials.append(mat)
 
         curve_obj.hide_select = True # Make the aid lines unselectable
+        line_group = name.rsplit("_", 1)[0] # 'VISUAL_Extraction_Line_2P_VP1_A' -> its group
+        tag_owned_object(curve_obj, 'AID_LINE', line_group, _aid_rig(line_group))
 
         if name not in collection.objects:
             collection.objects.link(curve_obj)
         return curve_obj
 
-def line_line_intersection_3d(p1, p2, p3, p4, tolerance=1e-3):
-    """
-    Finds the point of closest approach between two 3D lines L1 (p1-p2) and L2 (p3-p4).
-    If the distance between the closest points is within tolerance, their midpoint is returned.
-    Otherwise, returns None.
-    p1, p2: Vectors defining the first line segment.
-    p3, p4: Vectors defining the second line segment.
-    tolerance: Maximum distance for lines to be considered intersecting.
-    Returns: Intersection point (Vector) or None, and the two closest points C1, C2.
-    """
-    d1 = p2 - p1
-    d2 = p4 - p3
-
-    # Ensure direction vectors are not zero length
-    if d1.length_squared < 1e-9 or d2.length_squared < 1e-9:
-        # print("DEBUG Intersection: Line segment has zero length.")
-        return None, None, None
-
-    # System of equations to find parameters t (for L1) and u (for L2)
-    # where the lines are closest.
-    # (p1 - p3 + t*d1 - u*d2) . d1 = 0
-    # (p1 - p3 + t*d1 - u*d2) . d2 = 0
-    #
-    # t*(d1.d1) - u*(d2.d1) = (p3-p1).d1
-    # t*(d1.d2) - u*(d2.d2) = (p3-p1).d2
-
-    a = d1.dot(d1)
-    b = -d2.dot(d1) # same as -d1.dot(d2)
-    c = d1.dot(d2)
-    d = -d2.dot(d2)
-
-    dp = p3 - p1
-    r1 = dp.dot(d1)
-    r2 = dp.dot(d2)
-
-    determinant = a * d - b * c
-
-    if abs(determinant) < 1e-9: # Lines are parallel
-        # print(f"DEBUG Intersection: Determinant near zero ({determinant}), lines parallel/collinear.")
-        # Further checks for collinearity and overlap could be done here.
-        # For VP finding, parallel lines don't give a unique VP.
-        return None, None, None
-
-    t = (r1 * d - b * r2) / determinant
-    u = (a * r2 - r1 * c) / determinant # Note: u is for the line p3 + u*d2
-
-    closest_point_on_l1 = p1 + t * d1
-    closest_point_on_l2 = p3 + u * d2 # Corrected from p1 to p3
-
-    distance_squared = (closest_point_on_l1 - closest_point_on_l2).length_squared
-
-    # print(f"DEBUG Intersection: t={t:.4f}, u={u:.4f}, C1={closest_point_on_l1}, C2={closest_point_on_l2}, dist_sq={distance_squared:.6f}")
-
-
-    if distance_squared < tolerance**2:
-        intersection_point = (closest_point_on_l1 + closest_point_on_l2) / 2.0
-        return intersection_point, closest_point_on_l1, closest_point_on_l2
-    else:
-        # print(f"DEBUG Intersection: Lines are skew. Min dist sq: {distance_squared:.4f}")
-        return None, closest_point_on_l1, closest_point_on_l2
-
-
 def get_helpers_collection(context):
     if PERSPECTIVE_HELPER_COLLECTION not in bpy.data.collections:
         coll = bpy.data.collections.new(PERSPECTIVE_HELPER_COLLECTION)
@@ -580,38 +1448,262 @@ def get_guides_collection(context):
         context.scene.collection.children.link(coll)
     return bpy.data.collections[PERSPECTIVE_GUIDES_COLLECTION]
 
+# Each perspective mode has a child collection of the guides collection and each guide family one under
+# its mode's ('Guides_TWO_POINT' > 'Guides_2P_VP1'). Hiding a family excludes its layer collection, so its
+# objects also drop out of depsgraph evaluation. Merged guides holding several families stay in the guides
+# collection itself and hide their families' spline ranges instead.
+def _get_guide_child_collection(parent, name, held_key):
+    coll = bpy.data.collections.get(name)
+    if coll is None:
+        coll = bpy.data.collections.new(name)
+        coll[GUIDE_COLLECTION_PROP] = held_key
+    if parent.children.get(coll.name) is None:
+        parent.children.link(coll)
+    return coll
+
+def get_guide_mode_collection(context, mode):
+    return _get_guide_child_collection(get_guides_collection(context), GUIDE_COLLECTION_PREFIX + mode, mode)
+
+def get_guide_family_collection(context, family_key):
+    mode = GUIDE_FAMILY_DEFS[family_key][1]
+    return _get_guide_child_collection(get_guide_mode_collection(context, mode), GUIDE_COLLECTION_PREFIX + family_key, family_key)
+
+def guide_collection_tree(collection):
+    """collection and every collection nested in it, e.g. the guides collection with its mode / family collections."""
+    return {collection, *collection.children_recursive}
+
+def find_layer_collection(layer_collection, collection):
+    """The LayerCollection of collection below layer_collection (e.g. context.view_layer.layer_collection), or None."""
+    if layer_collection.collection == collection:
+        return layer_collection
+    for child in layer_collection.children:
+        found = find_layer_collection(child, collection)
+        if found is not None:
+            return found
+    return None
+
+def is_guide_family_excluded(view_layer, family_key):
+    """True if the family's collection or its mode's is excluded or hidden in view_layer (the family is hidden,
+    with the curve and the overlay backend alike)."""
+    for name in (GUIDE_COLLECTION_PREFIX + GUIDE_FAMILY_DEFS[family_key][1], GUIDE_COLLECTION_PREFIX + family_key):
+        coll = bpy.data.collections.get(name)
+        layer_coll = find_layer_collection(view_layer.layer_collection, coll) if coll is not None else None
+        if layer_coll is not None and (layer_coll.exclude or layer_coll.hide_viewport):
+            return True
+    return False
+
+def move_to_guide_collection(obj, collection, guides_tree):
+    """Links obj to collection and unlinks it from the other collections of guides_tree."""
+    if collection not in obj.users_collection:
+        collection.objects.link(obj)
+    for coll in list(obj.users_collection):
+        if coll != collection and coll in guides_tree:
+            coll.objects.unlink(obj)
+
 def get_horizon_control_object():
     return bpy.data.objects.get(HORIZON_CTRL_OBJ_NAME)
 
 def get_horizon_curve_object():
     return bpy.data.objects.get(HORIZON_CURVE_OBJ_NAME)
 
+# -----------------------------------------------------------
+# Vanishing Point Registry
+# -----------------------------------------------------------
+# One scan of the helpers collection fills role -> object and type -> [objects] tables; lookups
+# are then O(1). The registry is invalidated when objects are added or removed (the object count
+# changes, checked by the depsgraph handler and on lookup), on undo/redo/load, when a VP is relinked
+# into the helpers collection, and when a cached reference turns out to be stale.
+_vp_registry = {'valid': False, 'object_count': -1, 'roles': {}, 'by_type': {}, 'all': []}
+
+def invalidate_vp_registry():
+    _vp_registry['valid'] = False
+    bump_panel_view_model()
+
+def _rebuild_vp_registry():
+    roles, all_vps = {}, []
+    by_type = {type_key: [] for type_key in VP_TYPE_SPECIFIC_PREFIX_MAP}
+    helpers_coll = bpy.data.collections.get(PERSPECTIVE_HELPER_COLLECTION)
+    if helpers_coll:
+        for obj in helpers_coll.objects:
+            if obj.type != 'EMPTY' or not obj.name.startswith(VP_PREFIX): # General VP_ check
+                continue
+            all_vps.append(obj)
+            for type_key, type_prefix in VP_TYPE_SPECIFIC_PREFIX_MAP.items():
+                if obj.name.startswith(type_prefix):
+                    by_type[type_key].append(obj)
+            role = VP_ROLE_BY_NAME.get(obj.name)
+            if role:
+                roles[role] = obj
+    # Sorted by name so lists keep their historical order for non-role VPs
+    all_vps.sort(key=lambda vp_obj: vp_obj.name)
+    for vps in by_type.values():
+        vps.sort(key=lambda vp_obj: vp_obj.name)
+    _vp_registry.update(valid=True, object_count=len(bpy.data.objects), roles=roles, by_type=by_type, all=all_vps)
+
+def _ensure_vp_registry():
+    if not _vp_registry['valid'] or _vp_registry['object_count'] != len(bpy.data.objects):
+        _rebuild_vp_registry()
+
+def get_vp_by_role(role):
+    """The VP empty with the given role ('1P', '2P_1', '2P_2', '3P_H1', '3P_H2', '3P_V', 'FE'), or None."""
+    _ensure_vp_registry()
+    vp_obj = _vp_registry['roles'].get(role)
+    if vp_obj is None:
+        return None
+    try:
+        if vp_obj.name == VP_ROLE_DEFS[role][1]:
+            return vp_obj
+    except ReferenceError:
+        pass
+    _rebuild_vp_registry() # Renamed or removed behind our back
+    return _vp_registry['roles'].get(role)
+
 def get_vanishing_points(specific_prefix_key=None):
-    vps = []
-    if PERSPECTIVE_HELPER_COLLECTION not in bpy.data.collections:
-        return []
-    helpers_coll = bpy.data.collections[PERSPECTIVE_HELPER_COLLECTION]
-    target_prefix = None
+    """VP empties in the helpers collection, sorted by name; only those of one VP_TYPE_SPECIFIC_PREFIX_MAP
+    type if specific_prefix_key is given. Prefer get_vp_by_role for a specific VP."""
+    _ensure_vp_registry()
     if specific_prefix_key and specific_prefix_key in VP_TYPE_SPECIFIC_PREFIX_MAP:
-        target_prefix = VP_TYPE_SPECIFIC_PREFIX_MAP[specific_prefix_key]
+        vps = _vp_registry['by_type'][specific_prefix_key]
+    else:
+        vps = _vp_registry['all']
+    try:
+        for vp_obj in vps:
+            vp_obj.name # Raises ReferenceError for removed objects
+    except ReferenceError:
+        _rebuild_vp_registry()
+        return get_vanishing_points(specific_prefix_key)
+    return list(vps)
 
-    for obj in helpers_coll.objects:
-        if obj.type == 'EMPTY' and obj.name.startswith(VP_PREFIX): # General VP_ check
-            if target_prefix: # If a specific type is requested
-                if obj.name.startswith(target_prefix): # Check if obj name starts with specific type's prefix
-                    vps.append(obj)
-            else: # If no specific type, get all VPs
-                vps.append(obj)
+# -----------------------------------------------------------
+# Ownership Registry
+# -----------------------------------------------------------
+# Every object the add-on creates carries an owner tag (OWNER_TAG_PROP): its role, family (guide family
+# key, aid tag, aid line group, VP role, ...), rig (the perspective type it belongs to) and generation
+# (bumped whenever a family is emitted). Tags are ID properties, so they survive save/load and undo; the
+# registry indexing them by (role, family) is rebuilt from them after load/undo/redo, and when objects
+# were added behind its back (e.g. a tagged guide duplicated by the user). Untagged objects of older
+# files are classified by name when the registry is built. Clearing, hiding or selecting a family then
+# touches only its members instead of walking and name-matching whole collections.
+OWNER_TAG_PROP = "rogue_owner" # Object: {'role', 'family', 'rig', 'generation'}
+OWNER_ROLES = ('VP', 'HORIZON', 'GUIDE', 'MERGED_GUIDE', 'GRID', 'AID_EMPTY', 'AID_LINE', 'CLIP_SHAPE')
+NON_SHAPE_OWNER_ROLES = ('GUIDE', 'MERGED_GUIDE', 'GRID', 'AID_LINE', 'HORIZON') # Never clipping shapes
+_owner_registry = {'valid': False, 'object_count': -1, 'members': {}, 'generation': 0}
+# members: (role, family) -> {object pointer: object}
+
+def invalidate_owner_registry():
+    _owner_registry['valid'] = False
+
+def _aid_rig(aid_name):
+    """Perspective type of an aid tag ('2P_VP1_Aid') or aid line group ('VISUAL_Extraction_Line_2P_VP1')."""
+    return next((mode for mode, groups in EXTRACTION_AID_GROUPS.items() for group in groups if aid_name in group), "")
+
+def _infer_owner_tag(obj):
+    """Owner tag of an untagged object created by an older version, from its name; None if not ours."""
+    name = obj.name
+    if obj.type == 'EMPTY' and 'clipping_shape_type' in obj:
+        return {'role': 'CLIP_SHAPE', 'family': str(obj['clipping_shape_type']), 'rig': "", 'generation': 0}
+    if name in (HORIZON_CTRL_OBJ_NAME, HORIZON_CURVE_OBJ_NAME):
+        return {'role': 'HORIZON', 'family': "", 'rig': "", 'generation': 0}
+    if obj.type == 'EMPTY' and name.startswith("3P_Helper_"):
+        return {'role': 'AID_EMPTY', 'family': "3P_Helper", 'rig': 'THREE_POINT', 'generation': 0}
+    if obj.type == 'EMPTY' and "_Aid" in name:
+        aid_tag = next((tag for groups in EXTRACTION_AID_GROUPS.values() for tag, _ in groups if tag in name), "")
+        return {'role': 'AID_EMPTY', 'family': aid_tag, 'rig': _aid_rig(aid_tag) if aid_tag else "", 'generation': 0}
+    if obj.type == 'EMPTY' and name.startswith(VP_PREFIX):
+        role = VP_ROLE_BY_NAME.get(name, "")
+        return {'role': 'VP', 'family': role, 'rig': VP_ROLE_DEFS[role][0] if role else "", 'generation': 0}
+    if obj.type != 'CURVE':
+        return None
+    if name.startswith("VISUAL_Extraction_Line_"):
+        group = name.rsplit("_", 1)[0]
+        return {'role': 'AID_LINE', 'family': group, 'rig': _aid_rig(group), 'generation': 0}
+    if name.startswith(GRID_OBJECT_PREFIX):
+        return {'role': 'GRID', 'family': name[len(GRID_OBJECT_PREFIX):].split(".")[0], 'rig': "", 'generation': 0}
+    if obj.data is not None and SPLINE_RANGES_PROP in obj.data:
+        return {'role': 'MERGED_GUIDE', 'family': "", 'rig': "", 'generation': 0}
+    family_key = guide_family_of(name) # Also maps legacy names (LEGACY_GUIDE_FAMILY_NAMES)
+    if family_key:
+        return {'role': 'GUIDE', 'family': family_key, 'rig': GUIDE_FAMILY_DEFS[family_key][1], 'generation': 0}
+    return None
+
+def get_owner_role(obj):
+    """Owner role of obj (tagged, or inferred for older objects), or None if the add-on does not own it."""
+    tag = obj.get(OWNER_TAG_PROP) or _infer_owner_tag(obj)
+    return tag['role'] if tag else None
+
+def _rebuild_owner_registry():
+    members, generation = {}, 0
+    for obj in bpy.data.objects:
+        tag = obj.get(OWNER_TAG_PROP)
+        if tag is None:
+            tag = _infer_owner_tag(obj) # Kept in memory only: the registry may be built while drawing
+            if tag is None:
+                continue
+        members.setdefault((tag['role'], tag['family']), {})[obj.as_pointer()] = obj
+        generation = max(generation, int(tag['generation']))
+    _owner_registry.update(valid=True, object_count=len(bpy.data.objects), members=members, generation=generation)
+
+def _ensure_owner_registry():
+    # Only additions need a rebuild: removed members are dropped lazily (see owned_objects). Additions
+    # hidden by a removal (same count) are caught by the depsgraph handler (see note_owner_tagged_update).
+    object_count = len(bpy.data.objects)
+    if not _owner_registry['valid'] or object_count > _owner_registry['object_count']:
+        _rebuild_owner_registry()
+    else:
+        _owner_registry['object_count'] = object_count
 
-    # Sort VPs by name for consistent order, crucial for 2P/3P auto-assignment if names aren't exact _1, _2
-    vps.sort(key=lambda vp_obj: vp_obj.name)
-    return vps
+def note_owner_tagged_update(obj):
+    """Depsgraph hook for an updated object: a tagged object the registry does not know yet (e.g. a
+    duplicated guide, which the object count check misses when another object was removed since)
+    makes the next lookup rebuild the registry."""
+    if not _owner_registry['valid']:
+        return
+    tag = obj.get(OWNER_TAG_PROP)
+    if tag is not None and obj.as_pointer() not in _owner_registry['members'].get((tag['role'], tag['family']), {}):
+        invalidate_owner_registry()
+
+def next_owner_generation():
+    _ensure_owner_registry()
+    _owner_registry['generation'] += 1
+    return _owner_registry['generation']
+
+def tag_owned_object(obj, role, family="", rig="", generation=None):
+    """Tags an object the add-on created with its owner and indexes it in the registry."""
+    if not _owner_registry['valid']:
+        _rebuild_owner_registry()
+    # No object count check here: the count just grew by this very object
+    old_tag = obj.get(OWNER_TAG_PROP)
+    if old_tag is not None: # Retagged (e.g. a copy of a tagged object): leave the old group
+        _owner_registry['members'].get((old_tag['role'], old_tag['family']), {}).pop(obj.as_pointer(), None)
+    tag = {'role': role, 'family': family or "", 'rig': rig or "",
+           'generation': _owner_registry['generation'] if generation is None else int(generation)}
+    obj[OWNER_TAG_PROP] = tag
+    _owner_registry['members'].setdefault((role, tag['family']), {})[obj.as_pointer()] = obj
+    _owner_registry['object_count'] = len(bpy.data.objects)
+
+def owned_objects(role, families=None):
+    """Live objects the add-on created with role, of the given families only if families is not None.
+    Sorted by name, like the walks they replace."""
+    _ensure_owner_registry()
+    found = []
+    for (member_role, family), members in _owner_registry['members'].items():
+        if member_role != role or (families is not None and family not in families):
+            continue
+        for pointer, obj in list(members.items()):
+            try:
+                obj.name # Raises ReferenceError for removed objects
+            except ReferenceError:
+                del members[pointer]
+                continue
+            found.append(obj)
+    found.sort(key=lambda obj: obj.name)
+    return found
 
 
 def update_material_color_and_opacity(material, new_color_rgb, new_opacity):
     if material and material.node_tree:
-        mix_shader_node = next((n for n in material.node_tree.nodes if n.type == 'ShaderNodeMixShader'), None)
-        emission_node = next((n for n in material.node_tree.nodes if n.type == 'ShaderNodeEmission'), None)
+        mix_shader_node = next((n for n in material.node_tree.nodes if n.bl_idname == 'ShaderNodeMixShader'), None)
+        emission_node = next((n for n in material.node_tree.nodes if n.bl_idname == 'ShaderNodeEmission'), None)
         if emission_node:
             emission_node.inputs['Color'].default_value = list(new_color_rgb) + [1.0] # RGBA for emission color
         if mix_shader_node:
@@ -620,9 +1712,355 @@ def update_material_color_and_opacity(material, new_color_rgb, new_opacity):
         return True
     return False
 
+# -----------------------------------------------------------
+# Guide Material Pool
+# -----------------------------------------------------------
+# Guides share materials keyed by (colour, opacity, style) instead of one 'MAT_<name>' per line.
+# The pooled material's name is derived from its key, so lookups survive file reloads, and the
+# reference count is the material's own Blender user count: once no curve uses an entry it is
+# evicted by evict_orphaned_guide_materials().
+GUIDE_MATERIAL_POOL_PREFIX = "MAT_RoguePool_"
+GUIDE_MATERIAL_KEY_PROP = "rogue_pool_key"
+GUIDE_MATERIAL_STYLES = {
+    # STYLE: (emission strength, transparent mix)
+    'GUIDE': (3.0, True),
+    'AID':   (1.5, False),
+}
+EXTRACTION_AID_LINE_COLOR = (0.3, 0.7, 1.0) # Light blue
+EXTRACTION_AID_LINE_OPACITY = 0.9
+_guide_material_pool = {} # pool key -> material name
+_guide_material_pool_indexed = False # False until the current file's materials were scanned once
+
+def random_guide_color():
+    """Random guide colour. Not quantized: only explicit colours (aid lines, recoloured groups) share a
+    pooled material, so editing one random-coloured guide's material never recolours another family."""
+    return tuple(random.uniform(0.1, 1.0) for _ in range(3))
+
+def make_guide_material_key(color_rgb, opacity, style='GUIDE'):
+    rgb = [min(max(float(c), 0.0), 1.0) for c in color_rgb[:3]]
+    return f"{style}_{rgb[0]:.6f}_{rgb[1]:.6f}_{rgb[2]:.6f}{_guide_material_opacity_suffix(opacity)}"
+
+def _guide_material_opacity_suffix(opacity):
+    return f"_A{min(max(float(opacity), 0.0), 1.0):.3f}"
+
+def _index_guide_material_pool():
+    """Scans the file once for pooled materials and legacy per-line guide materials ('MAT_1P_Guides_3', ...)."""
+    global _guide_material_pool_indexed
+    legacy_prefixes = tuple("MAT_" + prefix for prefix, _ in GUIDE_FAMILY_DEFS.values()) + \
+                      ("MAT_GridPlane_", "MAT_Extraction_Aid_Line")
+    for mat in bpy.data.materials:
+        key = mat.get(GUIDE_MATERIAL_KEY_PROP)
+        if key:
+            _guide_material_pool[key] = mat.name
+        elif mat.name.startswith(legacy_prefixes):
+            _guide_material_pool["LEGACY_" + mat.name] = mat.name
+    _guide_material_pool_indexed = True
+
+def reset_guide_material_pool():
+    """Forgets the in-memory index (the materials themselves live in bpy.data). Called on file load / undo."""
+    global _guide_material_pool_indexed
+    _guide_material_pool.clear()
+    _guide_material_pool_indexed = False
+
+def _build_pooled_material_nodes(mat, color_rgb, opacity, style):
+    strength, use_transparency = GUIDE_MATERIAL_STYLES.get(style, GUIDE_MATERIAL_STYLES['GUIDE'])
+    mat.use_nodes = True
+    if mat.node_tree:
+        mat.node_tree.nodes.clear()
+        output_node = mat.node_tree.nodes.new(type='ShaderNodeOutputMaterial')
+        emission_node = mat.node_tree.nodes.new(type='ShaderNodeEmission')
+        emission_node.inputs['Color'].default_value = list(color_rgb[:3]) + [1.0]
+        emission_node.inputs['Strength'].default_value = strength
+        if use_transparency:
+            transparent_node = mat.node_tree.nodes.new(type='ShaderNodeBsdfTransparent')
+            mix_shader_node = mat.node_tree.nodes.new(type='ShaderNodeMixShader')
+            mix_shader_node.inputs[0].default_value = opacity
+            mat.node_tree.links.new(transparent_node.outputs['BSDF'], mix_shader_node.inputs[1])
+            mat.node_tree.links.new(emission_node.outputs['Emission'], mix_shader_node.inputs[2])
+            mat.node_tree.links.new(mix_shader_node.outputs['Shader'], output_node.inputs['Surface'])
+        else:
+            mat.node_tree.links.new(emission_node.outputs['Emission'], output_node.inputs['Surface'])
+    mat.blend_method = 'BLEND'
+    if hasattr(mat, "shadow_method"): mat.shadow_method = 'NONE'
+    mat.diffuse_color = tuple(list(color_rgb[:3]) + [opacity]) # For viewport display (solid mode)
+
+def get_pooled_guide_material(color_rgb, opacity, style='GUIDE'):
+    """Returns the shared material for (colour, opacity, style), creating it on first use."""
+    if not _guide_material_pool_indexed:
+        _index_guide_material_pool()
+    key = make_guide_material_key(color_rgb, opacity, style)
+    mat_name = _guide_material_pool.get(key, GUIDE_MATERIAL_POOL_PREFIX + key)
+    mat = bpy.data.materials.get(mat_name)
+    if mat is None or mat.get(GUIDE_MATERIAL_KEY_PROP) != key:
+        mat = bpy.data.materials.new(name=GUIDE_MATERIAL_POOL_PREFIX + key)
+        mat[GUIDE_MATERIAL_KEY_PROP] = key
+        _build_pooled_material_nodes(mat, color_rgb, opacity, style)
+    _guide_material_pool[key] = mat.name
+    return mat
+
+def _set_guide_material_opacity(mat, opacity):
+    if mat.node_tree:
+        mix_shader_node = next((n for n in mat.node_tree.nodes if n.bl_idname == 'ShaderNodeMixShader'), None)
+        if mix_shader_node:
+            mix_shader_node.inputs[0].default_value = opacity
+    mat.diffuse_color = tuple(list(mat.diffuse_color[:3]) + [opacity])
+
+def set_pooled_guide_opacity(opacity):
+    """Sets the opacity of every GUIDE-style pooled material (and legacy per-line guide material) in place.
+    Pooled materials are re-keyed (key and name); one whose new key is already taken hands its users
+    over to that material and is removed. Returns the number of edited materials."""
+    if not _guide_material_pool_indexed:
+        _index_guide_material_pool()
+    suffix = _guide_material_opacity_suffix(opacity)
+    edited_count, duplicates = 0, []
+    for key, mat_name in list(_guide_material_pool.items()):
+        mat = bpy.data.materials.get(mat_name)
+        if mat is None:
+            del _guide_material_pool[key]
+            continue
+        if key.startswith("LEGACY_"):
+            _set_guide_material_opacity(mat, opacity)
+            edited_count += 1
+            continue
+        if not key.startswith("GUIDE_") or key.endswith(suffix):
+            continue
+        new_key = key.rsplit("_A", 1)[0] + suffix # Same colour, new opacity
+        del _guide_material_pool[key]
+        survivor = bpy.data.materials.get(_guide_material_pool.get(new_key, ""))
+        if survivor is not None:
+            mat.user_remap(survivor)
+            duplicates.append(mat)
+            continue
+        _set_guide_material_opacity(mat, opacity)
+        mat[GUIDE_MATERIAL_KEY_PROP] = new_key
+        mat.name = GUIDE_MATERIAL_POOL_PREFIX + new_key
+        _guide_material_pool[new_key] = mat.name
+        edited_count += 1
+    if duplicates:
+        bpy.data.batch_remove(duplicates)
+    return edited_count
+
+def get_material_emission_color(mat, fallback_rgb=(1.0, 1.0, 1.0)):
+    """RGB of the material's emission node (guide colours live there), or fallback_rgb."""
+    if mat and mat.node_tree:
+        emission_node = next((n for n in mat.node_tree.nodes if n.bl_idname == 'ShaderNodeEmission'), None)
+        if emission_node:
+            return tuple(emission_node.inputs['Color'].default_value[:3])
+    return tuple(fallback_rgb[:3])
+
+def evict_orphaned_guide_materials():
+    """Removes pooled (and legacy per-line) guide materials that no curve uses anymore.
+    Returns the number of evicted materials."""
+    if not _guide_material_pool_indexed:
+        _index_guide_material_pool()
+    orphans = []
+    for key, mat_name in list(_guide_material_pool.items()):
+        mat = bpy.data.materials.get(mat_name)
+        if mat is None or mat.users == 0:
+            del _guide_material_pool[key]
+            if mat is not None:
+                orphans.append(mat)
+    if orphans:
+        bpy.data.batch_remove(orphans) # One pass for all of them
+    return len(orphans)
+
+# -----------------------------------------------------------
+# Bulk Spline I/O
+# -----------------------------------------------------------
+# Point coordinates are moved between NumPy and curve datablocks with foreach_set / foreach_get,
+# one call per spline, instead of per-point RNA access. Lines travel "packed": a flat (K, 3)
+# float32 coordinate array plus a per-spline point count array (see pack_lines in the geometry core).
+
+def write_splines_bulk(curve_data, coords, counts, spline_type='POLY', is_cyclic=False, handles=None):
+    """Appends one spline per entry of counts to curve_data and fills it from the packed coords.
+    All splines are allocated in one pass, then each one gets a single foreach_set.
+    BEZIER splines get AUTO handles (type and AUTO-equivalent positions) unless handles gives
+    (handle_left, handle_right); those keep Blender's default handle types.
+    Returns the number of splines written."""
+    coords = np.asarray(coords, dtype=np.float32).reshape(-1, 3)
+    counts = np.asarray(counts, dtype=np.int64)
+    if len(counts) == 0:
+        return 0
+    count_points_written(len(coords))
+    splines = curve_data.splines
+    first_new = len(splines)
+    auto_handles = spline_type == 'BEZIER' and handles is None
+    for count in counts:
+        spline = splines.new(type=spline_type)
+        if spline_type == 'BEZIER':
+            spline.bezier_points.add(int(count) - 1)
+            if auto_handles: # Enums have no foreach_set; set once here, they persist through update_splines_bulk
+                for point in spline.bezier_points:
+                    point.handle_left_type = 'AUTO'
+                    point.handle_right_type = 'AUTO'
+        else:
+            spline.points.add(int(count) - 1)
+
+    cyclic = np.asarray(is_cyclic, dtype=bool) & (counts > 1) if np.ndim(is_cyclic) \
+             else np.full(len(counts), bool(is_cyclic)) & (counts > 1)
+    offsets = np.concatenate(([0], np.cumsum(counts)))
+    if spline_type == 'BEZIER':
+        if handles is None:
+            handle_left, handle_right = auto_bezier_handles(coords, counts, cyclic)
+        else:
+            handle_left, handle_right = (np.asarray(h, dtype=np.float32).reshape(-1, 3) for h in handles)
+        for i in range(len(counts)):
+            bezier_points = splines[first_new + i].bezier_points
+            lo, hi = offsets[i], offsets[i + 1]
+            bezier_points.foreach_set("co", coords[lo:hi].ravel())
+            bezier_points.foreach_set("handle_left", handle_left[lo:hi].ravel())
+            bezier_points.foreach_set("handle_right", handle_right[lo:hi].ravel())
+    else:
+        homogeneous = np.ones((len(coords), 4), dtype=np.float32)
+        homogeneous[:, :3] = coords
+        for i in range(len(counts)):
+            splines[first_new + i].points.foreach_set("co", homogeneous[offsets[i]:offsets[i + 1]].ravel())
+
+    all_cyclic = np.zeros(len(splines), dtype=bool)
+    splines.foreach_get("use_cyclic_u", all_cyclic)
+    all_cyclic[first_new:] = cyclic
+    splines.foreach_set("use_cyclic_u", all_cyclic)
+    return len(counts)
+
+def update_splines_bulk(curve_data, coords, counts, spline_indices, spline_type='POLY', cyclic=None, handles=None):
+    """Overwrites the points of existing splines (given by index) from packed coords.
+    The point counts must match the splines' current counts. BEZIER splines also get their handles
+    rewritten: handles, or AUTO-equivalent ones (cyclic gives the per-spline cyclic flags for that)."""
+    coords = np.asarray(coords, dtype=np.float32).reshape(-1, 3)
+    count_points_written(len(coords))
+    offsets = np.concatenate(([0], np.cumsum(counts)))
+    splines = curve_data.splines
+    if spline_type == 'BEZIER':
+        if handles is None:
+            cyclic = np.zeros(len(counts), dtype=bool) if cyclic is None else cyclic
+            handle_left, handle_right = auto_bezier_handles(coords, counts, cyclic)
+        else:
+            handle_left, handle_right = (np.asarray(h, dtype=np.float32).reshape(-1, 3) for h in handles)
+        for i, spline_idx in enumerate(spline_indices):
+            bezier_points = splines[int(spline_idx)].bezier_points
+            lo, hi = offsets[i], offsets[i + 1]
+            bezier_points.foreach_set("co", coords[lo:hi].ravel())
+            bezier_points.foreach_set("handle_left", handle_left[lo:hi].ravel())
+            bezier_points.foreach_set("handle_right", handle_right[lo:hi].ravel())
+        return
+    homogeneous = np.ones((len(coords), 4), dtype=np.float32)
+    homogeneous[:, :3] = coords
+    for i, spline_idx in enumerate(spline_indices):
+        splines[int(spline_idx)].points.foreach_set("co", homogeneous[offsets[i]:offsets[i + 1]].ravel())
+
+def sync_curve_splines(curve_data, coords, counts, spline_type='POLY', is_cyclic=False):
+    """Makes curve_data hold exactly the packed lines, reusing its existing splines.
+    Leading splines whose type and point count already match are rewritten in place; only the
+    differing tail is removed / appended (e.g. when the density changed).
+    is_cyclic is one flag for all lines or one per line.
+    Returns the number of splines that had to be allocated."""
+    coords = np.asarray(coords, dtype=np.float32).reshape(-1, 3)
+    counts = np.asarray(counts, dtype=np.int64)
+    splines = curve_data.splines
+    n_old = len(splines)
+    old_counts = np.zeros(n_old, dtype=np.int32)
+    if n_old:
+        splines.foreach_get("point_count_u", old_counts)
+    n_common = min(n_old, len(counts))
+    types_match = np.array([spline.type == spline_type for spline in splines[:n_common]], dtype=bool)
+    matching = (old_counts[:n_common] == counts[:n_common]) & types_match
+    keep = n_common if matching.all() else int(np.argmin(matching)) # Index of the first mismatch
+
+    for idx in range(n_old - 1, keep - 1, -1): # Surplus / mismatched splines, removed from the end
+        splines.remove(splines[idx])
+
+    cyclic = (np.asarray(is_cyclic, dtype=bool) if np.ndim(is_cyclic) else np.full(len(counts), bool(is_cyclic))) & (counts > 1)
+    n_kept_points = int(counts[:keep].sum())
+    if keep:
+        update_splines_bulk(curve_data, coords[:n_kept_points], counts[:keep], range(keep), spline_type, cyclic[:keep])
+    allocated = write_splines_bulk(curve_data, coords[n_kept_points:], counts[keep:], spline_type, cyclic[keep:])
+    if len(splines):
+        splines.foreach_set("use_cyclic_u", cyclic)
+    return allocated
+
+def replace_splines(curve_data, parts, spline_types=('POLY', 'BEZIER')):
+    """Swaps the splines of curve_data whose type is in spline_types for parts, a list of packed lines
+    (coords, counts, cyclic, spline_type, handles), handles being None or as for write_splines_bulk.
+    Splines of other types are kept."""
+    parts = [part for part in parts if len(part[1])]
+    splines = curve_data.splines
+    if len(parts) <= 1 and all(spline.type in spline_types for spline in splines) and (not parts or parts[0][4] is None):
+        coords, counts, cyclic, spline_type, _ = parts[0] if parts else (np.zeros((0, 3)), (), False, 'POLY', None)
+        sync_curve_splines(curve_data, coords, counts, spline_type, cyclic) # Reuses matching splines
+        return
+    for idx in range(len(splines) - 1, -1, -1):
+        if splines[idx].type in spline_types:
+            splines.remove(splines[idx])
+    for coords, counts, cyclic, spline_type, handles in parts:
+        write_splines_bulk(curve_data, coords, counts, spline_type, cyclic, handles)
+
+def read_splines_bulk(curve_data, spline_types=('POLY',), spline_indices=None):
+    """Bulk reader matching write_splines_bulk, for the clipping and merge paths.
+    Returns (coords (K, 3) float32, counts, spline indices, cyclic flags) for the splines whose
+    type is in spline_types (among spline_indices, if given); each spline is read with a single foreach_get."""
+    splines = curve_data.splines
+    n_splines = len(splines)
+    all_counts = np.zeros(n_splines, dtype=np.int32)
+    all_cyclic = np.zeros(n_splines, dtype=bool)
+    if n_splines:
+        splines.foreach_get("point_count_u", all_counts)
+        splines.foreach_get("use_cyclic_u", all_cyclic)
+    chunks, indices = [], []
+    for idx in (range(n_splines) if spline_indices is None else spline_indices):
+        idx = int(idx)
+        spline = splines[idx]
+        if spline.type not in spline_types or all_counts[idx] == 0:
+            continue
+        if spline.type == 'BEZIER':
+            buf = np.empty(all_counts[idx] * 3, dtype=np.float32)
+            spline.bezier_points.foreach_get("co", buf)
+            chunks.append(buf.reshape(-1, 3))
+        else:
+            buf = np.empty(all_counts[idx] * 4, dtype=np.float32)
+            spline.points.foreach_get("co", buf)
+            chunks.append(buf.reshape(-1, 4)[:, :3])
+        indices.append(idx)
+    if not chunks:
+        return np.zeros((0, 3), dtype=np.float32), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=bool)
+    indices = np.array(indices, dtype=np.int64)
+    return (np.ascontiguousarray(np.concatenate(chunks)), all_counts[indices].astype(np.int64),
+            indices, all_cyclic[indices])
+
+def read_bezier_splines_bulk(curve_data, spline_indices=None):
+    """Like read_splines_bulk for the BEZIER splines, with their handles.
+    Returns (co, handle_left, handle_right (K, 3) float32 each, counts, cyclic flags)."""
+    coords, counts, indices, cyclic = read_splines_bulk(curve_data, ('BEZIER',), spline_indices)
+    handles = np.empty((2, len(coords), 3), dtype=np.float32)
+    offsets = np.concatenate(([0], np.cumsum(counts)))
+    for i, idx in enumerate(indices):
+        bezier_points = curve_data.splines[int(idx)].bezier_points
+        lo, hi = offsets[i], offsets[i + 1]
+        for side, attr in enumerate(("handle_left", "handle_right")):
+            buf = np.empty((hi - lo) * 3, dtype=np.float32)
+            bezier_points.foreach_get(attr, buf)
+            handles[side, lo:hi] = buf.reshape(-1, 3)
+    return coords, handles[0], handles[1], counts, cyclic
+
+def set_single_poly_spline(curve_data, coords):
+    """Makes a single-spline curve hold exactly coords ((M, 3)) as a POLY spline.
+    The spline is only recreated when its type or point count differs."""
+    coords = np.asarray(coords, dtype=np.float32).reshape(-1, 3)
+    splines = curve_data.splines
+    spline = splines[0] if len(splines) else None
+    if spline is None or spline.type != 'POLY' or len(spline.points) != len(coords):
+        splines.clear()
+        write_splines_bulk(curve_data, coords, (len(coords),), 'POLY')
+        return
+    count_points_written(len(coords))
+    homogeneous = np.ones((len(coords), 4), dtype=np.float32)
+    homogeneous[:, :3] = coords
+    spline.points.foreach_set("co", homogeneous.ravel())
+
 def create_curve_object(context, name, points_data_list, collection,
                         bevel_depth=0.01, opacity=1.0, color_rgb=None, # MODIFIED: Added optional color_rgb=None
-                        is_cyclic=False, curve_type='POLY'):
+                        is_cyclic=False, curve_type='POLY', material_style='GUIDE'):
+    # material_style: key style for the shared material pool; None gives the object its own 'MAT_<name>'
+    # material instead (used by the horizon line, whose colour is edited live).
     # Remove existing object and its curve data if it's the only user
     if name in bpy.data.objects:
         old_obj = bpy.data.objects[name]
@@ -637,29 +2075,9 @@ def create_curve_object(context, name, points_data_list, collection,
     curve_data.dimensions = '3D'
     curve_data.bevel_depth = bevel_depth
     curve_data.bevel_resolution = 1 
-    splines_created_count = 0
-
-    for spline_pts in points_data_list:
-        if not spline_pts: continue
-        if curve_type == 'POLY' and len(spline_pts) < 2: continue
-        if curve_type == 'BEZIER' and not spline_pts: continue
-
-        spline = curve_data.splines.new(type=curve_type)
-        if curve_type == 'POLY':
-            spline.points.add(len(spline_pts) - 1)
-            for idx, pt_co in enumerate(spline_pts):
-                spline.points[idx].co = list(pt_co) + [1.0] 
-        elif curve_type == 'BEZIER':
-            spline.bezier_points.add(len(spline_pts) -1 if spline_pts else 0)
-            for idx, pt_co in enumerate(spline_pts):
-                bp = spline.bezier_points[idx]
-                bp.co = pt_co
-                bp.handle_left_type = 'AUTO'
-                bp.handle_right_type = 'AUTO'
-        
-        if spline_pts : 
-            spline.use_cyclic_u = is_cyclic and (len(spline_pts) > 1)
-        splines_created_count += 1
+    # POLY splines need at least 2 points, a BEZIER spline may hold a single point
+    coords, counts = pack_lines(points_data_list, min_points=2 if curve_type == 'POLY' else 1)
+    splines_created_count = write_splines_bulk(curve_data, coords, counts, curve_type, is_cyclic)
 
     if splines_created_count == 0: 
         if curve_data.name in bpy.data.curves:
@@ -669,34 +2087,18 @@ def create_curve_object(context, name, points_data_list, collection,
     curve_obj = bpy.data.objects.new(name, curve_data)
     
     # MODIFIED: Determine color to use
-    final_color_rgb = color_rgb if color_rgb is not None else \
-                      (random.uniform(0.1, 1.0), random.uniform(0.1, 1.0), random.uniform(0.1, 1.0))
-
-    mat_name = f"MAT_{name.replace(':', '_').replace(' ', '_')}" 
-    mat = bpy.data.materials.get(mat_name)
-    if not mat:
-        mat = bpy.data.materials.new(name=mat_name)
-        mat.use_nodes = True
-        if mat.node_tree:
-            mat.node_tree.nodes.clear()
-            output_node = mat.node_tree.nodes.new(type='ShaderNodeOutputMaterial')
-            transparent_node = mat.node_tree.nodes.new(type='ShaderNodeBsdfTransparent')
-            emission_node = mat.node_tree.nodes.new(type='ShaderNodeEmission')
-            mix_shader_node = mat.node_tree.nodes.new(type='ShaderNodeMixShader')
-
-            emission_node.inputs['Color'].default_value = list(final_color_rgb) + [1.0] # MODIFIED to use final_color_rgb
-            emission_node.inputs['Strength'].default_value = 3.0 
-            mix_shader_node.inputs[0].default_value = opacity 
-
-            mat.node_tree.links.new(transparent_node.outputs['BSDF'], mix_shader_node.inputs[1])
-            mat.node_tree.links.new(emission_node.outputs['Emission'], mix_shader_node.inputs[2])
-            mat.node_tree.links.new(mix_shader_node.outputs['Shader'], output_node.inputs['Surface'])
+    final_color_rgb = color_rgb if color_rgb is not None else random_guide_color()
 
-        mat.blend_method = 'BLEND' 
-        if hasattr(mat, "shadow_method"): mat.shadow_method = 'NONE'
-        mat.diffuse_color = tuple(list(final_color_rgb) + [opacity]) # MODIFIED to use final_color_rgb
-    else: 
-        update_material_color_and_opacity(mat, final_color_rgb, opacity) # MODIFIED to use final_color_rgb
+    if material_style:
+        mat = get_pooled_guide_material(final_color_rgb, opacity, material_style)
+    else:
+        mat_name = f"MAT_{name.replace(':', '_').replace(' ', '_')}" 
+        mat = bpy.data.materials.get(mat_name)
+        if not mat:
+            mat = bpy.data.materials.new(name=mat_name)
+            _build_pooled_material_nodes(mat, final_color_rgb, opacity, 'GUIDE')
+        else: 
+            update_material_color_and_opacity(mat, final_color_rgb, opacity) # MODIFIED to use final_color_rgb
 
     if curve_obj.data.materials: 
         curve_obj.data.materials[0] = mat
@@ -707,118 +2109,1464 @@ def create_curve_object(context, name, points_data_list, collection,
     target_collection.objects.link(curve_obj)
     return curve_obj
 
+# --- Batched removal ---
+# Clear paths collect their objects together with the curve data only those objects use and the pooled
+# guide materials nothing else uses, then free everything in one bpy.data.batch_remove call (one relink /
+# depsgraph pass instead of one per datablock).
+
+def collect_removal_ids(objects):
+    """The set of IDs freed with objects: the objects, their curve data unless other objects use it, the
+    pooled guide materials only those curves use, and pooled materials already without users."""
+    if not _guide_material_pool_indexed:
+        _index_guide_material_pool()
+    doomed = set(objects)
+    data_uses = collections.Counter(obj.data for obj in objects if obj.data is not None)
+    doomed_curves = [data for data, uses in data_uses.items() if isinstance(data, bpy.types.Curve) and data.users <= uses]
+    doomed.update(doomed_curves)
+    pooled_mats = [bpy.data.materials.get(mat_name) for mat_name in _guide_material_pool.values()]
+    pooled_mats = {mat for mat in pooled_mats if mat is not None}
+    mat_uses = collections.Counter(mat for data in doomed_curves for mat in data.materials if mat in pooled_mats)
+    doomed.update(mat for mat in pooled_mats if mat.users <= mat_uses[mat])
+    return doomed
+
+def batch_remove_objects(objects):
+    """Removes objects (and the IDs collect_removal_ids finds for them) in one batch. Returns the removed object count."""
+    live_objects = []
+    for obj in objects:
+        try:
+            obj.name # Raises ReferenceError for removed objects
+        except ReferenceError:
+            continue
+        live_objects.append(obj)
+    live_objects = list(dict.fromkeys(live_objects))
+    if not live_objects:
+        return 0
+    doomed = collect_removal_ids(live_objects)
+    mat_names = {id_block.name for id_block in doomed if isinstance(id_block, bpy.types.Material)}
+    for id_block in doomed:
+        if isinstance(id_block, bpy.types.Curve): # Its cached flattenings would otherwise outlive it
+            _bezier_flatten_cache.pop(id_block.session_uid, None)
+    try:
+        bpy.data.batch_remove(doomed)
+    except Exception as e:
+        guide_log.error("Batch removal of %d object(s) failed: %s", len(live_objects), e)
+        return 0
+    for key, mat_name in list(_guide_material_pool.items()):
+        if mat_name in mat_names:
+            del _guide_material_pool[key]
+    return len(live_objects)
+
+# --- Data-level merge ---
+# Guides are merged without operators: the splines of all source curves are copied into one new curve
+# datablock with foreach_get / foreach_set, so merging needs no selection, active object or mode (and
+# works in background mode and from timers). As with bpy.ops.object.join the first object is the target:
+# the merged object takes its transform and object / curve settings, the other curves are moved into its
+# space, and material slots are combined with every spline's material index remapped.
+MERGE_SPLINE_ATTRS = (("use_cyclic_u", bool), ("material_index", np.int32), ("use_smooth", bool),
+                      ("resolution_u", np.int32), ("order_u", np.int32), ("use_endpoint_u", bool), ("use_bezier_u", bool))
+MERGE_POINT_ATTRS = {'BEZIER': (("co", 3), ("handle_left", 3), ("handle_right", 3), ("radius", 1), ("tilt", 1)),
+                     'POLY': (("co", 4), ("radius", 1), ("tilt", 1)),
+                     'NURBS': (("co", 4), ("radius", 1), ("tilt", 1))}
+MERGE_TRANSFORMED_ATTRS = ("co", "handle_left", "handle_right")
+
+@profiled("merge_curve_objects")
+def merge_curve_objects(objects, name=None, hidden_objects=()):
+    """Merges curve objects into one new curve object, linked to the collections of the first one
+    (see _merged_guide_collections), and removes them. name defaults to the first object's name. Restore clip layer guides first
+    (restore_clip_sources): only their current splines are merged.
+    The merged curve records which splines came from which guide family (see SPLINE_RANGES_PROP);
+    objects are merged family by family so each family gets one run. The lines of hidden_objects (hidden
+    or excluded guides, see is_guide_hidden) go into the index as hidden families instead, unless another
+    source shows the same family.
+    Returns the merged object, or None if there was no curve to merge."""
+    objects = [obj for obj in objects if obj.type == 'CURVE' and obj.data]
+    if not objects:
+        return None
+    # Visibility is per family in a merged guide: a family with any shown source is merged shown
+    visible_keys = {key for obj in objects if obj not in hidden_objects for key in _merge_source_keys(obj)}
+    hidden_objects = {obj for obj in hidden_objects if visible_keys.isdisjoint(_merge_source_keys(obj))}
+    family_order = {}
+    for obj in objects:
+        family_order.setdefault(_merge_range_key(obj), len(family_order))
+    objects.sort(key=lambda obj: family_order[_merge_range_key(obj)]) # Stable: the first object stays the target
+    target = objects[0]
+    target_name = target.name
+    merged_data = target.data.copy() # Curve settings (dimensions, bevel, ...) of the target
+    merged_data.splines.clear()
+    merged_data.materials.clear()
+    for prop in (CLIP_SOURCE_PROP, CLIP_KEY_PROP, SPLINE_RANGES_PROP): # Rebuilt from the merged splines
+        if prop in merged_data:
+            del merged_data[prop]
+    out_splines = merged_data.splines
+    to_target = target.matrix_world.inverted_safe()
+    materials, spline_attrs = [], {attr: [] for attr, _ in MERGE_SPLINE_ATTRS}
+    runs, hidden, hidden_slots = [], {}, {}
+    n_points = 0
+    for obj in objects:
+        curve_data = obj.data
+        slot_map = []
+        for mat in curve_data.materials:
+            if mat not in materials:
+                materials.append(mat)
+            slot_map.append(materials.index(mat))
+        matrix = matrix_to_numpy(to_target @ obj.matrix_world)
+        index = curve_data.get(SPLINE_RANGES_PROP)
+        if index is not None: # Hidden families of merged guides move along, into the target's space
+            source_slots = spline_range_slots(curve_data)
+            for key, packed in index['hidden'].items():
+                hidden.setdefault(key, []).extend(_pack_line_parts(_unpack_line_parts(packed), matrix))
+                if slot_map:
+                    hidden_slots.setdefault(key, slot_map[min(source_slots.get(key, 0), len(slot_map) - 1)])
+        if obj in hidden_objects: # Stays hidden: each of its families (or its own lines) joins the index
+            if spline_ranges_valid(curve_data):
+                source_slots = spline_range_slots(curve_data)
+                keyed_parts = [(key, read_spline_range(curve_data, key), source_slots.get(key, 0))
+                               for key in dict.fromkeys(key for key, _ in get_spline_ranges(curve_data))]
+            else:
+                coords, counts, _, cyclic = read_splines_bulk(curve_data, ('POLY',))
+                bezier = read_bezier_splines_bulk(curve_data)
+                keyed_parts = [(_merge_range_key(obj), [(coords, counts, cyclic, 'POLY', None),
+                                                        (bezier[0], bezier[3], bezier[4], 'BEZIER', bezier[1:3])], 0)]
+            for key, parts, slot in keyed_parts:
+                hidden.setdefault(key, []).extend(_pack_line_parts(parts, matrix))
+                if slot_map:
+                    hidden_slots.setdefault(key, slot_map[min(slot, len(slot_map) - 1)])
+            continue
+        splines = curve_data.splines
+        counts = np.zeros(len(splines), dtype=np.int32)
+        if len(splines):
+            splines.foreach_get("point_count_u", counts)
+        has_points = counts > 0
+        if not has_points.any():
+            continue
+        obj_runs = get_spline_ranges(curve_data) if spline_ranges_valid(curve_data) else []
+        if obj_runs: # Runs of a merged guide, without its empty splines
+            run_counts = np.array([count for _, count in obj_runs], dtype=np.int64)
+            kept = np.add.reduceat(has_points.astype(np.int64), np.cumsum(run_counts) - run_counts)
+            runs.extend((key, int(count)) for (key, _), count in zip(obj_runs, kept))
+        else:
+            runs.append((_merge_range_key(obj), int(has_points.sum())))
+        for attr, dtype in MERGE_SPLINE_ATTRS:
+            buf = np.empty(len(splines), dtype=dtype)
+            splines.foreach_get(attr, buf)
+            spline_attrs[attr].append(buf[has_points])
+        if slot_map:
+            indices = spline_attrs["material_index"][-1]
+            spline_attrs["material_index"][-1] = np.asarray(slot_map, dtype=np.int32)[np.clip(indices, 0, len(slot_map) - 1)]
+        for spline, count in zip(splines, counts):
+            if not count:
+                continue
+            new_spline = out_splines.new(type=spline.type)
+            src_points, dst_points = (spline.bezier_points, new_spline.bezier_points) if spline.type == 'BEZIER' \
+                                     else (spline.points, new_spline.points)
+            dst_points.add(int(count) - 1)
+            for attr, size in MERGE_POINT_ATTRS[spline.type]:
+                buf = np.empty(count * size, dtype=np.float32)
+                src_points.foreach_get(attr, buf)
+                if attr in MERGE_TRANSFORMED_ATTRS:
+                    pts = buf.reshape(-1, size)
+                    pts[:, :3] = transform_coords(matrix, pts[:, :3])
+                dst_points.foreach_set(attr, buf)
+        n_points += int(counts.sum())
+    for mat in materials:
+        merged_data.materials.append(mat)
+    if len(out_splines):
+        for attr, _ in MERGE_SPLINE_ATTRS:
+            out_splines.foreach_set(attr, np.concatenate(spline_attrs[attr]))
+    count_points_written(n_points)
+    # Each family keeps the material of its first spline (a family's splines share one material)
+    material_index = np.concatenate(spline_attrs["material_index"]) if len(out_splines) else np.zeros(0, dtype=np.int32)
+    run_starts = np.cumsum([count for _, count in runs]) - [count for _, count in runs]
+    slots = dict(hidden_slots)
+    for (key, _), run_start in zip(reversed(runs), reversed(run_starts)):
+        slots[key] = int(material_index[run_start])
+    set_spline_ranges(merged_data, runs, slots)
+    merged_data[SPLINE_RANGES_PROP]['hidden'] = hidden
+
+    merged_obj = target.copy() # Object settings and transform of the target
+    merged_obj.data = merged_data
+    if target in hidden_objects: # Its lines are hidden in the index, the merged guide itself is shown
+        merged_obj.hide_viewport = False
+    for collection in _merged_guide_collections(target, {key for key, _ in runs} | set(hidden)):
+        collection.objects.link(merged_obj)
+    batch_remove_objects(objects)
+    merged_obj.name = name or target_name # Unique: Blender appends .001 etc. to names in use
+    merged_data.name = f"{merged_obj.name}_Data"
+    tag_owned_object(merged_obj, 'MERGED_GUIDE')
+    merge_log.info("Merged %d curve(s), %d spline(s) into '%s'.", len(objects), len(out_splines), merged_obj.name)
+    return merged_obj
+
+def is_guide_hidden(obj, view_layer):
+    """True if a guide is hidden in view_layer: hidden itself or in an excluded / hidden collection."""
+    return obj.hide_viewport or not obj.visible_get(view_layer=view_layer)
+
+def _merged_guide_collections(target, range_keys):
+    """Collections a merged guide is linked to: the target's. A guide holding several range keys moves up
+    from mode / family collections to the guides collection, so hiding one family keeps the others shown."""
+    guides_coll = bpy.data.collections.get(PERSPECTIVE_GUIDES_COLLECTION)
+    collections = []
+    for collection in target.users_collection:
+        if len(range_keys) > 1 and guides_coll is not None and GUIDE_COLLECTION_PROP in collection:
+            collection = guides_coll
+        if collection not in collections:
+            collections.append(collection)
+    return collections
+
+def _merge_source_keys(obj):
+    """Range keys of the splines an object brings into a merge: its runs, or its _merge_range_key."""
+    if spline_ranges_valid(obj.data):
+        runs = get_spline_ranges(obj.data)
+        if runs:
+            return [key for key, _ in runs]
+    return [_merge_range_key(obj)]
+
+def _merge_range_key(obj):
+    """Range key an object's splines are merged under: its first family for merged guides, its guide
+    family, or its name for other curves."""
+    runs = get_spline_ranges(obj.data)
+    return runs[0][0] if runs else (guide_family_of(obj.name) or obj.name)
+
+# --- Spline ranges ---
+# A merged guide keeps the family identity of its splines: SPLINE_RANGES_PROP on its curve data lists
+# (range key, spline count) runs in spline order. Range keys are GUIDE_FAMILY_DEFS keys, or the source
+# object's name for other curves; a key owns one run unless merged guides were merged again. Every key has
+# one material slot ('slots'). Curves have no per-spline visibility, so a hidden family's lines are moved
+# into the index ('hidden') until it is shown again. Hiding, recolouring, regenerating or re-clipping one
+# family of a merged guide rewrites only the splines of its key.
+SPLINE_RANGES_PROP = "rogue_spline_ranges" # Curve data: {'keys', 'counts', 'slots': {key: slot}, 'hidden': {key: lines}}
+
+def guide_family_of(name):
+    """GUIDE_FAMILY_DEFS key of a guide object name ('2P_Guides_VP1_All' -> '2P_VP1'), or None.
+    Legacy names (LEGACY_GUIDE_FAMILY_NAMES) map to their family."""
+    legacy_key = LEGACY_GUIDE_FAMILY_NAMES.get(name.split(".")[0])
+    if legacy_key:
+        return legacy_key
+    matches = [key for key, (prefix, _) in GUIDE_FAMILY_DEFS.items() if name.startswith(prefix)]
+    return max(matches, key=lambda key: len(GUIDE_FAMILY_DEFS[key][0])) if matches else None
+
+def guide_families_with_prefix(group_prefix):
+    """Family keys whose object prefix starts with a guide group prefix (e.g. 'FE_Guides_Lon', 'FE_Guides')."""
+    return [key for key, (prefix, _) in GUIDE_FAMILY_DEFS.items() if prefix.startswith(group_prefix)]
+
+def has_spline_ranges(curve_data):
+    return curve_data is not None and SPLINE_RANGES_PROP in curve_data
+
+def get_spline_ranges(curve_data):
+    """[(key, spline count)] runs of a merged guide in spline order (empty for other curves)."""
+    index = curve_data.get(SPLINE_RANGES_PROP)
+    if index is None:
+        return []
+    return [(key, int(count)) for key, count in zip(index['keys'], index['counts'])]
+
+def spline_ranges_valid(curve_data):
+    """False when the splines no longer match the runs, e.g. after splines were deleted in edit mode."""
+    return sum(count for _, count in get_spline_ranges(curve_data)) == len(curve_data.splines)
+
+def set_spline_ranges(curve_data, runs, slots=None):
+    """Stores the (key, spline count) runs, joining neighbouring runs of one key and dropping empty ones.
+    slots: {key: material slot} to set; other keys keep theirs."""
+    keys, counts = [], []
+    for key, count in runs:
+        if count <= 0:
+            continue
+        if keys and keys[-1] == key:
+            counts[-1] += int(count)
+        else:
+            keys.append(key)
+            counts.append(int(count))
+    if SPLINE_RANGES_PROP not in curve_data:
+        curve_data[SPLINE_RANGES_PROP] = {'keys': [], 'counts': [], 'slots': {}, 'hidden': {}}
+    index = curve_data[SPLINE_RANGES_PROP]
+    index['keys'], index['counts'] = keys, counts
+    for key, slot in (slots or {}).items():
+        index['slots'][key] = int(slot)
+
+def spline_range_slots(curve_data):
+    index = curve_data.get(SPLINE_RANGES_PROP)
+    return {} if index is None else {key: int(slot) for key, slot in index['slots'].items()}
+
+def spline_range_keys(curve_data):
+    """Every key a merged guide holds: shown, clipped away or hidden."""
+    keys = [key for key, _ in get_spline_ranges(curve_data)]
+    if CLIP_SOURCE_PROP in curve_data:
+        keys += list(curve_data[CLIP_SOURCE_PROP].get('range_keys', ()))
+    index = curve_data.get(SPLINE_RANGES_PROP)
+    if index is not None:
+        keys += list(index['hidden'].keys())
+    return list(dict.fromkeys(keys))
+
+def is_spline_range_hidden(curve_data, key):
+    index = curve_data.get(SPLINE_RANGES_PROP)
+    return index is not None and key in index['hidden']
+
+def spline_range_indices(curve_data, key):
+    """Spline indices of key's runs."""
+    runs = get_spline_ranges(curve_data)
+    counts = np.array([count for _, count in runs], dtype=np.int64)
+    owned = np.array([run_key == key for run_key, _ in runs], dtype=bool)
+    if not owned.any():
+        return np.zeros(0, dtype=np.int64)
+    return _ragged_ranges((np.cumsum(counts) - counts)[owned], counts[owned])[1]
+
+def get_guide_range_objects(collection, family_keys):
+    """Merged guides in collection (or its child collections) that hold any of family_keys (see spline_range_keys)."""
+    family_keys = set(family_keys)
+    tree = guide_collection_tree(collection)
+    range_objs = []
+    for obj in owned_objects('MERGED_GUIDE'):
+        if obj.type != 'CURVE' or tree.isdisjoint(obj.users_collection) or not has_spline_ranges(obj.data) \
+           or not family_keys.intersection(spline_range_keys(obj.data)):
+            continue
+        if not spline_ranges_valid(obj.data):
+            guide_log.warning("Spline ranges of '%s' no longer match its splines; skipped.", obj.name)
+            continue
+        range_objs.append(obj)
+    return range_objs
+
+def _coords_to_idprop(coords):
+    """Packed (K, 3) coordinates as ID property data: their float32 bytes, stored without a per-float Python object."""
+    return np.ascontiguousarray(coords, dtype=np.float32).tobytes()
+
+def _coords_from_idprop(data):
+    """Inverse of _coords_to_idprop, as a read-only (K, 3) float32 view; also reads the float lists of older files."""
+    if isinstance(data, bytes):
+        return np.frombuffer(data, dtype=np.float32).reshape(-1, 3)
+    return np.asarray(data, dtype=np.float32).reshape(-1, 3)
+
+def _pack_line_parts(parts, matrix=None):
+    """Line parts (as for replace_splines) as ID property data; matrix moves them first."""
+    packed = []
+    for coords, counts, cyclic, spline_type, handles in parts:
+        if not len(counts):
+            continue
+        arrays = {'co': coords} if handles is None else {'co': coords, 'handle_left': handles[0], 'handle_right': handles[1]}
+        entry = {'type': spline_type, 'counts': [int(c) for c in counts],
+                 'cyclic': [int(c) for c in _cyclic_flags(cyclic, len(counts))]}
+        for attr, values in arrays.items():
+            values = np.asarray(values, dtype=np.float32).reshape(-1, 3)
+            entry[attr] = _coords_to_idprop(values if matrix is None else transform_coords(matrix, values))
+        packed.append(entry)
+    return packed
+
+def _unpack_line_parts(packed):
+    parts = []
+    for entry in packed:
+        arrays = [_coords_from_idprop(entry[attr]) for attr in ('co', 'handle_left', 'handle_right') if attr in entry]
+        parts.append((arrays[0], np.asarray(entry['counts'], dtype=np.int64), np.asarray(entry['cyclic'], dtype=bool),
+                      entry['type'], tuple(arrays[1:]) if len(arrays) == 3 else None))
+    return parts
+
+def read_spline_range(curve_data, key):
+    """key's splines as line parts: its POLY lines, then its BEZIER splines with their handles."""
+    indices = spline_range_indices(curve_data, key)
+    coords, counts, _, cyclic = read_splines_bulk(curve_data, ('POLY',), indices)
+    co, handle_left, handle_right, bezier_counts, bezier_cyclic = read_bezier_splines_bulk(curve_data, indices)
+    return [(coords, counts, cyclic, 'POLY', None), (co, bezier_counts, bezier_cyclic, 'BEZIER', (handle_left, handle_right))]
+
+def apply_spline_range_materials(curve_data):
+    """Gives every spline its run's material slot."""
+    runs = get_spline_ranges(curve_data)
+    slots = spline_range_slots(curve_data)
+    material_index = np.repeat(np.array([slots.get(key, 0) for key, _ in runs], dtype=np.int32),
+                               np.array([count for _, count in runs], dtype=np.int64))
+    if len(material_index) and len(material_index) == len(curve_data.splines):
+        curve_data.splines.foreach_set("material_index", material_index)
+
+def write_spline_range(curve_data, key, parts):
+    """Makes key's splines hold parts (line parts as for replace_splines); the other splines are kept.
+    A single run with the same spline types and point counts is rewritten in place, otherwise key's
+    splines are removed and the new ones appended as its run at the end. Returns the number of splines."""
+    parts = [part for part in parts if len(part[1])]
+    splines = curve_data.splines
+    indices = spline_range_indices(curve_data, key)
+    new_counts = np.concatenate([np.asarray(part[1], dtype=np.int64) for part in parts]) if parts else np.zeros(0, dtype=np.int64)
+    if len(indices) and len(indices) == len(new_counts) and indices[-1] - indices[0] + 1 == len(indices):
+        all_counts = np.zeros(len(splines), dtype=np.int32)
+        splines.foreach_get("point_count_u", all_counts)
+        new_types = [part[3] for part in parts for _ in range(len(part[1]))]
+        if np.array_equal(all_counts[indices], new_counts) and \
+           all(splines[int(idx)].type == spline_type for idx, spline_type in zip(indices, new_types)):
+            all_cyclic = np.zeros(len(splines), dtype=bool)
+            splines.foreach_get("use_cyclic_u", all_cyclic)
+            start = int(indices[0])
+            for coords, counts, cyclic, spline_type, handles in parts:
+                cyclic = _cyclic_flags(cyclic, len(counts)) & (np.asarray(counts) > 1)
+                update_splines_bulk(curve_data, coords, counts, range(start, start + len(counts)), spline_type, cyclic, handles)
+                all_cyclic[start:start + len(counts)] = cyclic
+                start += len(counts)
+            splines.foreach_set("use_cyclic_u", all_cyclic)
+            return len(new_counts)
+    for idx in indices[::-1]:
+        splines.remove(splines[int(idx)])
+    for coords, counts, cyclic, spline_type, handles in parts:
+        write_splines_bulk(curve_data, coords, counts, spline_type, cyclic, handles)
+    set_spline_ranges(curve_data, [run for run in get_spline_ranges(curve_data) if run[0] != key] + [(key, len(new_counts))])
+    apply_spline_range_materials(curve_data)
+    return len(new_counts)
+
+def write_guide_range(obj, key, parts, region=None):
+    """Makes key's run of a merged guide show parts (local-space line parts). Clip layer guides take them as
+    the run's source lines and show them clipped against region, or unclipped without one."""
+    if is_clip_layer_guide(obj):
+        set_clip_source_range(obj.data, key, parts)
+        if region is not None:
+            return clip_spline_range(obj, key, region)
+    return write_spline_range(obj.data, key, parts)
+
+def update_guide_range(context, obj, key, parts):
+    """Regenerates key's run of a merged guide from world-space line parts. A hidden run stays hidden
+    and gets the new lines when shown. Returns the number of splines shown."""
+    to_local = matrix_to_numpy(obj.matrix_world.inverted_safe())
+    parts = [(transform_coords(to_local, np.asarray(coords, dtype=np.float32).reshape(-1, 3)), counts, cyclic, spline_type,
+              None if handles is None else tuple(transform_coords(to_local, h) for h in handles))
+             for coords, counts, cyclic, spline_type, handles in parts]
+    curve_data = obj.data
+    if is_spline_range_hidden(curve_data, key):
+        curve_data[SPLINE_RANGES_PROP]['hidden'][key] = _pack_line_parts(parts)
+        return 0
+    region = get_clip_region(context.scene)
+    written = write_guide_range(obj, key, parts, region)
+    if region is not None and not is_clip_layer_guide(obj):
+        clip_guide_object(obj, region) # Joins the clip layer
+    curve_data.update_tag()
+    return written
+
+def set_spline_range_hidden(obj, key, hidden, region=None):
+    """Hides key's run of a merged guide (its lines move into the index) or shows it again; clip layer
+    guides stash the run's source lines and re-clip it against region when shown.
+    Returns True if the run's visibility changed."""
+    curve_data = obj.data
+    if key not in spline_range_keys(curve_data) or is_spline_range_hidden(curve_data, key) == hidden:
+        return False
+    index = curve_data[SPLINE_RANGES_PROP]
+    if hidden:
+        clipped = is_clip_layer_guide(obj)
+        parts = get_clip_source_range(curve_data, key) if clipped else read_spline_range(curve_data, key)
+        index['hidden'][key] = _pack_line_parts(parts)
+        if clipped:
+            set_clip_source_range(curve_data, key, [])
+        write_spline_range(curve_data, key, [])
+    else:
+        parts = _unpack_line_parts(index['hidden'][key])
+        del index['hidden'][key]
+        write_guide_range(obj, key, parts, region)
+    curve_data.update_tag()
+    return True
+
+def set_spline_range_material(obj, key, material):
+    """Gives key's run of a merged guide (shown or hidden) the material, in a slot shared with other runs."""
+    curve_data = obj.data
+    materials = curve_data.materials
+    slot = next((i for i, mat in enumerate(materials) if mat == material), None)
+    if slot is None:
+        materials.append(material)
+        slot = len(materials) - 1
+    set_spline_ranges(curve_data, get_spline_ranges(curve_data), {key: slot})
+    apply_spline_range_materials(curve_data)
+    curve_data.update_tag()
+
+def remove_guide_range(obj, key):
+    """Drops key from a merged guide: its splines, clip source lines and hidden lines.
+    Returns True if the guide held key."""
+    curve_data = obj.data
+    if key not in spline_range_keys(curve_data):
+        return False
+    index = curve_data[SPLINE_RANGES_PROP]
+    if key in index['hidden']:
+        del index['hidden'][key]
+    if is_clip_layer_guide(obj):
+        set_clip_source_range(curve_data, key, [])
+    write_spline_range(curve_data, key, [])
+    curve_data.update_tag()
+    return True
+
 def clear_guides_with_prefix(context, prefix_list):
+    doomed, cleared_count = collect_guide_clear_targets(context, prefix_list)
+    return batch_remove_objects(doomed) + cleared_count
+
+def collect_guide_clear_targets(context, prefix_list):
+    """(guide objects to remove, number of runs dropped from merged guides) for clear_guides_with_prefix;
+    callers clearing more than guides remove the objects in the same batch."""
     guides_coll = get_guides_collection(context) # Ensures collection exists
-    removed_count = 0
-    for obj in list(guides_coll.objects): # Iterate over a copy for safe removal
-        for prefix in prefix_list:
-            if obj.name.startswith(prefix):
-                try:
-                    if obj.data and obj.data.name in bpy.data.curves and obj.data.users <= 1:
-                        bpy.data.curves.remove(obj.data)
-                except ReferenceError: pass
-                except Exception as e: print(f"Error removing curve data for {obj.name}: {e}")
-                try:
-                    bpy.data.objects.remove(obj, do_unlink=True)
-                    removed_count += 1
-                except ReferenceError: pass
-                except Exception as e: print(f"Error removing object {obj.name}: {e}")
-                break 
-    return removed_count
-
-def generate_radial_lines_in_plane(vp_loc, density, line_extension, plane='XZ'):
-    lines = []
-    if density <= 0: return lines
-    for i in range(density):
-        angle = 2 * math.pi * i / density
-        if plane == 'XY': dir_vec = Vector((math.cos(angle), math.sin(angle), 0))
-        elif plane == 'XZ': dir_vec = Vector((math.cos(angle), 0, math.sin(angle)))
-        elif plane == 'YZ': dir_vec = Vector((0, math.cos(angle), math.sin(angle)))
-        else: dir_vec = Vector((math.cos(angle), math.sin(angle), 0)) # Fallback
-        dir_vec.normalize()
-        lines.append([vp_loc.copy(), vp_loc + dir_vec * line_extension])
-    return lines
+    prefixes = tuple(prefix_list)
+    # Only the families' registered objects are visited. Merged guides lose only the runs of the matching
+    # families (and are removed once they hold no family anymore).
+    families = {key for prefix in prefixes for key in guide_families_with_prefix(prefix)}
+    guides_tree = guide_collection_tree(guides_coll)
+    doomed = [obj for obj in owned_objects('GUIDE', families) if not guides_tree.isdisjoint(obj.users_collection)]
+    cleared_count = 0
+    for obj in get_guide_range_objects(guides_coll, families):
+        cleared_count += sum(remove_guide_range(obj, key) for key in families)
+        if not spline_range_keys(obj.data):
+            doomed.append(obj)
+    return doomed, cleared_count
+
+def guide_group_objects(collection, group_prefix):
+    """Unmerged guide objects in collection (or its child collections) of a guide group: the families whose
+    prefix starts with group_prefix (see guide_families_with_prefix), or the grid planes for GRID_OBJECT_PREFIX."""
+    objs = owned_objects('GUIDE', guide_families_with_prefix(group_prefix))
+    if GRID_OBJECT_PREFIX.startswith(group_prefix):
+        objs += owned_objects('GRID')
+    tree = guide_collection_tree(collection)
+    return [obj for obj in objs if not tree.isdisjoint(obj.users_collection)]
+
+def clear_guide_family(context, family_key):
+    """Removes every object of one guide family (see GUIDE_FAMILY_DEFS) and its runs in merged guides."""
+    return clear_guides_with_prefix(context, [GUIDE_FAMILY_DEFS[family_key][0]])
+
+def get_guide_family_objects(family_key, collection):
+    """{name: object} of the family's objects in collection (or its child collections): '<prefix>All' and
+    '<prefix><N>', plus legacy names (LEGACY_GUIDE_FAMILY_NAMES). Merged guides are never family objects,
+    whatever their name (see get_guide_range_objects)."""
+    prefix = GUIDE_FAMILY_DEFS[family_key][0]
+    tree = guide_collection_tree(collection)
+    family_objs = {}
+    for obj in owned_objects('GUIDE', (family_key,)):
+        if tree.isdisjoint(obj.users_collection) or has_spline_ranges(obj.data):
+            continue
+        if LEGACY_GUIDE_FAMILY_NAMES.get(obj.name.split(".")[0]) == family_key: # Never a target name: removed on emit
+            family_objs[obj.name] = obj
+        elif obj.name.startswith(prefix):
+            suffix = obj.name[len(prefix):]
+            if suffix == GUIDE_FAMILY_OBJECT_SUFFIX or suffix.isdigit():
+                family_objs[obj.name] = obj
+    return family_objs
+
+def _sync_guide_object(context, name, obj, coords, counts, collection, bevel_depth, opacity, is_cyclic, curve_type):
+    """Updates an existing guide object's curve in place, or creates it if there is none.
+    While the clip layer is on, guides get the lines as their clip source and show them clipped."""
+    region = get_clip_region(context.scene) if curve_type in CLIP_LAYER_SPLINE_TYPES else None
+    if obj is not None and obj.type == 'CURVE' and obj.data:
+        if region is not None or CLIP_SOURCE_PROP in obj.data:
+            set_clip_source_lines(obj.data, coords, counts, is_cyclic, curve_type)
+            if region is None: # Layer currently without a region: show the new lines unclipped
+                sync_curve_splines(obj.data, coords, counts, curve_type, is_cyclic)
+        else:
+            sync_curve_splines(obj.data, coords, counts, curve_type, is_cyclic)
+        if abs(obj.data.bevel_depth - bevel_depth) > 1e-7:
+            obj.data.bevel_depth = bevel_depth
+    else:
+        obj = create_curve_object(context, name, unpack_lines(coords, counts), collection,
+                                  bevel_depth, opacity, is_cyclic=is_cyclic, curve_type=curve_type)
+        if obj is None:
+            return None
+    if region is not None:
+        clip_guide_object(obj, region)
+    obj.data.update_tag()
+    return obj
+
+def emit_guide_family(context, family_key, lines, collection, bevel_depth=0.01, opacity=1.0,
+                      is_cyclic=False, curve_type='POLY', to_curves=None):
+    """
+    Emits the lines of one guide family (see GUIDE_FAMILY_DEFS).
+    With 'consolidate_guide_families' enabled the whole family becomes a single curve object
+    with one spline per line (e.g. '2P_Guides_VP1_All'), so the object, curve and material
+    count scales with the number of families instead of the number of lines.
+    Otherwise one object is created per line ('2P_Guides_VP1_1', '2P_Guides_VP1_2', ...).
+    The family's existing objects are updated in place: points are moved when the topology is
+    unchanged and only surplus splines / objects are added or removed, so object identity,
+    materials (user colour edits) and selection survive regeneration.
+    The family's objects are kept in its own child collection (see get_guide_family_collection).
+    Once the family was merged into other guides, only its run of the merged guide is rewritten.
+    With the overlay display backend no datablocks are written unless to_curves is True (baking);
+    the overlay is redrawn from its own buffers instead.
+    Returns the number of lines emitted.
+    """
+    prefix = GUIDE_FAMILY_DEFS[family_key][0]
+    ts = context.scene.perspective_tool_settings_splines
+    coords, counts = pack_lines(lines)
+    if to_curves is None:
+        to_curves = ts.guide_display_backend != 'OVERLAY'
+    if not to_curves:
+        invalidate_guide_overlay()
+        return len(counts)
+    existing_objs = get_guide_family_objects(family_key, collection)
+    range_objs = get_guide_range_objects(collection, (family_key,))
+    if range_objs: # The family lives in a merged guide: rewrite its run there
+        batch_remove_objects(list(existing_objs.values()))
+        for obj in range_objs[1:]:
+            remove_guide_range(obj, family_key)
+        update_guide_range(context, range_objs[0], family_key, [(coords, counts, is_cyclic, curve_type, None)])
+        return len(counts)
+
+    if ts.consolidate_guide_families:
+        target_names = [prefix + GUIDE_FAMILY_OBJECT_SUFFIX] if len(counts) else []
+    else:
+        target_names = [f"{prefix}{i+1}" for i in range(len(counts))]
+    # Objects of the family that are no longer needed (fewer lines, or the other emit mode)
+    target_name_set = set(target_names)
+    batch_remove_objects([obj for name, obj in existing_objs.items() if name not in target_name_set])
+    if not len(counts):
+        return 0
+    # The family's objects live in its own child collection (older files keep them in the guides collection)
+    family_coll = get_guide_family_collection(context, family_key)
+    guides_tree = guide_collection_tree(collection)
+    for name in target_names:
+        if name in existing_objs:
+            move_to_guide_collection(existing_objs[name], family_coll, guides_tree)
+
+    generation = next_owner_generation()
+    rig = GUIDE_FAMILY_DEFS[family_key][1]
+    if ts.consolidate_guide_families:
+        family_obj = _sync_guide_object(context, target_names[0], existing_objs.get(target_names[0]), coords, counts,
+                                        family_coll, bevel_depth, opacity, is_cyclic, curve_type)
+        if family_obj is None:
+            return 0
+        tag_owned_object(family_obj, 'GUIDE', family_key, rig, generation)
+        return len(counts)
+
+    created_count = 0
+    offsets = np.concatenate(([0], np.cumsum(counts)))
+    for i, name in enumerate(target_names):
+        line_obj = _sync_guide_object(context, name, existing_objs.get(name), coords[offsets[i]:offsets[i + 1]], counts[i:i + 1],
+                                      family_coll, bevel_depth, opacity, is_cyclic, curve_type)
+        if line_obj:
+            tag_owned_object(line_obj, 'GUIDE', family_key, rig, generation)
+            created_count += 1
+    return created_count
 
 # -----------------------------------------------------------
-# Dynamic Horizon Line Update
+# Guide Family Builders
 # -----------------------------------------------------------
-def update_dynamic_horizon_line_curve(context):
-    if not hasattr(context.scene, "perspective_tool_settings_splines"):
+# Every family is computed by the geometry core kernels as one contiguous float64 array of shape
+# (N lines, M points, 3). Families that can be cut (fish-eye 'Front Only') also return a boolean
+# (N, M) keep-mask.
+
+# --- Per-family builders: (tool settings, anchor points) -> (lines array, keep mask or None) ---
+# Anchors are the family's VP / centre locations (2P verticals take both 2P VPs).
+
+def _build_1p_family(ts, anchors):
+    vp_loc = _as_point(anchors[0])
+    ext = ts.one_point_line_extension
+    half_extent = ts.one_point_grid_extent * ext * 0.5
+    spacing = ts.one_point_grid_extent * ext * 0.2
+    parts = []
+    if ts.one_point_draw_radial:
+        parts.append(radial_lines_array(vp_loc, ts.one_point_grid_density_radial, ext, 'XZ'))
+    if ts.one_point_draw_ortho_x: # Horizontal parallels, stacked along Z
+        offsets = _centered_offsets(ts.one_point_grid_density_ortho_x) * (spacing / 2.0)
+        parts.append(parallel_lines_array(vp_loc, (0, 0, 1), offsets, (1, 0, 0), half_extent))
+    if ts.one_point_draw_ortho_y: # Vertical parallels, stacked along X
+        offsets = _centered_offsets(ts.one_point_grid_density_ortho_y) * (spacing / 2.0)
+        parts.append(parallel_lines_array(vp_loc, (1, 0, 0), offsets, (0, 0, 1), half_extent))
+    return (np.concatenate(parts) if parts else _empty_lines()), None
+
+def _build_2p_vertical_family(ts, anchors):
+    vp1_loc, vp2_loc = _as_point(anchors[0]), _as_point(anchors[1])
+    num_verts = ts.two_point_grid_density_vertical
+    x_space = ts.two_point_verticals_x_spacing_factor
+    vp_x_dist = abs(vp1_loc[0] - vp2_loc[0])
+    # Use the line extension if the VPs are too close
+    spread_width = vp_x_dist * x_space if vp_x_dist > 0.1 else ts.two_point_line_extension * 0.5 * x_space
+    base = np.array(((vp1_loc[0] + vp2_loc[0]) / 2.0,
+                     (vp1_loc[1] + vp2_loc[1]) / 2.0 + ts.two_point_grid_depth_offset,
+                     vp1_loc[2])) # Horizon Z
+    offsets = _centered_offsets(num_verts) * (spread_width / 2.0)
+    return parallel_lines_array(base, (1, 0, 0), offsets, (0, 0, 1), ts.two_point_grid_height / 2.0), None
+
+def _fish_eye_rotation():
+    # Main sphere uses a fixed default rotation.
+    return euler_xyz_matrix(math.radians(90.0), math.radians(90.0), 0.0)
+
+def _build_fe_lon_family(ts, anchors):
+    if ts.fish_eye_grid_radial <= 0 or ts.fish_eye_segments_per_curve <= 1: return _empty_lines(), None
+    lines, front = fish_eye_meridians_array(anchors[0], ts.fish_eye_grid_radius, ts.fish_eye_grid_radial,
+                                            ts.fish_eye_segments_per_curve, ts.fish_eye_horizontal_scale,
+                                            _fish_eye_rotation())
+    return lines, (front if getattr(ts, "fish_eye_front_only", True) else None)
+
+def _build_fe_lat_family(ts, anchors):
+    n_lat, segs = ts.fish_eye_grid_concentric, ts.fish_eye_segments_per_curve
+    if not ts.fish_eye_draw_latitude or n_lat <= 0 or segs <= 1: return _empty_lines(), None
+    thetas = math.pi * np.arange(1, n_lat + 1, dtype=np.float64) / (n_lat + 1)
+    lines, front = fish_eye_rings_array(anchors[0], ts.fish_eye_grid_radius, thetas, segs,
+                                        ts.fish_eye_horizontal_scale, _fish_eye_rotation())
+    return lines, (front if getattr(ts, "fish_eye_front_only", True) else None)
+
+def _build_fe_boundary_family(ts, anchors):
+    if not getattr(ts, "fish_eye_draw_1p", True): return _empty_lines(), None
+    lines, front = fish_eye_rings_array(anchors[0], ts.fish_eye_grid_radius, (math.pi / 2,),
+                                        ts.fish_eye_segments_per_curve, ts.fish_eye_horizontal_scale,
+                                        _fish_eye_rotation())
+    return lines, (front if getattr(ts, "fish_eye_front_only", True) else None)
+
+def _build_fe_radial_family(ts, anchors):
+    density = getattr(ts, "one_point_grid_density_radial", 16)
+    if not getattr(ts, "fish_eye_draw_1p", True) or density <= 0: return _empty_lines(), None
+    length = ts.fish_eye_grid_radius * getattr(ts, "one_point_line_length_factor", 1.0)
+    # User-controlled orientation for the 1P grid.
+    rot_matrix = euler_xyz_matrix(math.radians(getattr(ts, "one_point_orientation_x", 90.0)),
+                                  math.radians(getattr(ts, "one_point_orientation_y", 90.0)),
+                                  math.radians(getattr(ts, "one_point_orientation_z", 0.0)))
+    cos_t, sin_t = _angle_table(density, density, 2.0 * math.pi)
+    ends = np.stack((length * cos_t * ts.fish_eye_horizontal_scale, length * sin_t, np.zeros(density)), axis=1)
+    lines = np.zeros((density, 2, 3), dtype=np.float64)
+    lines[:, 1, :] = ends @ rot_matrix.T
+    return lines + _as_point(anchors[0]), None
+
+GUIDE_FAMILY_BUILDERS = {
+    '1P':          _build_1p_family,
+    '2P_VP1':      lambda ts, anchors: (radial_lines_array(anchors[0], ts.two_point_grid_density_vp1, ts.two_point_line_extension), None),
+    '2P_VP2':      lambda ts, anchors: (radial_lines_array(anchors[0], ts.two_point_grid_density_vp2, ts.two_point_line_extension), None),
+    '2P_VERTICAL': _build_2p_vertical_family,
+    '3P_H1':       lambda ts, anchors: (radial_lines_array(anchors[0], ts.three_point_vp_h1_density, ts.three_point_line_extension), None),
+    '3P_H2':       lambda ts, anchors: (radial_lines_array(anchors[0], ts.three_point_vp_h2_density, ts.three_point_line_extension), None),
+    '3P_V':        lambda ts, anchors: (radial_lines_array(anchors[0], ts.three_point_vp_v_density, ts.three_point_line_extension), None),
+    'FE_LON':      _build_fe_lon_family,
+    'FE_LAT':      _build_fe_lat_family,
+    'FE_BOUNDARY': _build_fe_boundary_family,
+    'FE_RADIAL':   _build_fe_radial_family,
+}
+
+def build_guide_family_lines(family_key, ts, anchors):
+    """Geometry of one family (see GUIDE_FAMILY_DEFS) as (lines array (N, M, 3), keep mask or None)."""
+    return GUIDE_FAMILY_BUILDERS[family_key](ts, anchors)
+
+def build_all_guide_families(ts, anchors_by_family):
+    """Computes every family in anchors_by_family ({family_key: anchor points}) in one call."""
+    return {family_key: build_guide_family_lines(family_key, ts, anchors)
+            for family_key, anchors in anchors_by_family.items()}
+
+# -----------------------------------------------------------
+# Live Guide Follow
+# -----------------------------------------------------------
+# While 'live_follow_guides' is on, a moved VP marks the families anchored to it dirty and a
+# bpy.app.timers tick regenerates all pending families in place, once per tick, however many
+# depsgraph updates arrived in between.
+
+# Structure: FAMILY_KEY: (anchor VP roles, see VP_ROLE_DEFS)
+GUIDE_FAMILY_ANCHOR_ROLES = {
+    '1P': ('1P',), '2P_VP1': ('2P_1',), '2P_VP2': ('2P_2',), '2P_VERTICAL': ('2P_1', '2P_2'),
+    '3P_H1': ('3P_H1',), '3P_H2': ('3P_H2',), '3P_V': ('3P_V',),
+    'FE_LON': ('FE',), 'FE_LAT': ('FE',), 'FE_BOUNDARY': ('FE',), 'FE_RADIAL': ('FE',),
+}
+VP_GUIDE_FAMILIES = {} # VP object name -> families anchored to it
+for _family_key, _roles in GUIDE_FAMILY_ANCHOR_ROLES.items():
+    for _role in _roles:
+        VP_GUIDE_FAMILIES.setdefault(VP_ROLE_DEFS[_role][1], []).append(_family_key)
+
+def get_guide_family_anchor_vps(family_key):
+    """The family's anchor VP empties, or None if one of them is missing."""
+    anchor_vps = [get_vp_by_role(role) for role in GUIDE_FAMILY_ANCHOR_ROLES[family_key]]
+    return anchor_vps if all(anchor_vps) else None
+
+LIVE_FOLLOW_INTERVAL = 1.0 / 60.0 # Seconds between coalesced regenerations
+_live_follow_dirty_families = set()
+
+def guide_family_emit_options(ts, family_key):
+    """(curve_type, is_cyclic) the family is emitted with. Fish-eye rings cut by 'Front Only'
+    are never cyclic, which prevents the ugly line across the gap."""
+    if GUIDE_FAMILY_DEFS[family_key][1] != 'FISH_EYE':
+        return 'POLY', False
+    is_ring = family_key in ('FE_LAT', 'FE_BOUNDARY')
+    return 'BEZIER', is_ring and not getattr(ts, "fish_eye_front_only", True)
+
+def regenerate_guide_family(context, family_key, to_curves=None):
+    """Rebuilds one family from the current settings and anchor VPs, updating its objects in place.
+    Returns the number of lines emitted, or None if an anchor VP is missing."""
+    anchor_vps = get_guide_family_anchor_vps(family_key)
+    if not anchor_vps:
+        return None
+    ts = context.scene.perspective_tool_settings_splines
+    lines, keep_mask = build_guide_family_lines(family_key, ts, [vp.location for vp in anchor_vps])
+    curve_type, is_cyclic = guide_family_emit_options(ts, family_key)
+    return emit_guide_family(context, family_key, compact_guide_lines(lines, keep_mask), get_guides_collection(context),
+                             ts.guide_curves_thickness, ts.guide_curves_opacity, is_cyclic=is_cyclic, curve_type=curve_type,
+                             to_curves=to_curves)
+
+@profiled("live_follow_timer")
+def _flush_live_follow_guides():
+    """Timer callback: regenerates every pending family once, then unregisters itself."""
+    context = bpy.context
+    if not _live_follow_dirty_families or not hasattr(context.scene, "perspective_tool_settings_splines"):
+        _live_follow_dirty_families.clear()
+        return None
+    pending = sorted(_live_follow_dirty_families)
+    _live_follow_dirty_families.clear()
+    guides_coll = get_guides_collection(context)
+    for family_key in pending:
+        # Only families the user generated follow; live follow never creates new ones.
+        if not get_guide_family_objects(family_key, guides_coll):
+            continue
+        try:
+            regenerate_guide_family(context, family_key)
+        except Exception as e:
+            guide_log.error("Live follow: failed to regenerate family %s: %s", family_key, e)
+    return None
+
+def mark_guide_families_dirty(vp_name):
+    """Queues the families anchored to vp_name for the next coalesced live-follow regeneration."""
+    families = VP_GUIDE_FAMILIES.get(vp_name)
+    if not families:
         return
-    tool_settings = context.scene.perspective_tool_settings_splines
-    horizon_curve_obj = get_horizon_curve_object()
-    if not horizon_curve_obj:
+    _live_follow_dirty_families.update(families)
+    if not bpy.app.timers.is_registered(_flush_live_follow_guides):
+        bpy.app.timers.register(_flush_live_follow_guides, first_interval=LIVE_FOLLOW_INTERVAL)
+
+def cancel_live_follow():
+    _live_follow_dirty_families.clear()
+    if bpy.app.timers.is_registered(_flush_live_follow_guides):
+        bpy.app.timers.unregister(_flush_live_follow_guides)
+
+# -----------------------------------------------------------
+# Clip Layer
+# -----------------------------------------------------------
+# Clipping is a derived layer. A clipped guide curve keeps its unclipped POLY lines and BEZIER splines
+# on the curve datablock (CLIP_SOURCE_PROP) and shows what is left of them inside the clip region: the camera
+# frame, the custom clipping shape or the shape stack ('clip_shapes', combined into a CompositeRegion),
+# chosen by 'clip_layer_mode'. The region is reduced to a key
+# of everything it depends on (camera transform and frame, shape transform); each curve remembers
+# the key it was last clipped with (CLIP_KEY_PROP, which also covers the guide's own transform),
+# so a refresh only re-clips curves whose key changed. Camera, shape or guide moves queue one
+# coalesced refresh on a timer; guides regenerated in place are re-clipped from their new lines.
+# The region is only built when its key changes, and a refresh clips the lines of all changed guides
+# against it in one batched pass. BEZIER splines (e.g. the fish eye guides) are flattened to 'clip_flatten_tolerance' pixels of the
+# render (see bezier_flatten_steps), clipped as polylines and shown as POLY or re-fitted BEZIER
+# splines ('clip_bezier_output'). Flattenings are cached per spline (by curve session_uid, source content and step counts).
+# The source of a merged guide labels its lines with their range key (see SPLINE_RANGES_PROP), so the clipped
+# splines keep one run per family and a single family can be re-clipped on its own (clip_spline_range).
+
+CLIP_SOURCE_PROP = "rogue_clip_source" # Curve data: {'co', 'counts', 'cyclic'} of the POLY lines, 'bezier' for BEZIER splines
+CLIP_KEY_PROP = "rogue_clip_key" # Curve data: key its current splines were clipped with
+CLIP_LAYER_INTERVAL = LIVE_FOLLOW_INTERVAL # Seconds between coalesced re-clips
+CLIP_LAYER_SPLINE_TYPES = ('POLY', 'BEZIER')
+_clip_layer_state = {'pending': False, 'key': None, 'region': None} # key: region key of the last refresh; region: last built
+_bezier_flatten_cache = {} # Curve data session_uid -> {'digest', 'steps', 'chunks': per spline (coords, knot flags)}
+
+def _clip_key_digest(*parts):
+    return hashlib.blake2b(repr(parts).encode(), digest_size=8).hexdigest()
+
+def _matrix_key(matrix):
+    return tuple(round(v, 6) for row in matrix for v in row)
+
+def clipping_shape_key(shape_obj):
+    """Key of everything a clipping shape's region depends on besides the camera view."""
+    if shape_obj.type == 'EMPTY':
+        geometry = shape_obj.get('clipping_shape_type')
+    else:
+        start, end = clipping_shape_outline_edges(shape_obj)
+        geometry = hashlib.blake2b(np.ascontiguousarray(start, dtype=np.float32).tobytes() +
+                                   np.ascontiguousarray(end, dtype=np.float32).tobytes(), digest_size=8).hexdigest()
+    return geometry, _matrix_key(shape_obj.matrix_world)
+
+def clip_shape_objects(ts):
+    """Every object set as a clipping shape (the custom shape and the shape stack), used or not."""
+    return ({ts.custom_clipping_shape} | {item.shape for item in ts.clip_shapes}) - {None}
+
+def get_clip_region(scene):
+    """The current clip region of the scene: {'key', 'view', 'region', 'flatten_tolerance' (camera view
+    units), 'bezier_output'}, or None when the clip layer is off or its camera / shapes are missing.
+    The region is rebuilt only when its key changed since the last call."""
+    ts = scene.perspective_tool_settings_splines
+    mode = ts.clip_layer_mode
+    cam = scene.camera
+    if mode == 'NONE' or not cam or cam.type != 'CAMERA':
+        return None
+    view = camera_view_params(scene, cam)
+    render = scene.render
+    render_px = max(render.resolution_x, render.resolution_y) * render.resolution_percentage / 100.0
+    flatten_tolerance = ts.clip_flatten_tolerance / max(render_px, 1.0)
+    key_parts = [mode, _matrix_key(view[0]), tuple(round(v, 6) for v in view[1]), view[2],
+                 round(flatten_tolerance, 9), ts.clip_bezier_output]
+    if mode == 'SHAPE':
+        shapes = [(ts.custom_clipping_shape, 'UNION')] if is_clipping_shape(ts.custom_clipping_shape) else []
+    else:
+        shapes = [(item.shape, item.operation) for item in ts.clip_shapes if is_clipping_shape(item.shape)]
+    if mode != 'CAMERA':
+        if not shapes:
+            return None
+        key_parts += [(clipping_shape_key(shape_obj), operation) for shape_obj, operation in shapes]
+        key_parts.append(mode == 'SHAPES' and ts.clip_shapes_invert)
+    key = _clip_key_digest(*key_parts)
+    cached = _clip_layer_state['region']
+    if cached is not None and cached['key'] == key:
+        return cached
+
+    if mode == 'CAMERA':
+        region = ConvexRegion(*rect_halfplanes(0.0, 1.0, 0.0, 1.0))
+    else:
+        regions = [(clipping_shape_region(shape_obj, view), operation) for shape_obj, operation in shapes]
+        regions = [(region, operation) for region, operation in regions if region is not None]
+        if not regions:
+            return None
+        if mode == 'SHAPE':
+            region = regions[0][0]
+        else: # Combined once here; every guide is then clipped against the combination in one pass
+            region = CompositeRegion(*zip(*regions), invert=ts.clip_shapes_invert)
+    _clip_layer_state['region'] = {'key': key, 'view': view, 'region': region,
+                                   'flatten_tolerance': flatten_tolerance, 'bezier_output': ts.clip_bezier_output}
+    return _clip_layer_state['region']
+
+def is_clip_layer_guide(obj):
+    return obj.type == 'CURVE' and obj.data is not None and CLIP_SOURCE_PROP in obj.data
+
+def _cyclic_flags(cyclic, n):
+    return np.asarray(cyclic, dtype=bool) if np.ndim(cyclic) else np.full(n, bool(cyclic))
+
+def set_clip_source(curve_data, coords, counts, cyclic=False, bezier=None, labels=None):
+    """cyclic: one flag for all lines or one per line. bezier: packed BEZIER splines kept next to
+    the POLY lines, (co, handle_left, handle_right, counts, cyclic flags). labels: for merged guides,
+    (range keys, key index of every POLY line, key index of every BEZIER spline)."""
+    source = {'co': _coords_to_idprop(coords), # float32 bytes like the BEZIER data (see _coords_to_idprop)
+              'counts': [int(c) for c in counts],
+              'cyclic': [int(c) for c in _cyclic_flags(cyclic, len(counts))]}
+    if bezier is not None and len(bezier[3]):
+        co, handle_left, handle_right, bezier_counts, bezier_cyclic = bezier
+        arrays = [_coords_to_idprop(v) for v in (co, handle_left, handle_right)]
+        source['bezier'] = {'co': arrays[0], 'handle_left': arrays[1], 'handle_right': arrays[2],
+                            'counts': [int(c) for c in bezier_counts],
+                            'cyclic': [int(c) for c in _cyclic_flags(bezier_cyclic, len(bezier_counts))],
+                            'digest': hashlib.blake2b(b"".join(arrays) +
+                                                      np.asarray(bezier_counts, dtype=np.int64).tobytes() +
+                                                      np.asarray(bezier_cyclic, dtype=bool).tobytes(),
+                                                      digest_size=8).hexdigest()}
+    if labels is not None:
+        range_keys, poly_labels, bezier_labels = labels
+        source['range_keys'] = list(range_keys)
+        source['labels'] = [int(label) for label in poly_labels]
+        if 'bezier' in source:
+            source['bezier']['labels'] = [int(label) for label in bezier_labels]
+    curve_data[CLIP_SOURCE_PROP] = source
+    if CLIP_KEY_PROP in curve_data:
+        del curve_data[CLIP_KEY_PROP] # New source: clipped splines are stale
+
+def set_clip_source_lines(curve_data, coords, counts, cyclic, spline_type):
+    """set_clip_source for freshly generated lines of one spline type (BEZIER lines get AUTO handles)."""
+    if spline_type != 'BEZIER':
+        set_clip_source(curve_data, coords, counts, cyclic)
         return
+    cyclic = _cyclic_flags(cyclic, len(counts)) & (np.asarray(counts) > 1)
+    set_clip_source(curve_data, np.zeros((0, 3)), (), bezier=(coords, *auto_bezier_handles(coords, counts, cyclic), counts, cyclic))
+
+def get_clip_source(curve_data):
+    """(coords (K, 3) float32, counts, cyclic) of the curve's unclipped POLY lines."""
+    source = curve_data[CLIP_SOURCE_PROP]
+    counts = np.asarray(source['counts'], dtype=np.int64)
+    cyclic = np.asarray(source['cyclic'], dtype=bool) if 'cyclic' in source else np.zeros(len(counts), dtype=bool)
+    return _coords_from_idprop(source['co']), counts, cyclic
+
+def get_clip_source_bezier(curve_data):
+    """(co, handle_left, handle_right, counts, cyclic) of the curve's unclipped BEZIER splines, or None."""
+    bezier = curve_data[CLIP_SOURCE_PROP].get('bezier')
+    if bezier is None:
+        return None
+    return (*(_coords_from_idprop(bezier[attr]) for attr in ('co', 'handle_left', 'handle_right')),
+            np.asarray(bezier['counts'], dtype=np.int64), np.asarray(bezier['cyclic'], dtype=bool))
+
+def get_clip_source_labels(curve_data):
+    """(range keys, key index of every POLY line, key index of every BEZIER spline) of a merged guide's
+    clip source, or None for other guides."""
+    source = curve_data[CLIP_SOURCE_PROP]
+    if 'range_keys' not in source:
+        return None
+    bezier = source.get('bezier')
+    return (list(source['range_keys']), np.asarray(source['labels'], dtype=np.int64),
+            np.asarray(bezier['labels'], dtype=np.int64) if bezier is not None else np.zeros(0, dtype=np.int64))
+
+def get_clip_source_range(curve_data, key):
+    """The source lines of key's run of a merged guide, as line parts (POLY, then BEZIER with handles)."""
+    range_keys, poly_labels, bezier_labels = get_clip_source_labels(curve_data)
+    label = range_keys.index(key) if key in range_keys else -1
+    coords, counts, cyclic = get_clip_source(curve_data)
+    mask = poly_labels == label
+    parts = [(*select_lines(coords, counts, mask), cyclic[mask], 'POLY', None)]
+    bezier = get_clip_source_bezier(curve_data)
+    if bezier is not None:
+        mask = bezier_labels == label
+        co, bezier_counts, handle_left, handle_right = select_lines(bezier[0], bezier[3], mask, bezier[1], bezier[2])
+        parts.append((co, bezier_counts, bezier[4][mask], 'BEZIER', (handle_left, handle_right)))
+    return parts
+
+def set_clip_source_range(curve_data, key, parts):
+    """Replaces the source lines of key's run of a merged guide by parts (line parts; BEZIER lines without
+    handles get AUTO ones). The other runs stay clipped: the curve keeps its clip key."""
+    range_keys, poly_labels, bezier_labels = get_clip_source_labels(curve_data)
+    label = range_keys.index(key) if key in range_keys else len(range_keys)
+    range_keys = range_keys + [key] * (label == len(range_keys))
+    coords, counts, cyclic = get_clip_source(curve_data)
+    mask = poly_labels != label
+    poly = [(*select_lines(coords, counts, mask), cyclic[mask], poly_labels[mask])]
+    bezier = get_clip_source_bezier(curve_data)
+    beziers = []
+    if bezier is not None:
+        mask = bezier_labels != label
+        co, bezier_counts, handle_left, handle_right = select_lines(bezier[0], bezier[3], mask, bezier[1], bezier[2])
+        beziers.append((co, handle_left, handle_right, bezier_counts, bezier[4][mask], bezier_labels[mask]))
+    _add_labelled_source_lines(parts, label, poly, beziers)
+    clip_key = curve_data.get(CLIP_KEY_PROP)
+    _set_labelled_clip_source(curve_data, range_keys, poly, beziers)
+    if clip_key is not None:
+        curve_data[CLIP_KEY_PROP] = clip_key
+
+def _add_labelled_source_lines(parts, label, poly, beziers):
+    """Appends line parts, labelled label, to the poly [(coords, counts, cyclic, labels)] and beziers
+    [(co, handle_left, handle_right, counts, cyclic, labels)] lists of _set_labelled_clip_source."""
+    for coords, counts, cyclic, spline_type, handles in parts:
+        if not len(counts):
+            continue
+        coords = np.asarray(coords, dtype=np.float32).reshape(-1, 3)
+        counts = np.asarray(counts, dtype=np.int64)
+        cyclic = _cyclic_flags(cyclic, len(counts)) & (counts > 1)
+        line_labels = np.full(len(counts), label, dtype=np.int64)
+        if spline_type == 'BEZIER':
+            handle_left, handle_right = auto_bezier_handles(coords, counts, cyclic) if handles is None else handles
+            beziers.append((coords, handle_left, handle_right, counts, cyclic, line_labels))
+        else:
+            poly.append((coords, counts, cyclic, line_labels))
+
+def _set_labelled_clip_source(curve_data, range_keys, poly, beziers):
+    """set_clip_source of a merged guide from the labelled poly / beziers lists (see _add_labelled_source_lines);
+    labels index range_keys. Keys without lines are dropped, the remaining labels renumbered."""
+    poly = [np.concatenate(arrays) for arrays in zip(*poly)] if poly else \
+           [np.zeros((0, 3), dtype=np.float32), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=bool), np.zeros(0, dtype=np.int64)]
+    beziers = [np.concatenate(arrays) for arrays in zip(*beziers)] if beziers else None
+    used = np.unique(np.concatenate((poly[3], beziers[5] if beziers else np.zeros(0, dtype=np.int64))))
+    set_clip_source(curve_data, poly[0], poly[1], poly[2], beziers[:5] if beziers else None,
+                    labels=([range_keys[i] for i in used], np.searchsorted(used, poly[3]),
+                            np.searchsorted(used, beziers[5]) if beziers else ()))
+
+def adopt_clip_source(curve_data):
+    """Makes the curve's current POLY and BEZIER splines its clip source. Returns False if it has none."""
+    if has_spline_ranges(curve_data) and spline_ranges_valid(curve_data):
+        range_keys = list(dict.fromkeys(key for key, _ in get_spline_ranges(curve_data)))
+        if not range_keys:
+            return False
+        poly, beziers = [], [] # Every run's lines first, then the source is written once
+        for label, key in enumerate(range_keys):
+            _add_labelled_source_lines(read_spline_range(curve_data, key), label, poly, beziers)
+        _set_labelled_clip_source(curve_data, range_keys, poly, beziers)
+        return True
+    coords, counts, _, cyclic = read_splines_bulk(curve_data, ('POLY',))
+    bezier = read_bezier_splines_bulk(curve_data)
+    if len(counts) == 0 and len(bezier[3]) == 0:
+        return False
+    set_clip_source(curve_data, coords, counts, cyclic, bezier)
+    return True
+
+def flatten_clip_source_bezier(curve_data, bezier, steps):
+    """flatten_bezier_splines of the curve's source BEZIER splines, reusing the cached flattening of
+    every spline whose source and step counts are unchanged. Returns (coords, counts, knot flags)."""
+    co, handle_left, handle_right, counts, cyclic = bezier
+    digest = curve_data[CLIP_SOURCE_PROP]['bezier'].get('digest')
+    _, _, n_segs = bezier_segment_indices(counts, cyclic)
+    cached = _bezier_flatten_cache.get(curve_data.session_uid)
+    if cached is None or cached['digest'] != digest or digest is None:
+        dirty = np.ones(len(counts), dtype=bool)
+        chunks = [None] * len(counts)
+    else:
+        seg_owner = np.repeat(np.arange(len(counts)), n_segs)
+        dirty = np.bincount(seg_owner, weights=steps != cached['steps'], minlength=len(counts)) > 0
+        chunks = cached['chunks']
+    if dirty.any():
+        point_mask, seg_mask = np.repeat(dirty, counts), np.repeat(dirty, n_segs)
+        flat, flat_counts, knots = flatten_bezier_splines(co[point_mask], handle_left[point_mask], handle_right[point_mask],
+                                                          counts[dirty], cyclic[dirty], steps[seg_mask])
+        splits = np.cumsum(flat_counts)[:-1]
+        for spline_idx, flat_chunk, knot_chunk in zip(np.nonzero(dirty)[0], np.split(flat, splits), np.split(knots, splits)):
+            chunks[spline_idx] = (flat_chunk, knot_chunk)
+        _bezier_flatten_cache[curve_data.session_uid] = {'digest': digest, 'steps': steps, 'chunks': chunks}
+    return (np.concatenate([chunk[0] for chunk in chunks]), np.array([len(chunk[0]) for chunk in chunks], dtype=np.int64),
+            np.concatenate([chunk[1] for chunk in chunks]))
+
+def prune_bezier_flatten_cache(curves):
+    """Drops the cached flattenings of every curve datablock but curves (e.g. guides that left the clip layer)."""
+    for uid in _bezier_flatten_cache.keys() - {curve_data.session_uid for curve_data in curves}:
+        del _bezier_flatten_cache[uid]
+
+def _clip_parts(curve_data, matrix_world, region, key=None):
+    """The curve's source lines as closed local-space polylines ready for clipping, one part per spline type
+    (and per range key of merged guides): {'co', 'counts', 'cyclic', 'knots', 'range'}. BEZIER splines are
+    flattened to the region's tolerance; knots flags the flattening points on their control points (None for
+    POLY lines); range is the part's range key, or None. key restricts the parts to that run of a merged guide."""
+    labels = get_clip_source_labels(curve_data)
+    range_keys, poly_labels, bezier_labels = labels if labels is not None else (None, None, None)
+    if key is not None:
+        label = range_keys.index(key) if key in range_keys else -1
+    parts = []
+    coords, counts, cyclic = get_clip_source(curve_data)
+    if key is not None:
+        mask = poly_labels == label
+        coords, counts = select_lines(coords, counts, mask)
+        cyclic, poly_labels = cyclic[mask], poly_labels[mask]
+    if len(counts):
+        cyclic = cyclic & (counts > 2)
+        closed, closed_counts = close_polylines(coords, counts, cyclic)
+        parts += _range_clip_parts({'co': closed, 'counts': closed_counts, 'cyclic': cyclic, 'knots': None},
+                                   poly_labels, range_keys)
+    bezier = get_clip_source_bezier(curve_data)
+    if bezier is not None and key is not None:
+        mask = bezier_labels == label
+        co, bezier_counts, handle_left, handle_right = select_lines(bezier[0], bezier[3], mask, bezier[1], bezier[2])
+        bezier = (co, handle_left, handle_right, bezier_counts, bezier[4][mask]) if mask.any() else None
+        bezier_labels = bezier_labels[mask]
+    if bezier is not None:
+        co, handle_left, handle_right, counts, cyclic = bezier
+        n = len(co)
+        projected = camera_view_project(transform_coords(matrix_world, np.concatenate((co, handle_left, handle_right))),
+                                        region['view'])
+        xy = projected[:, :2]
+        xy[projected[:, 2] < CAMERA_NEAR_CLIP] = np.nan # No screen-space bound behind the camera: most steps
+        steps = bezier_flatten_steps(xy[:n], xy[n:2 * n], xy[2 * n:], counts, cyclic, region['flatten_tolerance'])
+        if key is None:
+            flat, flat_counts, knots = flatten_clip_source_bezier(curve_data, bezier, steps)
+        else: # One run: flattened directly, the cache holds whole sources
+            flat, flat_counts, knots = flatten_bezier_splines(co, handle_left, handle_right, counts, cyclic, steps)
+        flat_cyclic = cyclic & (flat_counts > 2)
+        closed, closed_counts, closed_knots = close_polylines(flat, flat_counts, flat_cyclic, knots)
+        parts += _range_clip_parts({'co': closed, 'counts': closed_counts, 'cyclic': flat_cyclic, 'knots': closed_knots},
+                                   bezier_labels, range_keys)
+    return parts
+
+def _range_clip_parts(part, labels, range_keys):
+    """Splits a clip part into one part per range key of its lines (one part with range None without labels)."""
+    if labels is None:
+        part['range'] = None
+        return [part]
+    range_parts = []
+    for label in np.unique(labels):
+        mask = labels == label
+        knots = () if part['knots'] is None else (part['knots'],)
+        co, counts, *knots = select_lines(part['co'], part['counts'], mask, *knots)
+        range_parts.append({'co': co, 'counts': counts, 'cyclic': part['cyclic'][mask],
+                            'knots': knots[0] if knots else None, 'range': range_keys[label]})
+    return range_parts
+
+def _stitch_clip_part(part, seg_idx, t_enter, t_leave, bezier_output):
+    """The visible pieces of a clip part as an output part for replace_splines."""
+    coords, counts, cyclic, sources = stitch_clipped_segments(part['co'], part['counts'], seg_idx, t_enter, t_leave,
+                                                              cyclic=part['cyclic'], return_sources=True)
+    if part['knots'] is None or bezier_output != 'BEZIER':
+        return coords, counts, cyclic, 'POLY', None
+    # Re-fit: AUTO handles through the remaining control points and the cut points
+    on_knot = (sources >= 0) & part['knots'][np.maximum(sources, 0)]
+    coords, counts = select_polyline_points(coords, counts, on_knot, cyclic)
+    return coords, counts, cyclic, 'BEZIER', None
+
+def _clip_jobs(jobs, region):
+    """Clips the parts of every (obj, parts) job against region together, in one batched pass.
+    Returns the output parts (for replace_splines) of each job, one per input part."""
+    parts = [part for _, obj_parts in jobs for part in obj_parts]
+    if not parts:
+        return [[] for _ in jobs]
+    coords_world = np.concatenate([transform_coords(obj.matrix_world, part['co'])
+                                   for obj, obj_parts in jobs for part in obj_parts])
+    seg_idx, t_enter, t_leave = clip_polylines_in_camera_view(
+        coords_world, np.concatenate([part['counts'] for part in parts]), region['view'], region['region'])
+    # Segments are numbered part after part: split the intervals back (clip parameters are affine
+    # invariant, so each part is cut directly from its local coordinates)
+    seg_ends = np.cumsum([int(np.maximum(part['counts'] - 1, 0).sum()) for part in parts])
+    bounds = np.concatenate(([0], np.searchsorted(seg_idx, seg_ends)))
+    seg_starts = np.concatenate(([0], seg_ends[:-1]))
+    outputs, part_idx = [], 0
+    for _, obj_parts in jobs:
+        output = []
+        for part in obj_parts:
+            lo, hi = bounds[part_idx], bounds[part_idx + 1]
+            output.append(_stitch_clip_part(part, seg_idx[lo:hi] - seg_starts[part_idx], t_enter[lo:hi], t_leave[lo:hi],
+                                            region['bezier_output']))
+            part_idx += 1
+        outputs.append(output)
+    return outputs
+
+def clip_guide_objects(objects, region):
+    """Shows the clip layer of the guide objects for region, adopting them into the layer (their current
+    POLY and BEZIER splines become the source) if needed. The lines of all guides whose clip key changed
+    are clipped against the region together, in one batched pass. Returns the number of rewritten guides."""
+    jobs = []
+    for obj in objects:
+        curve_data = obj.data
+        if CLIP_SOURCE_PROP not in curve_data and not adopt_clip_source(curve_data):
+            continue # Nothing to clip
+        key = _clip_key_digest(region['key'], _matrix_key(obj.matrix_world))
+        if curve_data.get(CLIP_KEY_PROP) != key:
+            jobs.append((obj, key, _clip_parts(curve_data, obj.matrix_world, region)))
+    outputs = _clip_jobs([(obj, obj_parts) for obj, _, obj_parts in jobs], region)
+    for (obj, key, obj_parts), output in zip(jobs, outputs):
+        # Guides fully outside the region keep their source but show no splines
+        curve_data = obj.data
+        replace_splines(curve_data, output, CLIP_LAYER_SPLINE_TYPES)
+        if get_clip_source_labels(curve_data) is not None: # Merged guides: one run per range key, in part order
+            set_spline_ranges(curve_data, [(part['range'], len(lines[1])) for part, lines in zip(obj_parts, output)])
+            apply_spline_range_materials(curve_data)
+        curve_data[CLIP_KEY_PROP] = key
+        curve_data.update_tag()
+    return len(jobs)
+
+def clip_spline_range(obj, key, region):
+    """Re-clips only key's run of a merged clip layer guide against region (e.g. after that family was
+    regenerated); the other runs are left as they are. Returns the number of splines shown for key."""
+    output = _clip_jobs([(obj, _clip_parts(obj.data, obj.matrix_world, region, key))], region)[0]
+    return write_spline_range(obj.data, key, output)
+
+def clip_guide_object(obj, region):
+    """clip_guide_objects for one guide. Returns True if its splines were rewritten."""
+    return clip_guide_objects((obj,), region) > 0
+
+def restore_clip_source(obj):
+    """Puts the unclipped lines back and takes the object out of the clip layer."""
+    curve_data = obj.data
+    labels = get_clip_source_labels(curve_data)
+    if labels is not None: # Merged guides: one run per range key
+        range_parts = [(key, get_clip_source_range(curve_data, key)) for key in labels[0]]
+        replace_splines(curve_data, [part for _, parts in range_parts for part in parts], CLIP_LAYER_SPLINE_TYPES)
+        set_spline_ranges(curve_data, [(key, sum(len(part[1]) for part in parts)) for key, parts in range_parts])
+        apply_spline_range_materials(curve_data)
+    else:
+        parts = [(*get_clip_source(curve_data), 'POLY', None)]
+        bezier = get_clip_source_bezier(curve_data)
+        if bezier is not None:
+            parts.append((bezier[0], bezier[3], bezier[4], 'BEZIER', bezier[1:3]))
+        replace_splines(curve_data, parts, CLIP_LAYER_SPLINE_TYPES)
+    del curve_data[CLIP_SOURCE_PROP]
+    if CLIP_KEY_PROP in curve_data:
+        del curve_data[CLIP_KEY_PROP]
+    _bezier_flatten_cache.pop(curve_data.session_uid, None)
+    curve_data.update_tag()
+
+def iter_clippable_guides(context):
+    guides_coll = bpy.data.collections.get(PERSPECTIVE_GUIDES_COLLECTION)
+    if not guides_coll:
+        return
+    shape_objs = clip_shape_objects(context.scene.perspective_tool_settings_splines) # A curve may be a shape
+    for obj in guides_coll.all_objects:
+        if obj.type == 'CURVE' and obj.data and obj.name != HORIZON_CURVE_OBJ_NAME and obj not in shape_objs:
+            yield obj
+
+@profiled("refresh_clip_layer")
+def refresh_clip_layer(context):
+    """Re-clips every guide whose clip key changed. Returns the number of rewritten guides,
+    or None if there is no clip region (the current clipped splines are then kept)."""
+    region = get_clip_region(context.scene)
+    if region is None:
+        return None
+    _clip_layer_state['key'] = region['key']
+    guides = list(iter_clippable_guides(context))
+    prune_bezier_flatten_cache([obj.data for obj in guides]) # Removed guides and guides turned into clip shapes
+    return clip_guide_objects(guides, region)
+
+def clip_region_changed(scene):
+    region = get_clip_region(scene)
+    return region is not None and region['key'] != _clip_layer_state['key']
+
+def restore_clip_sources(objects):
+    """Restores the unclipped lines of those objects that are in the clip layer, e.g. before joining
+    them (a join keeps only the active object's source). Returns the number of restored objects."""
+    restored = [obj for obj in objects if is_clip_layer_guide(obj)]
+    for obj in restored:
+        restore_clip_source(obj)
+    return len(restored)
+
+def clear_clip_layer(context):
+    """Restores every clipped guide's source lines. Returns the number of restored guides."""
+    return restore_clip_sources(list(iter_clippable_guides(context)))
+
+def _flush_clip_layer():
+    """Timer callback: one coalesced clip layer refresh, then unregisters itself."""
+    _clip_layer_state['pending'] = False
+    context = bpy.context
+    if hasattr(context.scene, "perspective_tool_settings_splines"):
+        try:
+            rewritten = refresh_clip_layer(context)
+            guide_log.debug("Clip layer refresh rewrote %s guide(s).", rewritten)
+        except Exception as e:
+            guide_log.error("Clip layer refresh failed: %s", e)
+    return None
 
-    current_type = tool_settings.current_perspective_type
-    points_world = []
-    # Hide by default – we'll unhide it when we set valid points.
-    horizon_curve_obj.hide_set(True)
+def queue_clip_layer_refresh():
+    if _clip_layer_state['pending']:
+        return
+    _clip_layer_state['pending'] = True
+    if not bpy.app.timers.is_registered(_flush_clip_layer):
+        bpy.app.timers.register(_flush_clip_layer, first_interval=CLIP_LAYER_INTERVAL)
+
+def cancel_clip_layer_refresh():
+    _clip_layer_state['pending'] = False
+    if bpy.app.timers.is_registered(_flush_clip_layer):
+        bpy.app.timers.unregister(_flush_clip_layer)
+
+@profiled("update_clip_layer_mode")
+def update_clip_layer_mode(self, context): # self is PerspectiveToolSettingsSplines
+    if self.clip_layer_mode == 'NONE':
+        cancel_clip_layer_refresh()
+        clear_clip_layer(context)
+    else:
+        refresh_clip_layer(context)
 
+# -----------------------------------------------------------
+# Viewport Overlay Backend
+# -----------------------------------------------------------
+# With guide_display_backend = 'OVERLAY' guides, aid lines and the horizon are not curve objects:
+# they are line buffers computed from the VP empties and tool settings and drawn by a SpaceView3D
+# draw handler. compute_overlay_line_buffers() is the headless layer (scene data + NumPy only, no
+# gpu), so it can be checked under 'blender -b'. Anything that already exists as a curve object
+# (baked guides, a horizon curve) is skipped so it is not drawn twice.
+
+OVERLAY_LINE_WIDTH = 1.5 # Pixels
+OVERLAY_HORIZON_LINE_WIDTH = 2.5
+OVERLAY_FAMILY_COLOR_PROPS = { # Overlay guides take the colour of their VP empty
+    '1P': 'one_point_vp_empty_color', '2P_VP1': 'two_point_vp1_empty_color',
+    '2P_VP2': 'two_point_vp2_empty_color', '2P_VERTICAL': None,
+    '3P_H1': 'three_point_vp_h1_empty_color', '3P_H2': 'three_point_vp_h2_empty_color',
+    '3P_V': 'three_point_vp_v_empty_color', 'FE_LON': 'fish_eye_vp_empty_color',
+    'FE_LAT': 'fish_eye_vp_empty_color', 'FE_BOUNDARY': 'fish_eye_vp_empty_color',
+    'FE_RADIAL': 'fish_eye_vp_empty_color',
+}
+OVERLAY_NEUTRAL_COLOR = (0.8, 0.8, 0.8)
+_guide_overlay_cache = {'buffers': None, 'batches': None}
+_guide_overlay_draw_handle = None
+
+def overlay_guide_families(ts):
+    """Guide families the overlay shows for the current perspective mode."""
+    return [key for key, (_, persp_type) in GUIDE_FAMILY_DEFS.items() if persp_type == ts.current_perspective_type]
+
+def compute_overlay_line_buffers(scene, view_layer=None):
+    """Headless overlay layer: the line buffers the overlay draws for scene. Families hidden in view_layer
+    (default: the context's, see is_guide_family_excluded) are left out.
+    Returns a list of {'key', 'coords': (2K, 3) float32 segment end points, 'color': RGBA, 'width'}."""
+    ts = getattr(scene, "perspective_tool_settings_splines", None)
+    if ts is None:
+        return []
+    if view_layer is None:
+        view_layer = bpy.context.view_layer if bpy.context.scene == scene else scene.view_layers[0]
+    buffers = []
+    guides_coll = bpy.data.collections.get(PERSPECTIVE_GUIDES_COLLECTION)
+    for family_key in overlay_guide_families(ts):
+        if guides_coll and get_guide_family_objects(family_key, guides_coll):
+            continue # Baked: drawn by its curve objects
+        if is_guide_family_excluded(view_layer, family_key):
+            continue # Hidden by the group toggle (or in the outliner)
+        anchor_vps = get_guide_family_anchor_vps(family_key)
+        if not anchor_vps:
+            continue
+        lines, keep_mask = build_guide_family_lines(family_key, ts, [vp.location for vp in anchor_vps])
+        coords, counts = pack_lines(compact_guide_lines(lines, keep_mask))
+        if len(counts) == 0:
+            continue
+        _, is_cyclic = guide_family_emit_options(ts, family_key)
+        color_prop = OVERLAY_FAMILY_COLOR_PROPS.get(family_key)
+        rgb = tuple(getattr(ts, color_prop))[:3] if color_prop else OVERLAY_NEUTRAL_COLOR
+        buffers.append({'key': family_key, 'coords': polylines_to_segments(coords, counts, is_cyclic),
+                        'color': rgb + (ts.guide_curves_opacity,), 'width': OVERLAY_LINE_WIDTH})
+
+    if not get_horizon_curve_object():
+        horizon_pts = compute_horizon_line_points(ts)
+        if horizon_pts:
+            buffers.append({'key': 'HORIZON', 'coords': np.array([tuple(pt) for pt in horizon_pts], dtype=np.float32),
+                            'color': tuple(ts.horizon_line_color), 'width': OVERLAY_HORIZON_LINE_WIDTH})
+
+    if ts.show_extraction_helper_lines:
+        selected_empties = [obj for obj in owned_objects('AID_EMPTY') if obj.select_get()]
+        aid_segments = collect_extraction_aid_segments(ts, selected_empties)
+        if aid_segments:
+            coords = np.array([tuple(pt) for _, p1, p2 in aid_segments for pt in (p1, p2)], dtype=np.float32)
+            buffers.append({'key': 'EXTRACTION_AIDS', 'coords': coords,
+                            'color': EXTRACTION_AID_LINE_COLOR + (EXTRACTION_AID_LINE_OPACITY,), 'width': OVERLAY_LINE_WIDTH})
+    return buffers
+
+def get_overlay_line_buffers(scene):
+    """Cached compute_overlay_line_buffers(); recomputed after invalidate_guide_overlay()."""
+    if _guide_overlay_cache['buffers'] is None:
+        _guide_overlay_cache['buffers'] = compute_overlay_line_buffers(scene)
+        _guide_overlay_cache['batches'] = None
+    return _guide_overlay_cache['buffers']
+
+def invalidate_guide_overlay():
+    """Drops the cached overlay buffers and redraws the 3D views."""
+    _guide_overlay_cache['buffers'] = None
+    _guide_overlay_cache['batches'] = None
+    if bpy.app.background:
+        return
+    for window in bpy.context.window_manager.windows:
+        for area in (window.screen.areas if window.screen else ()):
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+
+def _draw_guide_overlay():
+    """SpaceView3D POST_VIEW draw callback of the overlay backend."""
+    context = bpy.context
+    ts = getattr(context.scene, "perspective_tool_settings_splines", None)
+    if ts is None or ts.guide_display_backend != 'OVERLAY':
+        return
+    import gpu
+    from gpu_extras.batch import batch_for_shader
+    shader = gpu.shader.from_builtin('POLYLINE_UNIFORM_COLOR')
+    buffers = get_overlay_line_buffers(context.scene)
+    if _guide_overlay_cache['batches'] is None:
+        _guide_overlay_cache['batches'] = [batch_for_shader(shader, 'LINES', {"pos": buf['coords']}) for buf in buffers]
+    region = context.region
+    gpu.state.blend_set('ALPHA')
+    for buf, batch in zip(buffers, _guide_overlay_cache['batches']):
+        shader.uniform_float("viewportSize", (region.width, region.height))
+        shader.uniform_float("lineWidth", buf['width'])
+        shader.uniform_float("color", buf['color'])
+        batch.draw(shader)
+    gpu.state.blend_set('NONE')
+
+@profiled("update_guide_display_backend")
+def update_guide_display_backend(self, context):
+    invalidate_guide_overlay()
+    refresh_extraction_aid_lines(context) # Aid line objects exist only with the curve backend
+
+# -----------------------------------------------------------
+# Dynamic Horizon Line Update
+# -----------------------------------------------------------
+def compute_horizon_line_points(tool_settings):
+    """World-space end points of the horizon line for the current mode: two points, [] if the
+    mode's VPs are missing, or None if there is nothing to anchor a 1P horizon to."""
+    current_type = tool_settings.current_perspective_type
     if current_type == 'ONE_POINT':
-        vp1p = get_vanishing_points('ONE_POINT')
+        vp1p = get_vp_by_role('1P')
         if vp1p:
-            z_level = vp1p[0].location.z
-            center_x = vp1p[0].location.x
-            center_y = vp1p[0].location.y
+            z_level = vp1p.location.z
+            center_x = vp1p.location.x
+            center_y = vp1p.location.y
         else:
             # Fallback to horizon control if needed
             horizon_ctrl = get_horizon_control_object()
             if not horizon_ctrl:
-                return
+                return None
             z_level = horizon_ctrl.location.z
             center_x, center_y = 0, 0
         hz_len = tool_settings.horizon_line_length / 2.0
-        points_world = [
+        return [
             Vector((center_x - hz_len, center_y, z_level)),
             Vector((center_x + hz_len, center_y, z_level))
         ]
+    elif current_type in ('TWO_POINT', 'THREE_POINT'): # 3P: the horizon runs through the two horizontal VPs
+        roles = ('2P_1', '2P_2') if current_type == 'TWO_POINT' else ('3P_H1', '3P_H2')
+        vp_a, vp_b = get_vp_by_role(roles[0]), get_vp_by_role(roles[1])
+        if vp_a and vp_b:
+            return [vp_a.location.copy(), vp_b.location.copy()]
+    return []
+
+@profiled("update_dynamic_horizon_line_curve")
+def update_dynamic_horizon_line_curve(context):
+    if not hasattr(context.scene, "perspective_tool_settings_splines"):
+        return
+    tool_settings = context.scene.perspective_tool_settings_splines
+    if tool_settings.guide_display_backend == 'OVERLAY':
+        invalidate_guide_overlay()
+    horizon_curve_obj = get_horizon_curve_object()
+    if not horizon_curve_obj:
+        return
+
+    # Hide by default – we'll unhide it when we set valid points.
+    horizon_curve_obj.hide_set(True)
+    points_world = compute_horizon_line_points(tool_settings)
+    if points_world is None:
+        return
+    if points_world:
         horizon_curve_obj.location = (0, 0, 0)
-        horizon_curve_obj.rotation_euler = (0, 0, 0)
-        # Explicitly unhide the horizon line for ONE_POINT mode.
+        if tool_settings.current_perspective_type == 'ONE_POINT':
+            horizon_curve_obj.rotation_euler = (0, 0, 0)
         horizon_curve_obj.hide_set(False)
 
-    elif current_type == 'TWO_POINT':
-        vps_2p = get_vanishing_points('TWO_POINT')
-        if len(vps_2p) >= 2:
-            points_world = [
-                vps_2p[0].location.copy(),
-                vps_2p[1].location.copy()
-            ]
-            horizon_curve_obj.location = Vector((0, 0, 0))
-            horizon_curve_obj.hide_set(False)
-
-    elif current_type == 'THREE_POINT': # Corrected from THREE_POINT to THREE_POINT_H as per get_vanishing_points usage
-        vps_3p_h = get_vanishing_points('THREE_POINT_H')
-        if len(vps_3p_h) >= 2:
-            points_world = [
-                vps_3p_h[0].location.copy(),
-                vps_3p_h[1].location.copy()
-            ]
-            horizon_curve_obj.location = Vector((0, 0, 0))
-            horizon_curve_obj.hide_set(False)
-
     # Update the spline for the horizon line, if the data exists.
     if horizon_curve_obj.data and horizon_curve_obj.data.splines:
-        if not horizon_curve_obj.data.splines: # Ensure spline exists
-             horizon_curve_obj.data.splines.new('POLY')
-
-        spline = horizon_curve_obj.data.splines[0]
         if len(points_world) == 2:
-            if len(spline.points) != 2:
-                #spline.points.clear() # Not a valid method for SplinePoints
-                while len(spline.points) > 0:
-                    spline.points.remove(spline.points[0])
-                spline.points.add(1)   # Adding one point creates a total of 2 points.
-            spline.points[0].co = list(points_world[0]) + [1.0]
-            spline.points[1].co = list(points_world[1]) + [1.0]
+            set_single_poly_spline(horizon_curve_obj.data, [tuple(pt) for pt in points_world])
         else: # Default to origin if no valid points
-            if len(spline.points) != 2:
-                while len(spline.points) > 0:
-                    spline.points.remove(spline.points[0])
-                spline.points.add(1)
-            spline.points[0].co = (0, 0, 0, 1)
-            spline.points[1].co = (0, 0, 0, 1)
+            set_single_poly_spline(horizon_curve_obj.data, ((0, 0, 0), (0, 0, 0)))
 
     horizon_curve_obj.data.bevel_depth = tool_settings.horizon_line_thickness
 
@@ -839,8 +3587,9 @@ def update_dynamic_horizon_line_curve(context):
 
 # Place with other Property Update Callbacks (e.g., after update_horizon_control_from_prop)
 
+@profiled("update_main_vps_visibility")
 def update_main_vps_visibility(context): # Note: self is not passed if called via lambda from property
-    print("DEBUG: update_main_vps_visibility CALLED")
+    vp_log.debug("update_main_vps_visibility CALLED")
     if not hasattr(context.scene, "perspective_tool_settings_splines"):
         return
     ts = context.scene.perspective_tool_settings_splines
@@ -869,8 +3618,8 @@ def update_main_vps_visibility(context): # Note: self is not passed if called vi
         vp_name = VP_TYPE_SPECIFIC_PREFIX_MAP['FISH_EYE'] + "_1" # Assuming _1 for the center
         if bpy.data.objects.get(vp_name): active_main_vps_to_show.append(vp_name)
 
-    print(f"DEBUG update_main_vps_visibility: Main VPs for mode '{ts.current_perspective_type}': {active_main_vps_to_show}")
-    print(f"DEBUG update_main_vps_visibility: ts.show_main_vps is {ts.show_main_vps}")
+    vp_log.debug("Main VPs for mode '%s': %s", ts.current_perspective_type, active_main_vps_to_show)
+    vp_log.debug("ts.show_main_vps is %s", ts.show_main_vps)
 
     for vp_obj in all_vps:
         # Check if this VP is one that *should* be active for the current mode
@@ -884,42 +3633,28 @@ def update_main_vps_visibility(context): # Note: self is not passed if called vi
     if context.area:
         context.area.tag_redraw()
 
+# Structure: VP ROLE: tool settings colour property
+VP_ROLE_COLOR_PROPS = {
+    '1P': 'one_point_vp_empty_color',
+    '2P_1': 'two_point_vp1_empty_color', '2P_2': 'two_point_vp2_empty_color',
+    '3P_H1': 'three_point_vp_h1_empty_color', '3P_H2': 'three_point_vp_h2_empty_color',
+    '3P_V': 'three_point_vp_v_empty_color',
+}
+
+@profiled("update_vp_empty_colors")
 def update_vp_empty_colors(self, context): # self is PerspectiveToolSettingsSplines
     tool_settings = self
-    vps_1p = get_vanishing_points('ONE_POINT')
-    if vps_1p: vps_1p[0].color = list(tool_settings.one_point_vp_empty_color)
-
-    vps_2p = get_vanishing_points('TWO_POINT') # Already sorted by name
-    vp1_2p_target = VP_TYPE_SPECIFIC_PREFIX_MAP['TWO_POINT'] + "_1"
-    vp2_2p_target = VP_TYPE_SPECIFIC_PREFIX_MAP['TWO_POINT'] + "_2"
-    if len(vps_2p) > 0 and vps_2p[0].name.startswith(vp1_2p_target): vps_2p[0].color = list(tool_settings.two_point_vp1_empty_color)
-    elif len(vps_2p) > 0: vps_2p[0].color = list(tool_settings.two_point_vp1_empty_color) # Fallback for first
-    if len(vps_2p) > 1 and vps_2p[1].name.startswith(vp2_2p_target): vps_2p[1].color = list(tool_settings.two_point_vp2_empty_color)
-    elif len(vps_2p) > 1: vps_2p[1].color = list(tool_settings.two_point_vp2_empty_color) # Fallback for second
-
-
-    vps_3ph = get_vanishing_points('THREE_POINT_H') # Sorted
-    vp1_3ph_target = VP_TYPE_SPECIFIC_PREFIX_MAP['THREE_POINT_H'] + "_1"
-    vp2_3ph_target = VP_TYPE_SPECIFIC_PREFIX_MAP['THREE_POINT_H'] + "_2"
-    if len(vps_3ph) > 0 and vps_3ph[0].name.startswith(vp1_3ph_target): vps_3ph[0].color = list(tool_settings.three_point_vp_h1_empty_color)
-    elif len(vps_3ph) > 0: vps_3ph[0].color = list(tool_settings.three_point_vp_h1_empty_color)
-    if len(vps_3ph) > 1 and vps_3ph[1].name.startswith(vp2_3ph_target): vps_3ph[1].color = list(tool_settings.three_point_vp_h2_empty_color)
-    elif len(vps_3ph) > 1: vps_3ph[1].color = list(tool_settings.three_point_vp_h2_empty_color)
-
-    vps_3pv = get_vanishing_points('THREE_POINT_V') # Sorted
-    vp1_3pv_target = VP_TYPE_SPECIFIC_PREFIX_MAP['THREE_POINT_V'] + "_1"
-    if vps_3pv and vps_3pv[0].name.startswith(vp1_3pv_target) : vps_3pv[0].color = list(tool_settings.three_point_vp_v_empty_color)
-    elif vps_3pv : vps_3pv[0].color = list(tool_settings.three_point_vp_v_empty_color)
-
-    vps_fe = get_vanishing_points('FISH_EYE')
-    if vps_fe: # Should typically only be one for FE center
-        # Apply color to all found FE VPs, though usually there's just one primary.
-        for vp_fe in vps_fe:
-            vp_fe.color = list(tool_settings.fish_eye_vp_empty_color)
+    for role, color_prop in VP_ROLE_COLOR_PROPS.items():
+        vp_obj = get_vp_by_role(role)
+        if vp_obj: vp_obj.color = list(getattr(tool_settings, color_prop))
 
+    # Apply color to all found FE VPs, though usually there's just one primary.
+    for vp_fe in get_vanishing_points('FISH_EYE'):
+        vp_fe.color = list(tool_settings.fish_eye_vp_empty_color)
 
     if context.area: context.area.tag_redraw()
 
+@profiled("update_guides_visuals_from_props")
 def update_guides_visuals_from_props(self, context): # self is PerspectiveToolSettingsSplines
     tool_settings = self # self is PerspectiveToolSettingsSplines
     guides_coll = get_guides_collection(context)
@@ -928,24 +3663,21 @@ def update_guides_visuals_from_props(self, context): # self is PerspectiveToolSe
     default_opacity = tool_settings.guide_curves_opacity
     # Thickness is handled by create_curve_object's bevel_depth and operator generate functions reading guide_curves_thickness
 
-    for obj in guides_coll.objects:
+    for obj in guides_coll.all_objects:
         if obj.type == 'CURVE' and obj.name != HORIZON_CURVE_OBJ_NAME:
             if obj.data: # Update bevel depth (thickness)
                 obj.data.bevel_depth = tool_settings.guide_curves_thickness
 
-            mat = obj.active_material if obj.active_material else (obj.data.materials[0] if obj.data.materials else None)
-            if mat:
-                # Color is set randomly at creation, so we only update opacity here
-                # Retrieve the existing emission color to preserve it
-                emission_node = next((n for n in mat.node_tree.nodes if n.type == 'ShaderNodeEmission'), None)
-                if emission_node:
-                    existing_rgb_color = list(emission_node.inputs['Color'].default_value[:3])
-                    update_material_color_and_opacity(mat, existing_rgb_color, default_opacity)
+    # Color is set randomly at creation, so we only update opacity here. Opacity is global to all
+    # GUIDE-style materials: the pooled materials are edited in place and re-keyed, none are allocated.
+    set_pooled_guide_opacity(default_opacity)
     if context.area: context.area.tag_redraw()
 
+@profiled("update_horizon_visuals_from_props")
 def update_horizon_visuals_from_props(self, context):
     update_dynamic_horizon_line_curve(context)
 
+@profiled("update_horizon_control_from_prop")
 def update_horizon_control_from_prop(self, context): # self is horizon_y_level property
     horizon_ctrl = get_horizon_control_object()
     if horizon_ctrl:
@@ -959,61 +3691,62 @@ def update_horizon_control_from_prop(self, context): # self is horizon_y_level p
 
 # Place this in your "Property Update Callbacks" section
 
+@profiled("switch_perspective_type_prop")
 def switch_perspective_type_prop(self, context): # self is PerspectiveToolSettingsSplines
     global previous_perspective_type_on_switch
     tool_settings = self 
     current_new_type = tool_settings.current_perspective_type
 
-    print(f"DEBUG switch_prop: Previous Type = '{previous_perspective_type_on_switch}', New Type = '{current_new_type}'")
+    mode_log.debug("Previous Type = '%s', New Type = '%s'", previous_perspective_type_on_switch, current_new_type)
 
     # 1. Clearing previous type's VPs & Guides
     if previous_perspective_type_on_switch != 'NONE' and previous_perspective_type_on_switch != current_new_type:
-        print(f"  Clearing VPs & Guides for previous type: {previous_perspective_type_on_switch}")
+        mode_log.debug("Clearing VPs & Guides for previous type: %s", previous_perspective_type_on_switch)
         try:
             bpy.ops.perspective_splines.clear_type_guides('EXEC_DEFAULT', type_filter_prop=previous_perspective_type_on_switch)
         except Exception as e:
-            print(f"  ERROR during clear_type_guides for '{previous_perspective_type_on_switch}': {e}")
+            mode_log.error("Failed during clear_type_guides for '%s': %s", previous_perspective_type_on_switch, e)
 
     # 2. Creating default VP elements for the NEW type.
     try:
         if current_new_type == 'ONE_POINT':
-            print(f"  Setting up default VP for ONE_POINT mode...")
+            mode_log.debug("Setting up default VP for ONE_POINT mode...")
             PERSPECTIVE_OT_generate_one_point_splines.create_default_one_point(context)
         elif current_new_type == 'TWO_POINT':
-            print(f"  Setting up default VPs for TWO_POINT mode...")
+            mode_log.debug("Setting up default VPs for TWO_POINT mode...")
             PERSPECTIVE_OT_create_2p_vps_if_needed.create_default_two_point_vps(context)
         elif current_new_type == 'THREE_POINT':
-            print(f"  Setting up default VPs for THREE_POINT mode...")
+            mode_log.debug("Setting up default VPs for THREE_POINT mode...")
             PERSPECTIVE_OT_create_3p_vps_if_needed.create_default_three_point_vps(context)
         elif current_new_type == 'FISH_EYE':
-            print(f"  Setting up default VP for FISH_EYE mode...")
+            mode_log.debug("Setting up default VP for FISH_EYE mode...")
             PERSPECTIVE_OT_generate_fish_eye_splines.create_default_fish_eye_center(context)
         elif current_new_type == 'NONE':
-            print(f"  Switched to NONE mode. VPs for '{previous_perspective_type_on_switch}' should be cleared.")
+            mode_log.debug("Switched to NONE mode. VPs for '%s' should be cleared.", previous_perspective_type_on_switch)
             
     except Exception as e:
-        print(f"  ERROR during default VP setup for {current_new_type}: {e}")
+        mode_log.error("Failed during default VP setup for %s: %s", current_new_type, e)
     
     # 3. Updating common visuals (VP colors, horizon line, aid lines)
     try:
-        print(f"  Updating VP empty colors for mode: {current_new_type}")
+        mode_log.debug("Updating VP empty colors for mode: %s", current_new_type)
         update_vp_empty_colors(tool_settings, context)
     except Exception as e:
-        print(f"  ERROR updating VP colors: {e}")
+        mode_log.error("Failed updating VP colors: %s", e)
     
     try:
-        print(f"  Updating dynamic horizon line for mode: {current_new_type}")
+        mode_log.debug("Updating dynamic horizon line for mode: %s", current_new_type)
         update_dynamic_horizon_line_curve(context) 
     except Exception as e:
-        print(f"  ERROR updating horizon line: {e}")
+        horizon_log.error("Failed updating horizon line: %s", e)
 
-    print(f"  Refreshing extraction aid lines for mode: {current_new_type}")
+    mode_log.debug("Refreshing extraction aid lines for mode: %s", current_new_type)
     refresh_extraction_aid_lines(context)
 
     previous_perspective_type_on_switch = current_new_type
     if context.area:
         context.area.tag_redraw()
-    print(f"--- Switch to {current_new_type} finished. ---")
+    mode_log.debug("--- Switch to %s finished. ---", current_new_type)
 
 
 # -----------------------------------------------------------
@@ -1025,6 +3758,24 @@ def switch_perspective_type_prop(self, context): # self is PerspectiveToolSettin
 #
 
 
+class PerspectiveClipShapeSplines(PropertyGroup):
+    """One entry of the clip layer's shape stack ('clip_shapes'), applied in stack order."""
+    shape: PointerProperty(
+        name="Shape",
+        type=bpy.types.Object,
+        description="Clipping shape Empty, or a curve / mesh object whose outline is the shape",
+        poll=lambda self, obj: is_clipping_shape(obj),
+        update=lambda self, context: refresh_clip_layer(context)
+    )
+    operation: EnumProperty(
+        name="Operation",
+        items=[('UNION', "Union", "Adds the inside of the shape to the region"),
+               ('DIFFERENCE', "Difference", "Cuts the inside of the shape out of the region, e.g. a window in a frame"),
+               ('INTERSECT', "Intersect", "Keeps only the part of the region inside the shape")],
+        default='UNION',
+        update=lambda self, context: refresh_clip_layer(context)
+    )
+
 class PerspectiveToolSettingsSplines(PropertyGroup):
 
     # --- Fish Eye Specific Properties ---
@@ -1106,6 +3857,59 @@ class PerspectiveToolSettingsSplines(PropertyGroup):
         subtype='FACTOR',
         update=lambda self, context: update_guides_visuals_from_props(self, context)
     )
+    consolidate_guide_families: BoolProperty(
+        name="One Object per Guide Family",
+        description="Emit each guide family (e.g. 2P VP1 lines) as a single curve object with one spline per line, instead of one object per line",
+        default=True
+    )
+    guide_display_backend: EnumProperty(
+        name="Guide Display",
+        description="How guides, aid lines and the horizon are shown",
+        items=[
+            ('CURVES', "Curve Objects", "Guides are beveled curve objects (renderable, editable)"),
+            ('OVERLAY', "Viewport Overlay", "Guides are drawn by a viewport overlay and cost no datablocks until baked"),
+        ],
+        default='CURVES',
+        update=lambda self, context: update_guide_display_backend(self, context)
+    )
+    live_follow_guides: BoolProperty(
+        name="Live Follow VPs",
+        description="Update the generated guide lines in place while their vanishing point is being moved",
+        default=False,
+        update=lambda self, context: None if self.live_follow_guides else cancel_live_follow()
+    )
+
+    # --- Diagnostics ---
+    log_level: EnumProperty(
+        name="Log Level",
+        description="Lowest level recorded in the log buffer (and console)",
+        items=[('DEBUG', "Debug", "Everything, including per-update traces"),
+               ('INFO', "Info", "Notable actions"),
+               ('WARNING', "Warning", "Warnings and errors"),
+               ('ERROR', "Error", "Errors only")],
+        default='WARNING',
+        update=lambda self, context: configure_logging(self)
+    )
+    log_subsystems: EnumProperty(
+        name="Log Subsystems",
+        description="Subsystems whose messages are recorded",
+        items=[(key, ui_name, description) for key, (ui_name, description) in LOG_SUBSYSTEMS.items()],
+        options={'ENUM_FLAG'},
+        default=set(LOG_SUBSYSTEMS),
+        update=lambda self, context: configure_logging(self)
+    )
+    log_to_console: BoolProperty(
+        name="Echo to Console",
+        description="Also print recorded messages to the system console",
+        default=True,
+        update=lambda self, context: configure_logging(self)
+    )
+    profiling_enabled: BoolProperty(
+        name="Profile",
+        description="Record call counts, timings, created/removed IDs and written spline points of operators, handlers and update callbacks",
+        default=False,
+        update=lambda self, context: _profiling_state.update(enabled=self.profiling_enabled)
+    )
 
     # --- VP Empty Colors ---
     one_point_vp_empty_color: FloatVectorProperty(name="1P VP Empty Color", subtype='COLOR', size=4, default=(1.0, 0.7, 0.2, 1.0), min=0.0, max=1.0, update=update_vp_empty_colors)
@@ -1176,8 +3980,39 @@ class PerspectiveToolSettingsSplines(PropertyGroup):
     custom_clipping_shape: PointerProperty(
         name="Clipping Shape",
         type=bpy.types.Object,
-        description="Select the Empty object to use as the custom clipping boundary",
-        poll=lambda self, obj: obj.type == 'EMPTY' and 'clipping_shape_type' in obj
+        description="Clipping shape Empty, or a curve / mesh object whose outline (which may be concave and have holes) is the clipping boundary",
+        poll=lambda self, obj: is_clipping_shape(obj)
+    )
+    clip_layer_mode: EnumProperty(
+        name="Clip Layer",
+        description="Region the guides are clipped to. The unclipped guides are kept and re-clipped when the camera, the shape or the guides change",
+        items=[('NONE', "Off", "Guides are shown unclipped"),
+               ('CAMERA', "Camera", "Guides are clipped to the camera borders"),
+               ('SHAPE', "Custom Shape", "Guides are clipped to the custom clipping shape"),
+               ('SHAPES', "Shape Stack", "Guides are clipped to the union / difference / intersection of the shape stack")],
+        default='NONE',
+        update=lambda self, context: update_clip_layer_mode(self, context)
+    )
+    clip_shapes: CollectionProperty(type=PerspectiveClipShapeSplines, name="Shape Stack")
+    clip_shapes_invert: BoolProperty(
+        name="Invert",
+        description="Keep the guides outside of the combined shape stack instead of inside",
+        default=False,
+        update=lambda self, context: refresh_clip_layer(context)
+    )
+    clip_flatten_tolerance: FloatProperty(
+        name="Curve Tolerance",
+        description="Largest distance, in render pixels, between a clipped Bezier guide (e.g. the fish eye guides) and the polyline it is clipped as",
+        default=0.5, min=0.01, soft_max=4.0, precision=2,
+        update=lambda self, context: refresh_clip_layer(context)
+    )
+    clip_bezier_output: EnumProperty(
+        name="Bezier Output",
+        description="How clipped Bezier guides are shown",
+        items=[('POLY', "Poly", "The clipped flattening, as POLY splines"),
+               ('BEZIER', "Bezier", "Bezier splines re-fitted through the remaining control points and the cut points")],
+        default='POLY',
+        update=lambda self, context: refresh_clip_layer(context)
     )
     clipping_shape_type_to_add: EnumProperty(
         name="Shape Type",
@@ -1230,28 +4065,21 @@ class PERSPECTIVE_OT_generate_3p_h1_lines(bpy.types.Operator):
         ts = context.scene.perspective_tool_settings_splines
         # Ensure VPs exist
         PERSPECTIVE_OT_create_3p_vps_if_needed.create_default_three_point_vps(context)
-        vps = get_vanishing_points('THREE_POINT_H')
-        if not vps or len(vps) < 1:
+        vp = get_vp_by_role('3P_H1')
+        if not vp:
             self.report({'ERROR'}, "3P H1 VP not found. Create VPs first.")
             return {'CANCELLED'}
-        vp = vps[0]  # H1 is the first horizontal VP
 
         guides_coll = get_guides_collection(context)
-        clear_guides_with_prefix(context, ["3P_Guides_H1_"])
-        ext = ts.three_point_line_extension
-        density = ts.three_point_vp_h1_density
-
-        lines_data = generate_radial_lines_in_plane(vp.location.copy(), density, ext, 'XZ')
-        if not lines_data:
+        lines_data, _ = build_guide_family_lines('3P_H1', ts, (vp.location,))
+        if len(lines_data) == 0:
+            clear_guide_family(context, '3P_H1')
             self.report({'INFO'}, "No H1 lines to generate.")
             return {'FINISHED'}
 
         opac = ts.guide_curves_opacity
         thickness = ts.guide_curves_thickness
-        created_count = 0
-        for i, pts_list in enumerate(lines_data):
-            if create_curve_object(context, f"3P_Guides_H1_{i+1}", [pts_list], guides_coll, thickness, opac):
-                created_count += 1
+        created_count = emit_guide_family(context, '3P_H1', lines_data, guides_coll, thickness, opac)
         self.report({'INFO'}, f"Generated {created_count} 3P H1 lines.")
         update_dynamic_horizon_line_curve(context)
         return {'FINISHED'}
@@ -1265,28 +4093,21 @@ class PERSPECTIVE_OT_generate_3p_h2_lines(bpy.types.Operator):
     def execute(self, context):
         ts = context.scene.perspective_tool_settings_splines
         PERSPECTIVE_OT_create_3p_vps_if_needed.create_default_three_point_vps(context)
-        vps = get_vanishing_points('THREE_POINT_H')
-        if not vps or len(vps) < 2:
+        vp = get_vp_by_role('3P_H2')
+        if not vp:
             self.report({'ERROR'}, "3P H2 VP not found. Create VPs first.")
             return {'CANCELLED'}
-        vp = vps[1]  # H2 is the second horizontal VP
 
         guides_coll = get_guides_collection(context)
-        clear_guides_with_prefix(context, ["3P_Guides_H2_"])
-        ext = ts.three_point_line_extension
-        density = ts.three_point_vp_h2_density
-
-        lines_data = generate_radial_lines_in_plane(vp.location.copy(), density, ext, 'XZ')
-        if not lines_data:
+        lines_data, _ = build_guide_family_lines('3P_H2', ts, (vp.location,))
+        if len(lines_data) == 0:
+            clear_guide_family(context, '3P_H2')
             self.report({'INFO'}, "No H2 lines to generate.")
             return {'FINISHED'}
 
         opac = ts.guide_curves_opacity
         thickness = ts.guide_curves_thickness
-        created_count = 0
-        for i, pts_list in enumerate(lines_data):
-            if create_curve_object(context, f"3P_Guides_H2_{i+1}", [pts_list], guides_coll, thickness, opac):
-                created_count += 1
+        created_count = emit_guide_family(context, '3P_H2', lines_data, guides_coll, thickness, opac)
         self.report({'INFO'}, f"Generated {created_count} 3P H2 lines.")
         update_dynamic_horizon_line_curve(context)
         return {'FINISHED'}
@@ -1300,28 +4121,21 @@ class PERSPECTIVE_OT_generate_3p_v_lines(bpy.types.Operator):
     def execute(self, context):
         ts = context.scene.perspective_tool_settings_splines
         PERSPECTIVE_OT_create_3p_vps_if_needed.create_default_three_point_vps(context)
-        vps = get_vanishing_points('THREE_POINT_V')
-        if not vps or len(vps) < 1:
+        vp = get_vp_by_role('3P_V')
+        if not vp:
             self.report({'ERROR'}, "3P V VP not found. Create VPs first.")
             return {'CANCELLED'}
-        vp = vps[0]  # V is the vertical VP
 
         guides_coll = get_guides_collection(context)
-        clear_guides_with_prefix(context, ["3P_Guides_V_"])
-        ext = ts.three_point_line_extension
-        density = ts.three_point_vp_v_density
-
-        lines_data = generate_radial_lines_in_plane(vp.location.copy(), density, ext, 'XZ')
-        if not lines_data:
+        lines_data, _ = build_guide_family_lines('3P_V', ts, (vp.location,))
+        if len(lines_data) == 0:
+            clear_guide_family(context, '3P_V')
             self.report({'INFO'}, "No V lines to generate.")
             return {'FINISHED'}
 
         opac = ts.guide_curves_opacity
         thickness = ts.guide_curves_thickness
-        created_count = 0
-        for i, pts_list in enumerate(lines_data):
-            if create_curve_object(context, f"3P_Guides_V_{i+1}", [pts_list], guides_coll, thickness, opac):
-                created_count += 1
+        created_count = emit_guide_family(context, '3P_V', lines_data, guides_coll, thickness, opac)
         self.report({'INFO'}, f"Generated {created_count} 3P V lines.")
         update_dynamic_horizon_line_curve(context)
         return {'FINISHED'}
@@ -1375,28 +4189,11 @@ class PERSPECTIVE_OT_create_3p_vps_if_needed(bpy.types.Operator):
 
 
 class PERSPECTIVE_OT_clip_guides_to_camera(bpy.types.Operator):
-    """Clips guide endpoints to the camera borders"""
+    """Clips guides to the camera borders, non-destructively: they follow camera changes until unclipped"""
     bl_idname = "perspective_splines.clip_guides_to_camera"
     bl_label = "Clip Guides to Camera"
     bl_options = {'REGISTER', 'UNDO'}
 
-    def liang_barsky_clip(self, A, B):
-        """Liang–Barsky clipping in 2D for an axis-aligned rectangle (the camera view)."""
-        dx = B[0] - A[0]
-        dy = B[1] - A[1]
-        t_min, t_max = 0.0, 1.0
-        p = [-dx, dx, -dy, dy]
-        q = [A[0], 1 - A[0], A[1], 1 - A[1]]
-        for i in range(4):
-            if abs(p[i]) < 1e-9:
-                if q[i] < 0: return None
-            else:
-                r = q[i] / p[i]
-                if p[i] < 0: t_min = max(t_min, r)
-                else: t_max = min(t_max, r)
-            if t_min > t_max: return None
-        return t_min, t_max
-
     def execute(self, context):
         scene = context.scene
         cam = scene.camera
@@ -1409,42 +4206,13 @@ class PERSPECTIVE_OT_clip_guides_to_camera(bpy.types.Operator):
             self.report({'WARNING'}, "No guides collection found.")
             return {'CANCELLED'}
 
-        clipped_obj_count = 0
-        for obj in guides_coll.objects:
-            if obj.type != 'CURVE' or obj.name == HORIZON_CURVE_OBJ_NAME:
-                continue
-
-            curve = obj.data
-            was_changed = False
-            for spline in curve.splines:
-                if spline.type != 'POLY' or len(spline.points) < 2:
-                    continue
-
-                p0_world = obj.matrix_world @ Vector(spline.points[0].co[:3])
-                p1_world = obj.matrix_world @ Vector(spline.points[-1].co[:3])
-                
-                p0_ndc = world_to_camera_view(scene, cam, p0_world)
-                p1_ndc = world_to_camera_view(scene, cam, p1_world)
-                
-                clip_result = self.liang_barsky_clip((p0_ndc.x, p0_ndc.y), (p1_ndc.x, p1_ndc.y))
-
-                if clip_result is None:
-                    spline.points[0].co = (0, 0, 0, 1)
-                    spline.points[-1].co = (0, 0, 0, 1)
-                    was_changed = True
-                else:
-                    t_min, t_max = clip_result
-                    new_p0_world = p0_world.lerp(p1_world, t_min)
-                    new_p1_world = p0_world.lerp(p1_world, t_max)
-
-                    inv_matrix = obj.matrix_world.inverted()
-                    spline.points[0].co = list(inv_matrix @ new_p0_world) + [1.0]
-                    spline.points[-1].co = list(inv_matrix @ new_p1_world) + [1.0]
-                    was_changed = True
-
-            if was_changed:
-                curve.update_tag()
-                clipped_obj_count += 1
+        # Switching the clip layer on clips every guide; the unclipped guides are kept as its source
+        ts = scene.perspective_tool_settings_splines
+        if ts.clip_layer_mode != 'CAMERA':
+            ts.clip_layer_mode = 'CAMERA' # Runs update_clip_layer_mode
+        else:
+            refresh_clip_layer(context)
+        clipped_obj_count = sum(is_clip_layer_guide(obj) for obj in iter_clippable_guides(context))
 
         self.report({'INFO'}, f"Clipped {clipped_obj_count} guides to camera view.")
         return {'FINISHED'}
@@ -1455,7 +4223,7 @@ class PERSPECTIVE_OT_clip_guides_to_camera(bpy.types.Operator):
 #
 
 class PERSPECTIVE_OT_clip_guides_custom_shape(bpy.types.Operator):
-    """Clips perspective guides to a custom shape boundary (updated to process every spline segment)"""
+    """Clips perspective guides to a custom shape boundary, non-destructively: they follow camera and shape changes until unclipped"""
     bl_idname = "perspective_splines.clip_guides_custom_shape"
     bl_label = "Clip Guides to Custom Shape"
     bl_options = {'REGISTER', 'UNDO'}
@@ -1474,84 +4242,21 @@ class PERSPECTIVE_OT_clip_guides_custom_shape(bpy.types.Operator):
         if not cam:
             self.report({'WARNING'}, "No active camera.")
             return {'CANCELLED'}
-        if not shape_obj or 'clipping_shape_type' not in shape_obj:
+        if not is_clipping_shape(shape_obj):
             self.report({'ERROR'}, "A valid custom clipping shape must be selected.")
             return {'CANCELLED'}
 
-        guides_coll = get_guides_collection(context)
-        clipped_obj_count = 0
-
-        # 1. Generate the precise 2D clipping polygon in camera space
-        shape_type = shape_obj['clipping_shape_type']
-        clip_polygon_2d_unsorted = []
-
-        if shape_type == 'RECTANGLE':
-            local_corners = [
-                Vector((-0.5, -0.5, 0)), Vector((0.5, -0.5, 0)),
-                Vector((0.5, 0.5, 0)),  Vector((-0.5, 0.5, 0))
-            ]
-            world_corners = [shape_obj.matrix_world @ c for c in local_corners]
-            ndc_corners = [world_to_camera_view(scene, cam, c) for c in world_corners]
-            clip_polygon_2d_unsorted = [Vector((c.x, c.y)) for c in ndc_corners]
-
-        elif shape_type == 'CIRCLE':
-            num_samples = 32
-            for i in range(num_samples):
-                angle = (2 * math.pi * i) / num_samples
-                local_pt = Vector((shape_obj.scale.x * math.cos(angle), shape_obj.scale.y * math.sin(angle), 0))
-                pt_world = shape_obj.matrix_world @ local_pt
-                pt_ndc = world_to_camera_view(scene, cam, pt_world)
-                clip_polygon_2d_unsorted.append(Vector((pt_ndc.x, pt_ndc.y)))
-
-        if not clip_polygon_2d_unsorted:
-            self.report({'ERROR'}, "Could not generate a 2D clipping polygon from the shape.")
+        if clipping_shape_region(shape_obj, camera_view_params(scene, cam)) is None:
+            self.report({'ERROR'}, "Could not generate a 2D clipping region from the shape.")
             return {'CANCELLED'}
 
-        # Force the projected polygon vertices into counter-clockwise order.
-        clip_polygon_2d = sort_polygon_ccw(clip_polygon_2d_unsorted)
-
-        # 2. Iterate through guide curves and clip them segment by segment.
-        for obj in guides_coll.objects:
-            if obj.type != 'CURVE' or obj.name == HORIZON_CURVE_OBJ_NAME:
-                continue
-
-            curve = obj.data
-            was_changed = False
-            new_spline_segments = []  # This will collect segments from all splines in the object.
-            inv_matrix = obj.matrix_world.inverted()
-
-            for spline in curve.splines:
-                if spline.type != 'POLY' or len(spline.points) < 2:
-                    continue
-
-                segments = clip_poly_spline_to_polygon(spline, obj.matrix_world, inv_matrix, clip_polygon_2d, scene, cam)
-                if segments:
-                    new_spline_segments.extend(segments)
-                # If a particular spline is entirely outside the polygon, we simply skip it.
-
-            # Rebuild the curve with the new segments.
-            if new_spline_segments:
-                # Remove existing splines
-                while len(curve.splines) > 0:
-                    curve.splines.remove(curve.splines[0])
-                # For each clipped segment, add a new poly spline with two points.
-                for seg in new_spline_segments:
-                    new_spline = curve.splines.new(type='POLY')
-                    # Ensure exactly two points are available
-                    if len(new_spline.points) < 2:
-                        new_spline.points.add(1)  # This creates a total of 2 points.
-                    new_spline.points[0].co = list(seg[0]) + [1.0]
-                    new_spline.points[1].co = list(seg[1]) + [1.0]
-                was_changed = True
-            else:
-                # If no segments remain inside the shape, clear this curve.
-                while len(curve.splines) > 0:
-                    curve.splines.remove(curve.splines[0])
-                was_changed = True
-
-            if was_changed:
-                curve.update_tag()
-                clipped_obj_count += 1
+        # The clip layer projects the shape outline and clips every segment of every guide spline,
+        # keeping the unclipped guides so that moving the camera or the shape re-clips them.
+        if ts.clip_layer_mode != 'SHAPE':
+            ts.clip_layer_mode = 'SHAPE' # Runs update_clip_layer_mode
+        else:
+            refresh_clip_layer(context)
+        clipped_obj_count = sum(is_clip_layer_guide(obj) for obj in iter_clippable_guides(context))
 
         self.report({'INFO'}, f"Clipped {clipped_obj_count} guide object(s) to custom shape.")
         return {'FINISHED'}
@@ -1561,6 +4266,53 @@ class PERSPECTIVE_OT_clip_guides_custom_shape(bpy.types.Operator):
 # ---------- END OF THE SECTION TO FIX ----------
 #
 
+class PERSPECTIVE_OT_unclip_guides(bpy.types.Operator):
+    """Turns the clip layer off and restores the unclipped guides"""
+    bl_idname = "perspective_splines.unclip_guides"
+    bl_label = "Unclip Guides"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        ts = context.scene.perspective_tool_settings_splines
+        cancel_clip_layer_refresh()
+        restored_count = clear_clip_layer(context)
+        if ts.clip_layer_mode != 'NONE':
+            ts.clip_layer_mode = 'NONE' # Nothing left to restore in update_clip_layer_mode
+        self.report({'INFO'}, f"Restored {restored_count} unclipped guide(s).")
+        return {'FINISHED'}
+
+
+class PERSPECTIVE_OT_add_clip_shape(bpy.types.Operator):
+    """Adds the active object (if it can be a clipping shape) or the custom clipping shape to the shape stack"""
+    bl_idname = "perspective_splines.add_clip_shape"
+    bl_label = "Add Shape to Stack"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        ts = context.scene.perspective_tool_settings_splines
+        shape_obj = context.active_object if is_clipping_shape(context.active_object) else ts.custom_clipping_shape
+        item = ts.clip_shapes.add()
+        item.shape = shape_obj # May be None: picked in the panel
+        self.report({'INFO'}, f"Added {shape_obj.name if shape_obj else 'an empty entry'} to the shape stack.")
+        return {'FINISHED'}
+
+
+class PERSPECTIVE_OT_remove_clip_shape(bpy.types.Operator):
+    """Removes an entry from the shape stack"""
+    bl_idname = "perspective_splines.remove_clip_shape"
+    bl_label = "Remove Shape from Stack"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    index: IntProperty(default=-1)
+
+    def execute(self, context):
+        ts = context.scene.perspective_tool_settings_splines
+        if not 0 <= self.index < len(ts.clip_shapes):
+            return {'CANCELLED'}
+        ts.clip_shapes.remove(self.index)
+        refresh_clip_layer(context)
+        return {'FINISHED'}
+
 
 class PERSPECTIVE_OT_delete_all_clipping_shapes(bpy.types.Operator):
     """Finds and deletes all custom clipping shape helpers in the scene"""
@@ -1568,20 +4320,20 @@ class PERSPECTIVE_OT_delete_all_clipping_shapes(bpy.types.Operator):
     bl_label = "Delete All Clipping Shapes"
     bl_options = {'REGISTER', 'UNDO'}
 
+    @staticmethod
+    def scene_clipping_shapes(context):
+        return [obj for obj in owned_objects('CLIP_SHAPE')
+                if obj.get('clipping_shape_type') and context.scene in obj.users_scene]
+
     @classmethod
     def poll(cls, context):
         # Check if any clipping shapes exist to be deleted
-        for obj in context.scene.objects:
-            if obj.get('clipping_shape_type'):
-                return True
-        return False
+        return bool(cls.scene_clipping_shapes(context))
 
     def execute(self, context):
         ts = context.scene.perspective_tool_settings_splines
         
-        shapes_to_delete = [
-            obj for obj in context.scene.objects if obj.get('clipping_shape_type')
-        ]
+        shapes_to_delete = self.scene_clipping_shapes(context)
 
         if not shapes_to_delete:
             self.report({'INFO'}, "No clipping shapes found to delete.")
@@ -1591,18 +4343,12 @@ class PERSPECTIVE_OT_delete_all_clipping_shapes(bpy.types.Operator):
         if ts.custom_clipping_shape and ts.custom_clipping_shape in shapes_to_delete:
             ts.custom_clipping_shape = None
             
-        deleted_count = len(shapes_to_delete)
-        
-        # Deselect all and enter object mode to be safe
-        if context.active_object:
+        # Leave edit modes before removing anything
+        if context.active_object and context.active_object.mode != 'OBJECT':
             bpy.ops.object.mode_set(mode='OBJECT')
-        bpy.ops.object.select_all(action='DESELECT')
 
-        # Select and delete the shapes
-        for shape in shapes_to_delete:
-            shape.select_set(True)
-        
-        bpy.ops.object.delete()
+        # Removed in one batch; pointers to them (e.g. the shape stack) are cleared by Blender
+        deleted_count = batch_remove_objects(shapes_to_delete)
 
         self.report({'INFO'}, f"Deleted {deleted_count} clipping shape(s).")
         return {'FINISHED'}
@@ -1629,6 +4375,7 @@ class PERSPECTIVE_OT_create_clipping_shape(bpy.types.Operator):
         
         # This custom property is CRUCIAL. It's how we identify our shapes.
         shape_obj['clipping_shape_type'] = shape_type 
+        tag_owned_object(shape_obj, 'CLIP_SHAPE', shape_type)
         
         shape_obj.name = f"ClippingShape_{shape_type.title()}"
         shape_obj.empty_display_size = 2 # Make it easy to see
@@ -1663,10 +4410,7 @@ class PERSPECTIVE_OT_delete_all_helpers(bpy.types.Operator):
         aids_coll = get_extraction_aids_collection(context)
         
         # Create a list of helper empties to delete to avoid issues while iterating
-        helpers_to_delete = [
-            obj for obj in aids_coll.objects 
-            if obj.type == 'EMPTY' and "_Aid" in obj.name
-        ]
+        helpers_to_delete = owned_objects('AID_EMPTY')
 
         if not helpers_to_delete:
             self.report({'INFO'}, "No helper empties found to delete.")
@@ -1674,23 +4418,12 @@ class PERSPECTIVE_OT_delete_all_helpers(bpy.types.Operator):
 
         deleted_count = len(helpers_to_delete)
         
-        # Deselect everything to avoid context issues
-        if context.active_object:
+        # Leave edit modes before removing anything
+        if context.active_object and context.active_object.mode != 'OBJECT':
             bpy.ops.object.mode_set(mode='OBJECT')
-        bpy.ops.object.select_all(action='DESELECT')
-
-        # Remove the objects
-        for obj in helpers_to_delete:
-            try:
-                bpy.data.objects.remove(obj, do_unlink=True)
-            except ReferenceError:
-                # Object might have already been removed by another process
-                pass
-            except Exception as e:
-                print(f"Could not remove helper empty {obj.name}: {e}")
 
-        # Also clear any visual lines that might be left over
-        clear_extraction_aids_lines(context)
+        # Remove the empties together with any visual lines that might be left over
+        batch_remove_objects(helpers_to_delete + owned_objects('AID_LINE'))
 
         self.report({'INFO'}, f"Deleted {deleted_count} helper empties.")
         
@@ -1794,6 +4527,7 @@ class PERSPECTIVE_OT_add_3p_v_vp_helpers(bpy.types.Operator):
                     coll.objects.unlink(new_empty)
                 if new_empty.name not in aids_coll.objects:
                     aids_coll.objects.link(new_empty)
+                    tag_owned_object(new_empty, 'AID_EMPTY', base_name, _aid_rig(base_name))
                 new_empty.select_set(True)
                 created_empties.append(new_empty)
             else:
@@ -1915,6 +4649,7 @@ class PERSPECTIVE_OT_add_3p_h_vp2_helpers(bpy.types.Operator):
                     coll.objects.unlink(new_empty)
                 if new_empty.name not in aids_coll.objects:
                     aids_coll.objects.link(new_empty)
+                    tag_owned_object(new_empty, 'AID_EMPTY', base_name, _aid_rig(base_name))
                 new_empty.select_set(True)
                 created_empties.append(new_empty)
             else:
@@ -2013,6 +4748,7 @@ class PERSPECTIVE_OT_add_3p_h_vp1_helpers(bpy.types.Operator):
                     coll.objects.unlink(new_empty)
                 if new_empty.name not in aids_coll.objects:
                     aids_coll.objects.link(new_empty)
+                    tag_owned_object(new_empty, 'AID_EMPTY', base_name, _aid_rig(base_name))
                 
                 new_empty.select_set(True)
                 created_empties.append(new_empty)
@@ -2124,15 +4860,16 @@ class PERSPECTIVE_OT_select_helper_empties(bpy.types.Operator):
             self.report({'INFO'}, "No helper empties found in the aid collection.")
             return {'CANCELLED'}
 
-        bpy.ops.object.select_all(action='DESELECT') # Deselect everything first
+        for obj in context.selected_objects: # Deselect everything first
+            obj.select_set(False)
 
         selected_count = 0
         empties_to_select = []
 
         if self.helper_set_identifier == "ALL_AIDS":
-            empties_to_select = [obj for obj in aids_coll.objects if obj.type == 'EMPTY' and "_Aid" in obj.name]
+            empties_to_select = owned_objects('AID_EMPTY')
         else: # Specific set like "1P_Aid", "2P_VP1_Aid", etc.
-            empties_to_select = [obj for obj in aids_coll.objects if obj.type == 'EMPTY' and self.helper_set_identifier in obj.name]
+            empties_to_select = owned_objects('AID_EMPTY', (self.helper_set_identifier,))
 
         if not empties_to_select:
             self.report({'INFO'}, f"No helpers found for identifier: '{self.helper_set_identifier}'.")
@@ -2187,6 +4924,7 @@ class PERSPECTIVE_OT_add_2p_vp2_helpers(bpy.types.Operator):
                     coll.objects.unlink(new_empty)
                 if new_empty.name not in aids_coll.objects: # Link to aids collection
                     aids_coll.objects.link(new_empty)
+                    tag_owned_object(new_empty, 'AID_EMPTY', base_name, _aid_rig(base_name))
                 new_empty.select_set(True)
                 created_empties.append(new_empty)
             else:
@@ -2279,23 +5017,22 @@ class PERSPECTIVE_OT_toggle_all_helpers(bpy.types.Operator):
     bl_options = {'REGISTER', 'UNDO'}
 
     def execute(self, context):
-        aids_coll = get_extraction_aids_collection(context)
-        if not aids_coll.objects:
+        aid_empties = owned_objects('AID_EMPTY') # Target only our aid empties
+        if not aid_empties:
             self.report({'INFO'}, "No helper empties to toggle.")
             return {'CANCELLED'}
 
         # Determine new hide_viewport state: if any are visible, new state is to hide all.
         # Otherwise, new state is to show all.
-        any_currently_visible = any(obj.type == 'EMPTY' and "_Aid" in obj.name and not obj.hide_viewport for obj in aids_coll.objects)
+        any_currently_visible = any(not obj.hide_viewport for obj in aid_empties)
         
         new_hide_state = any_currently_visible # If any visible, we want to hide them.
 
         changed_count = 0
-        for obj in aids_coll.objects:
-            if obj.type == 'EMPTY' and "_Aid" in obj.name: # Target only our aid empties
-                if obj.hide_viewport != new_hide_state:
-                    obj.hide_viewport = new_hide_state
-                    changed_count += 1
+        for obj in aid_empties:
+            if obj.hide_viewport != new_hide_state:
+                obj.hide_viewport = new_hide_state
+                changed_count += 1
         
         action_taken = "Hid" if new_hide_state else "Shown"
         self.report({'INFO'}, f"{action_taken} {changed_count} helper empties.")
@@ -2347,6 +5084,7 @@ class PERSPECTIVE_OT_add_2p_vp1_helpers(bpy.types.Operator):
                     coll.objects.unlink(new_empty)
                 if new_empty.name not in aids_coll.objects:
                     aids_coll.objects.link(new_empty)
+                    tag_owned_object(new_empty, 'AID_EMPTY', base_name, _aid_rig(base_name))
                 
                 new_empty.select_set(True) # Select it
                 created_empties.append(new_empty)
@@ -2470,6 +5208,7 @@ class PERSPECTIVE_OT_add_3p_helpers(bpy.types.Operator):
                     coll.objects.unlink(new_empty)
                 if new_empty.name not in aids_coll.objects:
                     aids_coll.objects.link(new_empty)
+                    tag_owned_object(new_empty, 'AID_EMPTY', base_name, 'THREE_POINT')
                 new_empty.select_set(True)
                 created.append(new_empty)
         self.report({'INFO'}, f"Added {len(created)} 3P helper empties.")
@@ -2520,6 +5259,7 @@ class PERSPECTIVE_OT_add_1p_extraction_empties(bpy.types.Operator):
                 coll.objects.unlink(new_empty)
             if new_empty.name not in aids_coll.objects:
                 aids_coll.objects.link(new_empty)
+                tag_owned_object(new_empty, 'AID_EMPTY', base_name, _aid_rig(base_name))
                 new_empty.select_set(True)
                 created_empties.append(new_empty)
             else:
@@ -2573,8 +5313,8 @@ class PERSPECTIVE_OT_extract_1p_from_selected_empties(bpy.types.Operator):
             intersection_pt, c1, c2 = line_line_intersection_3d(p1_loc, p2_loc, p3_loc, p4_loc, tolerance=0.05)
 
             if intersection_pt:
-                vp_location_world = intersection_pt
-                dist_str = f"{(c1-c2).length:.4f}" if c1 and c2 else "N/A"
+                vp_location_world = Vector(intersection_pt)
+                dist_str = f"{math.dist(c1, c2):.4f}" if c1 and c2 else "N/A"
                 # self.report({'INFO'}, f"Lines intersect near {vp_location_world} (dist: {dist_str}).") # Less verbose report
 
                 vp_name = VP_TYPE_SPECIFIC_PREFIX_MAP['ONE_POINT'] + "_1"
@@ -2602,7 +5342,7 @@ class PERSPECTIVE_OT_extract_1p_from_selected_empties(bpy.types.Operator):
                     bpy.ops.perspective_splines.generate_one_point('EXEC_DEFAULT')
                 except Exception as e:
                     self.report({'ERROR'}, f"VP set, but failed to auto-generate 1P lines: {e}")
-                    print(f"Error during auto 1P line generation after VP extraction: {e}")
+                    aid_log.error("Error during auto 1P line generation after VP extraction: %s", e)
                     # Decide if this is a critical failure for the operator
                     # return {'CANCELLED'} # Or just continue if setting VP is the primary goal
                 # --- END OF ADDED SECTION ---
@@ -2613,7 +5353,7 @@ class PERSPECTIVE_OT_extract_1p_from_selected_empties(bpy.types.Operator):
                 self.report({'INFO'}, f"1P VP '{vp_name}' and lines updated. VP at {vp_location_world}")
                 return {'FINISHED'}
             else:
-                dist_str = f"{(c1-c2).length:.4f}" if c1 and c2 else "N/A (parallel/collinear)"
+                dist_str = f"{math.dist(c1, c2):.4f}" if c1 and c2 else "N/A (parallel/collinear)"
                 self.report({'ERROR'}, f"Lines defined by empties do not intersect closely enough. Min distance: {dist_str}. Adjust empties.")
                 return {'CANCELLED'}
 
@@ -2626,7 +5366,7 @@ class PERSPECTIVE_OT_clear_grid_planes(Operator):
     bl_options = {'REGISTER', 'UNDO'}
 
     def execute(self, context):
-        count = clear_guides_with_prefix(context, ["GridPlane_"])
+        count = batch_remove_objects(owned_objects('GRID'))
         self.report({'INFO'}, f"Cleared {count} grid plane objects." if count > 0 else "No grid planes to clear.")
         return {'FINISHED'}
     
@@ -2649,21 +5389,58 @@ class PERSPECTIVE_OT_toggle_guide_visibility(Operator):
             self.report({'INFO'}, "Guides collection not found.")
             return {'CANCELLED'}
 
-        found_any = False
+        # A family with its own collection is hidden by excluding its layer collection, which also takes its
+        # objects out of depsgraph evaluation. Guides outside family collections (grid planes, guides of older
+        # files not regenerated yet) are hidden per object; guides merged from several families hide / show
+        # only the group's runs.
+        # The overlay backend draws the current mode's families without objects: their (empty) collections
+        # hold the hidden state there (see is_guide_family_excluded).
+        families = guide_families_with_prefix(self.group_prefix)
+        ts = context.scene.perspective_tool_settings_splines
+        overlay_families = set(overlay_guide_families(ts)) if ts.guide_display_backend == 'OVERLAY' else set()
+        view_layer_root = context.view_layer.layer_collection
+        family_layers = [] # (family layer collection, its mode's layer collection)
+        for key in families:
+            if key in overlay_families:
+                get_guide_family_collection(context, key)
+            family_coll = bpy.data.collections.get(GUIDE_COLLECTION_PREFIX + key)
+            mode_coll = bpy.data.collections.get(GUIDE_COLLECTION_PREFIX + GUIDE_FAMILY_DEFS[key][1])
+            if family_coll is None or mode_coll is None or not (key in overlay_families or len(family_coll.all_objects)):
+                continue
+            family_lc = find_layer_collection(view_layer_root, family_coll)
+            mode_lc = find_layer_collection(view_layer_root, mode_coll)
+            if family_lc is not None and mode_lc is not None:
+                family_layers.append((family_lc, mode_lc))
+        family_colls = {family_lc.collection for family_lc, _ in family_layers}
+        # Merged guides inside a family collection follow its flag, but their runs are hidden / shown with
+        # the others: a source that was hidden when merged left its run hidden in the index.
+        range_objs = get_guide_range_objects(guides_coll, families)
+        group_objs = [obj for obj in guide_group_objects(guides_coll, self.group_prefix)
+                      if family_colls.isdisjoint(obj.users_collection)]
         # Determine new visibility state: if any are visible, hide all; else show all
         # This is a simple toggle logic. More advanced would use stored states.
-        currently_any_visible = False
-        for obj in guides_coll.objects:
-            if obj.name.startswith(self.group_prefix) and not obj.hide_viewport:
-                currently_any_visible = True
-                break
+        currently_any_visible = any(not (family_lc.exclude or mode_lc.exclude) for family_lc, mode_lc in family_layers) or \
+            any(not obj.hide_viewport for obj in group_objs) or \
+            any(key in spline_range_keys(obj.data) and not is_spline_range_hidden(obj.data, key)
+                for obj in range_objs if family_colls.isdisjoint(obj.users_collection) for key in families)
         
         new_hide_state = currently_any_visible # If any are visible, new state is to hide them
 
-        for obj in guides_coll.objects:
-            if obj.type == 'CURVE' and obj.name.startswith(self.group_prefix):
+        found_any = bool(range_objs or family_layers)
+        for family_lc, mode_lc in family_layers:
+            family_lc.exclude = new_hide_state
+            if not new_hide_state: # A family shows only inside its mode's collection
+                mode_lc.exclude = False
+        if overlay_families:
+            invalidate_guide_overlay()
+        for obj in group_objs:
+            if obj.type == 'CURVE':
                 obj.hide_viewport = new_hide_state
                 found_any = True
+        region = get_clip_region(context.scene) if range_objs else None
+        for obj in range_objs:
+            for key in families:
+                set_spline_range_hidden(obj, key, new_hide_state, region)
         
         if not found_any:
             self.report({'INFO'}, f"No guides found with prefix '{self.group_prefix}'.")
@@ -2673,6 +5450,45 @@ class PERSPECTIVE_OT_toggle_guide_visibility(Operator):
         
         return {'FINISHED'}
 
+class PERSPECTIVE_OT_recolor_guide_group(Operator):
+    bl_idname = "perspective_splines.recolor_guide_group"
+    bl_label = "Recolour Guide Group"
+    bl_description = "Gives a guide group one colour, in its own objects and inside merged guides"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    group_prefix: StringProperty(name="Guide Group Prefix")
+    color: FloatVectorProperty(name="Colour", subtype='COLOR', size=3, min=0.0, max=1.0, default=(1.0, 0.5, 0.0))
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+
+    def execute(self, context):
+        if not self.group_prefix:
+            self.report({'WARNING'}, "No guide group prefix specified.")
+            return {'CANCELLED'}
+        ts = context.scene.perspective_tool_settings_splines
+        guides_coll = get_guides_collection(context)
+        mat = get_pooled_guide_material(tuple(self.color), ts.guide_curves_opacity)
+        recolored_count = 0
+        for obj in guide_group_objects(guides_coll, self.group_prefix):
+            if obj.type == 'CURVE' and obj.data:
+                if obj.data.materials:
+                    obj.data.materials[0] = mat
+                else:
+                    obj.data.materials.append(mat)
+                recolored_count += 1
+        families = guide_families_with_prefix(self.group_prefix)
+        for obj in get_guide_range_objects(guides_coll, families): # Only the group's runs of merged guides
+            for key in set(families).intersection(spline_range_keys(obj.data)):
+                set_spline_range_material(obj, key, mat)
+                recolored_count += 1
+        if not recolored_count:
+            self.report({'INFO'}, f"No guides found with prefix '{self.group_prefix}'.")
+            return {'CANCELLED'}
+        evict_orphaned_guide_materials()
+        self.report({'INFO'}, f"Recoloured {recolored_count} guide object(s) / merged run(s) for '{self.group_prefix}'.")
+        return {'FINISHED'}
+
 class PERSPECTIVE_OT_create_box_grid(Operator):
     bl_idname = "perspective_splines.create_box_grid"
     bl_label = "Create Perspective Box Grid"
@@ -2682,29 +5498,11 @@ class PERSPECTIVE_OT_create_box_grid(Operator):
                           u_axis_vec, v_axis_vec, normal_vec,
                           plane_name_suffix, guides_coll, ts):
         """ Helper to create a single grid plane """
-        all_spline_data = []
-        half_size_u = size_u / 2.0
-        half_size_v = size_v / 2.0
-
-        # Lines along V direction (varying U)
-        for i in range(subs_u + 1):
-            t = (i / subs_u) - 0.5 # from -0.5 to 0.5
-            p_offset = u_axis_vec * (t * size_u)
-            pt1 = center + p_offset - (v_axis_vec * half_size_v)
-            pt2 = center + p_offset + (v_axis_vec * half_size_v)
-            all_spline_data.append([pt1, pt2])
-
-        # Lines along U direction (varying V)
-        for i in range(subs_v + 1):
-            t = (i / subs_v) - 0.5 # from -0.5 to 0.5
-            p_offset = v_axis_vec * (t * size_v)
-            pt1 = center + p_offset - (u_axis_vec * half_size_u)
-            pt2 = center + p_offset + (u_axis_vec * half_size_u)
-            all_spline_data.append([pt1, pt2])
+        all_spline_data = plane_grid_lines_array(center, size_u, size_v, subs_u, subs_v, u_axis_vec, v_axis_vec)
         
-        if all_spline_data:
+        if len(all_spline_data):
             # Create one object per plane grid for easier management
-            grid_obj_name = f"GridPlane_{plane_name_suffix}"
+            grid_obj_name = f"{GRID_OBJECT_PREFIX}{plane_name_suffix}"
             # Ensure unique name
             idx = 1
             temp_name = grid_obj_name
@@ -2713,15 +5511,17 @@ class PERSPECTIVE_OT_create_box_grid(Operator):
                 idx +=1
             grid_obj_name = temp_name
 
-            create_curve_object(context, grid_obj_name, all_spline_data, guides_coll,
-                                ts.guide_curves_thickness, ts.guide_curves_opacity)
+            grid_obj = create_curve_object(context, grid_obj_name, all_spline_data, guides_coll,
+                                           ts.guide_curves_thickness, ts.guide_curves_opacity)
+            if grid_obj:
+                tag_owned_object(grid_obj, 'GRID', plane_name_suffix)
             return True
         return False
 
     def execute(self, context):
         ts = context.scene.perspective_tool_settings_splines
         guides_coll = get_guides_collection(context)
-        clear_guides_with_prefix(context, ["GridPlane_"]) # Clear old grids
+        batch_remove_objects(owned_objects('GRID')) # Clear old grids
 
         center = Vector(ts.grid_center)
         size = Vector(ts.grid_size)
@@ -2816,7 +5616,7 @@ class PERSPECTIVE_OT_merge_specific_guides(Operator):
     @classmethod
     def poll(cls, context):
         guides_coll = get_guides_collection(context)
-        return guides_coll and any(o.type == 'CURVE' and o.name != HORIZON_CURVE_OBJ_NAME for o in guides_coll.objects)
+        return guides_coll and any(o.type == 'CURVE' and o.name != HORIZON_CURVE_OBJ_NAME for o in guides_coll.all_objects)
 
     def get_curves_for_group(self, context, guides_coll):
         tool_settings = context.scene.perspective_tool_settings_splines
@@ -2866,7 +5666,7 @@ class PERSPECTIVE_OT_merge_specific_guides(Operator):
         if not target_prefixes:
             return [], "NoPrefixes"
 
-        for obj in guides_coll.objects:
+        for obj in guides_coll.all_objects:
             if obj.type == 'CURVE' and obj.name != HORIZON_CURVE_OBJ_NAME:
                 for prefix in target_prefixes:
                     if obj.name.startswith(prefix):
@@ -2890,77 +5690,17 @@ class PERSPECTIVE_OT_merge_specific_guides(Operator):
 
         if len(curves_to_merge) < 2:
             self.report({'INFO'}, f"Only {len(curves_to_merge)} curve(s) found for '{self.group_identifier}'. No merge needed or possible.")
-            if curves_to_merge: # If one, select it
-                bpy.ops.object.select_all(action='DESELECT')
-                try:
-                    curves_to_merge[0].select_set(True)
-                    context.view_layer.objects.active = curves_to_merge[0]
-                except ReferenceError:
-                    self.report({'WARNING'}, "The single curve found no longer exists.")
-                    return {'CANCELLED'}
             return {'FINISHED'}
 
-        if context.mode != 'OBJECT':
-            bpy.ops.object.mode_set(mode='OBJECT')
-        
-        original_active = context.view_layer.objects.active
-        original_selection = list(context.selected_objects) # Make a copy
-        
-        bpy.ops.object.select_all(action='DESELECT')
-        valid_curves_for_join = []
-        for obj in curves_to_merge:
-            if obj.name in bpy.data.objects: # Check if object still exists
-                obj.select_set(True)
-                valid_curves_for_join.append(obj)
-            else:
-                print(f"Info: Object '{obj.name}' for merge group '{self.group_identifier}' no longer exists.")
-        
-        if len(valid_curves_for_join) < 2:
-            self.report({'INFO'}, f"Not enough valid curves ({len(valid_curves_for_join)}) remaining to merge for '{self.group_identifier}'.")
-            # Restore original selection
-            bpy.ops.object.select_all(action='DESELECT')
-            for obj_sel in original_selection:
-                if obj_sel and obj_sel.name in bpy.data.objects:
-                    try: obj_sel.select_set(True)
-                    except ReferenceError: pass
-            if original_active and original_active.name in bpy.data.objects:
-                try: context.view_layer.objects.active = original_active
-                except ReferenceError: pass
-            return {'CANCELLED'}
-            
-        context.view_layer.objects.active = valid_curves_for_join[0]
-
-        try:
-            bpy.ops.object.join()
-        except RuntimeError as e:
-            self.report({'ERROR'}, f"Merge failed for group '{self.group_identifier}': {e}")
-            # Restore original selection attempt
-            bpy.ops.object.select_all(action='DESELECT')
-            for obj_sel in original_selection:
-                if obj_sel and obj_sel.name in bpy.data.objects:
-                   try: obj_sel.select_set(True)
-                   except ReferenceError: pass
-            if original_active and original_active.name in bpy.data.objects:
-                try: context.view_layer.objects.active = original_active
-                except ReferenceError: pass
-            return {'CANCELLED'}
-        
-        merged_obj = context.active_object
-        if merged_obj:
-            # Create a unique name for the merged object
-            final_name_base = f"Merged_{base_name_suffix}"
-            current_name_to_check = final_name_base
-            idx = 1
-            while current_name_to_check in bpy.data.objects and bpy.data.objects[current_name_to_check] != merged_obj:
-                current_name_to_check = f"{final_name_base}.{str(idx).zfill(3)}"
-                idx += 1
-            merged_obj.name = current_name_to_check
-            self.report({'INFO'}, f"Merged {len(valid_curves_for_join)} guides for '{self.group_identifier}' into: {merged_obj.name}")
-        else:
-            self.report({'WARNING'}, "Merge did not result in an active object.")
-            # Restore selection might be complex here if join partly failed.
+        restore_clip_sources(curves_to_merge) # Merged unclipped, re-clipped below
+        merged_count = len(curves_to_merge)
+        hidden_objs = {obj for obj in curves_to_merge if is_guide_hidden(obj, context.view_layer)} # Stay hidden
+        merged_obj = merge_curve_objects(curves_to_merge, f"Merged_{base_name_suffix}", hidden_objs)
+        if merged_obj is None:
+            self.report({'WARNING'}, f"Merge did not produce an object for '{self.group_identifier}'.")
             return {'CANCELLED'}
-
+        refresh_clip_layer(context) # The merged guide joins the clip layer, if it is on
+        self.report({'INFO'}, f"Merged {merged_count} guides for '{self.group_identifier}' into: {merged_obj.name}")
         return {'FINISHED'}
 
 
@@ -2976,7 +5716,7 @@ class PERSPECTIVE_OT_merge_guides(Operator): # This is your existing "Merge Guid
     def execute(self, context):
         guides_coll = get_guides_collection(context)
         curves_to_merge = [
-            o for o in guides_coll.objects 
+            o for o in guides_coll.all_objects
             if o.type == 'CURVE' and o.data and o.data.splines and o.name != HORIZON_CURVE_OBJ_NAME
         ]
         if not curves_to_merge:
@@ -2985,55 +5725,16 @@ class PERSPECTIVE_OT_merge_guides(Operator): # This is your existing "Merge Guid
         
         if len(curves_to_merge) < 2:
             self.report({'INFO'}, "Only one guide curve present. No merge needed.")
-            if curves_to_merge: # Select the single curve
-                bpy.ops.object.select_all(action='DESELECT')
-                try:
-                    curves_to_merge[0].select_set(True)
-                    context.view_layer.objects.active = curves_to_merge[0]
-                except ReferenceError: pass
-            return {'FINISHED'} # Or CANCELLED
-
-        if context.mode != 'OBJECT':
-            bpy.ops.object.mode_set(mode='OBJECT')
-        
-        original_active = context.view_layer.objects.active
-        original_selection = list(context.selected_objects) 
-        bpy.ops.object.select_all(action='DESELECT')
-        
-        valid_curves_for_join = []
-        for obj in curves_to_merge:
-            if obj.name in bpy.data.objects:
-                obj.select_set(True)
-                valid_curves_for_join.append(obj)
-        
-        if len(valid_curves_for_join) < 2:
-            self.report({'INFO'}, "Not enough valid curves remaining to merge.")
-            # Restore original selection
-            # ... (similar restoration as in merge_specific_guides) ...
-            return {'CANCELLED'}
-            
-        context.view_layer.objects.active = valid_curves_for_join[0]
+            return {'FINISHED'}
 
-        try:
-            bpy.ops.object.join()
-        except RuntimeError as e:
-            self.report({'ERROR'}, f"Merge all guides failed: {e}")
-            # ... (similar restoration) ...
-            return {'CANCELLED'}
-        
-        merged_obj = context.active_object
-        if merged_obj:
-            base_name = "Merged_All_Guides"
-            current_name_to_check = base_name
-            idx = 1
-            while current_name_to_check in bpy.data.objects and bpy.data.objects[current_name_to_check] != merged_obj:
-                current_name_to_check = f"{base_name}.{str(idx).zfill(3)}"
-                idx += 1
-            merged_obj.name = current_name_to_check
-            self.report({'INFO'}, f"Merged all guides into object: {merged_obj.name}")
-        else:
-            self.report({'WARNING'}, "Merge all operation did not result in an active object.")
+        restore_clip_sources(curves_to_merge) # Merged unclipped, re-clipped below
+        hidden_objs = {obj for obj in curves_to_merge if is_guide_hidden(obj, context.view_layer)} # Stay hidden
+        merged_obj = merge_curve_objects(curves_to_merge, "Merged_All_Guides", hidden_objs)
+        if merged_obj is None:
+            self.report({'WARNING'}, "Merge all operation did not produce an object.")
             return {'CANCELLED'}
+        refresh_clip_layer(context) # The merged guide joins the clip layer, if it is on
+        self.report({'INFO'}, f"Merged all guides into object: {merged_obj.name}")
         return {'FINISHED'}
 
 
@@ -3045,77 +5746,20 @@ class PERSPECTIVE_OT_merge_guides(Operator):
     def execute(self, context):
         guides_coll = get_guides_collection(context)
         # Select all curve objects in the guides collection (except the horizon curve)
-        curves_to_merge = [o for o in guides_coll.objects 
+        curves_to_merge = [o for o in guides_coll.all_objects
                            if o.type == 'CURVE' and o.data and o.data.splines and o.name != HORIZON_CURVE_OBJ_NAME]
         if not curves_to_merge:
             self.report({'INFO'}, "No guide curves found to merge.")
             return {'CANCELLED'}
         
-        # Ensure we are in Object mode
-        if context.mode != 'OBJECT':
-            bpy.ops.object.mode_set(mode='OBJECT')
-        
-        original_active = context.view_layer.objects.active
-        original_selection = list(context.selected_objects) # Make a copy
-        bpy.ops.object.select_all(action='DESELECT')
-        
-        for obj in curves_to_merge:
-            obj.select_set(True)
-        
-        if not curves_to_merge: # Should be caught earlier, but as a safeguard
-            bpy.ops.object.select_all(action='DESELECT') # Restore selection
-            for obj in original_selection:
-                if obj and obj.name in bpy.data.objects: # Check if obj still exists
-                   try: obj.select_set(True)
-                   except ReferenceError: pass
-            context.view_layer.objects.active = original_active
-            self.report({'ERROR'}, "No curves were selected for merging.")
-            return {'CANCELLED'}
-            
-        context.view_layer.objects.active = curves_to_merge[0]
-
-        try:
-            bpy.ops.object.join()
-        except RuntimeError as e:
-            self.report({'ERROR'}, f"Merge failed: {e}")
-            # Restore selection before returning
-            bpy.ops.object.select_all(action='DESELECT')
-            for obj in original_selection:
-                if obj and obj.name in bpy.data.objects:
-                   try: obj.select_set(True)
-                   except ReferenceError: pass
-            context.view_layer.objects.active = original_active
-            return {'CANCELLED'}
-        
-        merged_obj = context.active_object
-        if merged_obj:
-            self.report({'INFO'}, f"Merged guides into object: {merged_obj.name}")
-        else:
-            self.report({'WARNING'}, "Merge operation did not result in an active object.")
-            # Attempt to restore selection
-            bpy.ops.object.select_all(action='DESELECT')
-            for obj in original_selection:
-                if obj and obj.name in bpy.data.objects:
-                   try: obj.select_set(True)
-                   except ReferenceError: pass
-            context.view_layer.objects.active = original_active
+        restore_clip_sources(curves_to_merge) # Merged unclipped, re-clipped below
+        hidden_objs = {obj for obj in curves_to_merge if is_guide_hidden(obj, context.view_layer)} # Stay hidden
+        merged_obj = merge_curve_objects(curves_to_merge, hidden_objects=hidden_objs) # Keeps the first guide's name, as a join would
+        if merged_obj is None:
+            self.report({'WARNING'}, "Merge operation did not produce an object.")
             return {'CANCELLED'}
-
-
-        # Restore original selection (optional, but good practice if they weren't part of the merge)
-        # For this operator, the merged object becomes the new selection.
-        # If you want to restore the previous broader selection, uncomment:
-        # bpy.ops.object.select_all(action='DESELECT')
-        # for obj in original_selection:
-        #     if obj and obj.name in bpy.data.objects and obj.name != merged_obj.name:
-        #         try: obj.select_set(True)
-        #         except ReferenceError: pass
-        # if merged_obj and merged_obj.name in bpy.data.objects: # Ensure merged object remains selected
-        #    merged_obj.select_set(True)
-        #    context.view_layer.objects.active = merged_obj
-        # else:
-        #    context.view_layer.objects.active = original_active
-
+        refresh_clip_layer(context) # The merged guide joins the clip layer, if it is on
+        self.report({'INFO'}, f"Merged guides into object: {merged_obj.name}")
         return {'FINISHED'}
 
 
@@ -3126,6 +5770,24 @@ class PERSPECTIVE_OT_generate_horizon_spline(Operator):
     bl_idname = "perspective_splines.generate_horizon"
     bl_label = "Create/Set Horizon Ctrl & Visual"
     bl_options = {'REGISTER', 'UNDO'}
+    @staticmethod
+    def create_horizon_curve_object(context):
+        tool_settings = context.scene.perspective_tool_settings_splines
+        guides_coll = get_guides_collection(context)
+        hz_len = tool_settings.horizon_line_length / 2.0
+        # Points for the horizon curve visual should be relative to its object origin (0,0,0)
+        # The update_dynamic_horizon_line_curve function handles setting world space coords.
+        # For initial creation, we can use simple points, they will be updated.
+        pts = [Vector((-hz_len, 0, 0)), Vector((hz_len, 0, 0))]
+        col = list(tool_settings.horizon_line_color) # Get the RGBA color from settings
+        horizon_curve_obj = create_curve_object(context, HORIZON_CURVE_OBJ_NAME, [pts], guides_coll,
+                                                bevel_depth=tool_settings.horizon_line_thickness,
+                                                opacity=col[3], color_rgb=col[:3], # Pass opacity and color_rgb separately
+                                                material_style=None) # Own material, recoloured live from the settings
+        if horizon_curve_obj:
+            tag_owned_object(horizon_curve_obj, 'HORIZON', 'CURVE')
+        return horizon_curve_obj
+
     def execute(self, context):
         tool_settings = context.scene.perspective_tool_settings_splines
         helpers_coll = get_helpers_collection(context)
@@ -3133,22 +5795,15 @@ class PERSPECTIVE_OT_generate_horizon_spline(Operator):
         if not horizon_ctrl:
             horizon_ctrl = bpy.data.objects.new(HORIZON_CTRL_OBJ_NAME, None)
             helpers_coll.objects.link(horizon_ctrl)
+            tag_owned_object(horizon_ctrl, 'HORIZON', 'CONTROL')
             horizon_ctrl.empty_display_type = 'CIRCLE'
             horizon_ctrl.empty_display_size = 0.5
         horizon_ctrl.location = Vector((0, 0, tool_settings.horizon_y_level))
 
         horizon_curve_obj = get_horizon_curve_object()
-        if not horizon_curve_obj:
-            guides_coll = get_guides_collection(context)
-            hz_len = tool_settings.horizon_line_length / 2.0
-            # Points for the horizon curve visual should be relative to its object origin (0,0,0)
-            # The update_dynamic_horizon_line_curve function handles setting world space coords.
-            # For initial creation, we can use simple points, they will be updated.
-            pts = [Vector((-hz_len, 0, 0)), Vector((hz_len, 0, 0))]
-            col = list(tool_settings.horizon_line_color) # Get the RGBA color from settings
-            horizon_curve_obj = create_curve_object(context, HORIZON_CURVE_OBJ_NAME, [pts], guides_coll,
-                                        bevel_depth=tool_settings.horizon_line_thickness,
-                                        opacity=col[3], color_rgb=col[:3]) # Pass opacity and color_rgb separately
+        # With the overlay backend the horizon is drawn from the overlay buffers, not as a curve object.
+        if not horizon_curve_obj and tool_settings.guide_display_backend != 'OVERLAY':
+            horizon_curve_obj = self.create_horizon_curve_object(context)
             if not horizon_curve_obj:
                 self.report({'ERROR'}, "Failed to create horizon visual line.")
                 return {'CANCELLED'}
@@ -3161,6 +5816,70 @@ class PERSPECTIVE_OT_generate_horizon_spline(Operator):
         self.report({'INFO'}, f"Horizon elements set. Ctrl Z: {tool_settings.horizon_y_level:.2f}")
         return {'FINISHED'}
 
+class PERSPECTIVE_OT_bake_guide_overlay(Operator):
+    """Turn the overlay guides and horizon of the current perspective mode into curve objects"""
+    bl_idname = "perspective_splines.bake_guide_overlay"
+    bl_label = "Bake Overlay Guides"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        ts = context.scene.perspective_tool_settings_splines
+        baked_lines = 0
+        for family_key in overlay_guide_families(ts):
+            baked_lines += regenerate_guide_family(context, family_key, to_curves=True) or 0
+        if not get_horizon_curve_object() and compute_horizon_line_points(ts):
+            PERSPECTIVE_OT_generate_horizon_spline.create_horizon_curve_object(context)
+            update_dynamic_horizon_line_curve(context)
+        invalidate_guide_overlay()
+        self.report({'INFO'}, f"Baked {baked_lines} overlay guide lines into curve objects.")
+        return {'FINISHED'}
+
+class PERSPECTIVE_OT_dump_log(Operator):
+    """Write the in-memory log buffer to a text datablock"""
+    bl_idname = "perspective_splines.dump_log"
+    bl_label = "Dump Log"
+    bl_options = {'REGISTER'}
+
+    clear_buffer: BoolProperty(name="Clear Buffer", description="Empty the log buffer after dumping", default=False)
+
+    def execute(self, context):
+        lines = _log_ring_handler.dump_lines()
+        text = bpy.data.texts.get(LOG_TEXT_NAME) or bpy.data.texts.new(LOG_TEXT_NAME)
+        text.clear()
+        text.write("\n".join(lines) + "\n" if lines else "")
+        if self.clear_buffer:
+            _log_ring_handler.records.clear()
+        self.report({'INFO'}, f"Wrote {len(lines)} log records to text '{text.name}'.")
+        return {'FINISHED'}
+
+class PERSPECTIVE_OT_reset_profile_stats(Operator):
+    """Discard all recorded profiling statistics"""
+    bl_idname = "perspective_splines.reset_profile_stats"
+    bl_label = "Reset Profile"
+    bl_options = {'REGISTER'}
+
+    def execute(self, context):
+        reset_profile_stats()
+        return {'FINISHED'}
+
+class PERSPECTIVE_OT_export_profile_stats(Operator, ExportHelper):
+    """Export the recorded profiling statistics to a JSON file"""
+    bl_idname = "perspective_splines.export_profile_stats"
+    bl_label = "Export Profile (JSON)"
+    bl_options = {'REGISTER'}
+
+    filename_ext = ".json"
+    filter_glob: StringProperty(default="*.json", options={'HIDDEN'})
+
+    def execute(self, context):
+        try:
+            n_entries = export_profile_stats(self.filepath)
+        except OSError as e:
+            self.report({'ERROR'}, f"Could not write profile: {e}")
+            return {'CANCELLED'}
+        self.report({'INFO'}, f"Exported {n_entries} profile entries to {self.filepath}")
+        return {'FINISHED'}
+
 class PERSPECTIVE_OT_add_vanishing_point_empty(Operator):
     bl_idname = "perspective_splines.add_vp_empty"
     bl_label = "Add Generic VP Empty"
@@ -3180,7 +5899,7 @@ class PERSPECTIVE_OT_add_vanishing_point_empty(Operator):
         try:
             update_dynamic_horizon_line_curve(context)
             update_vp_empty_colors(tool_settings, context)
-        except Exception as e: print(f"Error in updates post add_vp_empty: {e}")
+        except Exception as e: vp_log.error("Error in updates post add_vp_empty: %s", e)
         return {'FINISHED'}
 
 class PERSPECTIVE_OT_remove_selected_helper_empty(Operator):
@@ -3200,9 +5919,9 @@ class PERSPECTIVE_OT_remove_selected_helper_empty(Operator):
         except: pass # Ignore if already gone
         if is_hz_ctrl:
             try: bpy.ops.perspective_splines.clear_horizon('EXEC_DEFAULT')
-            except Exception as e: print(f"Error clearing horizon after ctrl removal: {e}")
+            except Exception as e: horizon_log.error("Error clearing horizon after ctrl removal: %s", e)
         try: update_dynamic_horizon_line_curve(context)
-        except Exception as e: print(f"Error updating horizon after helper removal: {e}")
+        except Exception as e: horizon_log.error("Error updating horizon after helper removal: %s", e)
         self.report({'INFO'}, f"Removed helper: {name}.")
         return {'FINISHED'}
 
@@ -3216,11 +5935,11 @@ class PERSPECTIVE_OT_clear_type_guides_splines(Operator):
         tool_settings = context.scene.perspective_tool_settings_splines
         type_key = self.type_filter_prop if self.type_filter_prop else tool_settings.current_perspective_type # Fallback to current if no prop
         
-        print(f"--- PERSPECTIVE_OT_clear_type_guides_splines: Attempting to clear for type_key: '{type_key}' ---") # DEBUG
+        mode_log.debug("--- PERSPECTIVE_OT_clear_type_guides_splines: Attempting to clear for type_key: '%s' ---", type_key)
 
         if type_key == 'NONE' and not self.type_filter_prop: # If type_key is genuinely NONE from current mode and no filter_prop
             self.report({'INFO'}, "No specific perspective type active to clear.")
-            print("  DEBUG clear_type_guides: Type is NONE and no filter_prop, nothing to clear here.") # DEBUG
+            mode_log.debug("Type is NONE and no filter_prop, nothing to clear here.")
             return {'CANCELLED'}
         
         vp_prefixes_remove, guide_prefixes_clear = [], []
@@ -3238,43 +5957,35 @@ class PERSPECTIVE_OT_clear_type_guides_splines(Operator):
             vp_prefixes_remove.append(VP_TYPE_SPECIFIC_PREFIX_MAP['FISH_EYE'])
             guide_prefixes_clear.append("FE_Guides")
         else:
-            print(f"  DEBUG clear_type_guides: Unknown type_key '{type_key}', no VP prefixes defined for clearing.") # DEBUG
+            mode_log.debug("Unknown type_key '%s', no VP prefixes defined for clearing.", type_key)
             # No VPs to clear based on unknown type, but still try to clear general guides if any were associated
             # This path should ideally not be taken if type_key is always valid from the enum.
 
         helpers_collection = get_helpers_collection(context)
         all_vps_in_helpers = [obj for obj in helpers_collection.objects if obj.type == 'EMPTY' and obj.name.startswith(VP_PREFIX)]
         
-        print(f"  DEBUG clear_type_guides: Found VPs in helpers_collection: {[vp.name for vp in all_vps_in_helpers]}") # DEBUG
-        print(f"  DEBUG clear_type_guides: Target VP prefixes for removal: {vp_prefixes_remove}") # DEBUG
+        mode_log.debug("Found VPs in helpers_collection: %s", [vp.name for vp in all_vps_in_helpers])
+        mode_log.debug("Target VP prefixes for removal: %s", vp_prefixes_remove)
         
-        vps_removed_count = 0
-        for prefix_to_remove in vp_prefixes_remove:
-            print(f"    DEBUG clear_type_guides: Processing prefix: '{prefix_to_remove}'") # DEBUG
-            for vp in list(all_vps_in_helpers): # Iterate a copy if modifying the source list (though remove from bpy.data)
-                if vp.name in bpy.data.objects: # Check if it wasn't already removed
-                    if vp.name.startswith(prefix_to_remove):
-                        print(f"      DEBUG clear_type_guides: MATCH! Attempting to remove VP: {vp.name}") # DEBUG
-                        try:
-                            bpy.data.objects.remove(vp, do_unlink=True)
-                            vps_removed_count +=1
-                            # We might need to remove it from all_vps_in_helpers if we iterate it multiple times,
-                            # but since we iterate bpy.data.objects it should be fine.
-                        except Exception as e:
-                            print(f"      DEBUG clear_type_guides: Error removing {vp.name}: {e}")
+        vps_to_remove = [vp for vp in all_vps_in_helpers if vp.name.startswith(tuple(vp_prefixes_remove))]
+        mode_log.debug("VPs to remove: %s", [vp.name for vp in vps_to_remove])
         
-        guides_cleared_count = 0
+        guide_objs, ranges_cleared_count = [], 0
         if guide_prefixes_clear:
-            print(f"  DEBUG clear_type_guides: Guide prefixes to clear: {guide_prefixes_clear}") # DEBUG
-            guides_cleared_count = clear_guides_with_prefix(context, guide_prefixes_clear)
+            mode_log.debug("Guide prefixes to clear: %s", guide_prefixes_clear)
+            guide_objs, ranges_cleared_count = collect_guide_clear_targets(context, guide_prefixes_clear)
+        # VPs and guides (with their curves and orphaned materials) go in one batch
+        batch_remove_objects(vps_to_remove + guide_objs)
+        vps_removed_count = len(vps_to_remove)
+        guides_cleared_count = len(guide_objs) + ranges_cleared_count
         
         try:
             update_dynamic_horizon_line_curve(context)
         except Exception as e:
-            print(f"  Error updating horizon after type clear: {e}")
+            horizon_log.error("Error updating horizon after type clear: %s", e)
             
         self.report({'INFO'}, f"Cleared {vps_removed_count} VPs & {guides_cleared_count} guide groups for: {type_key}.")
-        print(f"--- PERSPECTIVE_OT_clear_type_guides_splines: Finished for '{type_key}' ---") # DEBUG
+        mode_log.debug("--- PERSPECTIVE_OT_clear_type_guides_splines: Finished for '%s' ---", type_key)
         return {'FINISHED'}
 
 
@@ -3294,21 +6005,10 @@ class PERSPECTIVE_OT_clear_horizon_spline(Operator):
     bl_label = "Clear Horizon Elements"
     bl_options = {'REGISTER', 'UNDO'}
     def execute(self, context):
-        cleared = 0
-        hz_ctrl = get_horizon_control_object()
-        if hz_ctrl:
-            try: bpy.data.objects.remove(hz_ctrl, do_unlink=True); cleared+=1
-            except: pass
-        hz_curve = get_horizon_curve_object()
-        if hz_curve:
-            try:
-                if hz_curve.data and hz_curve.data.name in bpy.data.curves and hz_curve.data.users <=1:
-                    bpy.data.curves.remove(hz_curve.data)
-                bpy.data.objects.remove(hz_curve, do_unlink=True); cleared+=1
-            except: pass
+        cleared = batch_remove_objects([obj for obj in (get_horizon_control_object(), get_horizon_curve_object()) if obj])
         self.report({'INFO'}, "Horizon elements cleared." if cleared > 0 else "No horizon elements to clear.")
         try: update_dynamic_horizon_line_curve(context) # Should effectively hide it
-        except Exception as e: print(f"Error updating horizon after clear_horizon: {e}")
+        except Exception as e: horizon_log.error("Error updating horizon after clear_horizon: %s", e)
         return {'FINISHED'}
 
 class PERSPECTIVE_OT_clear_all_perspective_splines(Operator):
@@ -3316,17 +6016,14 @@ class PERSPECTIVE_OT_clear_all_perspective_splines(Operator):
     bl_label = "Clear ALL Perspective Helpers"
     bl_options = {'REGISTER', 'UNDO'}
     def execute(self, context):
-        print("Attempting to clear ALL perspective data...")
-        for vp in get_vanishing_points(): # Get all VPs regardless of type
-            try: bpy.data.objects.remove(vp, do_unlink=True)
-            except Exception as e: print(f"  Failed to remove VP {vp.name}: {e}")
-        try: bpy.ops.perspective_splines.clear_horizon('EXEC_DEFAULT')
-        except Exception as e: print(f"  Failed to clear horizon elements: {e}")
+        mode_log.info("Attempting to clear ALL perspective data...")
         all_guide_prefixes = ["1P_Guides", "2P_Guides_VP1", "2P_Guides_VP2", "2P_Guides_Vertical",
                               "3P_Guides_H1", "3P_Guides_H2", "3P_Guides_V", "FE_Guides"]
-        clear_guides_with_prefix(context, all_guide_prefixes)
+        guide_objs, _ = collect_guide_clear_targets(context, all_guide_prefixes)
+        # VPs (regardless of type), horizon elements and guides go in one batch
+        batch_remove_objects(get_vanishing_points() + owned_objects('HORIZON') + guide_objs)
         try: update_dynamic_horizon_line_curve(context)
-        except Exception as e: print(f"  Error updating horizon post clear all: {e}")
+        except Exception as e: horizon_log.error("Error updating horizon post clear all: %s", e)
         self.report({'INFO'}, "Cleared ALL perspective data.")
         return {'FINISHED'}
 
@@ -3337,7 +6034,7 @@ class PERSPECTIVE_OT_generate_one_point_splines(Operator):
     
     @classmethod
     def create_default_one_point(cls, context):
-        print("DEBUG: create_default_one_point CALLED") 
+        vp_log.debug("create_default_one_point CALLED") 
         ts = context.scene.perspective_tool_settings_splines
         vp_name_1p = VP_TYPE_SPECIFIC_PREFIX_MAP['ONE_POINT'] + "_1"
         
@@ -3359,16 +6056,16 @@ class PERSPECTIVE_OT_generate_one_point_splines(Operator):
         if vp_1p_obj: # Re-fetch or use returned object
             if not existing_vp: # If it was newly created
                  vp_1p_obj.location = initial_loc_for_new # Ensure new ones get the default
-                 print(f"DEBUG create_default_one_point: VP '{vp_name_1p}' created at {initial_loc_for_new}.")
+                 vp_log.debug("VP '%s' created at %s.", vp_name_1p, initial_loc_for_new)
             else:
-                 print(f"DEBUG create_default_one_point: VP '{vp_name_1p}' found/ensured at {vp_1p_obj.location}.")
+                 vp_log.debug("VP '%s' found/ensured at %s.", vp_name_1p, vp_1p_obj.location)
 
             # Sync horizon_y_level to the VP_1P_1's Z
             if abs(ts.horizon_y_level - vp_1p_obj.location.z) > 0.001:
-                print(f"DEBUG create_default_one_point: Syncing horizon_y_level from {ts.horizon_y_level} to VP_1P_1.z {vp_1p_obj.location.z}")
+                vp_log.debug("Syncing horizon_y_level from %s to VP_1P_1.z %s", ts.horizon_y_level, vp_1p_obj.location.z)
                 ts.horizon_y_level = vp_1p_obj.location.z 
         else:
-            print(f"DEBUG create_default_one_point: CRITICAL - VP '{vp_name_1p}' could not be assured.")
+            vp_log.critical("VP '%s' could not be assured.", vp_name_1p)
     
     def execute(self, context):
         ts = context.scene.perspective_tool_settings_splines
@@ -3378,74 +6075,40 @@ class PERSPECTIVE_OT_generate_one_point_splines(Operator):
             try:
                 bpy.ops.perspective_splines.generate_horizon('EXEC_DEFAULT')
             except Exception as e:
-                print(f"Error ensuring horizon for 1P (no VP, no HC): {e}")
+                horizon_log.error("Error ensuring horizon for 1P (no VP, no HC): %s", e)
 
         PERSPECTIVE_OT_generate_one_point_splines.create_default_one_point(context)
         
-        vps = get_vanishing_points('ONE_POINT') 
-        if not vps:
+        vp = get_vp_by_role('1P')
+        if not vp:
             self.report({'ERROR'}, "1P VP not found or could not be created.")
             return {'CANCELLED'}
         
-        if abs(ts.horizon_y_level - vps[0].location.z) > 0.001 :
-             ts.horizon_y_level = vps[0].location.z 
+        if abs(ts.horizon_y_level - vp.location.z) > 0.001 :
+             ts.horizon_y_level = vp.location.z 
 
         try: update_vp_empty_colors(ts, context)
-        except Exception as e: print(f"Error updating VP colors for 1P: {e}")
+        except Exception as e: vp_log.error("Error updating VP colors for 1P: %s", e)
         
         guides_coll = get_guides_collection(context)
-        clear_guides_with_prefix(context, ["1P_Guides"]) # Clear existing 1P guides
-        vp_loc = vps[0].location.copy()
-        spline_data = []
-        ext = ts.one_point_line_extension
+        # Radial lines plus the optional horizontal / vertical parallels, as one array
+        spline_data, _ = build_guide_family_lines('1P', ts, (vp.location,))
 
-        if ts.one_point_draw_radial:
-            spline_data.extend(generate_radial_lines_in_plane(vp_loc, ts.one_point_grid_density_radial, ext, 'XZ'))
-        
-        if ts.one_point_draw_ortho_x:
-            half_grid_world_extent_x = ts.one_point_grid_extent * ext * 0.5 
-            vertical_spacing_world = ts.one_point_grid_extent * ext * 0.2 
-            density_x = ts.one_point_grid_density_ortho_x
-            for i in range(density_x + 1):
-                off_z_factor = (i / density_x - 0.5) * 2.0 if density_x > 0 else 0 
-                curr_z = vp_loc.z + off_z_factor * (vertical_spacing_world / 2.0)
-                spline_data.append([
-                    Vector((vp_loc.x - half_grid_world_extent_x, vp_loc.y, curr_z)),
-                    Vector((vp_loc.x + half_grid_world_extent_x, vp_loc.y, curr_z))
-                ])
-        
-        if ts.one_point_draw_ortho_y:
-            half_grid_world_extent_z = ts.one_point_grid_extent * ext * 0.5 
-            horizontal_spacing_world = ts.one_point_grid_extent * ext * 0.2 
-            density_y = ts.one_point_grid_density_ortho_y
-            for i in range(density_y + 1):
-                off_x_factor = (i / density_y - 0.5) * 2.0 if density_y > 0 else 0
-                curr_x = vp_loc.x + off_x_factor * (horizontal_spacing_world / 2.0)
-                spline_data.append([
-                    Vector((curr_x, vp_loc.y, vp_loc.z - half_grid_world_extent_z)),
-                    Vector((curr_x, vp_loc.y, vp_loc.z + half_grid_world_extent_z))
-                ])
-
-        if not spline_data:
+        if len(spline_data) == 0:
+            clear_guide_family(context, '1P')
             self.report({'INFO'}, "No 1P lines to generate based on current settings.")
             try: update_dynamic_horizon_line_curve(context)
-            except Exception as e: print(f"Error updating horizon (no 1P lines generated): {e}")
+            except Exception as e: horizon_log.error("Error updating horizon (no 1P lines generated): %s", e)
             return {'FINISHED'}
 
-        # <<<< MODIFICATION IS HERE >>>>
         opac = ts.guide_curves_opacity # Get global opacity from settings
         thickness = ts.guide_curves_thickness # Get global thickness
-        created_count = 0
-        for i, pts_list in enumerate(spline_data): 
-            # Call create_curve_object WITHOUT the color_rgb argument
-            if create_curve_object(context, f"1P_Guides_{i+1}", [pts_list], guides_coll,
-                                thickness, opac): # Pass thickness and opacity
-                created_count +=1
-        # <<<< END OF MODIFICATION >>>>
-                                
-        self.report({'INFO'}, f"Generated {created_count} 1P line objects.")
+        # Colors are left random (no color_rgb argument)
+        created_count = emit_guide_family(context, '1P', spline_data, guides_coll, thickness, opac)
+
+        self.report({'INFO'}, f"Generated {created_count} 1P lines.")
         try: update_dynamic_horizon_line_curve(context)
-        except Exception as e: print(f"Error updating horizon after 1P gen: {e}")
+        except Exception as e: horizon_log.error("Error updating horizon after 1P gen: %s", e)
         return {'FINISHED'}
 
 
@@ -3462,14 +6125,14 @@ class PERSPECTIVE_OT_create_2p_vps_if_needed(Operator):
 
     @classmethod
     def create_default_two_point_vps(cls, context):
-        print("DEBUG: create_default_two_point_vps CALLED")
+        vp_log.debug("create_default_two_point_vps CALLED")
         ts = context.scene.perspective_tool_settings_splines
         prefix = VP_TYPE_SPECIFIC_PREFIX_MAP['TWO_POINT']
         
         horizon_z_level = ts.horizon_y_level 
         horizon_ctrl = get_horizon_control_object()
         if not horizon_ctrl:
-            print("DEBUG create_default_two_point_vps: No horizon control, generating one.")
+            vp_log.debug("No horizon control, generating one.")
             bpy.ops.perspective_splines.generate_horizon('EXEC_DEFAULT')
             horizon_ctrl = get_horizon_control_object() # Attempt to get it again
         
@@ -3477,12 +6140,12 @@ class PERSPECTIVE_OT_create_2p_vps_if_needed(Operator):
             horizon_z_level = horizon_ctrl.location.z
             if abs(ts.horizon_y_level - horizon_z_level) > 0.001:
                 ts.horizon_y_level = horizon_z_level # Sync property to actual control Z
-                print(f"DEBUG create_default_two_point_vps: Synced ts.horizon_y_level to Horizon Control Z: {horizon_z_level}")
+                vp_log.debug("Synced ts.horizon_y_level to Horizon Control Z: %s", horizon_z_level)
         else:
-             print("DEBUG create_default_two_point_vps: Failed to ensure horizon control, using ts.horizon_y_level for new VPs.")
+             horizon_log.warning("Failed to ensure horizon control, using ts.horizon_y_level for new VPs.")
 
 
-        print(f"DEBUG create_default_two_point_vps: Target horizon Z for VPs: {horizon_z_level}")
+        vp_log.debug("Target horizon Z for VPs: %s", horizon_z_level)
 
         vp_definitions = [
             {"name_suffix": "_1", "default_x_offset": -10.0, "color_prop": ts.two_point_vp1_empty_color},
@@ -3495,7 +6158,7 @@ class PERSPECTIVE_OT_create_2p_vps_if_needed(Operator):
             existing_vp = bpy.data.objects.get(vp_name)
 
             if existing_vp:
-                print(f"DEBUG create_default_two_point_vps: VP '{vp_name}' exists. Ensuring Z is on horizon {horizon_z_level}.")
+                vp_log.debug("VP '%s' exists. Ensuring Z is on horizon %s.", vp_name, horizon_z_level)
                 current_loc = existing_vp.location.copy()
                 if abs(current_loc.z - horizon_z_level) > 0.001 :
                     current_loc.z = horizon_z_level
@@ -3503,7 +6166,7 @@ class PERSPECTIVE_OT_create_2p_vps_if_needed(Operator):
                 add_vp_empty_if_missing(context, vp_name, current_loc, vp_color) 
             else: 
                 initial_loc = Vector((vp_def["default_x_offset"], 0.0, horizon_z_level))
-                print(f"DEBUG create_default_two_point_vps: Creating NEW VP: '{vp_name}' at {initial_loc}")
+                vp_log.debug("Creating NEW VP: '%s' at %s", vp_name, initial_loc)
                 add_vp_empty_if_missing(context, vp_name, initial_loc, vp_color)
 
 
@@ -3516,25 +6179,19 @@ class PERSPECTIVE_OT_generate_2p_vp1_lines(Operator):
         ts = context.scene.perspective_tool_settings_splines
         bpy.ops.perspective_splines.create_2p_vps_if_needed()
 
-        vps = get_vanishing_points('TWO_POINT')
-        if not vps:
+        vp1 = get_vp_by_role('2P_1')
+        if not vp1:
             self.report({'ERROR'}, "2P VP1 not found. Create VPs first."); return {'CANCELLED'}
-        vp1 = vps[0] # Assumes sorted, VP_2P_1
 
         guides_coll = get_guides_collection(context)
-        clear_guides_with_prefix(context, ["2P_Guides_VP1_"]) # Note the underscore
-        ext = ts.two_point_line_extension
-        
-        lines_data = generate_radial_lines_in_plane(vp1.location.copy(), ts.two_point_grid_density_vp1, ext, 'XZ')
-        if not lines_data:
+        lines_data, _ = build_guide_family_lines('2P_VP1', ts, (vp1.location,))
+        if len(lines_data) == 0:
+            clear_guide_family(context, '2P_VP1')
             self.report({'INFO'}, "No VP1 lines to generate."); return {'FINISHED'}
         
         opac = ts.guide_curves_opacity
         thickness = ts.guide_curves_thickness
-        created_count = 0
-        for i, pts_list in enumerate(lines_data):
-            if create_curve_object(context, f"2P_Guides_VP1_{i+1}", [pts_list], guides_coll, thickness, opac):
-                created_count += 1
+        created_count = emit_guide_family(context, '2P_VP1', lines_data, guides_coll, thickness, opac)
         self.report({'INFO'}, f"Generated {created_count} 2P VP1 lines.")
         update_dynamic_horizon_line_curve(context)
         return {'FINISHED'}
@@ -3548,25 +6205,19 @@ class PERSPECTIVE_OT_generate_2p_vp2_lines(Operator):
         ts = context.scene.perspective_tool_settings_splines
         bpy.ops.perspective_splines.create_2p_vps_if_needed()
 
-        vps = get_vanishing_points('TWO_POINT')
-        if len(vps) < 2:
+        vp2 = get_vp_by_role('2P_2')
+        if not vp2:
             self.report({'ERROR'}, "2P VP2 not found. Create VPs first."); return {'CANCELLED'}
-        vp2 = vps[1] # Assumes sorted, VP_2P_2
 
         guides_coll = get_guides_collection(context)
-        clear_guides_with_prefix(context, ["2P_Guides_VP2_"]) # Note the underscore
-        ext = ts.two_point_line_extension
-        
-        lines_data = generate_radial_lines_in_plane(vp2.location.copy(), ts.two_point_grid_density_vp2, ext, 'XZ')
-        if not lines_data:
+        lines_data, _ = build_guide_family_lines('2P_VP2', ts, (vp2.location,))
+        if len(lines_data) == 0:
+            clear_guide_family(context, '2P_VP2')
             self.report({'INFO'}, "No VP2 lines to generate."); return {'FINISHED'}
 
         opac = ts.guide_curves_opacity
         thickness = ts.guide_curves_thickness
-        created_count = 0
-        for i, pts_list in enumerate(lines_data):
-            if create_curve_object(context, f"2P_Guides_VP2_{i+1}", [pts_list], guides_coll, thickness, opac):
-                created_count +=1
+        created_count = emit_guide_family(context, '2P_VP2', lines_data, guides_coll, thickness, opac)
         self.report({'INFO'}, f"Generated {created_count} 2P VP2 lines.")
         update_dynamic_horizon_line_curve(context)
         return {'FINISHED'}
@@ -3580,44 +6231,21 @@ class PERSPECTIVE_OT_generate_2p_vertical_lines(Operator):
         ts = context.scene.perspective_tool_settings_splines
         bpy.ops.perspective_splines.create_2p_vps_if_needed() # Ensure VPs exist for context
 
-        vps = get_vanishing_points('TWO_POINT')
-        if len(vps) < 2:
+        vp1, vp2 = get_vp_by_role('2P_1'), get_vp_by_role('2P_2')
+        if not vp1 or not vp2:
             self.report({'ERROR'}, "2P VPs not found for vertical line generation."); return {'CANCELLED'}
-        vp1_loc, vp2_loc = vps[0].location.copy(), vps[1].location.copy()
+        vp1_loc, vp2_loc = vp1.location.copy(), vp2.location.copy()
 
         guides_coll = get_guides_collection(context)
-        clear_guides_with_prefix(context, ["2P_Guides_Vertical_"]) # Note the underscore
-        
-        verts_data = []
-        num_verts = ts.two_point_grid_density_vertical
-        if num_verts >= 0:
-            h = ts.two_point_grid_height
-            y_off = ts.two_point_grid_depth_offset
-            x_space = ts.two_point_verticals_x_spacing_factor
-            avg_vp_x = (vp1_loc.x + vp2_loc.x) / 2.0
-            avg_vp_y = (vp1_loc.y + vp2_loc.y) / 2.0 
-            horizon_z = vp1_loc.z 
-            vp_x_dist = abs(vp1_loc.x - vp2_loc.x)
-            ext_fallback = ts.two_point_line_extension # Use this if VPs are too close
-            spread_width = vp_x_dist * x_space if vp_x_dist > 0.1 else ext_fallback * 0.5 * x_space
-            start_x = avg_vp_x - spread_width / 2.0
-            plane_y = avg_vp_y + y_off
-            
-            for i in range(num_verts + 1): 
-                t = (i / num_verts) if num_verts > 0 else 0.5 
-                curr_x = start_x + t * spread_width
-                verts_data.append([Vector((curr_x, plane_y, horizon_z - h/2.0)), 
-                                   Vector((curr_x, plane_y, horizon_z + h/2.0))])
+        verts_data, _ = build_guide_family_lines('2P_VERTICAL', ts, (vp1_loc, vp2_loc))
         
-        if not verts_data:
+        if len(verts_data) == 0:
+            clear_guide_family(context, '2P_VERTICAL')
             self.report({'INFO'}, "No Vertical lines to generate."); return {'FINISHED'}
 
         opac = ts.guide_curves_opacity
         thickness = ts.guide_curves_thickness
-        created_count = 0
-        for i, pts_list in enumerate(verts_data):
-            create_curve_object(context, f"2P_Guides_Vertical_{i+1}", [pts_list], guides_coll, thickness, opac)
-            created_count += 1
+        created_count = emit_guide_family(context, '2P_VERTICAL', verts_data, guides_coll, thickness, opac)
         self.report({'INFO'}, f"Generated {created_count} 2P Vertical lines.")
         update_dynamic_horizon_line_curve(context)
         return {'FINISHED'}
@@ -3643,6 +6271,7 @@ class PERSPECTIVE_OT_generate_fish_eye_splines(Operator):
                     if coll != helpers_coll:
                         coll.objects.unlink(existing_vp)
                 helpers_coll.objects.link(existing_vp)
+                invalidate_vp_registry()
             if tuple(round(c, 4) for c in existing_vp.color) != tuple(round(c, 4) for c in vp_color):
                 existing_vp.color = vp_color
                 update_vp_empty_colors(ts, context)
@@ -3654,7 +6283,6 @@ class PERSPECTIVE_OT_generate_fish_eye_splines(Operator):
         update_dynamic_horizon_line_curve(context)
 
     def execute(self, context):
-        from mathutils import Euler
         ts = context.scene.perspective_tool_settings_splines
         self.create_default_fish_eye_center(context)
         fe_centers = get_vanishing_points('FISH_EYE')
@@ -3663,135 +6291,19 @@ class PERSPECTIVE_OT_generate_fish_eye_splines(Operator):
             return {'CANCELLED'}
         fe_center_obj = fe_centers[0]
         guides_coll = get_guides_collection(context)
-        clear_guides_with_prefix(context, ["FE_Guides_"])
-        center_loc = fe_center_obj.location.copy()
-        n_lon = ts.fish_eye_grid_radial
-        n_lat = ts.fish_eye_grid_concentric
-        segs = ts.fish_eye_segments_per_curve
-        radius = ts.fish_eye_grid_radius
-        h_scale = ts.fish_eye_horizontal_scale
-        front_only = getattr(ts, "fish_eye_front_only", True)
-        draw_1p = getattr(ts, "fish_eye_draw_1p", True)
-
-        # Main sphere uses a fixed default rotation.
-        rot_euler = Euler((math.radians(90.0), math.radians(90.0), 0.0), 'XYZ')
-
-        # Get the new user-controlled orientation for the 1P grid.
-        rot_1p_x = math.radians(getattr(ts, "one_point_orientation_x", 90.0))
-        rot_1p_y = math.radians(getattr(ts, "one_point_orientation_y", 90.0))
-        rot_1p_z = math.radians(getattr(ts, "one_point_orientation_z", 0.0))
-        one_point_rot_euler = Euler((rot_1p_x, rot_1p_y, rot_1p_z), 'XYZ')
-
-        curves_data_to_create = []
-
-        # --- Generate longitude lines (meridians) ---
-        if n_lon > 0 and segs > 1:
-            for i in range(n_lon):
-                phi = (2 * math.pi * i) / n_lon
-                pts_longitude = []
-                for j in range(segs + 1):
-                    theta = math.pi * j / segs
-                    x = radius * math.cos(theta)
-                    y = radius * math.sin(theta) * math.cos(phi) * h_scale
-                    z = radius * math.sin(theta) * math.sin(phi)
-                    pt = Vector((x, y, z))
-                    pt_rot = pt.copy()
-                    pt_rot.rotate(rot_euler)
-                    if front_only and pt_rot.y > 0:
-                        continue
-                    pts_longitude.append(center_loc + pt_rot)
-                if len(pts_longitude) > 1:
-                    curves_data_to_create.append({'points_list': [pts_longitude], 'is_cyclic': False, 'name_suffix': f"Lon_{i}"})
-
-        # --- Generate latitude lines (parallels) ---
-        # --- START OF FINAL FIX ---
-        if ts.fish_eye_draw_latitude and n_lat > 0 and segs > 1:
-            for i in range(1, n_lat + 1):
-                theta = math.pi * i / (n_lat + 1)
-                ring_radius = radius * math.sin(theta)
-                x_offset = radius * math.cos(theta)
-
-                pts_latitude = []
-                # First, generate ALL the points for a full circle.
-                for j in range(segs + 1):
-                    phi = (2 * math.pi * j) / segs
-                    y = ring_radius * math.cos(phi) * h_scale
-                    z = ring_radius * math.sin(phi)
-                    pt = Vector((x_offset, y, z))
-
-                    # Rotate the point into its final position.
-                    pt_rot = pt.copy()
-                    pt_rot.rotate(rot_euler)
-
-                    # NOW, check if it should be included. This logic is now
-                    # identical to the longitude cutting logic.
-                    if front_only and pt_rot.y > 0:
-                        continue
-
-                    pts_latitude.append(center_loc + pt_rot)
-
-                # After building the list of valid points, create the curve.
-                if len(pts_latitude) > 1:
-                    # The curve is ONLY cyclic if we are NOT in "Front Only" mode.
-                    # This prevents the ugly line across the gap.
-                    is_line_cyclic = not front_only
-                    curves_data_to_create.append({
-                        'points_list': [pts_latitude],
-                        'is_cyclic': is_line_cyclic,
-                        'name_suffix': f"Lat_{i}"
-                    })
-        # --- END OF FINAL FIX ---
-
-        if draw_1p:
-            # This boundary should also be cut if front_only is active.
-            theta = math.pi / 2
-            ring_radius = radius * math.sin(theta)
-            x = radius * math.cos(theta)
-            pts_equator = []
-            for j in range(segs + 1):
-                phi = (2 * math.pi * j) / segs
-                y = ring_radius * math.cos(phi) * h_scale
-                z = ring_radius * math.sin(phi)
-                pt = Vector((x, y, z))
-                pt_rot = pt.copy()
-                pt_rot.rotate(rot_euler)
-                if front_only and pt_rot.y > 0:
-                    continue
-                pts_equator.append(center_loc + pt_rot)
-            if len(pts_equator) > 1:
-                curves_data_to_create.append({
-                    'points_list': [pts_equator],
-                    'is_cyclic': not front_only, # Also make this non-cyclic when cut
-                    'name_suffix': "1P_Boundary"
-                })
-
-        one_point_density = getattr(ts, "one_point_grid_density_radial", 16)
-        line_length_factor = getattr(ts, "one_point_line_length_factor", 1.0)
-        one_point_length = radius * line_length_factor
-        if draw_1p and one_point_density > 0:
-            for i in range(one_point_density):
-                angle = 2 * math.pi * i / one_point_density
-                pt_start = Vector((0, 0, 0))
-                pt_end = Vector((one_point_length * math.cos(angle) * h_scale, one_point_length * math.sin(angle), 0.0))
-                pt_start_rot, pt_end_rot = pt_start.copy(), pt_end.copy()
-                pt_start_rot.rotate(one_point_rot_euler)
-                pt_end_rot.rotate(one_point_rot_euler)
-                curves_data_to_create.append({
-                    'points_list': [[center_loc + pt_start_rot, center_loc + pt_end_rot]],
-                    'is_cyclic': False,
-                    'name_suffix': f"1P_Radial_{i+1}"
-                })
+        # Longitudes, latitudes, the 1P boundary ring and the 1P radials in one kernel call.
+        fe_families = build_all_guide_families(ts, {key: (fe_center_obj.location,) for key in
+                                                    ('FE_LON', 'FE_LAT', 'FE_BOUNDARY', 'FE_RADIAL')})
 
         opac = ts.guide_curves_opacity
         thickness = ts.guide_curves_thickness
         created_count = 0
-        for i, curve_def in enumerate(curves_data_to_create):
-            obj_name = f"FE_Guides_{curve_def['name_suffix']}"
-            if create_curve_object(context, obj_name, curve_def['points_list'], guides_coll,
-                                  thickness, opac, is_cyclic=curve_def['is_cyclic'], curve_type='BEZIER'):
-                created_count += 1
+        for family_key, (lines, keep_mask) in fe_families.items():
+            curve_type, is_cyclic = guide_family_emit_options(ts, family_key)
+            created_count += emit_guide_family(context, family_key, compact_guide_lines(lines, keep_mask), guides_coll,
+                                               thickness, opac, is_cyclic=is_cyclic, curve_type=curve_type)
 
-        self.report({'INFO'}, f"Generated {created_count} Fish Eye line objects.")
+        self.report({'INFO'}, f"Generated {created_count} Fish Eye lines.")
         return {'FINISHED'}
     
 
@@ -3815,10 +6327,10 @@ class PERSPECTIVE_OT_align_camera_splines(Operator):
         horizon_ctrl = get_horizon_control_object()
 
         if curr_type == 'ONE_POINT':
-            vps = get_vanishing_points('ONE_POINT')
-            if vps: 
-                target_point = vps[0].location.copy()
-                cam_height_origin_z = vps[0].location.z
+            vp = get_vp_by_role('1P')
+            if vp: 
+                target_point = vp.location.copy()
+                cam_height_origin_z = vp.location.z
             elif horizon_ctrl: 
                 cam_height_origin_z = horizon_ctrl.location.z
                 target_point = Vector((0, 0, cam_height_origin_z)) # Target center of horizon
@@ -3827,10 +6339,10 @@ class PERSPECTIVE_OT_align_camera_splines(Operator):
                 target_point = Vector((0, 0, cam_height_origin_z))
 
         elif curr_type == 'TWO_POINT':
-            vps = get_vanishing_points('TWO_POINT')
-            if len(vps) >=2: 
-                target_point = (vps[0].location + vps[1].location) / 2.0
-                cam_height_origin_z = vps[0].location.z # VPs are on horizon
+            vp1, vp2 = get_vp_by_role('2P_1'), get_vp_by_role('2P_2')
+            if vp1 and vp2: 
+                target_point = (vp1.location + vp2.location) / 2.0
+                cam_height_origin_z = vp1.location.z # VPs are on horizon
             elif horizon_ctrl:
                 cam_height_origin_z = horizon_ctrl.location.z
                 target_point = Vector((0, 0, cam_height_origin_z))
@@ -3839,14 +6351,14 @@ class PERSPECTIVE_OT_align_camera_splines(Operator):
                 target_point = Vector((0, 0, cam_height_origin_z))
         
         elif curr_type == 'THREE_POINT':
-            vps_h = get_vanishing_points('THREE_POINT_H')
+            vp_h1, vp_h2 = get_vp_by_role('3P_H1'), get_vp_by_role('3P_H2')
             # For 3P, typically target the center of the H_VPs on the horizon
-            if len(vps_h) >=2: 
-                target_point = (vps_h[0].location + vps_h[1].location) / 2.0
-                cam_height_origin_z = vps_h[0].location.z
+            if vp_h1 and vp_h2: 
+                target_point = (vp_h1.location + vp_h2.location) / 2.0
+                cam_height_origin_z = vp_h1.location.z
                 # Optional: Could consider V_VP for target_point.z if desired for worm's/bird's eye view aiming
-                # vps_v = get_vanishing_points('THREE_POINT_V')
-                # if vps_v: target_point.z = vps_v[0].location.z 
+                # vp_v = get_vp_by_role('3P_V')
+                # if vp_v: target_point.z = vp_v.location.z 
             elif horizon_ctrl:
                 cam_height_origin_z = horizon_ctrl.location.z
                 target_point = Vector((0, 0, cam_height_origin_z))
@@ -3893,8 +6405,76 @@ class PERSPECTIVE_OT_align_camera_splines(Operator):
 # Replace the existing PERSPECTIVE_OT_convert_to_grease_pencil with this:
 
 # -----------------------------------------------------------
-# UI Panel
+# Panel View Model
 # -----------------------------------------------------------
+# The sidebar redraws on every mouse move over the region, so the panels draw from a precomputed
+# model instead of scanning VPs, selection and guide group definitions. bump_panel_view_model() marks
+# it stale (depsgraph updates that touch the scene / selection, VP registry invalidation, file
+# load/undo); mode, VP visibility and object count changes are part of the model key.
+_panel_view_model = {'version': 0, 'built_version': -1, 'key': None, 'model': None}
+
+def bump_panel_view_model():
+    _panel_view_model['version'] += 1
+
+@functools.lru_cache(maxsize=None)
+def _guide_group_panel_rows(perspective_type):
+    """Merge and visibility toggle rows of a mode as ((group key, merge label), ...), ((group prefix, toggle label), ...)."""
+    guide_groups = PERSPECTIVE_OT_merge_specific_guides.GUIDE_GROUP_DEFS.get(perspective_type)
+    if perspective_type == 'NONE' or not guide_groups:
+        return (), ()
+    type_tag = perspective_type.replace('_', '')
+    merge_rows, toggle_rows = [], []
+    for group_key, (prefixes, name_part) in guide_groups.items():
+        fallback_label = group_key.replace("_LINES", "").replace("_", " ").strip().title()
+        label_text = name_part.replace(type_tag, "").replace("_Lines", "").replace("Lines", "").replace("_", " ").strip().title()
+        merge_rows.append((group_key, f"Merge {label_text or fallback_label} ({perspective_type.replace('_', ' ')})"))
+        if prefixes: # Ensure there's a prefix to use
+            toggle_label = name_part.replace('_Lines', '').replace(type_tag, "").replace("_", " ").strip().title()
+            toggle_rows.append((prefixes[0], f"Toggle {toggle_label or fallback_label}"))
+    return tuple(merge_rows), tuple(toggle_rows)
+
+def build_panel_view_model(context):
+    ts = context.scene.perspective_tool_settings_splines
+    mode = ts.current_perspective_type
+    vps_to_display = []
+    if ts.show_main_vps:
+        # Only VPs relevant to the current mode; all VPs when no mode is active
+        if mode == 'NONE':
+            vps_to_display = get_vanishing_points()
+        elif mode == 'THREE_POINT':
+            vps_to_display = get_vanishing_points('THREE_POINT_H') + get_vanishing_points('THREE_POINT_V')
+        elif mode in VP_TYPE_SPECIFIC_PREFIX_MAP:
+            vps_to_display = get_vanishing_points(mode)
+
+    selected_aid_counts = {aid_tag: 0 for aid_tag, _ in EXTRACTION_AID_GROUPS.get(mode, ())}
+    if selected_aid_counts:
+        for obj in context.selected_objects:
+            if obj.type != 'EMPTY':
+                continue
+            for aid_tag in selected_aid_counts:
+                if aid_tag in obj.name:
+                    selected_aid_counts[aid_tag] += 1
+
+    merge_rows, toggle_rows = _guide_group_panel_rows(mode)
+    return {
+        'mode': mode,
+        'mode_label': mode.replace('_', ' '),
+        'vp_names': tuple(vp_obj.name for vp_obj in vps_to_display),
+        'selected_aid_counts': selected_aid_counts,
+        'aid_lines_available': mode in EXTRACTION_AID_GROUPS,
+        'merge_rows': merge_rows,
+        'toggle_rows': toggle_rows,
+    }
+
+def get_panel_view_model(context):
+    ts = context.scene.perspective_tool_settings_splines
+    key = (context.scene.name, ts.current_perspective_type, ts.show_main_vps, len(bpy.data.objects))
+    if _panel_view_model['built_version'] != _panel_view_model['version'] or _panel_view_model['key'] != key:
+        _panel_view_model['model'] = build_panel_view_model(context)
+        _panel_view_model['key'] = key
+        _panel_view_model['built_version'] = _panel_view_model['version']
+    return _panel_view_model['model']
+
 # -----------------------------------------------------------
 # UI Panel
 # -----------------------------------------------------------
@@ -3949,7 +6529,7 @@ class VIEW3D_PT_rogue_perspective_grids(Panel):
             text="Toggle Grid Visibility",
             icon='HIDE_OFF' # Initial icon, can be made dynamic if state is tracked
         )
-        toggle_op.group_prefix = "GridPlane_"
+        toggle_op.group_prefix = GRID_OBJECT_PREFIX
 
 
 
@@ -3974,6 +6554,14 @@ class VIEW3D_PT_rogue_perspective_trimmer(bpy.types.Panel):
             layout.label(text="Perspective settings not found.", icon='ERROR')
             return
 
+        # --- Clip Layer State ---
+        layer_row = layout.row(align=True)
+        layer_row.prop(ts, "clip_layer_mode")
+        layer_row.operator("perspective_splines.unclip_guides", text="", icon='LOOP_BACK')
+        curve_row = layout.row(align=True)
+        curve_row.prop(ts, "clip_bezier_output", text="")
+        curve_row.prop(ts, "clip_flatten_tolerance")
+
         # --- Camera Clipping Section ---
         cam_box = layout.box()
         cam_box.label(text="Clip to Camera Borders:")
@@ -3998,6 +6586,77 @@ class VIEW3D_PT_rogue_perspective_trimmer(bpy.types.Panel):
         del_row.operator("perspective_splines.delete_all_clipping_shapes", 
                          text="Delete All Shapes", icon='TRASH')
 
+        # --- Shape Stack Section ---
+        stack_box = layout.box()
+        stack_box.label(text="Shape Stack (Clip Layer 'Shape Stack'):")
+        for idx, item in enumerate(ts.clip_shapes):
+            row = stack_box.row(align=True)
+            row.prop(item, "operation", text="")
+            row.prop(item, "shape", text="")
+            row.operator("perspective_splines.remove_clip_shape", text="", icon='X').index = idx
+        stack_row = stack_box.row(align=True)
+        stack_row.operator("perspective_splines.add_clip_shape", text="Add Shape", icon='ADD')
+        stack_row.prop(ts, "clip_shapes_invert", toggle=True)
+
+
+class VIEW3D_PT_rogue_perspective_diagnostics(Panel):
+    bl_label = "Diagnostics"
+    bl_idname = "VIEW3D_PT_rogue_perspective_diagnostics"
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_category = "RogueAI"
+    bl_parent_id = "VIEW3D_PT_rogue_perspective_ai"
+    bl_options = {'DEFAULT_CLOSED'}
+
+    def draw(self, context):
+        layout = self.layout
+        ts = context.scene.perspective_tool_settings_splines
+
+        log_box = layout.box()
+        log_box.label(text="Logging:")
+        col = log_box.column(align=True)
+        col.prop(ts, "log_level")
+        col.prop(ts, "log_to_console")
+        log_box.label(text="Subsystems:")
+        log_box.grid_flow(columns=2, align=True).prop(ts, "log_subsystems")
+        row = log_box.row(align=True)
+        row.operator("perspective_splines.dump_log", icon='TEXT').clear_buffer = False
+        row.operator("perspective_splines.dump_log", text="Dump & Clear", icon='TRASH').clear_buffer = True
+        log_box.label(text=f"Buffered records: {len(_log_ring_handler.records)} / {LOG_RING_BUFFER_SIZE}")
+
+
+class VIEW3D_PT_rogue_perspective_profiling(Panel):
+    bl_label = "Profiling"
+    bl_idname = "VIEW3D_PT_rogue_perspective_profiling"
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_category = "RogueAI"
+    bl_parent_id = "VIEW3D_PT_rogue_perspective_ai"
+    bl_options = {'DEFAULT_CLOSED'}
+
+    def draw(self, context):
+        layout = self.layout
+        ts = context.scene.perspective_tool_settings_splines
+
+        row = layout.row(align=True)
+        row.prop(ts, "profiling_enabled", toggle=True, icon='TIME')
+        row.operator("perspective_splines.reset_profile_stats", text="", icon='X')
+        row.operator("perspective_splines.export_profile_stats", text="", icon='EXPORT')
+
+        rows = summarize_profile_stats()
+        if not rows:
+            layout.label(text="No samples recorded." if ts.profiling_enabled else "Enable to record samples.", icon='INFO')
+            return
+        box = layout.box()
+        for row_stats in rows[:PROFILE_PANEL_ROWS]:
+            col = box.column(align=True)
+            col.label(text=row_stats['name'])
+            col.label(text=f"  {row_stats['calls']}x  total {row_stats['total_ms']:.1f} ms  "
+                           f"p50 {row_stats['p50_ms']:.2f}  p90 {row_stats['p90_ms']:.2f}  p99 {row_stats['p99_ms']:.2f} ms")
+            col.label(text=f"  IDs +{row_stats['ids_created']} / -{row_stats['ids_removed']}  points {row_stats['points_written']}")
+        if len(rows) > PROFILE_PANEL_ROWS:
+            box.label(text=f"... {len(rows) - PROFILE_PANEL_ROWS} more entries in the JSON export.")
+
 
 
     
@@ -4024,13 +6683,14 @@ class VIEW3D_PT_perspective_extraction(bpy.types.Panel):
         if not ts:
             layout.label(text="Perspective settings not found.", icon='ERROR')
             return
+        view_model = get_panel_view_model(context)
 
         # --- Visual Aid Controls ---
         aid_box = layout.box()
         aid_box.label(text="Visual Aid Controls:")
         aid_row = aid_box.row(align=True)
         aid_row.prop(ts, "show_extraction_helper_lines", text="Show Aid Lines", toggle=True)
-        aid_row.enabled = ts.current_perspective_type in ['ONE_POINT', 'TWO_POINT', 'THREE_POINT']
+        aid_row.enabled = view_model['aid_lines_available']
         refresh_op = aid_row.operator("perspective_splines.refresh_extraction_aids", text="", icon='FILE_REFRESH')
         if hasattr(refresh_op, 'from_selection_change'):
             refresh_op.from_selection_change = True
@@ -4065,11 +6725,11 @@ class VIEW3D_PT_perspective_extraction(bpy.types.Panel):
             col.separator()
             col.operator("perspective_splines.extract_1p_from_empties", text="Set 1P VP from Selection", icon='TRACKING_FORWARDS')
 
-            sel = [o for o in context.selected_objects if o.type == 'EMPTY' and "1P_Aid" in o.name]
-            if len(sel) == 4:
+            selected_count = view_model['selected_aid_counts'].get("1P_Aid", 0)
+            if selected_count == 4:
                 col.label(text="Status: 4 '1P_Aid' Empties selected. Ready.", icon='CHECKMARK')
             else:
-                col.label(text=f"Status: Select 4 '1P_Aid' Empties (found {len(sel)}).", icon='ERROR')
+                col.label(text=f"Status: Select 4 '1P_Aid' Empties (found {selected_count}).", icon='ERROR')
 
         elif ts.current_perspective_type == 'TWO_POINT':
             # [Your TWO_POINT UI code...]
@@ -4173,31 +6833,23 @@ class Rogue_Perspective_AI_PT_main(Panel):
         tool_settings = context.scene.perspective_tool_settings_splines
         current_perspective_type = tool_settings.current_perspective_type
 
+        view_model = get_panel_view_model(context)
+
         finalize_box = layout.box()
         finalize_box.label(text="Finalize & Manage Guides:") # Slightly clearer label
 
         # --- Merging Guides ---
         merge_box = finalize_box.box() # Sub-box for merging
         merge_box.label(text="Merge Guide Groups:")
-        if current_perspective_type != 'NONE' and \
-           current_perspective_type in PERSPECTIVE_OT_merge_specific_guides.GUIDE_GROUP_DEFS:
-        
+        if view_model['merge_rows']:
             type_specific_merge_col = merge_box.column(align=True) # Use a column for better button layout
-            guide_groups_for_type = PERSPECTIVE_OT_merge_specific_guides.GUIDE_GROUP_DEFS[current_perspective_type]
-            
-            for group_id_key, (_, name_suggestion_part) in guide_groups_for_type.items():
-                label_text = name_suggestion_part.replace(current_perspective_type.replace('_',''), "").replace("_Lines", "").replace("Lines","").replace("_", " ").strip().title()
-                if not label_text: label_text = group_id_key.replace("_LINES", "").replace("_", " ").strip().title()
-                
-                op = type_specific_merge_col.operator(
-                    PERSPECTIVE_OT_merge_specific_guides.bl_idname, 
-                    text=f"Merge {label_text} ({current_perspective_type.replace('_', ' ')})" # Added type for clarity
-                )
+            for group_id_key, merge_label in view_model['merge_rows']:
+                op = type_specific_merge_col.operator(PERSPECTIVE_OT_merge_specific_guides.bl_idname, text=merge_label)
                 op.group_identifier = group_id_key
         
             op_all_current = merge_box.operator(
                 PERSPECTIVE_OT_merge_specific_guides.bl_idname, 
-                text=f"Merge ALL {current_perspective_type.replace('_', ' ').title()} Guides"
+                text=f"Merge ALL {view_model['mode_label'].title()} Guides"
             )
             op_all_current.group_identifier = "ALL_CURRENT_TYPE"
         else:
@@ -4212,19 +6864,13 @@ class Rogue_Perspective_AI_PT_main(Panel):
         show_hide_box.label(text="Toggle Guide Group Visibility:")
         col_sh = show_hide_box.column(align=True)
 
-        if current_perspective_type != 'NONE' and current_perspective_type in PERSPECTIVE_OT_merge_specific_guides.GUIDE_GROUP_DEFS:
-              guide_groups = PERSPECTIVE_OT_merge_specific_guides.GUIDE_GROUP_DEFS[current_perspective_type]
-              for group_key, (prefixes, name_part) in guide_groups.items():
-                  if prefixes: # Ensure there's a prefix to use
-                     toggle_label = name_part.replace('_Lines','').replace(current_perspective_type.replace('_',''),"").replace("_", " ").strip().title()
-                     if not toggle_label: toggle_label = group_key.replace("_LINES", "").replace("_", " ").strip().title()
-                     
-                     op_sh = col_sh.operator(
-                         PERSPECTIVE_OT_toggle_guide_visibility.bl_idname, 
-                         text=f"Toggle {toggle_label}"
-                         # Icon could be made dynamic based on current visibility state of the group later
-                     )
-                     op_sh.group_prefix = prefixes[0] 
+        if view_model['merge_rows']:
+            for group_prefix, toggle_label in view_model['toggle_rows']:
+                # Icon could be made dynamic based on current visibility state of the group later
+                row_sh = col_sh.row(align=True)
+                op_sh = row_sh.operator(PERSPECTIVE_OT_toggle_guide_visibility.bl_idname, text=toggle_label)
+                op_sh.group_prefix = group_prefix
+                row_sh.operator(PERSPECTIVE_OT_recolor_guide_group.bl_idname, text="", icon='COLOR').group_prefix = group_prefix
         else:
             col_sh.label(text="Select a perspective type for visibility toggles.", icon='INFO')
 
@@ -4277,27 +6923,12 @@ class Rogue_Perspective_AI_PT_main(Panel):
 
 
         if ts.show_main_vps:
-            vps_to_display = []
-            # Determine which VPs are relevant to the current mode
-            if ts.current_perspective_type != 'NONE':
-                if ts.current_perspective_type == 'THREE_POINT':
-                    vps_to_display.extend(get_vanishing_points('THREE_POINT_H'))
-                    vps_to_display.extend(get_vanishing_points('THREE_POINT_V'))
-                elif ts.current_perspective_type in VP_TYPE_SPECIFIC_PREFIX_MAP:
-                     vps_to_display = get_vanishing_points(ts.current_perspective_type)
-            # If no specific mode or VPs for that mode, don't try to list (get_vanishing_points might return all)
-            # This prevents listing unrelated VPs when a specific mode is active.
-            # If mode is NONE, we might want to show all VPs that exist.
-            if ts.current_perspective_type == 'NONE':
-                vps_to_display = get_vanishing_points()
-
-
+            view_model = get_panel_view_model(context)
+            vps_to_display = [vp_obj for vp_obj in map(bpy.data.objects.get, view_model['vp_names']) if vp_obj]
             if vps_to_display:
                 vp_display_box = col_vps_main.box()
                 # vp_display_box.label(text="Relevant VPs:") # Label can be optional
                 for vp_obj in vps_to_display:
-                    if vp_obj.name not in bpy.data.objects: continue # Stale reference check
-
                     row_vp_item = vp_display_box.row(align=True)
                     row_vp_item.label(text=f"{vp_obj.name}", icon='EMPTY_DATA')
                     loc_row = row_vp_item.row(align=True)
@@ -4305,7 +6936,7 @@ class Rogue_Perspective_AI_PT_main(Panel):
                     loc_row.prop(vp_obj, "location", index=1, text="Y")
                     loc_row.prop(vp_obj, "location", index=2, text="Z")
             elif ts.current_perspective_type != 'NONE': # Only show "no VPs found" if a mode is active
-                col_vps_main.label(text=f"No VPs found for {ts.current_perspective_type.replace('_', ' ')} mode.", icon='INFO')
+                col_vps_main.label(text=f"No VPs found for {view_model['mode_label']} mode.", icon='INFO')
         layout.separator()
 
         # --- Guide Lines General Appearance ---
@@ -4315,6 +6946,11 @@ class Rogue_Perspective_AI_PT_main(Panel):
         col_guides_props = col_guides_app_main.column(align=True)
         col_guides_props.prop(ts, "guide_curves_thickness")
         col_guides_props.prop(ts, "guide_curves_opacity")
+        col_guides_app_main.prop(ts, "consolidate_guide_families")
+        col_guides_app_main.prop(ts, "live_follow_guides")
+        col_guides_app_main.prop(ts, "guide_display_backend")
+        if ts.guide_display_backend == 'OVERLAY':
+            col_guides_app_main.operator("perspective_splines.bake_guide_overlay", icon='OUTLINER_OB_CURVE')
         col_guides_app_main.operator("perspective_splines.clear_just_guides", text="Clear All Guide Lines", icon='BRUSH_DATA')
         layout.separator()
 
@@ -4514,6 +7150,7 @@ _depsgraph_handler_active_splines = True # Global flag to prevent re-entrancy
 # -----------------------------------------------------------
 _depsgraph_handler_active_splines = True # Global flag to prevent re-entrancy
 
+@profiled("depsgraph_handler")
 def perspective_depsgraph_handler_splines(scene, depsgraph):
     global _depsgraph_handler_active_splines
     if not _depsgraph_handler_active_splines or not bpy.context.screen:
@@ -4548,6 +7185,45 @@ def perspective_depsgraph_handler_splines(scene, depsgraph):
 
     _depsgraph_handler_active_splines = False
     try:
+        if _vp_registry['object_count'] != len(bpy.data.objects):
+            invalidate_vp_registry() # Objects were added or removed
+        elif any(isinstance(update.id, bpy.types.Collection) and update.id.name == PERSPECTIVE_HELPER_COLLECTION
+                 for update in depsgraph.updates):
+            invalidate_vp_registry() # Objects were (un)linked into the helpers collection
+        for update in depsgraph.updates:
+            if isinstance(update.id, bpy.types.Object):
+                note_owner_tagged_update(update.id.original)
+        if any(isinstance(update.id, bpy.types.Scene) for update in depsgraph.updates):
+            bump_panel_view_model() # Settings or selection changed
+
+        if tool_settings.guide_display_backend == 'OVERLAY':
+            # Settings (scene) or VP / horizon / aid empty changes make the overlay buffers stale.
+            for update in depsgraph.updates:
+                if isinstance(update.id, bpy.types.Scene) or (isinstance(update.id, bpy.types.Object) and
+                        (update.id.name.startswith((VP_PREFIX, HORIZON_CTRL_OBJ_NAME)) or "_Aid" in update.id.name)):
+                    invalidate_guide_overlay()
+                    break
+
+        if tool_settings.clip_layer_mode != 'NONE':
+            # The camera (transform or lens), the clipping shapes (transform or outline), guide transforms or
+            # the render size (scene) may have changed the clip region; refresh_clip_layer skips unchanged guides.
+            shape_objs = clip_shape_objects(tool_settings)
+            clip_region_ids = {scene.camera, scene.camera.data if scene.camera else None}
+            clip_region_ids |= shape_objs | {shape_obj.data for shape_obj in shape_objs}
+            guides_coll = bpy.data.collections.get(PERSPECTIVE_GUIDES_COLLECTION)
+            guides_tree = guide_collection_tree(guides_coll) if guides_coll else set()
+            scene_updated = False
+            for update in depsgraph.updates:
+                update_id = update.id.original
+                if update_id in clip_region_ids or (update.is_updated_transform and isinstance(update_id, bpy.types.Object)
+                                                    and not guides_tree.isdisjoint(update_id.users_collection)):
+                    queue_clip_layer_refresh()
+                    break
+                scene_updated = scene_updated or isinstance(update_id, bpy.types.Scene)
+            else:
+                if scene_updated and clip_region_changed(scene): # Scene updates are frequent: compare keys first
+                    queue_clip_layer_refresh()
+
         for update in depsgraph.updates:
             if not isinstance(update.id, bpy.types.Object) or not update.is_updated_transform:
                 continue
@@ -4565,6 +7241,8 @@ def perspective_depsgraph_handler_splines(scene, depsgraph):
                     needs_horizon_recalc = True
             elif obj_name.startswith(VP_PREFIX) and not "_Aid" in obj_name : # Main VPs, not aid empties
                 vp_obj_moved = scene.objects.get(obj_name)
+                if vp_obj_moved and tool_settings.live_follow_guides:
+                    mark_guide_families_dirty(obj_name) # Regenerated by the live-follow timer
                 if vp_obj_moved:
                     current_type = tool_settings.current_perspective_type
                     if current_type == 'ONE_POINT' and vp_obj_moved.name.startswith(VP_TYPE_SPECIFIC_PREFIX_MAP['ONE_POINT']):
@@ -4623,20 +7301,38 @@ def perspective_depsgraph_handler_splines(scene, depsgraph):
             try:
                 update_dynamic_horizon_line_curve(context_for_update)
             except Exception as e:
-                print(f"Depsgraph Error: Failed to update dynamic horizon line: {e}")
+                depsgraph_log.error("Failed to update dynamic horizon line: %s", e)
 
         if empties_used_for_aid_lines_transformed:
             try:
-                print("DEBUG depsgraph: Triggering refresh_extraction_aid_lines due to aid empty transform.") # DEBUG
+                depsgraph_log.debug("Triggering refresh_extraction_aid_lines due to aid empty transform.")
                 refresh_extraction_aid_lines(context_for_update, from_selection_change=False) # from_selection_change is False here
             except Exception as e:
-                 print(f"Depsgraph Error: Failed to refresh extraction aid lines: {e}")
+                 depsgraph_log.error("Failed to refresh extraction aid lines: %s", e)
 
     except Exception as e:
-        print(f"Error in perspective_depsgraph_handler_splines main loop: {e}")
+        depsgraph_log.error("Error in perspective_depsgraph_handler_splines main loop: %s", e)
     finally:
         _depsgraph_handler_active_splines = True
 
+@persistent
+def perspective_file_state_reset_handler(*args):
+    """load_post / undo_post / redo_post: drops in-memory caches that index the previous file state
+    and applies the log and profiling settings stored in the scene."""
+    reset_guide_material_pool()
+    invalidate_vp_registry() # Also marks the panel view model stale
+    invalidate_owner_registry() # Rebuilt from the owner tags of the restored objects
+    scene = getattr(bpy.context, "scene", None)
+    if scene and getattr(scene, "perspective_tool_settings_splines", None):
+        configure_logging(scene.perspective_tool_settings_splines) # Log settings are stored per file
+        _profiling_state['enabled'] = scene.perspective_tool_settings_splines.profiling_enabled
+    _guide_overlay_cache['buffers'] = _guide_overlay_cache['batches'] = None
+    cancel_clip_layer_refresh()
+    _clip_layer_state['key'] = _clip_layer_state['region'] = None # The curves keep their own clip keys
+    _bezier_flatten_cache.clear()
+
+PERSPECTIVE_FILE_STATE_HANDLER_LISTS = ('load_post', 'undo_post', 'redo_post')
+
 # -----------------------------------------------------------
 # Registration
 # -----------------------------------------------------------
@@ -4667,8 +7363,13 @@ def perspective_depsgraph_handler_splines(scene, depsgraph):
 # ... all your class definitions above ...
 
 classes_splines = (
+    PerspectiveClipShapeSplines,
     PerspectiveToolSettingsSplines,
     PERSPECTIVE_OT_generate_horizon_spline,
+    PERSPECTIVE_OT_bake_guide_overlay,
+    PERSPECTIVE_OT_dump_log,
+    PERSPECTIVE_OT_reset_profile_stats,
+    PERSPECTIVE_OT_export_profile_stats,
     PERSPECTIVE_OT_add_vanishing_point_empty,
     PERSPECTIVE_OT_generate_one_point_splines,
     PERSPECTIVE_OT_create_2p_vps_if_needed,
@@ -4686,6 +7387,9 @@ classes_splines = (
     PERSPECTIVE_OT_delete_all_clipping_shapes,
     PERSPECTIVE_OT_clip_guides_to_camera,
     PERSPECTIVE_OT_clip_guides_custom_shape,
+    PERSPECTIVE_OT_unclip_guides,
+    PERSPECTIVE_OT_add_clip_shape,
+    PERSPECTIVE_OT_remove_clip_shape,
     PERSPECTIVE_OT_add_1p_extraction_empties,
     PERSPECTIVE_OT_extract_1p_from_selected_empties,
     PERSPECTIVE_OT_add_2p_vp1_helpers,
@@ -4711,11 +7415,15 @@ classes_splines = (
     PERSPECTIVE_OT_merge_specific_guides,
     PERSPECTIVE_OT_merge_guides,
     PERSPECTIVE_OT_toggle_guide_visibility,
+    PERSPECTIVE_OT_recolor_guide_group,
     Rogue_Perspective_AI_PT_main,
     VIEW3D_PT_rogue_perspective_grids,
     VIEW3D_PT_rogue_perspective_trimmer,
     VIEW3D_PT_perspective_extraction,
+    VIEW3D_PT_rogue_perspective_diagnostics,
+    VIEW3D_PT_rogue_perspective_profiling,
 )
+profile_operator_classes(classes_splines) # Timed only while profiling is enabled
 
 def register():
     global _depsgraph_handler_active_splines, previous_perspective_type_on_switch
@@ -4723,50 +7431,71 @@ def register():
         try:
             bpy.utils.register_class(cls)
         except ValueError as e:
-            print(f"Warning: Class {cls.__name__} already registered or error: {e}")
+            register_log.warning("Class %s already registered or error: %s", cls.__name__, e)
 
     try:
         bpy.types.Scene.perspective_tool_settings_splines = bpy.props.PointerProperty(type=PerspectiveToolSettingsSplines)
     except TypeError as e:
-        print(f"Warning: perspective_tool_settings_splines already exists on Scene type: {e}")
+        register_log.warning("perspective_tool_settings_splines already exists on Scene type: %s", e)
 
     if perspective_depsgraph_handler_splines not in bpy.app.handlers.depsgraph_update_post:
         bpy.app.handlers.depsgraph_update_post.append(perspective_depsgraph_handler_splines)
+    for handler_list_name in PERSPECTIVE_FILE_STATE_HANDLER_LISTS:
+        handler_list = getattr(bpy.app.handlers, handler_list_name)
+        if perspective_file_state_reset_handler not in handler_list:
+            handler_list.append(perspective_file_state_reset_handler)
+
+    global _guide_overlay_draw_handle
+    if _guide_overlay_draw_handle is None and not bpy.app.background:
+        _guide_overlay_draw_handle = bpy.types.SpaceView3D.draw_handler_add(_draw_guide_overlay, (), 'WINDOW', 'POST_VIEW')
 
     _depsgraph_handler_active_splines = True
-    print("Rogue Perspective AI Registered.")
+    register_log.info("Rogue Perspective AI Registered.")
 
 def unregister():
     global _depsgraph_handler_active_splines
     _depsgraph_handler_active_splines = False
+    cancel_live_follow()
+    cancel_clip_layer_refresh()
 
     if perspective_depsgraph_handler_splines in bpy.app.handlers.depsgraph_update_post:
         bpy.app.handlers.depsgraph_update_post.remove(perspective_depsgraph_handler_splines)
+    for handler_list_name in PERSPECTIVE_FILE_STATE_HANDLER_LISTS:
+        handler_list = getattr(bpy.app.handlers, handler_list_name)
+        if perspective_file_state_reset_handler in handler_list:
+            handler_list.remove(perspective_file_state_reset_handler)
+    reset_guide_material_pool()
+
+    global _guide_overlay_draw_handle
+    if _guide_overlay_draw_handle is not None:
+        bpy.types.SpaceView3D.draw_handler_remove(_guide_overlay_draw_handle, 'WINDOW')
+        _guide_overlay_draw_handle = None
+    _guide_overlay_cache['buffers'] = _guide_overlay_cache['batches'] = None
 
     if hasattr(bpy.types.Scene, 'perspective_tool_settings_splines'):
         try:
             del bpy.types.Scene.perspective_tool_settings_splines
         except Exception as e:
-            print(f"Warning: Could not delete perspective_tool_settings_splines from Scene: {e}")
+            register_log.warning("Could not delete perspective_tool_settings_splines from Scene: %s", e)
 
     for cls in reversed(classes_splines):
         try:
             bpy.utils.unregister_class(cls)
         except RuntimeError as e:
-            print(f"Warning: Could not unregister class {cls.__name__}: {e}")
+            register_log.warning("Could not unregister class %s: %s", cls.__name__, e)
         except Exception as e:
-            print(f"Error unregistering class {cls.__name__}: {e}")
+            register_log.error("Error unregistering class %s: %s", cls.__name__, e)
 
-    print("Rogue Perspective AI Unregistered.")
+    register_log.info("Rogue Perspective AI Unregistered.")
 
 if __name__ == "__main__":
     if hasattr(bpy.types, "Rogue_Perspective_AI_PT_main"):
         try:
             unregister()
         except Exception as e:
-            print(f"Error during pre-emptive unregistration: {e}")
+            register_log.error("Error during pre-emptive unregistration: %s", e)
     try:
         register()
     except Exception as e:
-        print(f"Error during registration: {e}")
+        register_log.error("Error during registration: %s", e)
 
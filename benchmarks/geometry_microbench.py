@@ -0,0 +1,145 @@
+#Rogue Perspective AI - geometry core microbenchmarks
+
+#Runs in plain CPython (needs only NumPy), no Blender:
+#
+#   python benchmarks/geometry_microbench.py
+#   python benchmarks/geometry_microbench.py --repeat 7 --output core.json
+#
+#The add-on is a single file, so the geometry core is loaded from it by its
+#'# >>> GEOMETRY CORE >>>' / '# <<< GEOMETRY CORE <<<' markers and executed on its own; that also
+#proves the core still has no bpy / mathutils dependency. Timing only: correctness is covered by
+#tests/test_geometry_core.py, which loads the core the same way.
+
+import argparse
+import functools
+import json
+import math
+import os
+import random
+import sys
+import timeit
+
+import numpy as np
+
+ADDON_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "Rogue Perspective AI.py")
+CORE_START_MARKER = "# >>> GEOMETRY CORE >>>"
+CORE_END_MARKER = "# <<< GEOMETRY CORE <<<"
+SCALAR_BATCH = 10000 # Calls per timing of the per-segment scalar routines
+
+
+def load_geometry_core(addon_file=ADDON_FILE):
+    """Executes the marker-delimited geometry core of the add-on and returns its namespace."""
+    with open(addon_file, encoding="utf-8") as f:
+        source = f.read()
+    start, end = source.find(CORE_START_MARKER), source.find(CORE_END_MARKER)
+    if start < 0 or end < start:
+        raise RuntimeError(f"Geometry core markers not found in {addon_file}")
+    namespace = {'math': math, 'functools': functools, 'np': np}
+    exec(compile(source[start:end], addon_file + " (geometry core)", "exec"), namespace)
+    return namespace
+
+def build_cases(core):
+    """Structure: CASE NAME: zero-argument callable."""
+    rng = random.Random(1234)
+    rot = core['euler_xyz_matrix'](0.3, 0.2, 0.1)
+    polygon = core['sort_polygon_ccw']([(0.5 + 0.4 * math.cos(a), 0.5 + 0.4 * math.sin(a))
+                                        for a in np.linspace(0.0, 2.0 * math.pi, 8, endpoint=False)])
+    segments_2d = [((rng.uniform(-1, 2), rng.uniform(-1, 2)), (rng.uniform(-1, 2), rng.uniform(-1, 2)))
+                   for _ in range(SCALAR_BATCH)]
+    lines_3d = [tuple(tuple(rng.uniform(-10, 10) for _ in range(3)) for _ in range(4)) for _ in range(SCALAR_BATCH)]
+    polylines = [np.random.default_rng(i).random((rng.randint(2, 64), 3)) for i in range(2000)]
+    packed_coords, packed_counts = core['pack_lines'](polylines)
+    cyclic = np.zeros(len(packed_counts), dtype=bool)
+    matrix = np.eye(4)
+    matrix[:3, 3] = (1.0, 2.0, 3.0)
+
+    view = (np.eye(4), (-0.5, 0.5, -0.5, 0.5, 1.0), False)
+    guide_coords = packed_coords * 4.0 - np.array((2.0, 2.0, 5.0))
+    camera_frame = core['ConvexRegion'](*core['rect_halfplanes']())
+    polygon_region = core['convex_polygon_halfplanes'](polygon)
+    angles = np.linspace(0.0, 2.0 * math.pi, 400, endpoint=False)
+    star = np.stack((0.5 + (0.4 + 0.08 * np.sin(7 * angles)) * np.cos(angles),
+                     0.5 + (0.4 + 0.08 * np.sin(7 * angles)) * np.sin(angles)), axis=1)
+    ellipse_region = core['EllipseRegion'].from_plane_ellipse(
+        (np.eye(4), (-0.5, 0.5, -0.5, 0.5, 1.0), False), np.array((0.0, 0.0, -5.0)), rot[:, 0] * 2.0, rot[:, 1] * 2.0)
+    concave_region = core['PolygonRegion'].from_contours([star, [(0.4, 0.4), (0.6, 0.4), (0.6, 0.6), (0.4, 0.6)]])
+    dome = core['fish_eye_rings_array']((0.0, 0.0, 0.0), 10.0, np.linspace(0.1, 3.0, 64), 32, 1.0, rot)[0][:, :-1]
+    dome_coords, dome_counts = dome.reshape(-1, 3) - np.array((0.0, 0.0, 20.0)), np.full(len(dome), dome.shape[1])
+    dome_cyclic = np.ones(len(dome_counts), dtype=bool)
+    dome_handles = core['auto_bezier_handles'](dome_coords, dome_counts, dome_cyclic)
+    dome_xy = [core['camera_view_project'](v, view)[:, :2] for v in (dome_coords, *dome_handles)]
+    dome_steps = core['bezier_flatten_steps'](*dome_xy, dome_counts, dome_cyclic, 0.5 / 1920)
+    window_frame = core['CompositeRegion'](
+        (concave_region, ellipse_region, core['ConvexRegion'](*core['rect_halfplanes'](0.45, 0.55, 0.0, 1.0))),
+        ('UNION', 'DIFFERENCE', 'UNION'))
+    seg_a = np.array([a for a, _ in segments_2d])
+    seg_b = np.array([b for _, b in segments_2d])
+
+    clip_params = core['clip_segment_params_convex']
+    liang_barsky = core['liang_barsky_clip']
+    intersect = core['line_line_intersection_3d']
+    return {
+        'radial_lines_array[4096]': lambda: core['radial_lines_array']((0.0, 0.0, 0.0), 4096, 100.0),
+        'plane_grid_lines_array[512x512]': lambda: core['plane_grid_lines_array'](
+            np.zeros(3), 10.0, 10.0, 512, 512, np.array((1.0, 0.0, 0.0)), np.array((0.0, 0.0, 1.0))),
+        'fish_eye_meridians_array[128x256]': lambda: core['fish_eye_meridians_array'](
+            (0.0, 0.0, 0.0), 10.0, 128, 256, 1.0, rot),
+        'fish_eye_rings_array[64x256]': lambda: core['fish_eye_rings_array'](
+            (0.0, 0.0, 0.0), 10.0, np.linspace(0.1, 3.0, 64), 256, 1.0, rot),
+        'pack_lines[2000 lines]': lambda: core['pack_lines'](polylines),
+        'transform_coords[packed]': lambda: core['transform_coords'](matrix, packed_coords),
+        'auto_bezier_handles[packed]': lambda: core['auto_bezier_handles'](packed_coords, packed_counts, cyclic),
+        'polylines_to_segments[packed]': lambda: core['polylines_to_segments'](packed_coords, packed_counts),
+        f'clip_segment_params_convex[x{SCALAR_BATCH}]': lambda: [clip_params(a, b, polygon) for a, b in segments_2d],
+        f'liang_barsky_clip[x{SCALAR_BATCH}]': lambda: [liang_barsky(a, b) for a, b in segments_2d],
+        f'line_line_intersection_3d[x{SCALAR_BATCH}]': lambda: [intersect(*line) for line in lines_3d],
+        f'clip_segments_halfplanes[{SCALAR_BATCH}, octagon]': lambda: core['clip_segments_halfplanes'](
+            seg_a, seg_b, *polygon_region),
+        f'liang_barsky_clip_batch[{SCALAR_BATCH}]': lambda: core['liang_barsky_clip_batch'](seg_a, seg_b),
+        f'PolygonRegion.segment_intervals[{SCALAR_BATCH}, 404 edges]': lambda: concave_region.segment_intervals(
+            seg_a, seg_b),
+        f'EllipseRegion.segment_intervals[{SCALAR_BATCH}]': lambda: ellipse_region.segment_intervals(seg_a, seg_b),
+        f'CompositeRegion.segment_intervals[{SCALAR_BATCH}, 3 shapes]': lambda: window_frame.segment_intervals(
+            seg_a, seg_b),
+        'PolygonRegion[404 edges] build': lambda: core['PolygonRegion'].from_contours(
+            [star, [(0.4, 0.4), (0.6, 0.4), (0.6, 0.6), (0.4, 0.6)]]),
+        'clip_polylines_in_camera_view[packed]': lambda: core['clip_polylines_in_camera_view'](
+            guide_coords, packed_counts, view, camera_frame),
+        'clip + stitch_clipped_segments[packed]': lambda: core['stitch_clipped_segments'](
+            guide_coords, packed_counts, *core['clip_polylines_in_camera_view'](
+                guide_coords, packed_counts, view, camera_frame)),
+        'bezier_flatten_steps[64x32 rings]': lambda: core['bezier_flatten_steps'](
+            *dome_xy, dome_counts, dome_cyclic, 0.5 / 1920),
+        'flatten_bezier_splines[64x32 rings]': lambda: core['flatten_bezier_splines'](
+            dome_coords, *dome_handles, dome_counts, dome_cyclic, dome_steps),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rogue Perspective AI geometry core microbenchmarks")
+    parser.add_argument("--addon", default=ADDON_FILE, help="Path of the add-on file")
+    parser.add_argument("--repeat", type=int, default=5, help="Timings per case (the best one is reported)")
+    parser.add_argument("--cases", default="", help="Only run cases whose name contains one of these (comma separated)")
+    parser.add_argument("--output", default="", help="Optional JSON result file")
+    args = parser.parse_args(argv)
+
+    core = load_geometry_core(os.path.normpath(args.addon))
+    filters = [f.strip() for f in args.cases.split(",") if f.strip()]
+
+    results = []
+    for name, func in build_cases(core).items():
+        if filters and not any(f in name for f in filters):
+            continue
+        timer = timeit.Timer(func)
+        number, _ = timer.autorange() # Calls per timing so that one timing takes >= 0.2 s
+        best = min(timer.repeat(repeat=max(args.repeat, 1), number=number)) / number
+        results.append({'case': name, 'best_s': best, 'number': number})
+        print(f"{name:<40} {best * 1000.0:10.3f} ms")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({'numpy_version': np.__version__, 'python_version': sys.version.split()[0],
+                       'results': results}, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
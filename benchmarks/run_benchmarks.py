@@ -0,0 +1,294 @@
+#Rogue Perspective AI - headless benchmark suite
+
+#Runs inside Blender without a GPU or window:
+#
+#   blender -b --factory-startup --python benchmarks/run_benchmarks.py -- --output bench.json
+#   blender -b --factory-startup --python benchmarks/run_benchmarks.py -- --baseline bench.json --output new.json
+#
+#Every case is run for each density on a freshly cleared scene. Only the operator path itself is timed;
+#scene setup (VPs, guides to clip / merge, camera, clipping shape) happens before the clock starts.
+#With --baseline, cases whose median time grew by more than --threshold are reported and Blender
+#exits with code 1, so the suite can gate a release.
+
+import argparse
+import gc
+import importlib.util
+import json
+import os
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+
+import bpy
+
+ADDON_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "Rogue Perspective AI.py")
+ADDON_MODULE_NAME = "rogue_perspective_ai"
+DEFAULT_DENSITIES = (8, 32, 128)
+DEFAULT_REPEAT = 3
+DEFAULT_THRESHOLD = 1.25 # Median time ratio (new / baseline) above which a case counts as a regression
+CLEARED_ID_COLLECTIONS = ('objects', 'curves', 'meshes', 'materials', 'collections', 'cameras')
+RESULT_FORMAT_VERSION = 1
+
+
+# -----------------------------------------------------------
+# Scene Setup
+# -----------------------------------------------------------
+def load_addon(addon_file):
+    spec = importlib.util.spec_from_file_location(ADDON_MODULE_NAME, addon_file)
+    addon = importlib.util.module_from_spec(spec)
+    sys.modules[ADDON_MODULE_NAME] = addon
+    spec.loader.exec_module(addon)
+    addon.register()
+    return addon
+
+def reset_scene(addon):
+    """Removes every object and datablock the add-on could have made and resets its settings
+    (property_unset does not run update callbacks, so no mode switch side effects)."""
+    scene = bpy.context.scene
+    ts = scene.perspective_tool_settings_splines
+    ts.custom_clipping_shape = None
+    for attr in CLEARED_ID_COLLECTIONS:
+        id_blocks = list(getattr(bpy.data, attr))
+        if id_blocks:
+            bpy.data.batch_remove(id_blocks)
+    for prop in ts.bl_rna.properties:
+        if prop.identifier != "rna_type":
+            ts.property_unset(prop.identifier)
+    scene.camera = None
+    addon.previous_perspective_type_on_switch = 'NONE'
+    addon.perspective_file_state_reset_handler()
+
+def set_mode(ts, mode):
+    ts.current_perspective_type = mode # Runs switch_perspective_type_prop: default VPs + horizon
+
+def setup_1p(addon, ts, density):
+    set_mode(ts, 'ONE_POINT')
+    ts.one_point_grid_density_radial = density
+    ts.one_point_grid_density_ortho_x = ts.one_point_grid_density_ortho_y = max(density // 2, 1)
+
+def setup_2p(addon, ts, density):
+    set_mode(ts, 'TWO_POINT')
+    ts.two_point_grid_density_vp1 = ts.two_point_grid_density_vp2 = density
+    ts.two_point_grid_density_vertical = max(density // 2, 1)
+
+def setup_3p(addon, ts, density):
+    set_mode(ts, 'THREE_POINT')
+    ts.three_point_vp_h1_density = ts.three_point_vp_h2_density = ts.three_point_vp_v_density = density
+
+def setup_fish_eye(addon, ts, density):
+    set_mode(ts, 'FISH_EYE')
+    ts.fish_eye_grid_radial = density
+    ts.fish_eye_grid_concentric = max(density // 2, 1)
+
+def setup_box_grid(addon, ts, density):
+    ts.grid_subdivisions_u = ts.grid_subdivisions_v = density
+
+def generate_2p(addon, ts):
+    bpy.ops.perspective_splines.generate_2p_vp1_lines('EXEC_DEFAULT')
+    bpy.ops.perspective_splines.generate_2p_vp2_lines('EXEC_DEFAULT')
+    bpy.ops.perspective_splines.generate_2p_vertical_lines('EXEC_DEFAULT')
+
+def setup_2p_guides(addon, ts, density):
+    setup_2p(addon, ts, density)
+    generate_2p(addon, ts)
+
+def add_bench_camera(ts):
+    scene = bpy.context.scene
+    cam = bpy.data.objects.new("Bench_Camera", bpy.data.cameras.new("Bench_Camera"))
+    scene.collection.objects.link(cam)
+    cam.location = (0.0, -30.0, ts.horizon_y_level + 1.6)
+    cam.rotation_euler = (1.5708, 0.0, 0.0)
+    scene.camera = cam
+
+def setup_clip_camera(addon, ts, density):
+    setup_2p_guides(addon, ts, density)
+    add_bench_camera(ts)
+
+def setup_fish_eye_clip_layer(addon, ts, density):
+    setup_fish_eye(addon, ts, density)
+    bpy.ops.perspective_splines.generate_fish_eye('EXEC_DEFAULT')
+    add_bench_camera(ts)
+    bpy.ops.perspective_splines.clip_guides_to_camera('EXEC_DEFAULT')
+
+def setup_clip_layer(addon, ts, density):
+    setup_clip_camera(addon, ts, density)
+    bpy.ops.perspective_splines.clip_guides_to_camera('EXEC_DEFAULT')
+
+def reframe_clip_layer(addon, ts):
+    """Re-framing the shot: one re-clip of the kept source guides, no regeneration."""
+    bpy.context.scene.camera.location.x += 2.0
+    bpy.context.view_layer.update()
+    addon.refresh_clip_layer(bpy.context)
+
+def setup_clip_shape_stack(addon, ts, density):
+    """A rectangle frame with a circular window cut out of it, in front of the camera."""
+    setup_clip_camera(addon, ts, density)
+    for shape_type, operation in (('RECTANGLE', 'UNION'), ('CIRCLE', 'DIFFERENCE')):
+        ts.clipping_shape_type_to_add = shape_type
+        bpy.ops.perspective_splines.create_clipping_shape('EXEC_DEFAULT')
+        shape_obj = ts.custom_clipping_shape
+        shape_obj.location = (0.0, -20.0, ts.horizon_y_level + 1.6)
+        shape_obj.rotation_euler = (1.5708, 0.0, 0.0)
+        item = ts.clip_shapes.add()
+        item.shape, item.operation = shape_obj, operation
+    ts.clip_layer_mode = 'SHAPES'
+
+def setup_clip_custom_shape(addon, ts, density):
+    setup_2p_guides(addon, ts, density)
+    ts.clipping_shape_type_to_add = 'RECTANGLE'
+    bpy.ops.perspective_splines.create_clipping_shape('EXEC_DEFAULT')
+
+
+# -----------------------------------------------------------
+# Cases
+# -----------------------------------------------------------
+# Structure: CASE NAME: (setup(addon, ts, density), timed run(addon, ts))
+BENCHMARK_CASES = {
+    'generate_1p': (setup_1p, lambda addon, ts: bpy.ops.perspective_splines.generate_one_point('EXEC_DEFAULT')),
+    'generate_2p': (setup_2p, generate_2p),
+    'generate_3p': (setup_3p, lambda addon, ts: (bpy.ops.perspective_splines.generate_3p_h1_lines('EXEC_DEFAULT'),
+                                                 bpy.ops.perspective_splines.generate_3p_h2_lines('EXEC_DEFAULT'),
+                                                 bpy.ops.perspective_splines.generate_3p_v_lines('EXEC_DEFAULT'))),
+    'generate_fish_eye': (setup_fish_eye, lambda addon, ts: bpy.ops.perspective_splines.generate_fish_eye('EXEC_DEFAULT')),
+    'create_box_grid': (setup_box_grid, lambda addon, ts: bpy.ops.perspective_splines.create_box_grid('EXEC_DEFAULT')),
+    'clip_guides_to_camera': (setup_clip_camera,
+                              lambda addon, ts: bpy.ops.perspective_splines.clip_guides_to_camera('EXEC_DEFAULT')),
+    'clip_guides_custom_shape': (setup_clip_custom_shape,
+                                 lambda addon, ts: bpy.ops.perspective_splines.clip_guides_custom_shape('EXEC_DEFAULT')),
+    'reframe_clip_layer': (setup_clip_layer, reframe_clip_layer),
+    'reframe_clip_layer_fish_eye': (setup_fish_eye_clip_layer, reframe_clip_layer), # BEZIER guides
+    'reframe_clip_shape_stack': (setup_clip_shape_stack, reframe_clip_layer),
+    'merge_specific_guides': (setup_2p_guides,
+                              lambda addon, ts: bpy.ops.perspective_splines.merge_specific_guides(
+                                  'EXEC_DEFAULT', group_identifier="ALL_CURRENT_TYPE")),
+    'mode_switch': (setup_2p, lambda addon, ts: [set_mode(ts, mode) for mode in
+                                                 ('ONE_POINT', 'THREE_POINT', 'FISH_EYE', 'TWO_POINT', 'NONE')]),
+}
+
+def count_spline_points():
+    return sum(len(spline.points) + len(spline.bezier_points) for curve in bpy.data.curves for spline in curve.splines)
+
+def run_once(addon, case_name, density, trace=False):
+    """One fresh run of a case: (seconds, RSS growth in KB, Python peak bytes or None).
+    With trace the run is under tracemalloc, which slows allocation-heavy paths: its time is not used."""
+    setup, run = BENCHMARK_CASES[case_name]
+    reset_scene(addon)
+    ts = bpy.context.scene.perspective_tool_settings_splines
+    setup(addon, ts, density)
+    gc.collect()
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if trace:
+        tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        run(addon, ts)
+        elapsed = time.perf_counter() - start
+        python_peak = tracemalloc.get_traced_memory()[1] if trace else None
+    finally:
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+    return elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before, python_peak
+
+def run_case(addon, case_name, density, repeat):
+    times, rss_growth = [], []
+    python_peak = None
+    error = None
+    try:
+        for _ in range(repeat): # Timed runs, untraced
+            elapsed, growth, _ = run_once(addon, case_name, density)
+            times.append(elapsed)
+            rss_growth.append(growth)
+        python_peak = run_once(addon, case_name, density, trace=True)[2] # Separate pass for the peak
+    except Exception as e: # Keep going: one broken path must not hide the other numbers
+        error = f"{type(e).__name__}: {e}"
+    result = {'case': case_name, 'density': density, 'repeat': len(times), 'error': error}
+    if times:
+        result.update({
+            'median_s': statistics.median(times), 'min_s': min(times), 'max_s': max(times),
+            'python_peak_bytes': python_peak,
+            'max_rss_growth_kb': max(rss_growth), # ru_maxrss is a high-water mark: growth, not usage
+            'objects': len(bpy.data.objects), 'curves': len(bpy.data.curves),
+            'materials': len(bpy.data.materials), 'spline_points': count_spline_points(),
+        })
+    return result
+
+
+# -----------------------------------------------------------
+# Baseline Comparison
+# -----------------------------------------------------------
+def compare_with_baseline(results, baseline, threshold):
+    """Returns [(case, density, baseline median, new median, ratio)] for the regressed cases."""
+    baseline_medians = {(r['case'], r['density']): r['median_s'] for r in baseline.get('results', ()) if 'median_s' in r}
+    regressions = []
+    for result in results:
+        base = baseline_medians.get((result['case'], result['density']))
+        if base is None or 'median_s' not in result or base <= 0.0:
+            continue
+        ratio = result['median_s'] / base
+        result['baseline_median_s'] = base
+        result['ratio'] = ratio
+        if ratio > threshold:
+            regressions.append((result['case'], result['density'], base, result['median_s'], ratio))
+    return regressions
+
+def parse_args(argv):
+    argv = argv[argv.index("--") + 1:] if "--" in argv else []
+    parser = argparse.ArgumentParser(description="Rogue Perspective AI headless benchmarks")
+    parser.add_argument("--addon", default=ADDON_FILE, help="Path of the add-on file")
+    parser.add_argument("--densities", default=",".join(map(str, DEFAULT_DENSITIES)),
+                        help="Comma separated guide densities / grid subdivisions")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Timed runs per case and density")
+    parser.add_argument("--cases", default="", help="Comma separated subset of: " + ", ".join(BENCHMARK_CASES))
+    parser.add_argument("--output", default="bench_results.json", help="Result file (JSON)")
+    parser.add_argument("--baseline", default="", help="Earlier result file to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Median time ratio that counts as a regression")
+    return parser.parse_args(argv)
+
+def main():
+    args = parse_args(sys.argv)
+    addon = load_addon(os.path.normpath(args.addon))
+    densities = [int(d) for d in args.densities.split(",") if d.strip()]
+    case_names = [c.strip() for c in args.cases.split(",") if c.strip()] or list(BENCHMARK_CASES)
+
+    results = []
+    for case_name in case_names:
+        for density in densities:
+            result = run_case(addon, case_name, density, max(args.repeat, 1))
+            results.append(result)
+            if result['error']:
+                print(f"{case_name:<26} {density:>5}  ERROR {result['error']}")
+            else:
+                print(f"{case_name:<26} {density:>5}  median {result['median_s'] * 1000.0:9.2f} ms  "
+                      f"objects {result['objects']:>5}  points {result['spline_points']:>8}")
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare_with_baseline(results, json.load(f), args.threshold)
+        for case_name, density, base, new, ratio in regressions:
+            print(f"REGRESSION {case_name} @ {density}: {base * 1000.0:.2f} ms -> {new * 1000.0:.2f} ms ({ratio:.2f}x)")
+
+    report = {
+        'format_version': RESULT_FORMAT_VERSION,
+        'addon_version': list(addon.bl_info["version"]),
+        'blender_version': bpy.app.version_string,
+        'densities': densities,
+        'repeat': args.repeat,
+        'threshold': args.threshold,
+        'results': results,
+        'regressions': [{'case': c, 'density': d, 'baseline_median_s': b, 'median_s': n, 'ratio': r}
+                        for c, d, b, n, r in regressions],
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {len(results)} results to {args.output}")
+
+    addon.unregister()
+    failed = regressions or any(result['error'] for result in results)
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
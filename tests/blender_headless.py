@@ -0,0 +1,123 @@
+#Rogue Perspective AI - headless checks of the Blender side
+
+#Runs inside Blender without a GPU or window:
+#
+#   blender -b --factory-startup --python tests/blender_headless.py
+#   blender -b --factory-startup --python tests/blender_headless.py -- --checks legacy_fish_eye_boundary
+#
+#Every check runs on a freshly cleared scene (see benchmarks/run_benchmarks.py, whose scene helpers are
+#reused). Failures are listed and Blender exits with code 1. Not collected by pytest: it needs bpy.
+
+import argparse
+import os
+import sys
+import traceback
+
+import bpy
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "benchmarks"))
+from run_benchmarks import ADDON_FILE, generate_2p, load_addon, reset_scene, set_mode # noqa: E402
+
+
+# -----------------------------------------------------------
+# Checks
+# -----------------------------------------------------------
+def check_legacy_fish_eye_boundary(addon, ts):
+    """An older file's 'FE_Guides_1P_Boundary' ring is replaced on regeneration, not kept next to the new one."""
+    set_mode(ts, 'FISH_EYE')
+    guides_coll = addon.get_guides_collection(bpy.context)
+    legacy = addon.create_curve_object(bpy.context, "FE_Guides_1P_Boundary", [[(0.0, 0.0, 0.0), (1.0, 0.0, 0.0)]],
+                                       guides_coll) # Untagged, as older versions left it
+    assert legacy is not None and addon.OWNER_TAG_PROP not in legacy
+    bpy.ops.perspective_splines.generate_fish_eye('EXEC_DEFAULT')
+    assert "FE_Guides_1P_Boundary" not in bpy.data.objects, "legacy boundary ring kept"
+    rings = [obj for obj in bpy.data.objects if addon.guide_family_of(obj.name) == 'FE_BOUNDARY']
+    assert len(rings) <= 1, f"{len(rings)} boundary rings: {[obj.name for obj in rings]}"
+
+def check_clear_legacy_guides(addon, ts):
+    """Clear Fish Eye and Clear All find an older file's untagged 'FE_Guides_1P_Boundary' through the owner registry."""
+    for clear in (lambda: bpy.ops.perspective_splines.clear_type_guides('EXEC_DEFAULT', type_filter_prop='FISH_EYE'),
+                  lambda: bpy.ops.perspective_splines.clear_all('EXEC_DEFAULT')):
+        set_mode(ts, 'FISH_EYE')
+        legacy = addon.create_curve_object(bpy.context, "FE_Guides_1P_Boundary", [[(0.0, 0.0, 0.0), (1.0, 0.0, 0.0)]],
+                                           addon.get_guides_collection(bpy.context))
+        assert addon.get_owner_role(legacy) == 'GUIDE'
+        clear()
+        assert "FE_Guides_1P_Boundary" not in bpy.data.objects, "legacy boundary ring not cleared"
+        reset_scene(addon)
+
+def _check_buffer_layout(buffers):
+    for buf in buffers:
+        coords = buf['coords']
+        assert coords.dtype == np.float32, f"{buf['key']}: dtype {coords.dtype}"
+        assert coords.ndim == 2 and coords.shape[1] == 3 and coords.shape[0] % 2 == 0, \
+            f"{buf['key']}: shape {coords.shape} is not (2K, 3) segment end points"
+        assert len(buf['color']) == 4 and buf['width'] > 0.0
+
+def check_overlay_buffers(addon, ts):
+    """compute_overlay_line_buffers in both display modes: (2K, 3) float32 segments, baked families drawn by
+    their objects, and families hidden by the group toggle or excluded in the outliner left out."""
+    families = ('2P_VP1', '2P_VP2', '2P_VERTICAL')
+    for backend in ('CURVES', 'OVERLAY'):
+        reset_scene(addon)
+        ts.guide_display_backend = backend
+        set_mode(ts, 'TWO_POINT')
+        generate_2p(addon, ts)
+        scene = bpy.context.scene
+        buffers = addon.compute_overlay_line_buffers(scene)
+        _check_buffer_layout(buffers)
+        keys = {buf['key'] for buf in buffers}
+        if backend == 'OVERLAY':
+            assert keys.issuperset(families), f"overlay families missing: {set(families) - keys}"
+        else:
+            assert keys.isdisjoint(families), f"baked families drawn twice: {keys.intersection(families)}"
+
+        bpy.ops.perspective_splines.toggle_guide_visibility('EXEC_DEFAULT', group_prefix="2P_Guides_VP1")
+        family_coll = bpy.data.collections[addon.GUIDE_COLLECTION_PREFIX + '2P_VP2']
+        addon.find_layer_collection(bpy.context.view_layer.layer_collection, family_coll).exclude = True
+        buffers = addon.compute_overlay_line_buffers(scene)
+        _check_buffer_layout(buffers)
+        keys = {buf['key'] for buf in buffers}
+        assert keys.isdisjoint(('2P_VP1', '2P_VP2')), f"{backend}: hidden families drawn: {keys}"
+        if backend == 'OVERLAY':
+            assert '2P_VERTICAL' in keys
+        else:
+            for key in ('2P_VP1', '2P_VP2'):
+                family_objs = addon.get_guide_family_objects(key, addon.get_guides_collection(bpy.context))
+                assert family_objs and not any(obj.visible_get() for obj in family_objs.values()), f"{key} still shown"
+
+CHECKS = {
+    'legacy_fish_eye_boundary': check_legacy_fish_eye_boundary,
+    'clear_legacy_guides': check_clear_legacy_guides,
+    'overlay_buffers': check_overlay_buffers,
+}
+
+
+def parse_args(argv):
+    argv = argv[argv.index("--") + 1:] if "--" in argv else []
+    parser = argparse.ArgumentParser(description="Rogue Perspective AI headless checks")
+    parser.add_argument("--addon", default=ADDON_FILE, help="Path of the add-on file")
+    parser.add_argument("--checks", default="", help="Comma separated subset of: " + ", ".join(CHECKS))
+    return parser.parse_args(argv)
+
+def main():
+    args = parse_args(sys.argv)
+    addon = load_addon(os.path.normpath(args.addon))
+    check_names = [c.strip() for c in args.checks.split(",") if c.strip()] or list(CHECKS)
+    failures = []
+    for check_name in check_names:
+        reset_scene(addon)
+        try:
+            CHECKS[check_name](addon, bpy.context.scene.perspective_tool_settings_splines)
+        except Exception: # Keep going: report every failing check
+            failures.append(check_name)
+            print(f"FAIL {check_name}\n{traceback.format_exc()}")
+        else:
+            print(f"ok   {check_name}")
+    print(f"{len(check_names) - len(failures)}/{len(check_names)} checks passed")
+    addon.unregister()
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
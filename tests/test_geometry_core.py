@@ -0,0 +1,376 @@
+#Rogue Perspective AI - geometry core tests
+#
+#   python -m pytest -q tests
+#
+#The geometry core is loaded from the add-on file by its '# >>> GEOMETRY CORE >>>' markers (as the
+#microbenchmarks do) and runs in plain CPython with NumPy, no Blender needed.
+
+import math
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "benchmarks"))
+from geometry_microbench import load_geometry_core # noqa: E402
+
+PERSPECTIVE_VIEW = (np.eye(4), (-0.5, 0.5, -0.5, 0.5, 1.0), False) # At the origin looking down -Z, unit frame at depth 1
+ORTHO_VIEW = (np.eye(4), (0.0, 1.0, 0.0, 1.0, 1.0), True)
+UNIT_SQUARE = [(0.0, 0.0), (1.0, 0.0), (1.0, 1.0), (0.0, 1.0)]
+U_SHAPE = [(0, 0), (3, 0), (3, 3), (2, 3), (2, 1), (1, 1), (1, 3), (0, 3)]
+U_SHAPE_HOLE = [(1.2, 0.2), (1.8, 0.2), (1.8, 0.8), (1.2, 0.8)]
+NO_POINTS = np.zeros((0, 2))
+
+
+@pytest.fixture(scope="module")
+def core():
+    return load_geometry_core()
+
+def intervals(result):
+    """(segment index, t_enter, t_leave) arrays as one (N, 3) array."""
+    return np.stack(result, axis=1) if len(result[0]) else np.zeros((0, 3))
+
+def assert_empty_intervals(result):
+    assert [len(part) for part in result] == [0, 0, 0], result
+
+def brute_force_intervals(region, a, b, samples=2000):
+    """Inside flags of points sampled along each segment, for comparing against segment_intervals."""
+    t = (np.arange(samples) + 0.5) / samples
+    pts = a[:, None] + (b - a)[:, None] * t[None, :, None]
+    return t, region.contains(pts.reshape(-1, 2)).reshape(len(a), samples)
+
+def intervals_cover(result, n_segs, t):
+    seg_idx, t_enter, t_leave = result
+    covered = np.zeros((n_segs, len(t)), dtype=bool)
+    for seg, t0, t1 in zip(seg_idx, t_enter, t_leave):
+        covered[seg] |= (t >= t0) & (t <= t1)
+    return covered
+
+
+# -----------------------------------------------------------
+# Cyrus-Beck / Liang-Barsky
+# -----------------------------------------------------------
+def test_sort_polygon_ccw(core):
+    assert core['sort_polygon_ccw']([(1.0, 1.0), (0.0, 0.0), (0.0, 1.0), (1.0, 0.0)]) == UNIT_SQUARE
+    assert core['sort_polygon_ccw']([]) == []
+
+def test_cyrus_beck_crossing(core):
+    t = core['clip_segment_params_convex']((-1.0, 0.5), (2.0, 0.5), UNIT_SQUARE)
+    assert np.allclose(t, (1.0 / 3.0, 2.0 / 3.0))
+    assert np.allclose(core['clip_segment_to_convex_polygon']((-1.0, 0.5), (2.0, 0.5), UNIT_SQUARE),
+                       ((0.0, 0.5), (1.0, 0.5)))
+
+def test_cyrus_beck_degenerate(core):
+    clip = core['clip_segment_params_convex']
+    assert clip((0.2, 0.2), (0.8, 0.7), UNIT_SQUARE) == (0.0, 1.0) # Entirely inside
+    assert clip((2.0, 0.0), (3.0, 1.0), UNIT_SQUARE) is None # Entirely outside
+    assert clip((-1.0, 2.0), (2.0, 2.0), UNIT_SQUARE) is None # Parallel to an edge, outside
+    assert clip((-1.0, 1.0), (2.0, 1.0), UNIT_SQUARE) is not None # Along an edge
+    assert clip((0.5, 0.5), (0.5, 0.5), UNIT_SQUARE) == (0.0, 1.0) # Zero length, inside
+    assert clip((1.5, 0.5), (1.5, 0.5), UNIT_SQUARE) is None # Zero length, outside
+    assert clip((-1.0, -1.0), (2.0, -1.0), UNIT_SQUARE) is None
+    assert core['clip_segment_to_convex_polygon']((2.0, 0.0), (3.0, 1.0), UNIT_SQUARE) is None
+
+def test_liang_barsky_matches_cyrus_beck(core):
+    rng = np.random.default_rng(7)
+    for a, b in rng.uniform(-1.0, 2.0, (200, 2, 2)):
+        lb = core['liang_barsky_clip'](a, b)
+        cb = core['clip_segment_params_convex'](a, b, UNIT_SQUARE)
+        assert (lb is None) == (cb is None) or (lb and cb and math.isclose(lb[0], lb[1], abs_tol=1e-9))
+        if lb and cb:
+            assert np.allclose(lb, cb)
+
+def test_liang_barsky_degenerate(core):
+    clip = core['liang_barsky_clip']
+    assert clip((0.5, 0.5), (0.5, 0.5)) == (0.0, 1.0)
+    assert clip((1.5, 0.5), (1.5, 0.5)) is None
+    assert clip((-1.0, 2.0), (2.0, 2.0)) is None
+    assert np.allclose(clip((-1.0, 0.0), (1.0, 0.0), -0.5, 0.5, -0.5, 0.5), (0.25, 0.75))
+
+def test_liang_barsky_batch(core):
+    a = np.array([(-1.0, 0.5), (2.0, 2.0), (0.5, 0.5), (1.5, 0.5), (-1.0, 2.0)])
+    b = np.array([(2.0, 0.5), (3.0, 3.0), (0.5, 0.5), (1.5, 0.5), (2.0, 2.0)])
+    t_enter, t_leave, visible = core['liang_barsky_clip_batch'](a, b)
+    assert visible.tolist() == [True, False, True, False, False]
+    assert np.allclose((t_enter[0], t_leave[0]), (1.0 / 3.0, 2.0 / 3.0))
+    assert (t_enter[2], t_leave[2]) == (0.0, 1.0)
+    for i in range(len(a)):
+        scalar = core['liang_barsky_clip'](a[i], b[i])
+        assert (scalar is not None) == visible[i]
+        if scalar:
+            assert np.allclose(scalar, (t_enter[i], t_leave[i]))
+
+def test_halfplanes_batch_matches_scalar(core):
+    octagon = core['sort_polygon_ccw']([(0.5 + 0.4 * math.cos(a), 0.5 + 0.4 * math.sin(a))
+                                        for a in np.linspace(0.0, 2.0 * math.pi, 8, endpoint=False)])
+    rng = np.random.default_rng(3)
+    a, b = rng.uniform(-1.0, 2.0, (300, 2)), rng.uniform(-1.0, 2.0, (300, 2))
+    t_enter, t_leave, visible = core['clip_segments_halfplanes'](a, b, *core['convex_polygon_halfplanes'](octagon))
+    for i in range(len(a)):
+        scalar = core['clip_segment_params_convex'](a[i], b[i], octagon)
+        assert (scalar is not None) == visible[i]
+        if scalar:
+            assert np.allclose(scalar, (t_enter[i], t_leave[i]))
+
+def test_halfplanes_batch_empty(core):
+    t_enter, t_leave, visible = core['clip_segments_halfplanes'](NO_POINTS, NO_POINTS, *core['rect_halfplanes']())
+    assert t_enter.shape == t_leave.shape == visible.shape == (0,)
+    assert_empty_intervals(core['ConvexRegion'](*core['rect_halfplanes']()).segment_intervals(NO_POINTS, NO_POINTS))
+
+
+# -----------------------------------------------------------
+# EdgeGrid
+# -----------------------------------------------------------
+def test_edge_grid_candidate_pairs_cover_intersections(core):
+    rng = np.random.default_rng(11)
+    c, d = rng.uniform(0.0, 1.0, (120, 2)), rng.uniform(0.0, 1.0, (120, 2))
+    a, b = rng.uniform(-0.5, 1.5, (200, 2)), rng.uniform(-0.5, 1.5, (200, 2))
+    grid = core['EdgeGrid'](c, d)
+    seg, edge = grid.candidate_pairs(a, b)
+    candidates = set(zip(seg.tolist(), edge.tolist()))
+    assert len(candidates) == len(seg) # Unique pairs
+    r, q = (b - a)[:, None], (d - c)[None]
+    w = c[None] - a[:, None]
+    denom = r[..., 0] * q[..., 1] - r[..., 1] * q[..., 0]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = (w[..., 0] * q[..., 1] - w[..., 1] * q[..., 0]) / denom
+        u = (w[..., 0] * r[..., 1] - w[..., 1] * r[..., 0]) / denom
+    hits = set(zip(*np.nonzero((t >= 0.0) & (t <= 1.0) & (u >= 0.0) & (u <= 1.0))))
+    assert hits <= candidates, hits - candidates
+
+def test_edge_grid_crossing_parity(core):
+    square = np.array(UNIT_SQUARE)
+    grid = core['EdgeGrid'](square, np.roll(square, -1, axis=0))
+    points = np.array([(0.5, 0.5), (0.1, 0.9), (1.5, 0.5), (-0.5, 0.5), (0.5, -3.0), (5.0, 5.0)])
+    assert grid.crossing_parity(points).tolist() == [True, True, False, False, False, False]
+    assert grid.crossing_parity(NO_POINTS).shape == (0,)
+
+def test_edge_grid_empty_queries(core):
+    square = np.array(UNIT_SQUARE)
+    seg, edge = core['EdgeGrid'](square, np.roll(square, -1, axis=0)).candidate_pairs(NO_POINTS, NO_POINTS)
+    assert len(seg) == len(edge) == 0
+
+def test_edge_grid_single_edge(core):
+    grid = core['EdgeGrid'](np.array([(0.0, 0.0)]), np.array([(1.0, 0.0)])) # Zero height extent
+    seg, edge = grid.candidate_pairs(np.array([(0.5, -1.0)]), np.array([(0.5, 1.0)]))
+    assert seg.tolist() == [0] and edge.tolist() == [0]
+
+
+# -----------------------------------------------------------
+# Clip regions
+# -----------------------------------------------------------
+def test_polygon_region_concave_with_hole(core):
+    region = core['PolygonRegion'].from_contours([U_SHAPE, U_SHAPE_HOLE])
+    result = region.segment_intervals(np.array([(-1.0, 2.0), (-1.0, 0.5)]), np.array([(4.0, 2.0), (4.0, 0.5)]))
+    assert np.allclose(intervals(result), [(0, 0.2, 0.4), (0, 0.6, 0.8), (1, 0.2, 0.44), (1, 0.56, 0.8)])
+    points = np.array([(0.5, 2.0), (1.5, 2.0), (1.5, 0.5), (1.5, 0.9)])
+    assert region.contains(points).tolist() == [True, False, False, True]
+
+def test_polygon_region_matches_sampling(core):
+    angles = np.linspace(0.0, 2.0 * math.pi, 200, endpoint=False)
+    star = np.stack((0.5 + (0.4 + 0.08 * np.sin(7 * angles)) * np.cos(angles),
+                     0.5 + (0.4 + 0.08 * np.sin(7 * angles)) * np.sin(angles)), axis=1)
+    region = core['PolygonRegion'].from_contours([star])
+    rng = np.random.default_rng(5)
+    a, b = rng.uniform(-0.2, 1.2, (40, 2)), rng.uniform(-0.2, 1.2, (40, 2))
+    t, sampled = brute_force_intervals(region, a, b)
+    assert np.mean(intervals_cover(region.segment_intervals(a, b), len(a), t) == sampled) > 0.999
+
+def test_polygon_region_degenerate(core):
+    region = core['PolygonRegion'].from_contours([UNIT_SQUARE, [(5.0, 5.0), (6.0, 5.0)]]) # Too short: skipped
+    assert region.grid.c.shape == (4, 2)
+    assert_empty_intervals(region.segment_intervals(NO_POINTS, NO_POINTS))
+    assert region.contains(NO_POINTS).shape == (0,)
+    a = np.array([(0.5, 0.5), (2.0, 2.0), (-1.0, 2.0)])
+    b = np.array([(0.5, 0.5), (2.0, 2.0), (2.0, 2.0)]) # Zero length inside / outside, a miss
+    assert np.allclose(intervals(region.segment_intervals(a, b)), [(0, 0.0, 1.0)])
+
+def test_polygon_region_touching_vertex_is_one_interval(core):
+    diamond = core['PolygonRegion'].from_contours([[(0.0, -1.0), (1.0, 0.0), (0.0, 1.0), (-1.0, 0.0)]])
+    assert np.allclose(intervals(diamond.segment_intervals(np.array([(-2.0, 0.0)]), np.array([(2.0, 0.0)]))),
+                       [(0, 0.25, 0.75)])
+
+def test_ellipse_region_projects_onto_conic(core):
+    tilted = core['euler_xyz_matrix'](0.4, 0.2, 0.0)
+    center, axis_u, axis_v = np.array((0.3, 0.1, -5.0)), tilted[:, 0], tilted[:, 1]
+    ellipse = core['EllipseRegion'].from_plane_ellipse(PERSPECTIVE_VIEW, center, axis_u, axis_v)
+    rim = center + np.cos(np.arange(8.0))[:, None] * axis_u + np.sin(np.arange(8.0))[:, None] * axis_v
+    assert np.allclose(ellipse._values(core['camera_view_project'](rim, PERSPECTIVE_VIEW)[:, :2]), 0.0, atol=1e-9)
+    assert ellipse.contains(core['camera_view_project'](center[None], PERSPECTIVE_VIEW)[:, :2]).tolist() == [True]
+
+def test_ellipse_region_segment_intervals(core):
+    circle = core['EllipseRegion'](np.diag((1.0, 1.0, -1.0))) # Unit circle
+    a = np.array([(-2.0, 0.0), (-2.0, 1.0), (-2.0, 2.0), (0.0, 0.0), (-0.5, 0.0), (0.0, 0.0), (3.0, 0.0)])
+    b = np.array([(2.0, 0.0), (2.0, 1.0), (2.0, 2.0), (0.5, 0.0), (2.0, 0.0), (0.0, 0.0), (3.0, 0.0)])
+    # Through, tangent, miss, inside, leaving, zero length inside and outside
+    assert np.allclose(intervals(circle.segment_intervals(a, b)),
+                       [(0, 0.25, 0.75), (3, 0.0, 1.0), (4, 0.0, 0.6), (5, 0.0, 1.0)])
+    assert_empty_intervals(circle.segment_intervals(NO_POINTS, NO_POINTS))
+    assert circle.contains(NO_POINTS).shape == (0,)
+
+def test_composite_region_frame_with_window(core):
+    frame = core['ConvexRegion'](*core['rect_halfplanes'](0.0, 3.0, 0.0, 3.0))
+    window = core['ConvexRegion'](*core['rect_halfplanes'](1.0, 2.0, 1.0, 2.0))
+    a, b = np.array([(-1.0, 1.5)]), np.array([(4.0, 1.5)])
+    framed = core['CompositeRegion']((frame, window), ('UNION', 'DIFFERENCE'))
+    assert np.allclose(intervals(framed.segment_intervals(a, b)), [(0, 0.2, 0.4), (0, 0.6, 0.8)])
+    inverted = core['CompositeRegion']((frame, window), ('UNION', 'DIFFERENCE'), invert=True)
+    assert np.allclose(intervals(inverted.segment_intervals(a, b)), [(0, 0.0, 0.2), (0, 0.4, 0.6), (0, 0.8, 1.0)])
+    assert framed.contains(np.array([(0.5, 0.5), (1.5, 1.5), (3.5, 1.5)])).tolist() == [True, False, False]
+    both = core['CompositeRegion']((frame, window), ('UNION', 'INTERSECT'))
+    assert np.allclose(intervals(both.segment_intervals(a, b)), [(0, 0.4, 0.6)])
+
+def test_composite_region_mixed_shapes_match_sampling(core):
+    circle = core['EllipseRegion'](np.array(((1.0, 0.0, -0.5), (0.0, 1.0, -0.5), (-0.5, -0.5, 0.34))))
+    u_shape = core['PolygonRegion'].from_contours([np.array(U_SHAPE) / 3.0])
+    bar = core['ConvexRegion'](*core['rect_halfplanes'](0.45, 0.55, 0.0, 1.0))
+    region = core['CompositeRegion']((u_shape, circle, bar), ('UNION', 'DIFFERENCE', 'UNION'), invert=True)
+    rng = np.random.default_rng(9)
+    a, b = rng.uniform(-0.2, 1.2, (40, 2)), rng.uniform(-0.2, 1.2, (40, 2))
+    t, sampled = brute_force_intervals(region, a, b)
+    assert np.mean(intervals_cover(region.segment_intervals(a, b), len(a), t) == sampled) > 0.999
+
+def test_composite_region_degenerate(core):
+    frame = core['ConvexRegion'](*core['rect_halfplanes']())
+    far = core['ConvexRegion'](*core['rect_halfplanes'](5.0, 6.0, 5.0, 6.0))
+    assert_empty_intervals(core['CompositeRegion']((frame, far), ('UNION', 'UNION')).segment_intervals(
+        NO_POINTS, NO_POINTS))
+    # A child no segment reaches, and no children at all
+    a, b = np.array([(-1.0, 0.5)]), np.array([(2.0, 0.5)])
+    assert np.allclose(intervals(core['CompositeRegion']((frame, far), ('UNION', 'DIFFERENCE')).segment_intervals(a, b)),
+                       [(0, 1.0 / 3.0, 2.0 / 3.0)])
+    assert_empty_intervals(core['CompositeRegion']((frame, far), ('UNION', 'INTERSECT')).segment_intervals(a, b))
+    assert_empty_intervals(core['CompositeRegion']((), ()).segment_intervals(a, b))
+    assert np.allclose(intervals(core['CompositeRegion']((), (), invert=True).segment_intervals(a, b)), [(0, 0.0, 1.0)])
+
+
+# -----------------------------------------------------------
+# Camera clipping and stitching
+# -----------------------------------------------------------
+CROSSING_LINE = np.array([(-2.0, 0.0, -2.0), (0.0, 0.0, -2.0), (0.2, 0.0, -1.0), (0.2, 0.0, 1.0)])
+
+def test_clip_and_stitch_in_perspective(core):
+    # Enters the view from the left and leaves it sideways on its way behind the camera: stays one piece
+    camera_frame = core['ConvexRegion'](*core['rect_halfplanes']())
+    clip = core['clip_polylines_in_camera_view'](CROSSING_LINE, [4], PERSPECTIVE_VIEW, camera_frame)
+    stitched, counts, cyclic, sources = core['stitch_clipped_segments'](CROSSING_LINE, [4], *clip, return_sources=True)
+    assert counts.tolist() == [4] and cyclic.tolist() == [False]
+    assert stitched.dtype == np.float32
+    assert np.allclose(stitched[0], (-1.0, 0.0, -2.0)) and np.allclose(stitched[-1], (0.2, 0.0, -0.4))
+    assert sources.tolist() == [-1, 1, 2, -1] # Cut points have no source
+    unjoined, unjoined_counts, _ = core['stitch_clipped_segments'](CROSSING_LINE, [4], *clip, join=False)
+    assert unjoined_counts.tolist() == [2, 2, 2] and len(unjoined) == 6
+
+def test_clip_behind_camera(core):
+    camera_frame = core['ConvexRegion'](*core['rect_halfplanes']())
+    behind = np.array([(0.0, 0.0, 1.0), (0.0, 0.0, 3.0)])
+    assert_empty_intervals(core['clip_polylines_in_camera_view'](behind, [2], PERSPECTIVE_VIEW, camera_frame))
+
+def test_stitch_keeps_loop_seam(core):
+    # A closed loop whose right side leaves the frame stays one polyline across its seam (its first point);
+    # a loop entirely in view stays cyclic
+    camera_frame = core['ConvexRegion'](*core['rect_halfplanes']())
+    loops = np.array([(0.2, 0.2, 0), (1.4, 0.2, 0), (1.4, 0.8, 0), (0.2, 0.8, 0),
+                      (0.2, 0.2, 0), (0.8, 0.2, 0), (0.8, 0.8, 0), (0.2, 0.8, 0)], dtype=float)
+    loops, loop_counts = core['close_polylines'](loops, [4, 4], [True, True])
+    assert loop_counts.tolist() == [5, 5]
+    clip = core['clip_polylines_in_camera_view'](loops, loop_counts, ORTHO_VIEW, camera_frame)
+    stitched, counts, cyclic = core['stitch_clipped_segments'](loops, loop_counts, *clip, cyclic=[True, True])
+    assert counts.tolist() == [4, 4] and cyclic.tolist() == [False, True]
+    assert np.allclose(stitched[[0, 3]], [(1.0, 0.8, 0.0), (1.0, 0.2, 0.0)])
+
+def test_close_polylines_degenerate(core):
+    coords = np.arange(15.0).reshape(5, 3)
+    closed, counts, ids = core['close_polylines'](coords, [2, 3], [True, True], np.arange(5))
+    assert counts.tolist() == [2, 4] and ids.tolist() == [0, 1, 2, 3, 4, 2] # Two points make no loop
+    closed, counts = core['close_polylines'](np.zeros((0, 3)), [], [])
+    assert closed.shape == (0, 3) and len(counts) == 0
+
+def test_clip_and_stitch_empty(core):
+    camera_frame = core['ConvexRegion'](*core['rect_halfplanes']())
+    no_coords, no_counts = np.zeros((0, 3)), np.zeros(0, dtype=np.int64)
+    clip = core['clip_polylines_in_camera_view'](no_coords, no_counts, PERSPECTIVE_VIEW, camera_frame)
+    assert_empty_intervals(clip)
+    for result in (core['stitch_clipped_segments'](no_coords, no_counts, *clip, return_sources=True),
+                   core['stitch_clipped_segments'](CROSSING_LINE, [4], *clip, cyclic=[True], return_sources=True)):
+        stitched, counts, cyclic, sources = result
+        assert stitched.shape == (0, 3) and stitched.dtype == np.float32
+        assert len(counts) == len(cyclic) == len(sources) == 0
+
+
+# -----------------------------------------------------------
+# Bezier flattening
+# -----------------------------------------------------------
+def test_flatten_bezier_ring_within_tolerance(core):
+    # Every flattened point lies on the curve, no densely sampled point is farther than the tolerance from
+    # the flattening, and its knots are the control points
+    ring = np.array([(np.cos(a), np.sin(a), 0.0) for a in np.linspace(0.0, 2.0 * math.pi, 5, endpoint=False)])
+    handle_left, handle_right = core['auto_bezier_handles'](ring, [5], [True])
+    steps = core['bezier_flatten_steps'](ring, handle_left, handle_right, [5], [True], 1e-3)
+    assert len(steps) == 5 and all(int(s) & (int(s) - 1) == 0 for s in steps) # Powers of two
+    flat, counts, knots = core['flatten_bezier_splines'](ring, handle_left, handle_right, [5], [True], steps)
+    assert counts.tolist() == [int(steps.sum())] and np.allclose(flat[knots], ring)
+    dense = core['sample_bezier_spline'](ring, handle_left, handle_right, True, 256)
+    closed = np.concatenate((flat, flat[:1]))
+    a, ab = closed[:-1], closed[1:] - closed[:-1]
+    t = np.clip(np.einsum('pij,ij->pi', dense[:, None] - a[None], ab) / np.einsum('ij,ij->i', ab, ab), 0.0, 1.0)
+    assert np.linalg.norm(a[None] + t[..., None] * ab[None] - dense[:, None], axis=2).min(axis=1).max() <= 1e-3
+
+def test_flatten_bezier_open_and_degenerate_splines(core):
+    co = np.array([(0.0, 0.0, 0.0), (1.0, 0.0, 0.0), (2.0, 1.0, 0.0), (5.0, 5.0, 5.0)])
+    counts, cyclic = [3, 0, 1], [False, True, True] # Open, empty, single point (no segment to close)
+    handle_left, handle_right = co - 0.25, co + 0.25
+    cur, nxt, n_segs = core['bezier_segment_indices'](counts, cyclic)
+    assert cur.tolist() == [0, 1] and nxt.tolist() == [1, 2] and n_segs.tolist() == [2, 0, 0]
+    steps = core['bezier_flatten_steps'](co, handle_left, handle_right, counts, cyclic, 1e-3)
+    flat, flat_counts, knots = core['flatten_bezier_splines'](co, handle_left, handle_right, counts, cyclic, steps)
+    assert flat_counts.tolist() == [int(steps.sum()) + 1, 0, 1]
+    assert np.allclose(flat[knots], co) and np.allclose(flat[[0, -2, -1]], co[[0, 2, 3]])
+
+def test_flatten_bezier_straight_and_empty(core):
+    co = np.array([(0.0, 0.0, 0.0), (1.0, 0.0, 0.0)])
+    handle_left, handle_right = co + ((-1.0 / 3.0, 0.0, 0.0),), co + ((1.0 / 3.0, 0.0, 0.0),) # Evenly spaced: a straight line
+    steps = core['bezier_flatten_steps'](co, handle_left, handle_right, [2], [False], 1e-3)
+    assert steps.tolist() == [1]
+    no_points = np.zeros((0, 3))
+    steps = core['bezier_flatten_steps'](no_points, no_points, no_points, [], [], 1e-3)
+    assert steps.shape == (0,)
+    flat, counts, knots = core['flatten_bezier_splines'](no_points, no_points, no_points, [], [], steps)
+    assert flat.shape == (0, 3) and len(counts) == len(knots) == 0
+
+def test_flatten_steps_capped(core):
+    co = np.array([(0.0, 0.0, 0.0), (1.0, 0.0, 0.0)])
+    wild = co + np.array([(0.0, 1e6, 0.0), (0.0, -1e6, 0.0)])
+    steps = core['bezier_flatten_steps'](co, wild, wild, [2], [False], 1e-3)
+    assert steps.tolist() == [core['BEZIER_FLATTEN_MAX_STEPS']]
+
+
+# -----------------------------------------------------------
+# Packed lines
+# -----------------------------------------------------------
+def test_pack_lines(core):
+    coords, counts = core['pack_lines']([np.zeros((3, 3)), np.ones((1, 3)), np.ones((2, 3))])
+    assert coords.shape == (5, 3) and coords.dtype == np.float32 and counts.tolist() == [3, 2]
+    assert core['polylines_to_segments'](coords, counts).shape == (6, 3)
+    assert [len(line) for line in core['unpack_lines'](coords, counts)] == [3, 2]
+
+def test_pack_lines_empty(core):
+    for lines in ([], [np.ones((1, 3))], np.zeros((0, 2, 3)), np.zeros((4, 1, 3))):
+        coords, counts = core['pack_lines'](lines)
+        assert coords.shape == (0, 3) and len(counts) == 0
+    assert core['unpack_lines'](np.zeros((0, 3)), []) == []
+
+def test_select_lines_and_points(core):
+    picked, counts, ids = core['select_lines'](CROSSING_LINE, [2, 2], [False, True], np.arange(4))
+    assert counts.tolist() == [2] and ids.tolist() == [2, 3] and np.allclose(picked, CROSSING_LINE[2:])
+    kept, kept_counts = core['select_polyline_points'](CROSSING_LINE, [4], [False, False, False, False], [False])
+    assert kept_counts.tolist() == [2] and np.allclose(kept, CROSSING_LINE[[0, 3]]) # Open lines keep their ends
+    kept, kept_counts = core['select_polyline_points'](np.zeros((0, 3)), [], [], [])
+    assert kept.shape == (0, 3) and len(kept_counts) == 0
+
+def test_radial_lines_and_intersection(core):
+    radial = core['radial_lines_array']((1.0, 2.0, 3.0), 8, 10.0, 'XZ')
+    assert radial.shape == (8, 2, 3) and np.allclose(np.linalg.norm(radial[:, 1] - radial[:, 0], axis=1), 10.0)
+    point, _, _ = core['line_line_intersection_3d']((0, 0, 0), (1, 0, 0), (0.5, -1, 0), (0.5, 1, 0))
+    assert np.allclose(point, (0.5, 0.0, 0.0))